@@ -0,0 +1,2 @@
+# Offline benchmarks; run as modules from the project root, e.g.
+# python -m api.benchmarks.bench_router
@@ -0,0 +1,94 @@
+"""
+Compare the previous word-window chunker with the structure-aware chunker.
+
+Chunks api/rag/data both ways and reports chunk counts and token sizes, then
+runs the labeled queries in retrieval_queries.json with k=4 and reports recall
+and the context tokens each answer would send to the model (after
+pack_context for the new chunker). Retrieval uses BM25 so the comparison runs
+offline without the embedding model; both chunkings are ranked the same way.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_chunker [--k 4] [--context-tokens 1500]
+"""
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.benchmarks.bench_hybrid_retrieval import load_labeled_queries, recall_at_k  # noqa: E402
+from api.rag.bm25 import BM25Index  # noqa: E402
+from api.rag.corpus import DATA_DIR, chunk_text, extract_frontmatter, list_markdown_files, load_corpus  # noqa: E402
+from api.rag.retriever import pack_context  # noqa: E402
+from api.rag.tokens import count_tokens, tokenizer_name  # noqa: E402
+
+
+def load_word_window_corpus() -> list[dict]:
+    """Rows as the previous build_index.py produced them (500-word windows, 50 overlap)"""
+    rows = []
+    for md_file in list_markdown_files():
+        relative_path = md_file.relative_to(DATA_DIR)
+        frontmatter, body = extract_frontmatter(md_file.read_text(encoding="utf-8"))
+        title = frontmatter.get("title", md_file.stem)
+        for idx, chunk in enumerate(chunk_text(body)):
+            rows.append({
+                "id": f"{relative_path.with_suffix('').as_posix()}#{idx}",
+                "document": chunk,
+                "metadata": {"source": str(relative_path), "title": title},
+            })
+    return rows
+
+
+def evaluate(rows: list[dict], queries: list[dict], k: int, context_tokens: int, pack: bool) -> dict:
+    index = BM25Index.from_rows(rows)
+    sources = {row["id"]: row["metadata"]["source"] for row in rows}
+    chunk_tokens = [count_tokens(row["document"]) for row in rows]
+
+    recalls, answer_tokens = [], []
+    for item in queries:
+        hits = [row for row, _ in index.search(item["query"], k)]
+        results = [{"chunk": rows[row]["document"], "token_count": rows[row]["metadata"].get("token_count")} for row in hits]
+        if pack:
+            context, _ = pack_context(results, max_tokens=context_tokens)
+        else:
+            context = "\n\n".join(result["chunk"] for result in results)
+        recalls.append(recall_at_k([rows[row]["id"] for row in hits], sources, item["relevant"], k))
+        answer_tokens.append(count_tokens(context))
+
+    return {
+        "chunks": len(rows),
+        "avg_chunk_tokens": round(statistics.mean(chunk_tokens), 1),
+        "max_chunk_tokens": max(chunk_tokens),
+        f"recall@{k}": round(statistics.mean(recalls), 3),
+        "avg_context_tokens_per_answer": round(statistics.mean(answer_tokens), 1),
+        "max_context_tokens_per_answer": max(answer_tokens),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--context-tokens", type=int, default=1500, help="pack_context budget for the new chunker")
+    args = parser.parse_args()
+
+    queries = load_labeled_queries()
+    before = evaluate(load_word_window_corpus(), queries, args.k, args.context_tokens, pack=False)
+    after = evaluate(load_corpus(), queries, args.k, args.context_tokens, pack=True)
+    report = {
+        "tokenizer": tokenizer_name(),
+        "queries": len(queries),
+        "word_windows": before,
+        "markdown_sections": after,
+        "context_token_reduction_percent": round(
+            100 * (1 - after["avg_context_tokens_per_answer"] / before["avg_context_tokens_per_answer"]), 1
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
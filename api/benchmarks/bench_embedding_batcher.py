@@ -0,0 +1,104 @@
+"""
+Benchmark micro-batched query embedding under concurrency.
+
+A pool of client threads (like concurrent retrieve() calls) embeds distinct
+queries either one model call per query or through the EmbeddingBatcher.
+Reports throughput, per-query latency, the batch-size distribution and the
+queue delay the batching window adds.
+
+By default the model is simulated with a batch cost of --overhead-ms plus
+--per-item-ms per text (ONNX MiniLM has a large fixed per-call cost and runs
+calls serially); pass --model to use Chroma's default ONNX MiniLM model.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_embedding_batcher [--clients 16] [--queries 400] [--wait-ms 3] [--model]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag.embedding_batcher import EmbeddingBatcher  # noqa: E402
+
+
+def make_model(use_model: bool, overhead_ms: float, per_item_ms: float, dim: int):
+    if use_model:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        return DefaultEmbeddingFunction()
+
+    # One inference at a time, as with a single ONNX session on a small CPU
+    lock = threading.Lock()
+
+    def simulated(texts):
+        with lock:
+            time.sleep((overhead_ms + per_item_ms * len(texts)) / 1000)
+        return [np.zeros(dim, dtype=np.float32) for _ in texts]
+
+    return simulated
+
+
+def run(embed_one, queries: list[str], clients: int) -> dict:
+    latencies = []
+
+    def call(query):
+        start = time.perf_counter()
+        embed_one(query)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(call, queries))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "queries_per_second": round(len(queries) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(latencies[len(latencies) // 2] * 1000, 2),
+            "p99": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--wait-ms", type=float, default=3.0, help="Batching window")
+    parser.add_argument("--overhead-ms", type=float, default=6.0, help="Simulated fixed cost per model call")
+    parser.add_argument("--per-item-ms", type=float, default=0.5, help="Simulated cost per text")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--model", action="store_true", help="Use the real ONNX MiniLM embedding model")
+    args = parser.parse_args()
+
+    model = make_model(args.model, args.overhead_ms, args.per_item_ms, args.dim)
+    queries = [f"query {i} about fever and headache" for i in range(args.queries)]
+    model(queries[:1])  # load model / warm up
+
+    unbatched = run(lambda q: model([q])[0], queries, args.clients)
+    batcher = EmbeddingBatcher(model, max_batch=args.max_batch, max_wait_ms=args.wait_ms)
+    batched = run(batcher.embed, queries, args.clients)
+    batcher.shutdown(5)
+
+    report = {
+        "clients": args.clients,
+        "queries": args.queries,
+        "model": "onnx-minilm" if args.model else f"simulated {args.overhead_ms}ms + {args.per_item_ms}ms/item",
+        "unbatched": unbatched,
+        "batched": batched,
+        "batcher": batcher.get_statistics(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark the query-embedding cache on a replayed query stream.
+
+Queries from router_queries.json are drawn with a Zipf-like popularity skew, and
+some are re-sent in the enhanced form that _enhance_search_query_with_context
+produces (question + history keywords) or with different casing/spacing.
+Reports hit rate, embedding time with and without the cache, and the
+float16 payload size stored in Redis.
+
+By default the embedder is simulated with a fixed cost (--embed-ms) so the
+benchmark runs offline; pass --model to use Chroma's default ONNX MiniLM model.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_embedding_cache [--requests 2000] [--cache-size 256] [--embed-ms 8] [--model]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag.embedding_cache import QueryEmbeddingCache, encode_float16  # noqa: E402
+
+QUERIES_PATH = Path(__file__).parent / "router_queries.json"
+HISTORY_KEYWORDS = ["fever", "headache", "cough", "pregnant", "diabetes", "chest pain"]
+
+
+def query_stream(count: int, seed: int) -> list[str]:
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        base = [item["query"] for item in json.load(f)]
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(base) + 1)
+    picks = rng.choice(len(base), size=count, p=weights / weights.sum())
+    stream = []
+    for pick in picks:
+        query = base[pick]
+        variant = rng.random()
+        if variant < 0.2:
+            query = f"{query} {HISTORY_KEYWORDS[pick % len(HISTORY_KEYWORDS)]}"
+        elif variant < 0.3:
+            query = "  " + query.upper()
+        stream.append(query)
+    return stream
+
+
+def make_embedder(use_model: bool, embed_ms: float, dim: int):
+    if use_model:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        function = DefaultEmbeddingFunction()
+        return lambda query: function([query])[0]
+
+    def simulated(query: str):
+        time.sleep(embed_ms / 1000)
+        rng = np.random.default_rng(abs(hash(query)) % (2**32))
+        return rng.standard_normal(dim).astype(np.float32)
+
+    return simulated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Queries to replay")
+    parser.add_argument("--cache-size", type=int, default=256, help="L1 LRU capacity")
+    parser.add_argument("--embed-ms", type=float, default=8.0, help="Simulated cost of one embedding")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--model", action="store_true", help="Use the real ONNX MiniLM embedding model")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    embed = make_embedder(args.model, args.embed_ms, args.dim)
+    stream = query_stream(args.requests, args.seed)
+    embed(stream[0])  # load model / warm up
+
+    start = time.perf_counter()
+    for query in stream:
+        embed(query)
+    uncached_s = time.perf_counter() - start
+
+    cache = QueryEmbeddingCache(max_size=args.cache_size)
+    start = time.perf_counter()
+    for query in stream:
+        cache.get_or_compute(query, embed)
+    cached_s = time.perf_counter() - start
+
+    sample = np.asarray(embed(stream[0]), dtype=np.float32)
+    report = {
+        "requests": len(stream),
+        "distinct_queries": len(set(stream)),
+        "embedder": "onnx-minilm" if args.model else f"simulated {args.embed_ms}ms",
+        "uncached_total_ms": round(uncached_s * 1000, 1),
+        "cached_total_ms": round(cached_s * 1000, 1),
+        "speedup": round(uncached_s / cached_s, 2) if cached_s else None,
+        "cache": cache.get_statistics(),
+        "redis_payload_bytes": {
+            "float16_base64": len(encode_float16(sample)),
+            "float32_json": len(json.dumps(sample.tolist())),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark the in-memory graph (api.graph.memory.MemoryGraph): load time and per-query latency.
+
+Every query of cypher.py runs over each symptom (red flags, related symptoms),
+condition (contraindications) and city (providers) of seed.csv and
+symptom_relationships.csv. With --neo4j the same calls go to Neo4j (loaded by
+graph/ingest.py) too, and the report counts the calls whose results differ.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_graph [--repeat 50] [--neo4j]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.graph.memory import GRAPH_CSV_FILES, MemoryGraph, read_triples  # noqa: E402
+
+
+def query_arguments() -> dict[str, list[tuple]]:
+    """Arguments of each query: every symptom, condition and city of the triples"""
+    triples = [triple for path in GRAPH_CSV_FILES for triple in read_triples(path)]
+
+    def names(label: str) -> list[str]:
+        return sorted(
+            {t["subject"] for t in triples if t["type_s"] == label} | {t["object"] for t in triples if t["type_o"] == label}
+        )
+
+    symptoms = [([name.lower()],) for name in names("Symptom")]
+    return {
+        "get_red_flags": symptoms,
+        "get_contraindications": [([name],) for name in names("Condition")],
+        "get_safe_actions_for_metabolic_conditions": [()],
+        "get_providers_in_city": [(name,) for name in names("Location")],
+        "get_related_symptoms": symptoms,
+    }
+
+
+def normalized(rows: list[dict]) -> list[dict]:
+    """Rows with list values sorted, in a stable order"""
+    rows = [{key: sorted(value) if isinstance(value, list) else value for key, value in row.items()} for row in rows]
+    return sorted(rows, key=repr)
+
+
+def time_calls(function, arguments: list[tuple], repeat: int) -> dict:
+    latencies_us = []
+    for _ in range(repeat):
+        for args in arguments:
+            start = time.perf_counter()
+            function(*args)
+            latencies_us.append((time.perf_counter() - start) * 1e6)
+    latencies_us.sort()
+    return {
+        "calls": len(latencies_us),
+        "mean": round(statistics.fmean(latencies_us), 2),
+        "p50": round(latencies_us[len(latencies_us) // 2], 2),
+        "p99": round(latencies_us[max(0, int(len(latencies_us) * 0.99) - 1)], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Timing passes over the arguments of each query")
+    parser.add_argument("--neo4j", action="store_true", help="Also time Neo4j and compare its results")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = MemoryGraph.from_csv()
+    report = {
+        "nodes": len(graph),
+        "relationships": graph.edge_count,
+        "load_ms": round((time.perf_counter() - start) * 1000, 1),
+        "queries": {},
+    }
+
+    cypher = None
+    if args.neo4j:
+        from api.graph import cypher
+        from api.graph.client import neo4j_client
+
+        if not neo4j_client.connect():
+            parser.error("cannot connect to Neo4j")
+
+    for name, arguments in query_arguments().items():
+        result = {"memory_us": time_calls(getattr(graph, name), arguments, args.repeat)}
+        if cypher is not None:
+            neo4j_query = getattr(cypher, name)
+            result["neo4j_us"] = time_calls(neo4j_query, arguments, 1)
+            result["mismatches"] = sum(
+                normalized(getattr(graph, name)(*call)) != normalized(neo4j_query(*call)) for call in arguments
+            )
+        report["queries"][name] = result
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
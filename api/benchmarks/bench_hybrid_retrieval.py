@@ -0,0 +1,113 @@
+"""
+Benchmark recall@k of dense, sparse (BM25) and hybrid (RRF) retrieval.
+
+Indexes the chunks of api/rag/data exactly as build_index.py does and runs the
+labeled queries in retrieval_queries.json (exact medical terms, romanized
+words and plain-language paraphrases). recall@k is the fraction of a query's
+relevant documents that appear among the top-k chunks.
+
+Dense retrieval embeds chunks with Chroma's default ONNX MiniLM model; if the
+model cannot be loaded (e.g. offline), only the sparse results are reported.
+Also reports BM25 build and artifact-load times.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_hybrid_retrieval [--k 1 3 5] [--candidates 4]
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag.bm25 import BM25Index, reciprocal_rank_fusion  # noqa: E402
+from api.rag.corpus import load_corpus  # noqa: E402
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+QUERIES_PATH = Path(__file__).parent / "retrieval_queries.json"
+
+
+def load_labeled_queries(path: Path = QUERIES_PATH) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def recall_at_k(ranked_ids: list[str], sources: dict, relevant: list[str], k: int) -> float:
+    found = {sources[chunk_id] for chunk_id in ranked_ids[:k]}
+    return len(found & set(relevant)) / len(relevant)
+
+
+def build_dense(rows: list[dict]):
+    """Exact-search vector index over MiniLM chunk embeddings, or None if the model is unavailable"""
+    try:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        embed = DefaultEmbeddingFunction()
+        embeddings = embed([row["document"] for row in rows])
+    except Exception as e:
+        print(f"Dense retrieval skipped, embedding model unavailable: {type(e).__name__}", file=sys.stderr)
+        return None, None
+    index = NumpyVectorIndex(
+        [row["id"] for row in rows], embeddings, [row["document"] for row in rows], [row["metadata"] for row in rows]
+    )
+    return index, embed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--candidates", type=int, default=4, help="Per-ranker candidates before fusion, as a multiple of k")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = load_corpus()
+    bm25 = BM25Index.from_rows(rows)
+    build_ms = (time.perf_counter() - start) * 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = Path(tmp) / "bm25_index.json"
+        bm25.save(artifact)
+        start = time.perf_counter()
+        BM25Index.load(artifact)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    sources = {row["id"]: row["metadata"]["source"] for row in rows}
+    dense_index, embed = build_dense(rows)
+    queries = load_labeled_queries()
+    depth = max(args.k) * args.candidates
+
+    rankings = defaultdict(list)  # mode -> ranked ids per query
+    for item in queries:
+        sparse_ids = [bm25.ids[row] for row, _ in bm25.search(item["query"], depth)]
+        rankings["sparse"].append(sparse_ids)
+        if dense_index is not None:
+            dense_ids = dense_index.query(embed([item["query"]])[0], depth)["ids"]
+            rankings["dense"].append(dense_ids)
+            rankings["hybrid"].append([chunk_id for chunk_id, _ in reciprocal_rank_fusion([dense_ids, sparse_ids])])
+
+    report = {
+        "chunks": len(rows),
+        "queries": len(queries),
+        "bm25_build_from_data_ms": round(build_ms, 1),
+        "bm25_artifact_load_ms": round(load_ms, 1),
+        "recall": {},
+    }
+    kinds = sorted({item["kind"] for item in queries})
+    for mode, ranked in rankings.items():
+        report["recall"][mode] = {}
+        for k in args.k:
+            per_query = [recall_at_k(ids, sources, item["relevant"], k) for ids, item in zip(ranked, queries)]
+            by_kind = {
+                kind: round(statistics.fmean(r for r, item in zip(per_query, queries) if item["kind"] == kind), 3)
+                for kind in kinds
+            }
+            report["recall"][mode][f"@{k}"] = {"all": round(statistics.fmean(per_query), 3), **by_kind}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark worker cold start and memory: Chroma load vs memory-mapped snapshot.
+
+Builds a synthetic collection (random embeddings, so no embedding model is
+needed), exports it as an index snapshot, then starts N worker processes that
+each load the index the way an API worker would and run one query:
+
+- collection: open a PersistentClient and copy all embeddings out of Chroma
+  (RAG_ENGINE=numpy)
+- snapshot: numpy.memmap the exported snapshot (RAG_ENGINE=snapshot), with and
+  without checksum verification
+
+All workers hold their index at the same time when memory is sampled, so PSS
+(proportional set size, Linux only) shows how much of the index is shared.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_index_snapshot [--rows 50000] [--dim 384] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag.snapshot import export_collection_snapshot, load_snapshot  # noqa: E402
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+
+def memory_mb() -> dict:
+    """RSS and PSS of this process from /proc (empty where unavailable)"""
+    try:
+        fields = {}
+        for line in Path("/proc/self/smaps_rollup").read_text().splitlines()[1:]:
+            name, value = line.split(":", 1)
+            fields[name] = int(value.split()[0])
+        return {"rss_mb": round(fields["Rss"] / 1024, 1), "pss_mb": round(fields["Pss"] / 1024, 1)}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+
+def build_collection(path: Path, rows: int, dim: int):
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+    collection = client.create_collection("medical_knowledge", embedding_function=None)
+    embeddings = np.random.default_rng(0).standard_normal((rows, dim)).astype(np.float32)
+    batch = 5000
+    for start in range(0, rows, batch):
+        end = min(start + batch, rows)
+        collection.add(
+            ids=[f"doc_{i}#0" for i in range(start, end)],
+            embeddings=embeddings[start:end].tolist(),
+            documents=[f"chunk {i}" for i in range(start, end)],
+            metadatas=[{"source": f"doc_{i}.md"} for i in range(start, end)],
+        )
+    return collection
+
+
+def worker(mode: str, chroma_path: str, snapshot_path: str, dim: int, barrier, results):
+    start = time.perf_counter()
+    if mode == "collection":
+        import chromadb
+        from chromadb.config import Settings
+        client = chromadb.PersistentClient(path=chroma_path, settings=Settings(anonymized_telemetry=False))
+        index = NumpyVectorIndex.from_collection(client.get_collection("medical_knowledge"))
+    else:
+        index = load_snapshot(Path(snapshot_path), verify=mode == "snapshot_verified")
+    index.search(np.ones(dim, dtype=np.float32), 4)
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    barrier.wait()  # every worker holds its index now
+    results.put({"startup_ms": startup_ms, **memory_mb()})
+    barrier.wait()
+
+
+def run_workers(mode: str, workers: int, chroma_path: Path, snapshot_path: Path, dim: int) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(mode, str(chroma_path), str(snapshot_path), dim, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    report = {"startup_ms_mean": round(statistics.mean(s["startup_ms"] for s in samples), 1)}
+    if "pss_mb" in samples[0]:
+        report["rss_mb_per_worker"] = round(statistics.mean(s["rss_mb"] for s in samples), 1)
+        report["pss_mb_total"] = round(sum(s["pss_mb"] for s in samples), 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chroma_path, snapshot_path = Path(tmp) / "chroma", Path(tmp) / "snapshot"
+        collection = build_collection(chroma_path, args.rows, args.dim)
+        start = time.perf_counter()
+        export_collection_snapshot(collection, snapshot_path)
+        export_ms = (time.perf_counter() - start) * 1000
+
+        report = {
+            "rows": args.rows,
+            "dimension": args.dim,
+            "workers": args.workers,
+            "embeddings_mb": round(args.rows * args.dim * 4 / 2**20, 1),
+            "snapshot_export_ms": round(export_ms, 1),
+        }
+        for mode in ("collection", "snapshot_verified", "snapshot"):
+            report[mode] = run_workers(mode, args.workers, chroma_path, snapshot_path, args.dim)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
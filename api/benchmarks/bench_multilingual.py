@@ -0,0 +1,126 @@
+"""
+Benchmark multilingual retrieval against translate-first retrieval, per language.
+
+Runs multilingual_queries.json (the same questions in Hindi, Tamil, Telugu,
+Kannada and Malayalam, native script and romanized, each with a reference
+English translation) through:
+
+- translate_first: the English translation on the English index (what retrieve()
+  gets after translate_to_english; the reference translation stands in for the
+  LLM's, so this is an upper bound and excludes translation latency)
+- untranslated_english_index: the original text on the English index
+- multilingual: the original text on chunks embedded with the multilingual model
+  (rag/multilingual.py), searched while translation would still be running
+
+and reports recall@k and MRR per language and script, plus query latency.
+The English index is dense (Chroma's default MiniLM) when the model loads and
+BM25 otherwise; the multilingual mode needs sentence-transformers and the model
+download, and is reported as unavailable without them.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_multilingual [--k 4] [--model paraphrase-multilingual-MiniLM-L12-v2]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.benchmarks.bench_hybrid_retrieval import build_dense, load_labeled_queries, recall_at_k  # noqa: E402
+from api.rag.bm25 import BM25Index  # noqa: E402
+from api.rag.corpus import load_corpus  # noqa: E402
+from api.rag.multilingual import MULTILINGUAL_EMBEDDING_MODEL, get_multilingual_embedding_function  # noqa: E402
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+QUERIES_PATH = Path(__file__).parent / "multilingual_queries.json"
+
+
+def reciprocal_rank(ranked_ids: list[str], sources: dict, relevant: list[str], k: int) -> float:
+    for rank, chunk_id in enumerate(ranked_ids[:k], start=1):
+        if sources[chunk_id] in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def build_multilingual(rows: list[dict], model_name: str):
+    """Vector index over multilingual chunk embeddings, or (None, None) if the model is unavailable"""
+    try:
+        embed = get_multilingual_embedding_function(model_name)
+        embeddings = embed([row["document"] for row in rows])
+    except Exception as e:
+        print(f"Multilingual retrieval skipped, model unavailable: {type(e).__name__}: {e}", file=sys.stderr)
+        return None, None
+    index = NumpyVectorIndex(
+        [row["id"] for row in rows], embeddings, [row["document"] for row in rows], [row["metadata"] for row in rows]
+    )
+    return index, embed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--model", default=MULTILINGUAL_EMBEDDING_MODEL, help="Multilingual sentence-transformers model")
+    args = parser.parse_args()
+
+    rows = load_corpus()
+    sources = {row["id"]: row["metadata"]["source"] for row in rows}
+    queries = load_labeled_queries(QUERIES_PATH)
+
+    dense_index, dense_embed = build_dense(rows)
+    if dense_index is not None:
+        english_engine = "dense"
+
+        def search_english(text: str) -> list[str]:
+            return dense_index.query(dense_embed([text])[0], args.k)["ids"]
+    else:
+        english_engine = "bm25"
+        bm25 = BM25Index.from_rows(rows)
+
+        def search_english(text: str) -> list[str]:
+            return [bm25.ids[row] for row, _ in bm25.search(text, args.k)]
+
+    modes = {
+        "translate_first": lambda item: search_english(item["english"]),
+        "untranslated_english_index": lambda item: search_english(item["query"]),
+    }
+    multilingual_index, multilingual_embed = build_multilingual(rows, args.model)
+    if multilingual_index is not None:
+        modes["multilingual"] = lambda item: multilingual_index.query(multilingual_embed([item["query"]])[0], args.k)["ids"]
+
+    report = {
+        "queries": len(queries),
+        "k": args.k,
+        "english_index": english_engine,
+        "multilingual_model": args.model if multilingual_index is not None else None,
+        "modes": {},
+    }
+    for mode, search in modes.items():
+        by_group = defaultdict(lambda: {"recall": [], "mrr": []})
+        latencies = []
+        for item in queries:
+            start = time.perf_counter()
+            ranked = search(item)
+            latencies.append((time.perf_counter() - start) * 1000)
+            for group in ("all", item["lang"], f"{item['lang']}_{item['script']}"):
+                by_group[group]["recall"].append(recall_at_k(ranked, sources, item["relevant"], args.k))
+                by_group[group]["mrr"].append(reciprocal_rank(ranked, sources, item["relevant"], args.k))
+        report["modes"][mode] = {
+            "avg_query_ms": round(statistics.fmean(latencies), 2),
+            **{
+                group: {"recall": round(statistics.fmean(v["recall"]), 3), "mrr": round(statistics.fmean(v["mrr"]), 3)}
+                for group, v in sorted(by_group.items())
+            },
+        }
+    if multilingual_index is None:
+        report["modes"]["multilingual"] = "unavailable (pip install sentence-transformers; the model downloads on first use)"
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark profile-aware prefiltered retrieval against a global search.
+
+Runs the labeled queries in retrieval_queries.json once per synthetic profile
+and compares a global BM25 search with the prefiltered one (planner.py filter
+as a per-category row subset, with the global fallback on weak results):
+candidate rows searched, latency, chunks from excluded categories in the top k,
+and recall@k over relevant files. Uses BM25 so the benchmark runs offline.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_prefilter [--k 4] [--repeat 20]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.benchmarks.bench_hybrid_retrieval import load_labeled_queries, recall_at_k  # noqa: E402
+from api.models import Profile  # noqa: E402
+from api.rag.bm25 import BM25Index  # noqa: E402
+from api.rag.corpus import load_corpus  # noqa: E402
+from api.rag.planner import category_rows, is_weak, plan_retrieval, rows_for_where  # noqa: E402
+from api.router import route_query  # noqa: E402
+
+PROFILES = {
+    "male_adult": Profile(sex="male", age=45),
+    "female_adult": Profile(sex="female", age=32),
+    "pregnant": Profile(sex="female", age=28, pregnancy=True),
+    "child": Profile(age=8),
+}
+
+
+def _is_weak(hits: list, k: int) -> bool:
+    return is_weak([{"bm25_score": score} for _, score in hits], k)
+
+
+def search_with_fallback(index: BM25Index, query: str, k: int, rows) -> list:
+    """Filtered search, rerun globally when weak (as retrieve() does)"""
+    hits = index.search(query, k, rows)
+    if rows is not None and _is_weak(hits, k):
+        hits = index.search(query, k)
+    return hits
+
+
+def run(index: BM25Index, rows_by_category: dict, queries: list[dict], profile: Profile, k: int, repeat: int) -> dict:
+    stats = {"global": {"searched": [], "ms": [], "off_profile": [], "recall": []},
+             "prefiltered": {"searched": [], "ms": [], "off_profile": [], "recall": []}}
+    fallbacks = 0
+    sources = {chunk_id: metadata["source"] for chunk_id, metadata in zip(index.ids, index.metadatas)}
+    for item in queries:
+        where = plan_retrieval(profile, item["query"], {"route": route_query(item["query"])})
+        rows = rows_for_where(rows_by_category, where)
+        excluded = set((where or {}).get("category", {}).get("$nin", ()))
+
+        for name, subset in (("global", None), ("prefiltered", rows)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                hits = search_with_fallback(index, item["query"], k, subset)
+            stats[name]["ms"].append((time.perf_counter() - start) * 1000 / repeat)
+            stats[name]["searched"].append(len(index) if subset is None else len(subset))
+            stats[name]["off_profile"].append(sum(index.metadatas[row]["category"] in excluded for row, _ in hits))
+            chunk_ids = [index.ids[row] for row, _ in hits]
+            stats[name]["recall"].append(recall_at_k(chunk_ids, sources, item["relevant"], k))
+        if rows is not None:
+            fallbacks += _is_weak(index.search(item["query"], k, rows), k)
+
+    report = {
+        name: {
+            "avg_rows_searched": round(statistics.mean(values["searched"]), 1),
+            "avg_ms": round(statistics.mean(values["ms"]), 3),
+            "off_profile_chunks": sum(values["off_profile"]),
+            "recall": round(statistics.mean(values["recall"]), 3),
+        }
+        for name, values in stats.items()
+    }
+    report["global_fallbacks"] = fallbacks
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20, help="Searches per query for the latency average")
+    args = parser.parse_args()
+
+    index = BM25Index.from_rows(load_corpus())
+    rows_by_category = category_rows(index.metadatas)
+    queries = load_labeled_queries()
+
+    report = {
+        "chunks": len(index),
+        "queries": len(queries),
+        "k": args.k,
+        "profiles": {
+            name: run(index, rows_by_category, queries, profile, args.k, args.repeat)
+            for name, profile in PROFILES.items()
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
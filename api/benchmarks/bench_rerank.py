@@ -0,0 +1,87 @@
+"""
+Benchmark diversity-aware reranking (MMR + per-source caps) against plain top-k.
+
+Runs the labeled queries in retrieval_queries.json and compares the plain
+top-k chunks with MMR picks from k * multiplier candidates: chunks and context
+tokens per answer, distinct source files, and recall@k over relevant files.
+Candidates come from BM25 so the benchmark runs offline; reranking itself is
+independent of the retrieval mode.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_rerank [--k 4] [--multiplier 3] [--lambda 0.7]
+"""
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.benchmarks.bench_hybrid_retrieval import load_labeled_queries  # noqa: E402
+from api.rag.bm25 import BM25Index  # noqa: E402
+from api.rag.corpus import load_corpus  # noqa: E402
+from api.rag.rerank import (  # noqa: E402
+    MAX_CHUNKS_PER_SOURCE,
+    RERANK_DUPLICATE_SIMILARITY,
+    RERANK_MIN_RELEVANCE,
+    mmr_rerank,
+)
+from api.rag.tokens import count_tokens, tokenizer_name  # noqa: E402
+
+
+def summarize(answers: list[list[dict]], queries: list[dict]) -> dict:
+    tokens = [count_tokens("\n\n".join(r["chunk"] for r in answer)) for answer in answers]
+    recalls = [
+        len({r["source"] for r in answer} & set(item["relevant"])) / len(item["relevant"])
+        for answer, item in zip(answers, queries)
+    ]
+    return {
+        "avg_chunks": round(statistics.mean(len(answer) for answer in answers), 2),
+        "avg_distinct_sources": round(statistics.mean(len({r["source"] for r in answer}) for answer in answers), 2),
+        "avg_context_tokens": round(statistics.mean(tokens), 1),
+        "recall": round(statistics.mean(recalls), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--multiplier", type=int, default=3, help="Candidates fetched as a multiple of k")
+    parser.add_argument("--lambda", dest="lambda_", type=float, default=0.7)
+    parser.add_argument("--max-per-source", type=int, default=MAX_CHUNKS_PER_SOURCE)
+    parser.add_argument("--duplicate-similarity", type=float, default=RERANK_DUPLICATE_SIMILARITY)
+    parser.add_argument("--min-relevance", type=float, default=RERANK_MIN_RELEVANCE)
+    args = parser.parse_args()
+
+    rows = load_corpus()
+    index = BM25Index.from_rows(rows)
+    queries = load_labeled_queries()
+
+    plain, reranked = [], []
+    for item in queries:
+        candidates = [
+            {"chunk": rows[row]["document"], "source": rows[row]["metadata"]["source"], "score": score}
+            for row, score in index.search(item["query"], args.k * args.multiplier)
+        ]
+        plain.append(candidates[:args.k])
+        reranked.append(mmr_rerank(
+            candidates, args.k, args.lambda_, args.max_per_source, args.duplicate_similarity, args.min_relevance
+        ))
+
+    before, after = summarize(plain, queries), summarize(reranked, queries)
+    report = {
+        "tokenizer": tokenizer_name(),
+        "queries": len(queries),
+        "k": args.k,
+        "top_k": before,
+        "mmr": after,
+        "context_token_savings_percent": round(100 * (1 - after["avg_context_tokens"] / before["avg_context_tokens"]), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
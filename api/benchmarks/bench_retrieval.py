@@ -0,0 +1,390 @@
+"""
+Offline retrieval quality and latency benchmark over an auto-generated query set.
+
+Builds the query set from the knowledge base itself, so it needs no hand
+labeling and grows with api/rag/data:
+
+- title: each document's title, labeled with that document
+- heading: section headings that name at most --max-heading-files documents,
+  labeled with the documents that use them
+- symptom: English and romanized phrases from safety.SYMPTOM_SYNONYMS, labeled
+  with the documents whose title or headings contain them (or, failing that,
+  the few whose text does)
+- canned: the smoke-test queries of retriever.test_retrieval(), hand-labeled
+
+and runs every query through each retrieval engine and configuration:
+BM25, BM25 with the profile prefilter (planner.py, with the global fallback on
+weak results), exact NumPy dense search, Chroma dense search, hybrid (RRF of
+dense and BM25) and hybrid with the prefilter. Filtered runs use a profile
+consistent with the labeled document (a pregnancy page is asked by a pregnant
+user, a peds page about a child).
+
+Reports recall@k, MRR and p50/p99 search latency per configuration, overall
+and per query kind, as JSON (--out also writes it to a file, so runs can be
+diffed). The "cutoff" section calibrates the relevance cutoff of retriever.py:
+the score of each labeled query's top hit (BM25 score, dense distance) next to
+that of off-topic queries the knowledge base does not cover, and the threshold
+that keeps the top hit of all but --cutoff-loss of the labeled queries. Dense latencies exclude query embedding, which is reported once as
+query_embedding_ms. Dense configurations need Chroma's default MiniLM model and
+are reported as skipped when it cannot be loaded; everything else is offline.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_retrieval [--k 1 4 10] [--max-per-kind 150] [--out report.json]
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.benchmarks.bench_hybrid_retrieval import build_dense, recall_at_k  # noqa: E402
+from api.benchmarks.bench_multilingual import reciprocal_rank  # noqa: E402
+from api.benchmarks.bench_prefilter import PROFILES  # noqa: E402
+from api.rag.bm25 import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+from api.rag.corpus import load_corpus  # noqa: E402
+from api.rag.planner import category_rows, is_weak, plan_retrieval, rows_for_where  # noqa: E402
+from api.rag.retriever import HYBRID_CANDIDATE_MULTIPLIER, TEST_QUERIES  # noqa: E402
+from api.router import route_query  # noqa: E402
+from api.safety import SYMPTOM_SYNONYMS  # noqa: E402
+
+# Relevant documents of retriever.TEST_QUERIES
+CANNED_LABELS = {
+    "I have fever and body ache": [
+        "general/fever-adult.md", "general/body-aches-fatigue.md", "Respiratory/seasonal-flu-influenza.md",
+    ],
+    "What should I do for sore throat?": ["general/sore-throat.md"],
+    "Chest pain and shortness of breath": [
+        "general/chest-pain-red-flags.md", "general/shortness-of-breath-mild.md", "Cardiometabolic/heart-attack-red-flags.md",
+    ],
+}
+
+# Questions the knowledge base does not cover; a calibrated cutoff drops their hits
+OFF_TOPIC_QUERIES = [
+    "how do I change a flat car tyre",
+    "best recipe for chicken biryani",
+    "which mutual fund gives the best returns",
+    "who won the cricket world cup",
+    "how to reset my wifi router password",
+    "python list comprehension syntax",
+    "train timings from Mumbai to Pune",
+    "how to file income tax returns online",
+    "what is the capital of Australia",
+    "tips for learning to play the guitar",
+    "how to grow tomatoes on a balcony",
+    "latest smartphone with the best camera",
+    "how do I renew my passport",
+    "explain the rules of chess",
+    "cheap flights to Goa in December",
+    "how to remove a coffee stain from a carpet",
+    "what time does the stock market open",
+    "write a poem about the monsoon",
+    "how to install windows on a laptop",
+    "history of the Mughal empire",
+]
+
+# Profile that would plausibly ask about a document of each category
+CATEGORY_PROFILES = {
+    "pregnancy": "pregnant",
+    "peds": "child",
+    "Sexual_Health_Women": "female_adult",
+    "Sexual_Health_Men": "male_adult",
+}
+DEFAULT_PROFILE = "female_adult"
+
+# Symptom phrases matching more documents than this are too generic to label
+MAX_SYMPTOM_FILES = 5
+
+
+def _documents(rows: list[dict]) -> dict:
+    """source -> title, category, headings and lowercased text"""
+    documents = {}
+    for row in rows:
+        metadata = row["metadata"]
+        document = documents.setdefault(
+            metadata["source"],
+            {"title": metadata.get("title", ""), "category": metadata.get("category", "general"), "headings": set(), "text": []},
+        )
+        for heading in (metadata.get("heading_path") or "").split(" > ")[1:]:
+            document["headings"].add(heading.strip())
+        document["text"].append(row["document"].lower())
+    for document in documents.values():
+        document["text"] = "\n".join(document["text"])
+    return documents
+
+
+def _contains_phrase(text: str, phrase: str) -> bool:
+    return re.search(rf"\b{re.escape(phrase)}\b", text) is not None
+
+
+def generate_queries(rows: list[dict], max_heading_files: int = 3) -> list[dict]:
+    """
+    Labeled queries derived from the chunks' metadata and the symptom lexicon
+
+    Args:
+        rows: Chunks from corpus.load_corpus()
+        max_heading_files: Skip headings shared by more documents than this
+
+    Returns:
+        Dicts with query, relevant (source files), kind and category
+    """
+    documents = _documents(rows)
+    queries = []
+    seen = set()
+
+    def add(query: str, relevant, kind: str):
+        key = " ".join(tokenize(query))
+        if not key or key in seen:
+            return
+        seen.add(key)
+        relevant = sorted(relevant)
+        queries.append({
+            "query": query,
+            "relevant": relevant,
+            "kind": kind,
+            "category": documents[relevant[0]]["category"],
+        })
+
+    for source, document in sorted(documents.items()):
+        if document["title"]:
+            add(document["title"], [source], "title")
+
+    heading_sources = defaultdict(set)
+    for source, document in documents.items():
+        for heading in document["headings"]:
+            heading_sources[heading].add(source)
+    for heading, sources in sorted(heading_sources.items()):
+        if len(sources) <= max_heading_files and len(tokenize(heading)) >= 2:
+            add(heading, sources, "heading")
+
+    for phrases in SYMPTOM_SYNONYMS.values():
+        for phrase in sorted(phrases):
+            if not phrase.isascii():
+                continue
+            sources = [
+                source for source, document in documents.items()
+                if _contains_phrase(" ".join([document["title"], *document["headings"]]).lower(), phrase)
+            ] or [source for source, document in documents.items() if _contains_phrase(document["text"], phrase)]
+            if 0 < len(sources) <= MAX_SYMPTOM_FILES:
+                add(phrase, sources, "symptom")
+
+    for query in TEST_QUERIES:
+        relevant = [source for source in CANNED_LABELS.get(query, ()) if source in documents]
+        if relevant:
+            add(query, relevant, "canned")
+    return queries
+
+
+def sample_per_kind(queries: list[dict], max_per_kind: int, seed: int = 0) -> list[dict]:
+    """At most max_per_kind queries of each kind (a seeded sample, so runs stay comparable)"""
+    by_kind = defaultdict(list)
+    for item in queries:
+        by_kind[item["kind"]].append(item)
+    rng = random.Random(seed)
+    sampled = []
+    for kind in sorted(by_kind):
+        items = by_kind[kind]
+        sampled.extend(items if len(items) <= max_per_kind else rng.sample(items, max_per_kind))
+    return sampled
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 3)
+
+
+def evaluate(search, queries: list[dict], sources: dict, ks: list[int]) -> dict:
+    """recall@k, MRR and latency of one configuration; search(item) returns ranked chunk ids"""
+    latencies = []
+    by_kind = defaultdict(lambda: defaultdict(list))
+    depth = max(ks)
+    for item in queries:
+        start = time.perf_counter()
+        ranked = search(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+        for group in ("all", item["kind"]):
+            for k in ks:
+                by_kind[group][f"recall@{k}"].append(recall_at_k(ranked, sources, item["relevant"], k))
+            by_kind[group][f"mrr@{depth}"].append(reciprocal_rank(ranked, sources, item["relevant"], depth))
+
+    metrics = {group: {name: round(statistics.fmean(v), 3) for name, v in values.items()} for group, values in by_kind.items()}
+    return {
+        **metrics.pop("all"),
+        "p50_ms": _percentile(latencies, 50),
+        "p99_ms": _percentile(latencies, 99),
+        "by_kind": dict(sorted(metrics.items())),
+    }
+
+
+def calibrate_cutoff(relevant: list[float], off_topic: list[float], lower_is_better: bool, loss: float) -> dict:
+    """
+    Threshold on one ranker's top-hit scores that keeps the labeled queries' hits
+
+    Args:
+        relevant: Top-hit score of each labeled query
+        off_topic: Top-hit score of each off-topic query (0 for BM25 queries without hits)
+        lower_is_better: Distances (dense) rather than scores (BM25)
+        loss: Fraction of labeled queries whose top hit the threshold may drop
+
+    Returns:
+        Percentiles of both groups, the threshold and the fraction of each group it keeps
+    """
+    threshold = _percentile(relevant, 100 * (1 - loss) if lower_is_better else 100 * loss)
+
+    def kept(values: list[float]) -> float:
+        passing = [v <= threshold if lower_is_better else v >= threshold for v in values]
+        return round(sum(passing) / len(passing), 3) if passing else 0.0
+
+    def percentiles(values: list[float]) -> dict:
+        return {f"p{q}": _percentile(values, q) for q in (1, 5, 50, 95, 99)} if values else {}
+
+    return {
+        "relevant": percentiles(relevant),
+        "off_topic": percentiles(off_topic),
+        "threshold": threshold,
+        "relevant_kept": kept(relevant),
+        "off_topic_kept": kept(off_topic),
+    }
+
+
+def build_chroma(rows: list[dict], embeddings, directory: str):
+    """Chroma collection over precomputed chunk embeddings, configured like build_index.py"""
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(path=directory, settings=Settings(anonymized_telemetry=False))
+    collection = client.create_collection("medical_knowledge_benchmark", embedding_function=None)
+    for start in range(0, len(rows), 256):
+        batch = rows[start:start + 256]
+        collection.add(
+            ids=[row["id"] for row in batch],
+            embeddings=[list(map(float, vector)) for vector in embeddings[start:start + 256]],
+            documents=[row["document"] for row in batch],
+            metadatas=[row["metadata"] for row in batch],
+        )
+    return client, collection
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--max-per-kind", type=int, default=150, help="Sample at most this many queries per kind")
+    parser.add_argument("--max-heading-files", type=int, default=3, help="Skip headings used by more documents")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cutoff-loss", type=float, default=0.01, help="Labeled top hits the calibrated cutoff may drop")
+    parser.add_argument("--save-queries", type=Path, help="Also write the generated query set as JSON")
+    parser.add_argument("--out", type=Path, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    rows = load_corpus()
+    sources = {row["id"]: row["metadata"]["source"] for row in rows}
+    generated = generate_queries(rows, args.max_heading_files)
+    queries = sample_per_kind(generated, args.max_per_kind, args.seed)
+    if args.save_queries:
+        args.save_queries.write_text(json.dumps(queries, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    depth = max(args.k)
+    candidates = depth * HYBRID_CANDIDATE_MULTIPLIER
+    bm25 = BM25Index.from_rows(rows)
+    rows_by_category = category_rows(bm25.metadatas)
+    filters = {}
+    for item in queries:
+        profile = PROFILES[CATEGORY_PROFILES.get(item["category"], DEFAULT_PROFILE)]
+        where = plan_retrieval(profile, item["query"], {"route": route_query(item["query"])})
+        filters[item["query"]] = rows_for_where(rows_by_category, where)
+
+    def bm25_hits(query: str, n: int, subset=None) -> list[dict]:
+        hits = bm25.search(query, n, subset)
+        if subset is not None and is_weak([{"bm25_score": score} for _, score in hits], n):
+            hits = bm25.search(query, n)  # global fallback, as retrieve() does
+        return [bm25.ids[row] for row, _ in hits]
+
+    def top_bm25_scores(texts: list[str]) -> list[float]:
+        return [hits[0][1] if hits else 0.0 for hits in (bm25.search(text, 1) for text in texts)]
+
+    cutoff = {
+        "bm25": calibrate_cutoff(
+            top_bm25_scores([item["query"] for item in queries]), top_bm25_scores(OFF_TOPIC_QUERIES),
+            lower_is_better=False, loss=args.cutoff_loss,
+        ),
+        "dense": "skipped (embedding model unavailable)",
+    }
+
+    configs = {
+        "bm25": lambda item: bm25_hits(item["query"], depth),
+        "bm25_filtered": lambda item: bm25_hits(item["query"], depth, filters[item["query"]]),
+    }
+
+    dense_index, embed = build_dense(rows)
+    query_embedding_ms = None
+    tmp = None
+    if dense_index is not None:
+        query_vectors = {}
+        timings = []
+        for item in queries:
+            start = time.perf_counter()
+            query_vectors[item["query"]] = embed([item["query"]])[0]
+            timings.append((time.perf_counter() - start) * 1000)
+        query_embedding_ms = {"p50_ms": _percentile(timings, 50), "p99_ms": _percentile(timings, 99)}
+
+        def dense_hits(query: str, n: int, subset=None) -> list[str]:
+            hits = dense_index.search(query_vectors[query], n, subset)
+            if subset is not None and is_weak([{"distance": distance} for _, distance in hits], n):
+                hits = dense_index.search(query_vectors[query], n)
+            return [dense_index.ids[row] for row, _ in hits]
+
+        def hybrid_hits(query: str, subset=None) -> list[str]:
+            fused = reciprocal_rank_fusion([dense_hits(query, candidates, subset), bm25_hits(query, candidates, subset)])
+            return [chunk_id for chunk_id, _ in fused[:depth]]
+
+        def top_distances(vectors) -> list[float]:
+            return [dense_index.search(vector, 1)[0][1] for vector in vectors]
+
+        cutoff["dense"] = calibrate_cutoff(
+            top_distances(query_vectors.values()), top_distances(embed(OFF_TOPIC_QUERIES)),
+            lower_is_better=True, loss=args.cutoff_loss,
+        )
+
+        tmp = tempfile.TemporaryDirectory()
+        _, chroma = build_chroma(rows, dense_index.matrix, tmp.name)
+        configs.update({
+            "numpy": lambda item: dense_hits(item["query"], depth),
+            "chroma": lambda item: chroma.query(query_embeddings=[list(map(float, query_vectors[item["query"]]))], n_results=depth)["ids"][0],
+            "hybrid": lambda item: hybrid_hits(item["query"]),
+            "hybrid_filtered": lambda item: hybrid_hits(item["query"], filters[item["query"]]),
+        })
+
+    report = {
+        "chunks": len(rows),
+        "documents": len(set(sources.values())),
+        "queries": len(queries),
+        "queries_generated": dict(sorted(Counter(item["kind"] for item in generated).items())),
+        "queries_used": dict(sorted(Counter(item["kind"] for item in queries).items())),
+        "k": args.k,
+        "query_embedding_ms": query_embedding_ms,
+        "configs": {name: evaluate(search, queries, sources, args.k) for name, search in configs.items()},
+        "cutoff": cutoff,
+    }
+    if dense_index is None:
+        for name in ("numpy", "chroma", "hybrid", "hybrid_filtered"):
+            report["configs"][name] = "skipped (embedding model unavailable)"
+    if tmp is not None:
+        tmp.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
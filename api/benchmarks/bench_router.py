@@ -0,0 +1,107 @@
+"""
+Benchmark the intent router: accuracy on the labeled query set and per-query latency.
+
+Compares the compiled router (api.router.route_query) with the previous
+substring-scanning implementation, reproduced below for reference.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_router [--repeat 200]
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import router  # noqa: E402
+
+QUERIES_PATH = Path(__file__).parent / "router_queries.json"
+
+
+def load_labeled_queries(path: Path = QUERIES_PATH) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def legacy_is_graph_intent(text: str) -> bool:
+    """Previous implementation: per-pattern re.search plus substring keyword loops."""
+    text_lower = text.lower()
+    for pattern in router.GRAPH_PATTERNS:
+        if re.search(pattern, text_lower):
+            return True
+    if sum(1 for term in router.SYMPTOM_TERMS if term in text_lower) >= 2:
+        return True
+    if any(term in text_lower for term in router.PREGNANCY_TERMS):
+        if any(trigger in text_lower for trigger in ["red flag", "danger", "movement", "avoid", "safe", "warning", "kick"]):
+            return True
+        if any(keyword in text_lower for keyword in router.RESOURCE_KEYWORDS):
+            return True
+    if any(term in text_lower for term in router.MENTAL_TERMS):
+        if any(keyword in text_lower for keyword in router.RESOURCE_KEYWORDS | {"support", "help", "what to do"}):
+            return True
+    if " and " in text_lower or " with " in text_lower:
+        if len({term for term in router.CONDITION_TERMS if term in text_lower}) >= 2:
+            return True
+    if any(keyword in text_lower for keyword in router.GRAPH_KEYWORDS):
+        return True
+    return False
+
+
+def evaluate(classify, queries: list[dict], repeat: int) -> dict:
+    correct = 0
+    graph_routed = 0
+    false_graph = []
+    missed_graph = []
+    for item in queries:
+        predicted = "graph" if classify(item["query"]) else "vector"
+        graph_routed += predicted == "graph"
+        if predicted == item["route"]:
+            correct += 1
+        elif predicted == "graph":
+            false_graph.append(item["query"])
+        else:
+            missed_graph.append(item["query"])
+
+    latencies_us = []
+    for _ in range(repeat):
+        for item in queries:
+            start = time.perf_counter()
+            classify(item["query"])
+            latencies_us.append((time.perf_counter() - start) * 1e6)
+    latencies_us.sort()
+
+    return {
+        "accuracy": round(correct / len(queries), 4),
+        "graph_routed": graph_routed,
+        "false_graph": false_graph,
+        "missed_graph": missed_graph,
+        "latency_us": {
+            "mean": round(statistics.fmean(latencies_us), 2),
+            "p50": round(latencies_us[len(latencies_us) // 2], 2),
+            "p99": round(latencies_us[int(len(latencies_us) * 0.99) - 1], 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Timing passes over the query set")
+    args = parser.parse_args()
+
+    queries = load_labeled_queries()
+    report = {
+        "queries": len(queries),
+        "legacy": evaluate(legacy_is_graph_intent, queries, args.repeat),
+        "compiled": evaluate(router.is_graph_intent, queries, args.repeat),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
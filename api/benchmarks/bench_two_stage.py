@@ -0,0 +1,279 @@
+"""
+Flat vs two-stage (document, then chunk) retrieval at 1x, 10x and 100x corpus size.
+
+rag/data is scaled up with synthetic distractor documents: for every real
+document and every extra copy, a document of the same category and chunk count
+whose title splices two real titles and whose chunks are sentences drawn from
+real documents of that category under real section headings. They share the
+vocabulary and topics of the real pages but none of their structure, the way a
+larger knowledge base adds pages that compete for the same queries. Queries and
+labels are bench_retrieval.py's generated set, so relevant documents are always
+real ones.
+
+For each size, reports recall@k, MRR and p50/p99 search latency of BM25, exact
+NumPy dense search and hybrid (RRF) retrieval, flat and two-stage
+(doc_index.DocumentIndex picks --documents documents, then only their chunks
+are searched), plus the first stage's document recall; --chroma adds Chroma
+dense search with and without the ``source`` filter. Latencies exclude query
+embedding.
+
+Dense search uses Chroma's default MiniLM model when it can be loaded and
+otherwise a signed feature-hashing embedding of word uni- and bigrams: its
+latencies are representative (same dimension and matrix sizes) but its recall
+only reflects lexical overlap.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_two_stage [--scales 1 10 100] [--documents 4 8 16] [--chroma] [--out report.json]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.benchmarks.bench_retrieval import build_chroma, evaluate, generate_queries, sample_per_kind  # noqa: E402
+from api.rag.bm25 import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+from api.rag.corpus import HEADING_SEPARATOR, load_corpus  # noqa: E402
+from api.rag.doc_index import DocumentIndex  # noqa: E402
+from api.rag.planner import category_rows, rows_for_where  # noqa: E402
+from api.rag.retriever import HYBRID_CANDIDATE_MULTIPLIER  # noqa: E402
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class HashingEmbedding:
+    """Signed feature hashing of word uni- and bigrams into unit vectors"""
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def __call__(self, input: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(input), self.dimension), dtype=np.float32)
+        for i, text in enumerate(input):
+            tokens = tokenize(text)
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                matrix[i, h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+
+def load_embedding(name: str):
+    """(embedding function, name actually used); "auto" falls back to hashing without the model"""
+    if name in ("auto", "minilm"):
+        try:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+            embed = DefaultEmbeddingFunction()
+            embed(["warmup"])
+            return embed, "minilm"
+        except Exception as e:
+            if name == "minilm":
+                raise
+            print(f"MiniLM unavailable ({type(e).__name__}); using the hashing embedding", file=sys.stderr)
+    return HashingEmbedding(), "hashing"
+
+
+def synthesize_corpus(rows: list[dict], copies: int, seed: int = 0) -> list[dict]:
+    """
+    rows followed by ``copies`` synthetic distractors of every real document
+
+    Copy c is generated from its own seed, so the corpus for fewer copies is a
+    prefix of the corpus for more.
+    """
+    by_source = defaultdict(list)
+    for row in rows:
+        by_source[row["metadata"]["source"]].append(row)
+    sources = sorted(by_source)
+    titles = [by_source[source][0]["metadata"].get("title", "") for source in sources]
+    sentences = defaultdict(list)
+    headings = defaultdict(list)
+    for row in rows:
+        category = row["metadata"].get("category", "general")
+        body = row["document"].split("\n", 1)[-1]
+        sentences[category].extend(s for s in _SENTENCE_RE.split(" ".join(body.split())) if len(s) > 20)
+        heading = (row["metadata"].get("heading_path") or "").split(HEADING_SEPARATOR)[-1]
+        if heading:
+            headings[category].append(heading)
+
+    synthetic = list(rows)
+    for copy in range(1, copies + 1):
+        rng = random.Random(f"{seed}-{copy}")
+        for source in sources:
+            template = by_source[source]
+            category = template[0]["metadata"].get("category", "general")
+            first, second = rng.sample(titles, 2)
+            first_words, second_words = first.split(), second.split()
+            title = " ".join(first_words[:max(1, len(first_words) // 2)] + second_words[len(second_words) // 2:])
+            synthetic_source = f"synthetic-{copy}/{source}"
+            for chunk_id, row in enumerate(template):
+                heading = rng.choice(headings[category] or [title])
+                pool = sentences[category]
+                n_sentences = max(1, len(_SENTENCE_RE.split(row["document"])) - 1)
+                body = " ".join(rng.choice(pool) for _ in range(n_sentences)) if pool else row["document"]
+                synthetic.append({
+                    "id": f"{synthetic_source[:-3]}#{chunk_id}",
+                    "document": f"{title}\n{heading}\n{body}",
+                    "metadata": {
+                        **row["metadata"],
+                        "source": synthetic_source,
+                        "title": title,
+                        "topic": re.sub(r"\W+", "-", title.lower()).strip("-"),
+                        "chunk_id": chunk_id,
+                        "heading_path": f"{title}{HEADING_SEPARATOR}{heading}",
+                        "reference_sources": "[]",
+                    },
+                })
+    return synthetic
+
+
+def document_recall(selected: list[str], relevant: list[str]) -> float:
+    return len(set(selected) & set(relevant)) / len(relevant)
+
+
+def run_scale(rows, embeddings, embed, queries, query_vectors, ks, documents_options, with_chroma) -> dict:
+    """Flat and two-stage configurations over one corpus size"""
+    depth = max(ks)
+    candidates = depth * HYBRID_CANDIDATE_MULTIPLIER
+    sources = {row["id"]: row["metadata"]["source"] for row in rows}
+    ids = [row["id"] for row in rows]
+    texts = [row["document"] for row in rows]
+    metadatas = [row["metadata"] for row in rows]
+
+    start = time.perf_counter()
+    dense = NumpyVectorIndex(ids, embeddings, texts, metadatas)
+    bm25 = BM25Index(ids, texts, metadatas)
+    chunk_build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    document_index = DocumentIndex.from_chunks(ids, texts, metadatas, embed)
+    document_build_s = time.perf_counter() - start
+    rows_by_source = category_rows(metadatas, "source")
+
+    def dense_ids(item, n, rows=None):
+        return [dense.ids[row] for row, _ in dense.search(query_vectors[item["query"]], n, rows)]
+
+    def bm25_ids(item, n, rows=None):
+        return [bm25.ids[row] for row, _ in bm25.search(item["query"], n, rows)]
+
+    def hybrid_ids(item, n, rows=None):
+        fused = reciprocal_rank_fusion([dense_ids(item, candidates, rows), bm25_ids(item, candidates, rows)])
+        return [chunk_id for chunk_id, _ in fused[:n]]
+
+    chunk_search = {"dense": dense_ids, "sparse": bm25_ids, "hybrid": hybrid_ids}
+    names = {"dense": "numpy", "sparse": "bm25", "hybrid": "hybrid"}
+    configs = {}
+    for mode, search in chunk_search.items():
+        configs[names[mode]] = evaluate(lambda item, search=search: search(item, depth), queries, sources, ks)
+
+    for n_documents in documents_options:
+        for mode, search in chunk_search.items():
+            selected = {}
+
+            def two_stage(item, mode=mode, search=search, n_documents=n_documents, selected=selected):
+                query_vector = query_vectors[item["query"]] if mode != "sparse" else None
+                chosen = document_index.search(item["query"], n_documents, mode, query_vector)
+                selected[item["query"]] = chosen
+                if not chosen:
+                    return []
+                return search(item, depth, rows_for_where(rows_by_source, {"source": {"$in": chosen}}))
+
+            result = evaluate(two_stage, queries, sources, ks)
+            result["document_recall"] = round(float(np.mean([
+                document_recall(selected[item["query"]], item["relevant"]) for item in queries
+            ])), 3)
+            configs[f"{names[mode]}_two_stage@{n_documents}"] = result
+
+    if with_chroma:
+        with tempfile.TemporaryDirectory() as directory:
+            _, chroma = build_chroma(rows, dense.matrix, directory)
+
+            def chroma_ids(item, where=None):
+                kwargs = {"where": where} if where else {}
+                vector = list(map(float, query_vectors[item["query"]]))
+                return chroma.query(query_embeddings=[vector], n_results=depth, **kwargs)["ids"][0]
+
+            configs["chroma"] = evaluate(chroma_ids, queries, sources, ks)
+            for n_documents in documents_options:
+                configs[f"chroma_two_stage@{n_documents}"] = evaluate(
+                    lambda item, n_documents=n_documents: chroma_ids(item, {"source": {"$in": document_index.search(
+                        item["query"], n_documents, "dense", query_vectors[item["query"]]
+                    )}}),
+                    queries, sources, ks,
+                )
+
+    return {
+        "chunks": len(rows),
+        "documents": len(document_index),
+        "build_s": {"chunk_indexes": round(chunk_build_s, 2), "document_index": round(document_build_s, 2)},
+        "configs": configs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--documents", type=int, nargs="+", default=[8], help="Documents picked by the first stage")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--max-per-kind", type=int, default=150, help="Sample at most this many queries per kind")
+    parser.add_argument("--embedding", choices=("auto", "minilm", "hashing"), default="auto")
+    parser.add_argument("--chroma", action="store_true", help="Also measure Chroma (slow to build at 100x)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    real_rows = load_corpus()
+    queries = sample_per_kind(generate_queries(real_rows), args.max_per_kind, args.seed)
+    embed, embedding_name = load_embedding(args.embedding)
+    query_vectors = dict(zip((item["query"] for item in queries), embed([item["query"] for item in queries])))
+
+    # Embed the largest corpus once; smaller sizes are prefixes of it
+    rows = synthesize_corpus(real_rows, max(args.scales) - 1, args.seed)
+    start = time.perf_counter()
+    embeddings = np.concatenate([
+        np.asarray(embed([row["document"] for row in rows[i:i + 256]]), dtype=np.float32)
+        for i in range(0, len(rows), 256)
+    ])
+    embed_s = time.perf_counter() - start
+    n_sources = len({row["metadata"]["source"] for row in real_rows})
+
+    report = {
+        "embedding": embedding_name,
+        "queries": len(queries),
+        "k": args.k,
+        "chunk_embedding_s": round(embed_s, 1),
+        "scales": {},
+    }
+    for scale in sorted(args.scales):
+        seen = set()
+        end = 0
+        for end, row in enumerate(rows, start=1):
+            seen.add(row["metadata"]["source"])
+            if len(seen) > n_sources * scale:
+                end -= 1
+                break
+        else:
+            end = len(rows)
+        report["scales"][f"{scale}x"] = run_scale(
+            rows[:end], embeddings[:end], embed, queries, query_vectors, args.k, args.documents, args.chroma
+        )
+        print(f"{scale}x done: {end} chunks", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
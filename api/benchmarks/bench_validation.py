@@ -0,0 +1,107 @@
+"""
+Benchmark chat input validation on typical and worst-case messages.
+
+Compares validate_chat_input (literal prefilter + linear-time rules) with the
+previous loop of re.search calls over CHAT_SQL_PATTERNS, reproduced below for
+reference. Worst-case messages are built to make the lazy ``.*?`` and ``\\w+``
+patterns backtrack on 5000-character input.
+
+Usage (from project root):
+    python -m api.benchmarks.bench_validation [--repeat 20]
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.auth import validation  # noqa: E402
+
+TYPICAL_MESSAGES = [
+    "I have a headache. What should I do?",
+    "I've been coughing for a week and my chest feels tight",
+    "My blood pressure is 140/90, is that dangerous?",
+    "Is it safe to take paracetamol during pregnancy?",
+    "I can't sleep at night and I feel anxious all the time",
+    "The doctor said 'take this twice daily' but I forgot a dose",
+    "My child has had a fever of 102 since yesterday evening, should we go to the hospital?",
+    "What are the warning signs of a heart attack in women?",
+    "मुझे सिरदर्द हो रहा है",
+    "I need to select a doctor from the list",
+]
+
+WORST_CASE_MESSAGES = {
+    "long_word": "a" * 4990,
+    "if_spam": "if " * 1600,
+    "select_spam": "select a, " * 490,
+    "where_spam": "where x " * 600,
+    "exec_long_word": "exec" + "x" * 4900,
+    "quote_or_spam": "' or x " * 700,
+    "having_spam": "having x " * 550,
+    "order_by_spam": "order by x " * 450,
+    "union_select_spam": "union select x " * 330,
+}
+
+
+def legacy_find_chat_sql_injection(text: str) -> bool:
+    """Previous implementation: re.search for every pattern on every message."""
+    for pattern in validation.CHAT_SQL_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+    return False
+
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip())
+
+
+def time_messages(check, messages: list[str], repeat: int) -> dict:
+    latencies_us = []
+    for _ in range(repeat):
+        for message in messages:
+            start = time.perf_counter()
+            check(message)
+            latencies_us.append((time.perf_counter() - start) * 1e6)
+    latencies_us.sort()
+    return {
+        "mean": round(statistics.fmean(latencies_us), 2),
+        "p50": round(latencies_us[len(latencies_us) // 2], 2),
+        "max": round(latencies_us[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timing passes over each message set")
+    args = parser.parse_args()
+
+    typical = [_collapse(message) for message in TYPICAL_MESSAGES]
+    report = {
+        "typical_latency_us": {
+            "legacy": time_messages(legacy_find_chat_sql_injection, typical, args.repeat),
+            "engine": time_messages(validation._find_chat_sql_injection, typical, args.repeat),
+        },
+        "worst_case_latency_us": {},
+    }
+    for name, message in WORST_CASE_MESSAGES.items():
+        message = _collapse(message)
+        flagged = validation._find_chat_sql_injection(message)
+        if flagged != legacy_find_chat_sql_injection(message):
+            raise SystemExit(f"Result mismatch on worst-case message {name!r}")
+        report["worst_case_latency_us"][name] = {
+            "length": len(message),
+            "flagged": flagged,
+            "legacy": time_messages(legacy_find_chat_sql_injection, [message], max(1, args.repeat // 10))["p50"],
+            "engine": time_messages(validation._find_chat_sql_injection, [message], args.repeat)["p50"],
+        }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
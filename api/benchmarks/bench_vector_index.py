@@ -0,0 +1,133 @@
+"""
+Benchmark per-query latency of the NumPy vector index against Chroma.
+
+Both engines answer the same query embeddings, so the model that embeds the
+query text is left out of the timing. By default a temporary Chroma collection
+is filled with synthetic unit vectors sized like the knowledge base; pass
+--collection-path to benchmark an existing index (e.g. api/rag/chroma_db).
+
+Usage (from project root):
+    python -m api.benchmarks.bench_vector_index [--chunks 400] [--dim 384] [--queries 300] [--k 4]
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import chromadb  # noqa: E402
+from chromadb.config import Settings  # noqa: E402
+
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+
+def _unit_rows(rng: np.random.Generator, rows: int, dim: int) -> np.ndarray:
+    matrix = rng.standard_normal((rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def build_synthetic_collection(client, chunks: int, dim: int, seed: int):
+    rng = np.random.default_rng(seed)
+    collection = client.create_collection(name="medical_knowledge", metadata={"description": "benchmark"})
+    embeddings = _unit_rows(rng, chunks, dim)
+    collection.add(
+        ids=[f"category/doc_{i // 3}#{i % 3}" for i in range(chunks)],
+        embeddings=embeddings.tolist(),
+        documents=[f"synthetic chunk {i}" for i in range(chunks)],
+        metadatas=[{"source": f"category/doc_{i // 3}.md", "category": "category", "chunk_id": i % 3} for i in range(chunks)],
+    )
+    return collection
+
+
+def make_queries(index: NumpyVectorIndex, count: int, seed: int) -> np.ndarray:
+    """Queries near existing chunks, like real questions about covered topics."""
+    rng = np.random.default_rng(seed + 1)
+    rows = index.matrix[rng.integers(0, len(index), size=count)]
+    noisy = rows + 0.3 * _unit_rows(rng, count, index.dimension)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def time_queries(search, queries: np.ndarray) -> dict:
+    latencies_us = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies_us.append((time.perf_counter() - start) * 1e6)
+    latencies_us.sort()
+    return {
+        "mean": round(statistics.fmean(latencies_us), 2),
+        "p50": round(latencies_us[len(latencies_us) // 2], 2),
+        "p99": round(latencies_us[int(len(latencies_us) * 0.99) - 1], 2),
+    }
+
+
+def run(collection, queries_count: int, k: int, seed: int) -> dict:
+    load_start = time.perf_counter()
+    index = NumpyVectorIndex.from_collection(collection)
+    load_ms = (time.perf_counter() - load_start) * 1000
+    queries = make_queries(index, queries_count, seed)
+
+    def chroma_search(query):
+        return collection.query(query_embeddings=[query.tolist()], n_results=k)
+
+    def numpy_search(query):
+        return index.query(query, k)
+
+    # Warm up both paths before timing
+    for query in queries[:5]:
+        chroma_search(query)
+        numpy_search(query)
+
+    overlap = []
+    for query in queries:
+        chroma_ids = set(chroma_search(query)["ids"][0])
+        numpy_ids = set(numpy_search(query)["ids"])
+        overlap.append(len(chroma_ids & numpy_ids) / max(len(chroma_ids), 1))
+
+    return {
+        "chunks": len(index),
+        "dim": index.dimension,
+        "space": index.space,
+        "k": k,
+        "queries": len(queries),
+        "numpy_load_ms": round(load_ms, 2),
+        "top_k_overlap_with_chroma": round(statistics.fmean(overlap), 4),
+        "latency_us": {
+            "chroma": time_queries(chroma_search, queries),
+            "numpy": time_queries(numpy_search, queries),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=400, help="Synthetic chunks to index")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=300, help="Queries to time per engine")
+    parser.add_argument("--k", type=int, default=4, help="Results per query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--collection-path", type=Path, default=None, help="Existing Chroma directory to benchmark")
+    args = parser.parse_args()
+
+    settings = Settings(anonymized_telemetry=False)
+    if args.collection_path:
+        client = chromadb.PersistentClient(path=str(args.collection_path), settings=settings)
+        report = run(client.get_collection("medical_knowledge"), args.queries, args.k, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = chromadb.PersistentClient(path=tmp, settings=settings)
+            collection = build_synthetic_collection(client, args.chunks, args.dim, args.seed)
+            report = run(collection, args.queries, args.k, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from .client import neo4j_client, run_cypher
+from .memory import canonical_city, merge_related_symptoms
 from typing import List, Dict
 
 
@@ -80,7 +81,7 @@ def get_providers_in_city(city: str) -> List[Dict]:
     Query 3: Get healthcare providers in a specific city
     
     Args:
-        city: City name
+        city: City name ("Delhi", "Bangalore" and "Gurgaon" are looked up under seed.csv's spelling)
         
     Returns:
         List of dicts with provider info
@@ -95,7 +96,7 @@ def get_providers_in_city(city: str) -> List[Dict]:
     """
     
     try:
-        results = run_cypher(query, {"city": city})
+        results = run_cypher(query, {"city": canonical_city(city)})
         return results
     except Exception as e:
         print(f"Error in get_providers_in_city: {e}")
@@ -176,36 +177,8 @@ def get_related_symptoms(symptoms: List[str]) -> List[Dict]:
         all_results.extend(results_associated or [])
         all_results.extend(results_mixed or [])
         
-        # Merge results by symptom pairs and combine shared conditions
-        merged = {}
-        for result in all_results:
-            original = result.get("original_symptom", "")
-            related = result.get("related_symptom", "")
-            conditions = result.get("shared_conditions", [])
-            key = (original.lower(), related.lower())
-            
-            if key not in merged:
-                merged[key] = {
-                    "original_symptom": original,
-                    "related_symptom": related,
-                    "shared_conditions": set(conditions)
-                }
-            else:
-                merged[key]["shared_conditions"].update(conditions)
-        
-        # Convert sets back to lists and sort by number of shared conditions
-        final_results = []
-        for key, value in merged.items():
-            final_results.append({
-                "original_symptom": value["original_symptom"],
-                "related_symptom": value["related_symptom"],
-                "shared_conditions": sorted(list(value["shared_conditions"]))
-            })
-        
-        # Sort by number of shared conditions (descending)
-        final_results.sort(key=lambda x: len(x.get("shared_conditions", [])), reverse=True)
-        
-        return final_results[:20]  # Limit to top 20
+        # Merge results by symptom pairs, most shared conditions first, top 20
+        return merge_related_symptoms(all_results)
         
     except Exception as e:
         print(f"Error in get_related_symptoms: {e}")
@@ -1,6 +1,6 @@
-import csv
 from pathlib import Path
 from .client import neo4j_client
+from .memory import GRAPH_CSV_FILES, KEY_PROPERTIES, read_triples
 
 
 def create_constraints():
@@ -34,9 +34,7 @@ def ingest_triples_from_csv(csv_path: Path, file_name: str = ""):
         print(f"  [SKIP] File not found: {csv_path}")
         return 0
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        triples = list(reader)
+    triples = read_triples(csv_path)
     
     print(f"  Found {len(triples)} triples to ingest")
     
@@ -54,10 +52,15 @@ def ingest_triples_from_csv(csv_path: Path, file_name: str = ""):
             type_s = triple['type_s']
             type_o = triple['type_o']
             
-            # Create Cypher query to merge nodes and relationship
+            # Create Cypher query to merge nodes and relationship; Location and
+            # Contact nodes also get the property the queries match them on
+            key_s = KEY_PROPERTIES.get(type_s)
+            key_o = KEY_PROPERTIES.get(type_o)
             query = f"""
             MERGE (s:{type_s} {{name: $subject}})
+            {f"SET s.{key_s} = $subject" if key_s else ""}
             MERGE (o:{type_o} {{name: $object}})
+            {f"SET o.{key_o} = $object" if key_o else ""}
             MERGE (s)-[r:{predicate}]->(o)
             """
             
@@ -78,14 +81,10 @@ def ingest_triples_from_csv(csv_path: Path, file_name: str = ""):
 
 def ingest_triples():
     """Ingest triples from all CSV files"""
-    script_dir = Path(__file__).parent
-    
-    # Ingest from seed.csv (main data)
-    seed_csv = script_dir / "seed.csv"
+    # seed.csv (main data), then symptom_relationships.csv (symptom relationship feature);
+    # memory.MemoryGraph loads the same files
+    seed_csv, symptom_csv = GRAPH_CSV_FILES
     count1 = ingest_triples_from_csv(seed_csv, "seed.csv")
-    
-    # Ingest from symptom_relationships.csv (symptom relationship feature)
-    symptom_csv = script_dir / "symptom_relationships.csv"
     count2 = ingest_triples_from_csv(symptom_csv, "symptom_relationships.csv")
     
     total = count1 + count2
@@ -0,0 +1,239 @@
+"""
+In-process graph engine over the triples ingest.py writes to Neo4j.
+
+seed.csv and symptom_relationships.csv are loaded into adjacency maps keyed by
+integer node ids, merged the way ingest.py MERGEs them: one node per (label,
+name), one edge per (subject, predicate, object). Each query of cypher.py has
+a method here returning the same rows as its Cypher, from dictionary lookups
+instead of a round trip to Neo4j, so the graph can serve requests when Neo4j
+is down (fallback.py) or on its own (GRAPH_BACKEND=memory).
+"""
+import csv
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger("health_assistant")
+
+GRAPH_DIR = Path(__file__).parent
+# The files ingest.py loads, in order
+GRAPH_CSV_FILES = (GRAPH_DIR / "seed.csv", GRAPH_DIR / "symptom_relationships.csv")
+# Properties ingest.py sets from a node's name besides ``name`` itself
+KEY_PROPERTIES = {"Location": "city", "Contact": "phone"}
+# Conditions whose contraindications rule an action out of get_safe_actions_for_metabolic_conditions()
+METABOLIC_CONDITIONS = ("Diabetes", "Hypertension")
+RELATED_SYMPTOMS_LIMIT = 20
+# Other spellings of seed.csv's cities (router.extract_city returns "Delhi", "Bangalore", "Gurgaon")
+CITY_ALIASES = {"delhi": "New Delhi", "bangalore": "Bengaluru", "gurgaon": "Gurugram"}
+
+_EMPTY: Tuple[int, ...] = ()
+
+
+def read_triples(csv_path: Path) -> List[Dict[str, str]]:
+    """Rows of a triples CSV (subject, predicate, object, type_s, type_o, ...)"""
+    with open(csv_path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def canonical_city(city: str) -> str:
+    """seed.csv's spelling of a city name"""
+    return CITY_ALIASES.get(str(city).strip().lower(), city)
+
+
+def merge_related_symptoms(results: Iterable[Dict], limit: int = RELATED_SYMPTOMS_LIMIT) -> List[Dict]:
+    """
+    Merge related-symptom rows of the same symptom pair, most shared conditions first
+
+    Args:
+        results: Rows {"original_symptom", "related_symptom", "shared_conditions"}
+        limit: Maximum number of pairs
+
+    Returns:
+        One row per (original, related) pair, case-insensitively, with the sorted
+        union of their shared conditions; ties ordered by the symptom names
+    """
+    merged: Dict[Tuple[str, str], Dict] = {}
+    for result in results:
+        original = result.get("original_symptom", "")
+        related = result.get("related_symptom", "")
+        key = (original.lower(), related.lower())
+        if key not in merged:
+            merged[key] = {"original_symptom": original, "related_symptom": related, "shared_conditions": set()}
+        merged[key]["shared_conditions"].update(result.get("shared_conditions", []))
+
+    final_results = [
+        {
+            "original_symptom": value["original_symptom"],
+            "related_symptom": value["related_symptom"],
+            "shared_conditions": sorted(value["shared_conditions"]),
+        }
+        for value in merged.values()
+    ]
+    final_results.sort(key=lambda x: (-len(x["shared_conditions"]), x["original_symptom"].lower(), x["related_symptom"].lower()))
+    return final_results[:limit]
+
+
+class MemoryGraph:
+    """Labelled nodes and typed edges with the read queries of cypher.py"""
+
+    def __init__(self, triples: Iterable[Dict[str, str]] = ()):
+        self.labels: List[str] = []
+        self.names: List[str] = []
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._nodes_by_label: Dict[str, List[int]] = {}
+        # label -> lowercased name -> node ids, for toLower(n.name) IN $names
+        self._lower_names: Dict[str, Dict[str, List[int]]] = {}
+        # relationship type -> node id -> neighbour ids, in insertion order
+        self._out: Dict[str, Dict[int, List[int]]] = {}
+        self._in: Dict[str, Dict[int, List[int]]] = {}
+        self._edges: Set[Tuple[int, str, int]] = set()
+        for triple in triples:
+            self.add_triple(triple)
+
+    @classmethod
+    def from_csv(cls, paths: Sequence[Path] = GRAPH_CSV_FILES) -> "MemoryGraph":
+        """Load triples CSVs; missing files are skipped, as ingest.py does"""
+        start = time.perf_counter()
+        graph = cls()
+        for path in paths:
+            if not Path(path).exists():
+                logger.warning(f"Graph triples file not found: {path}")
+                continue
+            for triple in read_triples(path):
+                graph.add_triple(triple)
+        logger.info(
+            f"Loaded in-memory graph: {len(graph)} nodes, {graph.edge_count} relationships "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def node(self, label: str, name: str) -> int:
+        """Id of a node, created when new (MERGE (n:label {name: name}))"""
+        key = (label, name)
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = len(self.names)
+            self._ids[key] = node_id
+            self.labels.append(label)
+            self.names.append(name)
+            self._nodes_by_label.setdefault(label, []).append(node_id)
+            self._lower_names.setdefault(label, {}).setdefault(name.lower(), []).append(node_id)
+        return node_id
+
+    def add_triple(self, triple: Dict[str, str]) -> bool:
+        """Merge one CSV row; False when it lacks a field ingest.py needs"""
+        fields = [triple.get(field) for field in ("subject", "predicate", "object", "type_s", "type_o")]
+        if any(value is None for value in fields):
+            return False
+        subject, predicate, obj, type_s, type_o = fields
+        if not (predicate and type_s and type_o):
+            return False
+        source = self.node(type_s, subject)
+        target = self.node(type_o, obj)
+        if (source, predicate, target) not in self._edges:
+            self._edges.add((source, predicate, target))
+            self._out.setdefault(predicate, {}).setdefault(source, []).append(target)
+            self._in.setdefault(predicate, {}).setdefault(target, []).append(source)
+        return True
+
+    def _neighbours(self, node_id: int, predicate: str, label: str, incoming: bool = False) -> List[int]:
+        adjacency = (self._in if incoming else self._out).get(predicate, {})
+        return [other for other in adjacency.get(node_id, _EMPTY) if self.labels[other] == label]
+
+    def _matching(self, label: str, names: Iterable[str]) -> List[int]:
+        """Nodes whose lowercased name is in ``names`` (lowercased), in the order of ``names``"""
+        by_name = self._lower_names.get(label, {})
+        nodes: List[int] = []
+        for name in dict.fromkeys(name.lower() for name in names):
+            nodes.extend(by_name.get(name, _EMPTY))
+        return nodes
+
+    def _property(self, node_id: int, key: str) -> Optional[str]:
+        if key == "name" or KEY_PROPERTIES.get(self.labels[node_id]) == key:
+            return self.names[node_id]
+        return None
+
+    def get_red_flags(self, symptoms: List[str]) -> List[Dict]:
+        """Conditions each given symptom is a red flag for (cypher.get_red_flags)"""
+        grouped: Dict[str, List[str]] = {}
+        for symptom in self._matching("Symptom", symptoms):
+            for condition in self._neighbours(symptom, "IS_RED_FLAG_FOR", "Condition"):
+                conditions = grouped.setdefault(self.names[symptom], [])
+                if self.names[condition] not in conditions:
+                    conditions.append(self.names[condition])
+        return [{"symptom": symptom, "conditions": conditions} for symptom, conditions in grouped.items()]
+
+    def get_contraindications(self, user_conditions: List[str]) -> List[Dict]:
+        """Actions to avoid with the given conditions, names matched exactly (cypher.get_contraindications)"""
+        grouped: Dict[str, List[str]] = {}
+        for name in dict.fromkeys(user_conditions):
+            condition = self._ids.get(("Condition", name))
+            if condition is None:
+                continue
+            for action in self._neighbours(condition, "AVOID_IN", "Action", incoming=True):
+                because = grouped.setdefault(self.names[action], [])
+                if name not in because:
+                    because.append(name)
+        return [{"avoid": action, "because": because} for action, because in grouped.items()]
+
+    def get_safe_actions_for_metabolic_conditions(self) -> List[Dict]:
+        """Actions not to avoid in diabetes or hypertension (cypher.get_safe_actions_for_metabolic_conditions)"""
+        excluded: Set[int] = set()
+        for name in METABOLIC_CONDITIONS:
+            condition = self._ids.get(("Condition", name))
+            if condition is not None:
+                excluded.update(self._neighbours(condition, "AVOID_IN", "Action", incoming=True))
+        return [
+            {"safeAction": self.names[action]}
+            for action in self._nodes_by_label.get("Action", _EMPTY)
+            if action not in excluded
+        ]
+
+    def get_providers_in_city(self, city: str) -> List[Dict]:
+        """Providers located in a city, one row per mode and phone when known (cypher.get_providers_in_city)"""
+        city = canonical_city(city)
+        results = []
+        for location in self._lower_names.get("Location", {}).get(str(city).lower(), _EMPTY):
+            if self._property(location, "city") != city:
+                continue
+            for provider in self._neighbours(location, "LOCATED_IN", "Provider", incoming=True):
+                modes = [self.names[node] for node in self._neighbours(provider, "HAS_MODE", "Service")] or [None]
+                phones = [
+                    self._property(node, "phone") for node in self._neighbours(provider, "HAS_PHONE", "Contact")
+                ] or [None]
+                for mode in modes:
+                    for phone in phones:
+                        results.append({"provider": self.names[provider], "mode": mode, "phone": phone})
+        return results
+
+    def get_related_symptoms(self, symptoms: List[str]) -> List[Dict]:
+        """
+        Symptoms sharing a condition with the given ones through IS_RED_FLAG_FOR or
+        IS_ASSOCIATED_WITH, in any combination (cypher.get_related_symptoms)
+        """
+        predicates = ("IS_RED_FLAG_FOR", "IS_ASSOCIATED_WITH")
+        rows: Dict[Tuple[str, str], Set[str]] = {}
+        for original in self._matching("Symptom", symptoms):
+            original_lower = self.names[original].lower()
+            for predicate in predicates:
+                for condition in self._neighbours(original, predicate, "Condition"):
+                    for other in predicates:
+                        for related in self._neighbours(condition, other, "Symptom", incoming=True):
+                            if self.names[related].lower() != original_lower:
+                                key = (self.names[original], self.names[related])
+                                rows.setdefault(key, set()).add(self.names[condition])
+        return merge_related_symptoms(
+            {"original_symptom": original, "related_symptom": related, "shared_conditions": conditions}
+            for (original, related), conditions in rows.items()
+        )
+
+    def count_red_flags(self, symptoms: List[str]) -> int:
+        return len(self.get_red_flags(symptoms))
@@ -7,6 +7,7 @@ import os
 import re
 import tempfile
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from collections import defaultdict, deque
 from io import BytesIO
 from pathlib import Path
@@ -59,11 +60,33 @@ os.environ.setdefault("CHROMADB_DISABLE_TELEMETRY", "1")
 from .safety import (
     detect_red_flags,
     detect_mental_health_crisis,
+    detect_native_safety_signals,
     detect_pregnancy_emergency,
     extract_symptoms,
+    match_symptom_phrases,
+    merge_native_safety,
+    native_safety_payload,
+    unconfirmed_native_categories,
 )
-from .router import is_graph_intent, extract_city
-from .rag.retriever import retrieve, initialize_chroma_client
+from .router import is_graph_intent, extract_city, route_query
+from .rag.retriever import (
+    retrieve,
+    retrieve_by_symptoms,
+    pack_context,
+    initialize_chroma_client,
+    get_embedding_cache_statistics,
+    get_embedding_batcher_statistics,
+    get_chroma_client,
+    index_paths,
+    multilingual_retrieval_available,
+    retrieve_multilingual,
+    warm_embedding_model,
+)
+from .rag.maintenance import startup_segment_check
+from .rag.reload import RAG_HOT_RELOAD, index_reloader
+from .rag.doc_store import summarize_chunk
+from .rag.planner import is_weak, plan_retrieval, profile_class
+from .rag.embedding_cache import query_embedding_cache, QUERY_EMBEDDING_CACHE_REDIS
 from .models import ChatRequest, ChatResponse, Profile, VoiceChatResponse
 
 from .graph import fallback as graph_fallback
@@ -85,6 +108,15 @@ from .pipeline_functions import (
     translate_to_user_language,
 )
 from .services.cache import cache_service
+from .services.warmup import STARTUP_WARMUP, startup_warmup
+from .services.symptom_ledger import (
+    build_ledger_from_history,
+    extract_raw_symptom_phrases,
+    get_symptom_ledger,
+    ledger_cache_key,
+    recent_terms,
+    update_symptom_ledger,
+)
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -115,7 +147,9 @@ async def _startup() -> None:
     
     # Initialize Neo4j connection pool (persistent, stays alive)
     try:
-        if neo4j_client.connect():
+        if GRAPH_BACKEND == "memory":
+            logger.info("GRAPH_BACKEND=memory - graph queries use the in-memory graph")
+        elif neo4j_client.connect():
             logger.info("Neo4j connection pool initialized successfully (persistent connection)")
         else:
             logger.warning("Neo4j not connected - graph queries will use fallback")
@@ -155,13 +189,29 @@ async def _startup() -> None:
             except Exception as e:
                 logger.error(f"Redis initialization error: {e}", exc_info=True)
     
-    # Pre-initialize ChromaDB vector database (reduces cold start time)
-    logger.info("Pre-initializing ChromaDB vector database...")
-    try:
-        initialize_chroma_client()
-        logger.info("ChromaDB vector database pre-initialized successfully")
-    except Exception as e:
-        logger.warning(f"Failed to pre-initialize ChromaDB (will initialize on first use): {e}")
+    # Share Redis with the query-embedding cache (L2 tier, float16 vectors)
+    if QUERY_EMBEDDING_CACHE_REDIS and cache_service.is_available():
+        query_embedding_cache.attach_redis(cache_service.redis_client)
+        logger.info("Query embedding cache using Redis as L2 tier")
+    
+    # Warm the vector index, embedding model, safety patterns and graph queries
+    # (steps registered below /health); /ready returns 503 until they finish
+    if STARTUP_WARMUP == "blocking":
+        logger.info("Warming up before serving...")
+        await asyncio.to_thread(startup_warmup.run)
+    else:
+        logger.info("Warming up in the background (see /ready)...")
+        startup_warmup.start()
+    
+    # Rebuild and swap the index when rag/data or the graph CSVs change
+    if RAG_HOT_RELOAD:
+        loop = asyncio.get_running_loop()
+        # Answers cached before a swap came from the old knowledge base
+        index_reloader.on_swap.append(
+            lambda generation: asyncio.run_coroutine_threadsafe(cache_service.invalidate_all_cache(), loop)
+        )
+        index_reloader.start()
+        logger.info("Watching the knowledge base for changes (hot reload)")
     
     # Pre-initialize OpenAI client (reduces cold start time)
     logger.info("Pre-initializing OpenAI client...")
@@ -178,6 +228,7 @@ async def _startup() -> None:
 @app.on_event("shutdown")
 async def _shutdown() -> None:
     """Cleanup database connections on shutdown"""
+    index_reloader.stop()
     logger.info("Shutting down database connections...")
     if neo4j_client.driver:
         neo4j_client.close()
@@ -339,6 +390,36 @@ DISCLAIMER_EN = (
     "⚠️ This is general information only, not medical advice. Consult a healthcare professional for proper diagnosis and treatment."
 )
 
+# Returned without an LLM call when no chunk passes the retrieval relevance cutoff and
+# there are no graph facts or safety signals (includes the "consult a professional" advice,
+# so no disclaimer is appended)
+INSUFFICIENT_INFORMATION_MESSAGES: Dict[str, str] = {
+    "en": (
+        "I don't have enough information from my sources to answer this. "
+        "For health concerns, please consult a healthcare professional. In an emergency, call 108."
+    ),
+    "hi": (
+        "मेरे स्रोतों में इसका उत्तर देने के लिए पर्याप्त जानकारी नहीं है। "
+        "स्वास्थ्य संबंधी चिंताओं के लिए कृपया किसी स्वास्थ्य विशेषज्ञ से परामर्श करें। आपात स्थिति में 108 पर कॉल करें।"
+    ),
+    "ta": (
+        "இதற்குப் பதிலளிக்க என் ஆதாரங்களில் போதுமான தகவல் இல்லை. "
+        "உடல்நலக் கவலைகளுக்கு மருத்துவரை அணுகவும். அவசர நிலையில் 108 ஐ அழைக்கவும்."
+    ),
+    "te": (
+        "దీనికి సమాధానం ఇవ్వడానికి నా మూలాల్లో తగినంత సమాచారం లేదు. "
+        "ఆరోగ్య సమస్యల కోసం దయచేసి వైద్యుడిని సంప్రదించండి. అత్యవసర పరిస్థితిలో 108కి కాల్ చేయండి."
+    ),
+    "kn": (
+        "ಇದಕ್ಕೆ ಉತ್ತರಿಸಲು ನನ್ನ ಮೂಲಗಳಲ್ಲಿ ಸಾಕಷ್ಟು ಮಾಹಿತಿ ಇಲ್ಲ. "
+        "ಆರೋಗ್ಯ ಸಮಸ್ಯೆಗಳಿಗೆ ದಯವಿಟ್ಟು ವೈದ್ಯರನ್ನು ಸಂಪರ್ಕಿಸಿ. ತುರ್ತು ಸಂದರ್ಭದಲ್ಲಿ 108 ಗೆ ಕರೆ ಮಾಡಿ."
+    ),
+    "ml": (
+        "ഇതിന് ഉത്തരം നൽകാൻ എന്റെ ഉറവിടങ്ങളിൽ മതിയായ വിവരങ്ങളില്ല. "
+        "ആരോഗ്യ പ്രശ്നങ്ങൾക്ക് ദയവായി ഒരു ഡോക്ടറെ സമീപിക്കുക. അടിയന്തര സാഹചര്യത്തിൽ 108 വിളിക്കുക."
+    ),
+}
+
 PREGNANCY_ALERT_GUIDANCE_EN = [
     "Severe pregnancy symptoms need urgent medical review.",
     "Contact your obstetrician or emergency services immediately.",
@@ -579,14 +660,6 @@ def romanize_text(text: str, lang: str) -> str:
         return text
 
 
-def _summarize_chunk(chunk: str, sentence_limit: int = 2) -> str:
-    if not chunk:
-        return ""
-    sentences = re.split(r"(?<=[.?!])\s+", chunk.strip())
-    summary = " ".join(sentences[:sentence_limit]).strip()
-    return summary
-
-
 def build_fallback_answer(
     *,
     query_en: str,
@@ -601,8 +674,8 @@ def build_fallback_answer(
     if rag_results:
         top_chunks = rag_results[:2]
         for idx, result in enumerate(top_chunks, start=1):
-            chunk = result.get("chunk", "")
-            summary = _summarize_chunk(chunk)
+            # Precomputed by the doc store at index time when available
+            summary = result.get("summary") or summarize_chunk(result.get("chunk", ""))
             if summary:
                 lines.append(f"Key insight {idx}: {summary}")
 
@@ -806,6 +879,9 @@ _openrouter_client: Optional[OpenAI] = None
 _chat_model_openai: str = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
 _chat_model_openrouter: str = OPENROUTER_MODEL
 _neo4j_available: Optional[bool] = None
+# "neo4j": Neo4j, with the in-memory graph (graph/memory.py) when it is down;
+# "memory": serve graph queries in-process only and never connect to Neo4j
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j").strip().lower()
 
 
 def get_openai_client() -> Optional[OpenAI]:
@@ -872,6 +948,8 @@ def ensure_neo4j() -> bool:
     Connection is initialized on startup, this just ensures it's still valid
     """
     global _neo4j_available
+    if GRAPH_BACKEND == "memory":
+        return False
     # Check if connection is already established (from startup)
     if neo4j_client.is_connected():
         _neo4j_available = True
@@ -950,12 +1028,12 @@ def graph_get_safe_actions(user_conditions: List[str]) -> List[Dict[str, Any]]:
             return neo4j_get_safe_actions()
         except Exception as exc:
             logger.error("Neo4j safe actions query failed", extra={"error": str(exc)})
-    return graph_fallback.get_safe_actions(user_conditions)
+    return graph_fallback.get_safe_actions_for_metabolic_conditions()
 
 
 def graph_get_related_symptoms(symptoms: List[str]) -> List[Dict[str, Any]]:
     """
-    Query Neo4j for symptoms related to the given symptoms through shared conditions
+    Query Neo4j (or the in-memory graph) for symptoms related to the given symptoms through shared conditions
     This helps identify symptom clusters (e.g., chest pain and left arm pain both related to heart attack)
     
     Args:
@@ -972,9 +1050,7 @@ def graph_get_related_symptoms(symptoms: List[str]) -> List[Dict[str, Any]]:
             return neo4j_get_related_symptoms(symptoms)
         except Exception as exc:
             logger.error("Neo4j related symptoms query failed", extra={"error": str(exc)})
-            return []
-    # Fallback: return empty (no fallback data for symptom relationships)
-    return []
+    return graph_fallback.get_related_symptoms(symptoms)
 
 
 def build_fact_blocks(facts: List[Dict[str, Any]]) -> Tuple[str, str]:
@@ -1181,12 +1257,65 @@ async def health_check():
             "rag": True,
             "graph": ensure_neo4j(),
             "graph_fallback": True,
+            "graph_backend": GRAPH_BACKEND,
             "safety": True,
             "database": db_client.is_connected()
         }
     }
 
 
+# Canned queries for warmup: English, romanized and native-script, red-flag and routine
+WARMUP_QUERIES = [
+    "I have chest pain and shortness of breath",
+    "my child has a high fever and a rash",
+    "mujhe sar dard hai aur bukhar hai",
+    "मुझे बुखार और खांसी है",
+    "what can I take for a headache during pregnancy",
+]
+
+
+def _warm_vector_index() -> None:
+    initialize_chroma_client()
+    # Report (or remove, CHROMA_GC_ON_STARTUP=clean) orphaned segment directories
+    startup_segment_check(get_chroma_client(), index_paths()["chroma"])
+
+
+def _warm_retrieval() -> None:
+    for query in WARMUP_QUERIES:
+        retrieve(query, k=4)
+
+
+def _warm_safety() -> None:
+    for query in WARMUP_QUERIES:
+        detect_red_flags(query, "en")
+        detect_mental_health_crisis(query, "en")
+        detect_pregnancy_emergency(query)
+        detect_native_safety_signals(query)
+        extract_symptoms(query)
+        is_graph_intent(query)
+        extract_city(query)
+
+
+def _warm_graph() -> None:
+    graph_get_red_flags(["chest pain", "shortness of breath"])
+    graph_get_contraindications(["Hypertension"])
+    graph_get_safe_actions(["Diabetes"])
+
+
+startup_warmup.add_step("vector_index", _warm_vector_index)
+startup_warmup.add_step("embedding_model", warm_embedding_model)
+startup_warmup.add_step("retrieval", _warm_retrieval)
+startup_warmup.add_step("safety", _warm_safety)
+startup_warmup.add_step("graph", _warm_graph)
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup warmup has finished (liveness is /health)"""
+    status = startup_warmup.get_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 @app.post("/stt")
 async def speech_to_text(
     file: UploadFile = File(...),
@@ -1211,33 +1340,6 @@ async def speech_to_text(
         raise HTTPException(status_code=502, detail=f"STT error: {str(exc)}") from exc
 
 
-def _extract_symptoms_from_history(conversation_history: Optional[List[Dict[str, str]]]) -> List[str]:
-    """
-    Extract symptoms mentioned in conversation history
-    
-    Args:
-        conversation_history: Previous conversation messages
-        
-    Returns:
-        List of symptom names found in conversation history
-    """
-    if not conversation_history:
-        return []
-    
-    symptoms_found = []
-    # Extract from last 4 messages (user and assistant)
-    for msg in conversation_history[-4:]:
-        content = msg.get("content", "")
-        if content:
-            # Extract symptoms from the message using the same extract_symptoms function
-            msg_symptoms = extract_symptoms(content)
-            symptoms_found.extend(msg_symptoms)
-    
-    # Remove duplicates while preserving order
-    unique_symptoms = list(dict.fromkeys(symptoms_found))
-    return unique_symptoms
-
-
 def _extract_raw_symptom_phrases(text: str) -> List[str]:
     """
     Extract raw symptom phrases from text (before canonical mapping)
@@ -1249,63 +1351,36 @@ def _extract_raw_symptom_phrases(text: str) -> List[str]:
     Returns:
         List of raw symptom phrases found in text
     """
-    if not text:
-        return []
-    
-    text_lower = text.lower()
-    found_phrases = []
-    
-    # Common symptom phrases that might be mentioned (expanded list)
-    symptom_phrases = [
-        "chest pain", "chest pressure", "tightness in chest",
-        "left arm pain", "right arm pain", "arm pain", "left arm numb", "right arm numb",
-        "jaw pain", "shoulder pain", "back pain", "upper back pain",
-        "shortness of breath", "difficulty breathing",
-        "cold sweats", "sweating", "excessive sweating",
-        "nausea", "vomiting",
-        "lightheadedness", "dizziness",
-        "headache", "severe headache",
-        "abdominal pain", "stomach pain",
-        "fever", "high fever",
-        "rash", "skin rash",
-        "cough", "persistent cough"
-    ]
-    
-    for phrase in symptom_phrases:
-        if phrase in text_lower:
-            found_phrases.append(phrase)
-    
-    return found_phrases
+    return extract_raw_symptom_phrases(text)
 
 
 def _check_symptom_relationships(processed_text: str, current_symptoms: List[str], 
-                                  conversation_history: Optional[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+                                  conversation_history: Optional[List[Dict[str, str]]] = None,
+                                  symptom_ledger: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
-    Check for symptom relationships between current query and conversation history
+    Check for symptom relationships between current query and symptoms the user reported earlier
     
     Args:
         processed_text: Processed English text from current query
         current_symptoms: Canonical symptoms extracted from current query
-        conversation_history: Previous conversation messages
+        conversation_history: Previous conversation messages (only used to build a ledger
+            when symptom_ledger is not given)
+        symptom_ledger: Per-session symptom ledger of earlier user turns
         
     Returns:
         List of facts containing symptom relationships or no-relationship info
     """
     facts = []
     
-    if not conversation_history:
-        return facts
-    
-    # Extract canonical symptoms from conversation history
-    history_symptoms = _extract_symptoms_from_history(conversation_history)
+    if symptom_ledger is None:
+        if not conversation_history:
+            return facts
+        symptom_ledger = build_ledger_from_history(conversation_history)
     
-    # Extract raw symptom phrases from history (before canonical mapping)
-    history_raw_phrases = []
-    for msg in conversation_history[-4:]:
-        content = msg.get("content", "")
-        if content:
-            raw_phrases = _extract_raw_symptom_phrases(content)
-            history_raw_phrases.extend(raw_phrases)
+    # Canonical symptoms and raw phrases from the user's recent turns
+    history_symptom_set, history_phrase_set = recent_terms(symptom_ledger)
+    history_symptoms = sorted(history_symptom_set)
+    history_raw_phrases = sorted(history_phrase_set)
     
     # Extract raw symptom phrases from current query
     current_raw_phrases = _extract_raw_symptom_phrases(processed_text)
@@ -1336,52 +1411,29 @@ def _check_symptom_relationships(processed_text: str, current_symptoms: List[str
         related_symptoms = graph_get_related_symptoms(all_symptoms_for_query) if all_symptoms_for_query else []
         logger.debug(f"Neo4j returned {len(related_symptoms) if related_symptoms else 0} related symptoms")
         
+        current_set = {s.lower() for s in current_symptoms}
+        history_set = {s.lower() for s in history_symptoms}
+        current_phrases_set = {p.lower() for p in current_raw_phrases}
+        history_phrases_set = {p.lower() for p in history_raw_phrases}
+        all_current_lower = current_set | current_phrases_set
+        all_history_lower = history_set | history_phrases_set
+        
+        def _mentioned(name: str, terms: set, phrases: set) -> bool:
+            # Exact match on canonical symptoms or raw phrases, then partial match on phrases
+            # (Neo4j names like "Left arm pain" vs phrase "arm pain")
+            return name in terms or any(name in phrase or phrase in name for phrase in phrases)
+        
         if related_symptoms:
             # Filter to only show relationships between current and history symptoms/phrases
             relevant_relationships = []
-            current_symptoms_lower = [s.lower() for s in current_symptoms]
-            history_symptoms_lower = [s.lower() for s in history_symptoms]
-            current_raw_lower = [p.lower() for p in current_raw_phrases]
-            history_raw_lower = [p.lower() for p in history_raw_phrases]
-            
-            # Create combined lists for matching
-            all_current_lower = current_symptoms_lower + current_raw_lower
-            all_history_lower = history_symptoms_lower + history_raw_lower
-            
             for rel in related_symptoms:
                 original = rel.get("original_symptom", "").lower()
                 related = rel.get("related_symptom", "").lower()
                 
-                # Check if this relationship connects current and history symptoms
-                # Match Neo4j symptom names with both canonical symptoms and raw phrases
-                
-                # Check if original symptom matches current (canonical or raw phrase)
-                original_in_current = (
-                    original in current_symptoms_lower or 
-                    original in current_raw_lower or
-                    any(original in phrase or phrase in original for phrase in current_raw_lower)
-                )
-                
-                # Check if related symptom matches current (canonical or raw phrase)
-                related_in_current = (
-                    related in current_symptoms_lower or 
-                    related in current_raw_lower or
-                    any(related in phrase or phrase in related for phrase in current_raw_lower)
-                )
-                
-                # Check if original symptom matches history (canonical or raw phrase)
-                original_in_history = (
-                    original in history_symptoms_lower or 
-                    original in history_raw_lower or
-                    any(original in phrase or phrase in original for phrase in history_raw_lower)
-                )
-                
-                # Check if related symptom matches history (canonical or raw phrase)
-                related_in_history = (
-                    related in history_symptoms_lower or 
-                    related in history_raw_lower or
-                    any(related in phrase or phrase in related for phrase in history_raw_lower)
-                )
+                original_in_current = _mentioned(original, all_current_lower, current_phrases_set)
+                related_in_current = _mentioned(related, all_current_lower, current_phrases_set)
+                original_in_history = _mentioned(original, all_history_lower, history_phrases_set)
+                related_in_history = _mentioned(related, all_history_lower, history_phrases_set)
                 
                 # Relationship connects current and history if:
                 # 1. One symptom is in history AND the other is in current, OR
@@ -1399,33 +1451,25 @@ def _check_symptom_relationships(processed_text: str, current_symptoms: List[str
                 })
                 logger.info(
                     f"Found {len(relevant_relationships)} symptom relationships between current and history. "
-                    f"Current: {all_current_lower}, History: {all_history_lower}, "
+                    f"Current: {sorted(all_current_lower)}, History: {sorted(all_history_lower)}, "
                     f"Relationships: {[(r.get('original_symptom'), r.get('related_symptom')) for r in relevant_relationships[:3]]}"
                 )
             else:
                 logger.debug(
                     f"No relevant relationships found. Neo4j returned {len(related_symptoms)} relationships, "
-                    f"but none matched current ({all_current_lower}) and history ({all_history_lower})"
+                    f"but none matched current ({sorted(all_current_lower)}) and history ({sorted(all_history_lower)})"
                 )
         else:
             # No relationships found - check if we should explicitly state no relationship
-            # Check if raw phrases are different (even if canonical symptoms are same)
-            current_phrases_set = set(current_raw_lower) if current_raw_phrases else set()
-            history_phrases_set = set(history_raw_lower) if history_raw_phrases else set()
-            
-            # Also check canonical symptoms
-            current_set = set([s.lower() for s in current_symptoms])
-            history_set = set([s.lower() for s in history_symptoms])
-            
             # Symptoms are different if:
             # 1. Canonical symptoms are different, OR
             # 2. Raw phrases are different (even if canonical is same)
             symptoms_different = (
-                (current_set != history_set and len(current_set & history_set) == 0) or
-                (current_phrases_set != history_phrases_set and len(current_phrases_set & history_phrases_set) == 0)
+                (current_set != history_set and not (current_set & history_set)) or
+                (current_phrases_set != history_phrases_set and not (current_phrases_set & history_phrases_set))
             )
             
-            if symptoms_different and (current_symptoms or current_raw_phrases) and (history_symptoms or history_raw_phrases):
+            if symptoms_different:
                 # No relationship found between different symptoms
                 current_display = ", ".join(current_symptoms + current_raw_phrases[:2])
                 history_display = ", ".join(history_symptoms + history_raw_phrases[:2])
@@ -1444,46 +1488,6 @@ def _check_symptom_relationships(processed_text: str, current_symptoms: List[str
     return facts
 
 
-def _extract_raw_symptom_phrases(text: str) -> List[str]:
-    """
-    Extract raw symptom phrases from text (before canonical mapping)
-    This helps when "left arm pain" maps to "chest pain" but we want to detect the relationship
-    
-    Args:
-        text: Text to extract symptoms from
-        
-    Returns:
-        List of raw symptom phrases found in text
-    """
-    if not text:
-        return []
-    
-    text_lower = text.lower()
-    found_phrases = []
-    
-    # Common symptom phrases that might be mentioned (expanded list)
-    symptom_phrases = [
-        "chest pain", "chest pressure", "tightness in chest",
-        "left arm pain", "right arm pain", "arm pain", "left arm numb", "right arm numb",
-        "jaw pain", "shoulder pain", "back pain", "upper back pain",
-        "shortness of breath", "difficulty breathing",
-        "cold sweats", "sweating", "excessive sweating",
-        "nausea", "vomiting",
-        "lightheadedness", "dizziness",
-        "headache", "severe headache",
-        "abdominal pain", "stomach pain",
-        "fever", "high fever",
-        "rash", "skin rash",
-        "cough", "persistent cough"
-    ]
-    
-    for phrase in symptom_phrases:
-        if phrase in text_lower:
-            found_phrases.append(phrase)
-    
-    return found_phrases
-
-
 def _enhance_search_query_with_context(current_query: str, conversation_history: Optional[List[Dict[str, str]]]) -> str:
     """
     Enhance search query using conversation history for better RAG retrieval
@@ -1686,9 +1690,143 @@ def _filter_md_sources(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return filtered
 
 
+def _retrieval_filter(profile, processed_text: str, mental_health: dict, pregnancy_alert: dict) -> Optional[dict]:
+    """Category filter for retrieve() from the profile, safety and router signals (see rag/planner.py)"""
+    return plan_retrieval(
+        profile,
+        processed_text,
+        {"mental_health": mental_health, "pregnancy": pregnancy_alert, "route": route_query(processed_text)},
+    )
+
+
+# Retrieval for untranslated queries runs here while translate_to_english() is in flight
+_native_retrieval_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="native-retrieval")
+
+
+def _start_native_retrieval(
+    text: str,
+    detected_lang: Optional[str],
+    profile,
+    conversation_history: Optional[List[Dict[str, str]]],
+) -> Optional[Tuple[Future, Optional[dict]]]:
+    """
+    Start retrieving with the original (untranslated) text on the multilingual index
+    
+    The category filter is planned from the profile and original text only, since the
+    safety signals need the translation; _native_results() discards the results when
+    the filter planned after translation differs.
+    
+    Returns:
+        (future of retrieve_multilingual results, filter used), or None for English
+        queries or when multilingual retrieval is unavailable
+    """
+    if detected_lang in (None, "en") or not multilingual_retrieval_available():
+        return None
+    native_filter = plan_retrieval(profile, text)
+    query = _enhance_search_query_with_context(text, conversation_history)
+    return _native_retrieval_executor.submit(retrieve_multilingual, query, 4, native_filter), native_filter
+
+
+def _native_results(
+    results: List[Dict[str, Any]], native_filter: Optional[dict], retrieval_filter: Optional[dict], k: int
+) -> Optional[List[Dict[str, Any]]]:
+    """Top k untranslated-query results, or None to fall back to retrieve() on the translation"""
+    if native_filter != retrieval_filter or is_weak(results, 1):
+        return None
+    return results[:k]
+
+
+def _symptom_route_results(
+    profile, processed_text: str, enhanced_query: str, pregnancy_alert: dict, k: int, retrieval_filter: Optional[dict]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Precomputed chunks for a message that clearly names known symptoms (see rag/symptom_routes.py)
+    
+    Only for messages searched as they are: a query enhanced with conversation
+    context is left to retrieve(). None when the message does not route.
+    """
+    if enhanced_query != processed_text:
+        return None
+    signals = {"pregnancy": pregnancy_alert, "route": route_query(processed_text)}
+    return retrieve_by_symptoms(
+        processed_text,
+        match_symptom_phrases(processed_text),
+        profile_class(profile, processed_text, signals),
+        k,
+        retrieval_filter,
+    )
+
+
+def _retrieve_for_request(
+    native_retrieval: Optional[Tuple[Future, Optional[dict]]],
+    enhanced_query: str,
+    k: int,
+    retrieval_filter: Optional[dict],
+    debug_info: Dict[str, Any],
+    routed: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Use symptom-routed chunks or the parallel untranslated-query retrieval when usable, else retrieve() the translation"""
+    if routed is not None:
+        debug_info["retrieval_source"] = "symptom_route"
+        return routed
+    if native_retrieval is not None:
+        future, native_filter = native_retrieval
+        results = _native_results(future.result(), native_filter, retrieval_filter, k)
+        if results is not None:
+            debug_info["retrieval_source"] = "multilingual"
+            return results
+    debug_info["retrieval_source"] = "translated"
+    return retrieve(enhanced_query, k=k, where=retrieval_filter)
+
+
+def _skip_generation(
+    rag_results: List[Dict[str, Any]],
+    facts: List[Dict[str, Any]],
+    safety_result: Dict[str, Any],
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+) -> bool:
+    """
+    No chunk passed the relevance cutoff and there are no graph facts, safety signals
+    or earlier turns to answer from (follow-ups like "what about for kids?" are answered
+    from the conversation)
+    """
+    # Mental-health and pregnancy signals are already in facts
+    return not rag_results and not facts and not safety_result.get("red_flag") and not conversation_history
+
+
+def _insufficient_information_answer(lang: str) -> str:
+    return INSUFFICIENT_INFORMATION_MESSAGES.get(lang, INSUFFICIENT_INFORMATION_MESSAGES["en"])
+
+
+def _rag_citations(rag_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Citations for retrieved chunks, deduplicated by URL
+    
+    Uses each result's precomputed "citations" (doc store); results without them
+    go through _filter_md_sources' reference_sources extraction.
+    """
+    citations: List[Dict[str, Any]] = []
+    seen_urls = set()
+    for r in rag_results:
+        chunk_citations = r.get("citations")
+        if chunk_citations is None:
+            chunk_citations = _filter_md_sources([{
+                "source": r.get("source", "unknown"),
+                "id": r.get("id", ""),
+                "topic": r.get("topic"),
+                "reference_sources": r.get("reference_sources", []),
+            }])
+        for citation in chunk_citations:
+            if citation["url"] not in seen_urls:
+                seen_urls.add(citation["url"])
+                citations.append(citation)
+    return citations
+
+
 def process_chat_request(
     request: ChatRequest, 
-    conversation_history: Optional[List[Dict[str, str]]] = None
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    symptom_ledger: Optional[Dict[str, Any]] = None,
 ) -> Tuple[ChatResponse, str, Dict[str, float]]:
     timings: Dict[str, float] = {}
     total_start = time.perf_counter()
@@ -1703,6 +1841,14 @@ def process_chat_request(
     # ============================================================
     # STEP 1: GPT-4o-mini → Detect Language + Translate to English
     # ============================================================
+    # Screen the original text with the native-script/romanized safety lexicons
+    # before any LLM round trip (confirmed on the translated text below)
+    native_safety_start = time.perf_counter()
+    native_safety = detect_native_safety_signals(text)
+    timings["native_safety"] = time.perf_counter() - native_safety_start
+    if native_safety["languages"]:
+        logger.warning(f"Safety match on original text ({', '.join(native_safety['languages'])}): {native_safety['matched']}")
+    
     detection_start = time.perf_counter()
     openai_client = get_openai_client()
     model = _chat_model_openai
@@ -1739,6 +1885,9 @@ def process_chat_request(
     # Log final detected language (for debugging)
     logger.info(f"Language detection complete - detected_lang: {detected_lang}, target_lang: {target_lang}, will translate back to: {detected_lang}")
     
+    # Untranslated queries start retrieving on the multilingual index while translation runs
+    native_retrieval = _start_native_retrieval(text, detected_lang, profile, conversation_history)
+    
     # Translate to English using GPT-4o-mini (SKIP if English detected)
     if detected_lang == "en":
         # Skip translation entirely if English detected - optimize pipeline
@@ -1773,6 +1922,14 @@ def process_chat_request(
     safety_result = detect_red_flags(processed_text, "en")
     mental_health_en = detect_mental_health_crisis(processed_text, "en")
     pregnancy_alert_en = detect_pregnancy_emergency(processed_text)
+    if native_safety["languages"]:
+        unconfirmed = unconfirmed_native_categories(native_safety, safety_result, mental_health_en, pregnancy_alert_en)
+        if unconfirmed:
+            logger.info(f"Original-text safety match not confirmed on translation: {unconfirmed}")
+        debug_info["native_safety"] = {**native_safety, "unconfirmed": unconfirmed}
+        safety_result, mental_health_en, pregnancy_alert_en = merge_native_safety(
+            native_safety, safety_result, mental_health_en, pregnancy_alert_en
+        )
     timings["safety_analysis"] = time.perf_counter() - safety_start
 
     # Translate mental health and pregnancy alerts if needed (skip if English detected)
@@ -1817,13 +1974,16 @@ def process_chat_request(
     answer = ""
     route = "vector"
     rag_results: List[Dict[str, Any]] = []
+    skip_generation = False
     
     # Extract symptoms from current query
     current_symptoms = extract_symptoms(processed_text)
     
     # Check for symptom relationships when there's conversation history
     # This helps with follow-up questions like "what about left arm pain?" after "chest pain"
-    relationship_facts = _check_symptom_relationships(processed_text, current_symptoms, conversation_history)
+    relationship_facts = _check_symptom_relationships(
+        processed_text, current_symptoms, conversation_history, symptom_ledger=symptom_ledger
+    )
     facts_en.extend(relationship_facts)
     
     if safety_result["red_flag"] or current_symptoms:
@@ -1951,115 +2111,120 @@ def process_chat_request(
         rag_start = time.perf_counter()
         # Enhance query with conversation history for better context
         enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
-        rag_results = retrieve(enhanced_query, k=3)
+        retrieval_filter = _retrieval_filter(profile, processed_text, mental_health_en, pregnancy_alert_en)
+        debug_info["retrieval_filter"] = retrieval_filter
+        routed = _symptom_route_results(
+            profile, processed_text, enhanced_query, pregnancy_alert_en, 3, retrieval_filter
+        )
+        rag_results = _retrieve_for_request(native_retrieval, enhanced_query, 3, retrieval_filter, debug_info, routed)
         timings["retrieval"] = time.perf_counter() - rag_start
-        context = "\n\n".join([r["chunk"] for r in rag_results])
-        citations = _filter_md_sources([
-            {
-                "source": r["source"], 
-                "id": r["id"], 
-                "topic": r.get("topic"),
-                "reference_sources": r.get("reference_sources", [])
-            }
-            for r in rag_results
-        ])
+        context, rag_results = pack_context(rag_results)
+        citations = _rag_citations(rag_results)
         debug_info["rag_context_snippets"] = [r["chunk"][:200] for r in rag_results]
         debug_info["citations"] = citations
         
-        if facts_en:
-            fact_summary = "\n\nRelevant facts from database:\n"
-            for fact_group in facts_en:
-                if fact_group["type"] == "red_flags":
-                    fact_summary += "⚠️ Red flag conditions detected\n"
-                elif fact_group["type"] == "contraindications":
-                    avoid_phrases = []
-                    for entry in fact_group["data"]:
-                        avoid_items = ", ".join(entry["avoid"])
-                        avoid_phrases.append(f"{entry['condition']}: {avoid_items}")
-                    if avoid_phrases:
-                        fact_summary += f"⛔ Things to avoid — {'; '.join(avoid_phrases)}\n"
-                elif fact_group["type"] == "providers":
-                    fact_summary += f"🏥 {len(fact_group['data'])} healthcare providers found\n"
-                elif fact_group["type"] == "symptom_relationships":
-                    for entry in fact_group["data"]:
-                        original = entry.get("original_symptom", "")
-                        related = entry.get("related_symptom", "")
-                        shared_conditions = entry.get("shared_conditions", [])
-                        if original and related and shared_conditions:
-                            fact_summary += f"🔗 {original} and {related} are related symptoms, both associated with: {', '.join(shared_conditions)}\n"
-                            fact_summary += f"   This suggests these symptoms may be part of the same condition cluster.\n"
-                elif fact_group["type"] == "symptom_no_relationship":
-                    current_display = fact_group["data"].get("current_display", "")
-                    history_display = fact_group["data"].get("history_display", "")
-                    fact_summary += f"❌ No relationship found between current symptoms ({current_display}) and history symptoms ({history_display})\n"
-                    fact_summary += f"   These symptoms appear to be unrelated based on available medical knowledge.\n"
-            context += fact_summary
-
-        if personalization_notes:
-            context += "\n\nPersonalization notes:\n" + "\n".join(
-                f"- {note}" for note in personalization_notes
-            )
-            if not any(f.get("type") == "personalization" for f in facts_en):
-                facts_en.append({"type": "personalization", "data": personalization_notes})
+        skip_generation = _skip_generation(rag_results, facts_en, safety_result, conversation_history)
+        if skip_generation:
+            answer_en = INSUFFICIENT_INFORMATION_MESSAGES["en"]
+            answer = _insufficient_information_answer(detected_lang)
+            debug_info["llm"] = {"provider": None, "model": None, "fallback": True, "reason": "insufficient_context"}
+            debug_info["answer_en"] = answer_en
+            debug_info["answer_localized"] = answer
+        else:
+            if facts_en:
+                fact_summary = "\n\nRelevant facts from database:\n"
+                for fact_group in facts_en:
+                    if fact_group["type"] == "red_flags":
+                        fact_summary += "⚠️ Red flag conditions detected\n"
+                    elif fact_group["type"] == "contraindications":
+                        avoid_phrases = []
+                        for entry in fact_group["data"]:
+                            avoid_items = ", ".join(entry["avoid"])
+                            avoid_phrases.append(f"{entry['condition']}: {avoid_items}")
+                        if avoid_phrases:
+                            fact_summary += f"⛔ Things to avoid — {'; '.join(avoid_phrases)}\n"
+                    elif fact_group["type"] == "providers":
+                        fact_summary += f"🏥 {len(fact_group['data'])} healthcare providers found\n"
+                    elif fact_group["type"] == "symptom_relationships":
+                        for entry in fact_group["data"]:
+                            original = entry.get("original_symptom", "")
+                            related = entry.get("related_symptom", "")
+                            shared_conditions = entry.get("shared_conditions", [])
+                            if original and related and shared_conditions:
+                                fact_summary += f"🔗 {original} and {related} are related symptoms, both associated with: {', '.join(shared_conditions)}\n"
+                                fact_summary += f"   This suggests these symptoms may be part of the same condition cluster.\n"
+                    elif fact_group["type"] == "symptom_no_relationship":
+                        current_display = fact_group["data"].get("current_display", "")
+                        history_display = fact_group["data"].get("history_display", "")
+                        fact_summary += f"❌ No relationship found between current symptoms ({current_display}) and history symptoms ({history_display})\n"
+                        fact_summary += f"   These symptoms appear to be unrelated based on available medical knowledge.\n"
+                context += fact_summary
 
-        # ============================================================
-        # STEP 4: GPT-4o-mini → Final reasoning + Generate answer in English
-        # ============================================================
-        generation_start = time.perf_counter()
+            if personalization_notes:
+                context += "\n\nPersonalization notes:\n" + "\n".join(
+                    f"- {note}" for note in personalization_notes
+                )
+                if not any(f.get("type") == "personalization" for f in facts_en):
+                    facts_en.append({"type": "personalization", "data": personalization_notes})
+
+            # ============================================================
+            # STEP 4: GPT-4o-mini → Final reasoning + Generate answer in English
+            # ============================================================
+            generation_start = time.perf_counter()
         
-        if openai_client and model:
-            answer_en = generate_final_answer(
-                client=openai_client,
-                model=model,
-                user_question=processed_text,
-                rag_context=context,
-                facts=facts_en,
-                profile=profile,
-                conversation_history=conversation_history,
-            )
-            provider_meta = {"provider": "openai", "model": model, "fallback": False}
-        else:
-            # Fallback to old method
-            answer_en, provider_meta = generate_answer(
-                context=context,
-                query_en=processed_text,
-                llm_language_label="English",
-                original_query=text,
-                facts=facts_en,
-                citations=citations,
-            )
+            if openai_client and model:
+                answer_en = generate_final_answer(
+                    client=openai_client,
+                    model=model,
+                    user_question=processed_text,
+                    rag_context=context,
+                    facts=facts_en,
+                    profile=profile,
+                    conversation_history=conversation_history,
+                )
+                provider_meta = {"provider": "openai", "model": model, "fallback": False}
+            else:
+                # Fallback to old method
+                answer_en, provider_meta = generate_answer(
+                    context=context,
+                    query_en=processed_text,
+                    llm_language_label="English",
+                    original_query=text,
+                    facts=facts_en,
+                    citations=citations,
+                )
         
-        # ============================================================
-        # STEP 5: GPT-4o-mini → Translate answer back to user's language (native script)
-        # SKIP if English detected
-        # ============================================================
-        translation_start = time.perf_counter()
+            # ============================================================
+            # STEP 5: GPT-4o-mini → Translate answer back to user's language (native script)
+            # SKIP if English detected
+            # ============================================================
+            translation_start = time.perf_counter()
         
-        # Skip translation back if English was detected (optimization)
-        # Use detected_lang (not target_lang) to respond in the language user typed in
-        if detected_lang == "en":
-            answer = answer_en
-            logger.debug("English detected - skipping translation back to user's language step")
-        elif detected_lang != "en" and openai_client and model:
-            # Translate to user's detected language (always native script, not romanized)
-            logger.info(f"Translating answer back to {detected_lang} (native script)")
-            answer = translate_to_user_language(
-                client=openai_client,
-                model=model,
-                english_text=answer_en,
-                target_language=detected_lang,
-            )
-            logger.debug(f"Translation complete - answer length: {len(answer)} characters")
-        else:
-            answer = answer_en
-            logger.warning(f"Translation skipped - detected_lang: {detected_lang}, openai_client: {bool(openai_client)}, model: {model}")
+            # Skip translation back if English was detected (optimization)
+            # Use detected_lang (not target_lang) to respond in the language user typed in
+            if detected_lang == "en":
+                answer = answer_en
+                logger.debug("English detected - skipping translation back to user's language step")
+            elif detected_lang != "en" and openai_client and model:
+                # Translate to user's detected language (always native script, not romanized)
+                logger.info(f"Translating answer back to {detected_lang} (native script)")
+                answer = translate_to_user_language(
+                    client=openai_client,
+                    model=model,
+                    english_text=answer_en,
+                    target_language=detected_lang,
+                )
+                logger.debug(f"Translation complete - answer length: {len(answer)} characters")
+            else:
+                answer = answer_en
+                logger.warning(f"Translation skipped - detected_lang: {detected_lang}, openai_client: {bool(openai_client)}, model: {model}")
         
-        timings["answer_generation"] = time.perf_counter() - generation_start
-        timings["answer_translation"] = time.perf_counter() - translation_start
+            timings["answer_generation"] = time.perf_counter() - generation_start
+            timings["answer_translation"] = time.perf_counter() - translation_start
         
-        debug_info["llm"] = provider_meta
-        debug_info["answer_en"] = answer_en
-        debug_info["answer_localized"] = answer
+            debug_info["llm"] = provider_meta
+            debug_info["answer_en"] = answer_en
+            debug_info["answer_localized"] = answer
         
     else:
         # ============================================================
@@ -2068,20 +2233,19 @@ def process_chat_request(
         rag_start = time.perf_counter()
         # Enhance query with conversation history for better context
         enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
-        rag_results = retrieve(enhanced_query, k=4)
+        retrieval_filter = _retrieval_filter(profile, processed_text, mental_health_en, pregnancy_alert_en)
+        debug_info["retrieval_filter"] = retrieval_filter
+        routed = _symptom_route_results(
+            profile, processed_text, enhanced_query, pregnancy_alert_en, 4, retrieval_filter
+        )
+        rag_results = _retrieve_for_request(native_retrieval, enhanced_query, 4, retrieval_filter, debug_info, routed)
         timings["retrieval"] = time.perf_counter() - rag_start
         debug_info["rag_context_snippets"] = [r["chunk"][:200] for r in rag_results] if rag_results else []
         
-        if not rag_results:
-            answer_en = (
-                "I don't have enough information from my sources. "
-                "For health concerns, please consult a healthcare professional."
-            )
-            localized_answer = localize_text(
-                answer_en,
-                target_lang=target_lang,
-                response_style=response_style,
-            )
+        skip_generation = _skip_generation(rag_results, facts_en, safety_result, conversation_history)
+        if skip_generation:
+            answer_en = INSUFFICIENT_INFORMATION_MESSAGES["en"]
+            localized_answer = _insufficient_information_answer(detected_lang)
             provider_meta = {
                 "provider": None,
                 "model": None,
@@ -2093,16 +2257,8 @@ def process_chat_request(
             debug_info["answer_en"] = answer_en
             debug_info["answer_localized"] = localized_answer
         else:
-            context = "\n\n".join([r["chunk"] for r in rag_results])
-            citations = _filter_md_sources([
-                {
-                    "source": r["source"], 
-                    "id": r["id"], 
-                    "topic": r.get("topic"),
-                    "reference_sources": r.get("reference_sources", [])
-                }
-                for r in rag_results
-            ])
+            context, rag_results = pack_context(rag_results)
+            citations = _rag_citations(rag_results)
             debug_info["citations"] = citations
 
             personalized_conditions: List[str] = []
@@ -2186,7 +2342,7 @@ def process_chat_request(
             debug_info["answer_en"] = answer_en
             debug_info["answer_localized"] = answer
 
-    if not safety_result["red_flag"]:
+    if not safety_result["red_flag"] and not skip_generation:
         # Translate disclaimer to user's language (skip if English detected)
         # Use detected_lang (not target_lang) to respond in the language user typed in
         disclaimer_en = DISCLAIMER_EN
@@ -2245,6 +2401,8 @@ def process_chat_request(
         "target_language": target_lang,
         "detected_language": detected_lang,
         "pipeline": "new_multilingual",
+        # Symptoms in this (English) turn, recorded in the session's symptom ledger after saving
+        "symptoms": {"symptoms": current_symptoms, "phrases": _extract_raw_symptom_phrases(processed_text)},
     }
     if request.debug:
         metadata_payload["debug"] = debug_info
@@ -2374,6 +2532,14 @@ async def save_chat_messages_background(
                     await cache_service.delete(conversation_history_key)
                     cache_invalidated += 1
                     logger.debug(f"Invalidated cache: {conversation_history_key}")
+                
+                # Record this user turn in the session's symptom ledger
+                try:
+                    await update_symptom_ledger(session_id, user_message, metadata.get("symptoms"))
+                except Exception as ledger_error:
+                    logger.warning(f"Failed to update symptom ledger, invalidating instead: {ledger_error}")
+                    await cache_service.delete(ledger_cache_key(session_id))
+                    cache_invalidated += 1
         except Exception as e:
             logger.warning(f"Failed to invalidate cache: {e}", exc_info=True)
         
@@ -2493,9 +2659,21 @@ async def chat(
         else:
             logger.debug(f"No conversation history - session_id: {session_id}, db_connected: {db_client.is_connected() if db_client else False}")
         
+        # Symptoms the user reported earlier in this session (user turns only)
+        symptom_ledger = None
+        if session_id and conversation_history and not request.conversation_history:
+            symptom_ledger = await get_symptom_ledger(session_id, conversation_history)
+        
         # Process chat request (no caching for chat responses)
         # This is the main work - generate AI response
-        response, target_lang, timings = process_chat_request(request, conversation_history=conversation_history)
+        # Runs in a worker thread so retrieval (query embedding) never blocks the event loop
+        # and concurrent requests can share embedding batches
+        response, target_lang, timings = await asyncio.to_thread(
+            process_chat_request,
+            request,
+            conversation_history=conversation_history,
+            symptom_ledger=symptom_ledger,
+        )
         
         # Add customer_id and session_id to response metadata
         if customer_id:
@@ -2551,7 +2729,8 @@ async def process_chat_request_stream(
     request: ChatRequest,
     conversation_history: Optional[List[Dict[str, str]]] = None,
     session_id: Optional[str] = None,
-    customer_id: Optional[str] = None
+    customer_id: Optional[str] = None,
+    symptom_ledger: Optional[Dict[str, Any]] = None,
 ):
     """
     Process chat request and stream the response.
@@ -2562,6 +2741,7 @@ async def process_chat_request_stream(
         conversation_history: Previous conversation messages for context
         session_id: Session ID for metadata
         customer_id: Customer ID for metadata
+        symptom_ledger: Per-session symptom ledger of earlier user turns
     """
     text = request.text
     profile: Profile = request.profile
@@ -2574,6 +2754,14 @@ async def process_chat_request_stream(
     pipeline_timings = {}
     total_start = time.perf_counter()
     
+    # Screen the original text before any LLM round trip and send the alert right away
+    native_safety_start = time.perf_counter()
+    native_safety = detect_native_safety_signals(text)
+    pipeline_timings["native_safety"] = time.perf_counter() - native_safety_start
+    if native_safety["languages"]:
+        logger.warning(f"Safety match on original text ({', '.join(native_safety['languages'])}): {native_safety['matched']}")
+        yield f"data: {json.dumps({'type': 'safety', 'stage': 'original_text', 'safety': native_safety_payload(native_safety)})}\n\n"
+    
     detection_start = time.perf_counter()
     openai_client = get_openai_client()
     model = _chat_model_openai
@@ -2606,6 +2794,9 @@ async def process_chat_request_stream(
     requested_lang_raw = request.lang if request.lang in SUPPORTED_LANG_CODES else None
     target_lang = requested_lang_raw or detected_lang or DEFAULT_LANG
     
+    # Untranslated queries start retrieving on the multilingual index while translation runs
+    native_retrieval = _start_native_retrieval(text, detected_lang, profile, conversation_history)
+    
     # Translate to English if needed
     if detected_lang == "en":
         processed_text = text
@@ -2631,36 +2822,36 @@ async def process_chat_request_stream(
     safety_result = detect_red_flags(processed_text, "en")
     mental_health_en = detect_mental_health_crisis(processed_text, "en")
     pregnancy_alert_en = detect_pregnancy_emergency(processed_text)
+    if native_safety["languages"]:
+        unconfirmed = unconfirmed_native_categories(native_safety, safety_result, mental_health_en, pregnancy_alert_en)
+        if unconfirmed:
+            logger.info(f"Original-text safety match not confirmed on translation: {unconfirmed}")
+        safety_result, mental_health_en, pregnancy_alert_en = merge_native_safety(
+            native_safety, safety_result, mental_health_en, pregnancy_alert_en
+        )
     pipeline_timings["safety_analysis"] = time.perf_counter() - safety_start
     
     # RAG retrieval - enhance query with conversation history for better context
     rag_start = time.perf_counter()
     enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
-    rag_results = retrieve(enhanced_query, k=4)
+    retrieval_filter = _retrieval_filter(profile, processed_text, mental_health_en, pregnancy_alert_en)
+    retrieval_info: Dict[str, Any] = {}
+    routed = _symptom_route_results(profile, processed_text, enhanced_query, pregnancy_alert_en, 4, retrieval_filter)
+    rag_results = await asyncio.to_thread(
+        _retrieve_for_request, native_retrieval, enhanced_query, 4, retrieval_filter, retrieval_info, routed
+    )
     pipeline_timings["rag_retrieval"] = time.perf_counter() - rag_start
-    context = "\n\n".join([r["chunk"] for r in rag_results]) if rag_results else ""
+    context, rag_results = pack_context(rag_results) if rag_results else ("", [])
     
-    # Build citations from RAG results
-    raw_citations = []
-    if rag_results:
-        for r in rag_results:
-            citation = {
-                "source": r.get("source", "unknown"), 
-                "id": r.get("id", ""), 
-                "topic": r.get("topic"),
-                "reference_sources": r.get("reference_sources", [])
-            }
-            raw_citations.append(citation)
-            logger.debug(f"RAG result citation: source={citation['source']}, has_refs={len(citation.get('reference_sources', []))}")
+    # Build citations from RAG results (precomputed per chunk by the doc store)
+    citations = _rag_citations(rag_results) if rag_results else []
     
-    logger.info(f"📚 Generated {len(raw_citations)} raw citations from {len(rag_results) if rag_results else 0} RAG results")
-    
-    # Filter citations
-    citations = _filter_md_sources(raw_citations) if raw_citations else []
-    
-    logger.info(f"🔍 After filtering: {len(citations)} citations remain (from {len(raw_citations)} raw citations)")
-    if len(raw_citations) > 0 and len(citations) == 0:
-        logger.warning(f"⚠️ All citations filtered out! Sample raw citation: {json.dumps(raw_citations[0] if raw_citations else {}, indent=2)}")
+    logger.info(
+        f"🔍 {len(citations)} citations from {len(rag_results) if rag_results else 0} RAG results "
+        f"({retrieval_info['retrieval_source']})"
+    )
+    if rag_results and not citations:
+        logger.warning(f"⚠️ No citations for RAG results! Sample source: {rag_results[0].get('source', 'unknown')}")
     
     # Extract symptoms from current query
     current_symptoms = extract_symptoms(processed_text)
@@ -2670,7 +2861,9 @@ async def process_chat_request_stream(
     
     # Check for symptom relationships when there's conversation history
     # This helps with follow-up questions like "what about left arm pain?" after "chest pain"
-    relationship_facts = _check_symptom_relationships(processed_text, current_symptoms, conversation_history)
+    relationship_facts = _check_symptom_relationships(
+        processed_text, current_symptoms, conversation_history, symptom_ledger=symptom_ledger
+    )
     facts_en.extend(relationship_facts)
     
     if safety_result["red_flag"] or current_symptoms:
@@ -2698,6 +2891,9 @@ async def process_chat_request_stream(
             },
         })
     
+    # Nothing relevant retrieved and nothing to warn about: answer without generation
+    skip_generation = _skip_generation(rag_results, facts_en, safety_result, conversation_history)
+    
     # Add personalization notes
     if personalization_notes:
         context += "\n\nPersonalization notes:\n" + "\n".join(
@@ -2710,7 +2906,11 @@ async def process_chat_request_stream(
     generation_start = time.perf_counter()
     needs_translation = detected_lang != "en" and openai_client and model
     
-    if openai_client and model:
+    if skip_generation:
+        answer_en_chunks.append(INSUFFICIENT_INFORMATION_MESSAGES["en"])
+        logger.info("🚫 No relevant chunks, graph facts or safety signals - skipping AI generation")
+        yield f"data: {json.dumps({'type': 'chunk', 'content': _insufficient_information_answer(detected_lang)})}\n\n"
+    elif openai_client and model:
         # Use context if available, otherwise use empty string
         rag_context = context if context else ""
         logger.info(f"🤖 Starting AI generation with model: {model}")
@@ -2755,7 +2955,9 @@ async def process_chat_request_stream(
     
     # Translate if needed, then stream the translated answer
     translate_back_start = time.perf_counter()
-    if detected_lang == "en":
+    if skip_generation:
+        answer = _insufficient_information_answer(detected_lang)
+    elif detected_lang == "en":
         answer = answer_en
         logger.info(f"✅ Answer already in English - skipping translation back")
     elif detected_lang != "en" and openai_client and model:
@@ -2797,7 +2999,7 @@ async def process_chat_request_stream(
     
     # Add disclaimer
     disclaimer_start = time.perf_counter()
-    if not safety_result["red_flag"]:
+    if not safety_result["red_flag"] and not skip_generation:
         disclaimer_en = DISCLAIMER_EN
         if detected_lang == "en":
             disclaimer = disclaimer_en
@@ -2866,6 +3068,7 @@ async def process_chat_request_stream(
         "metadata": {
             "target_language": target_lang,
             "detected_language": detected_lang,
+            "symptoms": {"symptoms": current_symptoms, "phrases": _extract_raw_symptom_phrases(processed_text)},
         }
     }
     
@@ -2972,6 +3175,11 @@ async def chat_stream(
         else:
             logger.debug(f"No conversation history - session_id: {session_id}, db_connected: {db_client.is_connected() if db_client else False}")
         
+        # Symptoms the user reported earlier in this session (user turns only)
+        symptom_ledger = None
+        if session_id and conversation_history and not request.conversation_history:
+            symptom_ledger = await get_symptom_ledger(session_id, conversation_history)
+        
         # Stream the response
         async def generate():
             full_answer = ""
@@ -2985,7 +3193,8 @@ async def chat_stream(
                 request, 
                 conversation_history=conversation_history,
                 session_id=session_id,
-                customer_id=customer_id
+                customer_id=customer_id,
+                symptom_ledger=symptom_ledger,
             ):
                 yield chunk_data
                 # Extract content and metadata from chunks
@@ -3098,6 +3307,8 @@ async def get_cache_stats(
     return {
         "statistics": stats,
         "info": info,
+        "query_embeddings": get_embedding_cache_statistics(),
+        "embedding_batches": get_embedding_batcher_statistics(),
     }
 
 
@@ -3137,6 +3348,54 @@ async def invalidate_cache_endpoint(
     }
 
 
+@app.get("/admin/reload")
+async def get_reload_status(
+    user: dict = Depends(require_role(["admin"]))
+):
+    """
+    Index version being served, rollback target and last reload outcome (Admin only)
+    """
+    return index_reloader.get_status()
+
+
+@app.post("/admin/reload")
+async def reload_knowledge_base(
+    full: bool = False,
+    force: bool = False,
+    user: dict = Depends(require_role(["admin"]))
+):
+    """
+    Rebuild the RAG index from rag/data and swap it in without downtime (Admin only)
+    
+    The new version is built next to the served one, validated with smoke
+    queries and swapped atomically; retrieval keeps using the old version until
+    then. A rejected or failed build leaves it in place. See rag/reload.py.
+    """
+    result = await asyncio.to_thread(index_reloader.reload, full, force)
+    if result["status"] == "busy":
+        raise HTTPException(status_code=409, detail="An index reload is already running")
+    if result["status"] == "reloaded":
+        result["invalidated_cache_keys"] = await cache_service.invalidate_all_cache()
+    return result
+
+
+@app.post("/admin/reload/rollback")
+async def rollback_knowledge_base(
+    user: dict = Depends(require_role(["admin"]))
+):
+    """
+    Serve the previous index version again (Admin only)
+    """
+    result = await asyncio.to_thread(index_reloader.rollback)
+    if result["status"] == "busy":
+        raise HTTPException(status_code=409, detail="An index reload is already running")
+    if result["status"] == "unavailable":
+        raise HTTPException(status_code=404, detail="No previous index version to roll back to")
+    if result["status"] == "rolled_back":
+        result["invalidated_cache_keys"] = await cache_service.invalidate_all_cache()
+    return result
+
+
 @app.post("/voice-chat", response_model=VoiceChatResponse)
 async def voice_chat(
     background_tasks: BackgroundTasks,
@@ -3228,8 +3487,18 @@ async def voice_chat(
             except Exception as e:
                 logger.warning(f"Failed to retrieve conversation history: {e}", exc_info=True)
 
+        # Symptoms the user reported earlier in this session (user turns only)
+        symptom_ledger = None
+        if session_id and conversation_history:
+            symptom_ledger = await get_symptom_ledger(session_id, conversation_history)
+
         # Process chat request - generate AI response
-        chat_response, target_lang, chat_timings = process_chat_request(chat_request, conversation_history=conversation_history)
+        chat_response, target_lang, chat_timings = await asyncio.to_thread(
+            process_chat_request,
+            chat_request,
+            conversation_history=conversation_history,
+            symptom_ledger=symptom_ledger,
+        )
 
         # Queue background task to save messages (non-blocking)
         # This allows the response to be returned immediately
@@ -3691,6 +3960,7 @@ async def delete_session(
             await cache_service.delete(f"session_full:{session_id}")
             # Invalidate conversation history cache
             await cache_service.delete(f"conversation_history:{session_id}")
+            await cache_service.delete(ledger_cache_key(session_id))
         except Exception as e:
             logger.warning(f"Failed to invalidate cache after session deletion: {e}")
     
@@ -0,0 +1,190 @@
+"""
+In-memory BM25 (Okapi) index over the knowledge-base chunks, plus
+reciprocal-rank fusion for combining it with dense retrieval.
+
+Dense MiniLM retrieval handles exact medical terms poorly (drug names, "PCOS",
+"otitis externa", "108", romanized words left over after translation); lexical
+matching covers those. The index is an inverted index of term -> (rows, term
+frequencies) arrays, so a query only touches the postings of its own terms.
+"""
+import json
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("health_assistant")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Standard RRF constant (Cormack et al.); dampens the weight of top ranks
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from had has have he her his how i if in into is it its "
+    "me my of on or our she should so than that the their them then there these they this to was we were what "
+    "when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords; numbers (e.g. "108") are kept"""
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    BM25 index over chunks; ``ids``, ``documents`` and ``metadatas`` are parallel
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        tokenized: Optional[Sequence[Sequence[str]]] = None,
+    ):
+        if not (len(ids) == len(documents) == len(metadatas)):
+            raise ValueError("ids, documents and metadatas must be parallel")
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.k1 = k1
+        self.b = b
+
+        if tokenized is None:
+            tokenized = [tokenize(self._indexed_text(doc, meta)) for doc, meta in zip(self.documents, self.metadatas)]
+        self._build(tokenized)
+
+    @staticmethod
+    def _indexed_text(document: str, metadata: Dict[str, Any]) -> str:
+        # Titles carry the condition name, which often is the exact term users type
+        return f"{metadata.get('title', '')} {document}"
+
+    def _build(self, tokenized: Sequence[Sequence[str]]):
+        rows: Dict[str, List[int]] = defaultdict(list)
+        freqs: Dict[str, List[int]] = defaultdict(list)
+        lengths = np.zeros(len(tokenized), dtype=np.float32)
+        for row, tokens in enumerate(tokenized):
+            lengths[row] = len(tokens)
+            for term, count in Counter(tokens).items():
+                rows[term].append(row)
+                freqs[term].append(count)
+
+        self.doc_lengths = lengths
+        n_docs = len(tokenized)
+        avg_length = float(lengths.mean()) if n_docs else 0.0
+        # Per-row BM25 length normalisation, precomputed once
+        self._length_norm = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+        for term, term_rows in rows.items():
+            df = len(term_rows)
+            self.idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            self.postings[term] = (np.asarray(term_rows, dtype=np.int32), np.asarray(freqs[term], dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], **kwargs) -> "BM25Index":
+        """Build from corpus rows ({"id", "document", "metadata"}, see corpus.load_corpus)"""
+        rows = list(rows)
+        return cls(
+            [row["id"] for row in rows],
+            [row["document"] for row in rows],
+            [row["metadata"] for row in rows],
+            **kwargs,
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every row for the query"""
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term, query_tf in Counter(tokenize(query)).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            term_rows, tf = posting
+            scores[term_rows] += query_tf * self.idf[term] * tf * (self.k1 + 1) / (tf + self._length_norm[term_rows])
+        return scores
+
+    def search(self, query: str, k: int, rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Top ``k`` rows with a positive score as (row index, score), best first
+
+        ``rows`` restricts the results to a subset of row indexes (e.g. one category).
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+        scores = self.scores(query)
+        if rows is not None:
+            matched = rows[scores[rows] > 0]
+        else:
+            matched = np.flatnonzero(scores > 0)
+        if matched.size > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(row), float(scores[row])) for row in order]
+
+    def save(self, path: Path):
+        """Write the index (chunks + tokenized text) as a JSON artifact"""
+        tokenized: List[List[str]] = [[] for _ in range(len(self))]
+        for term, (term_rows, tf) in self.postings.items():
+            for row, count in zip(term_rows.tolist(), tf.tolist()):
+                tokenized[row].extend([term] * int(count))
+        payload = {
+            "version": 1,
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "documents": self.documents,
+            "metadatas": self.metadatas,
+            "tokenized": tokenized,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Load an artifact written by save()"""
+        start = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        index = cls(
+            payload["ids"],
+            payload["documents"],
+            payload["metadatas"],
+            k1=payload.get("k1", BM25_K1),
+            b=payload.get("b", BM25_B),
+            tokenized=payload["tokenized"],
+        )
+        logger.info(f"Loaded BM25 index: {len(index)} chunks in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists by reciprocal rank: score(id) = sum 1 / (k + rank)
+
+    Args:
+        rankings: Id lists, best first (e.g. dense and BM25 results)
+        k: RRF constant
+
+    Returns:
+        (id, fused score) pairs, best first; ties keep first-seen order
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -1,72 +1,88 @@
 import chromadb
 from chromadb.config import Settings
 from pathlib import Path
+from typing import Optional
+import argparse
 import os
 import sys
 import re
-import yaml
-import json
-from datetime import date, datetime
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
 
-load_dotenv()
-
-
-def make_json_serializable(obj):
-    """Convert date/datetime objects to strings for JSON serialization"""
-    if isinstance(obj, (date, datetime)):
-        return obj.isoformat()
-    elif isinstance(obj, dict):
-        return {key: make_json_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [make_json_serializable(item) for item in obj]
-    return obj
+from rag.bm25 import BM25Index
+from rag.corpus import load_corpus
+from rag.dedup import DEDUP_THRESHOLD, RAG_DEDUP, apply_dedup
+from rag.doc_index import DOCUMENT_INDEX_PATH, DocumentIndex
+from rag.doc_store import DOC_STORE_PATH, DocStore
+from rag.incremental import MANIFEST_NAME, empty_manifest, load_manifest, save_manifest
+from rag.ingest import EMBED_BATCH_SIZE, INGEST_WORKERS, UPSERT_BATCH_SIZE, BatchWriter, ingest
+from rag.multilingual import MULTILINGUAL_RETRIEVAL, sync_multilingual_collection
+from rag.snapshot import SNAPSHOT_DIR, export_collection_snapshot
+from rag.symptom_routes import SYMPTOM_ROUTES_PATH, SymptomRouteTable
 
+load_dotenv()
 
-def extract_frontmatter(content: str) -> tuple[dict, str]:
-    """Extract YAML frontmatter from markdown file"""
-    frontmatter = {}
-    body = content
-    
-    # Check for YAML frontmatter (--- markers)
-    if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            try:
-                frontmatter = yaml.safe_load(parts[1]) or {}
-                body = parts[2].strip()
-            except yaml.YAMLError:
-                # If YAML parsing fails, treat entire content as body
-                pass
-    
-    return frontmatter, body
+BM25_INDEX_PATH = Path(__file__).parent / "bm25_index.json"
 
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
-    """Split text into overlapping chunks"""
-    words = text.split()
-    chunks = []
+def build_index(
+    full: bool = False,
+    data_dir: Optional[Path] = None,
+    chroma_path: Optional[Path] = None,
+    bm25_path: Optional[Path] = BM25_INDEX_PATH,
+    doc_store_path: Optional[Path] = DOC_STORE_PATH,
+    document_index_path: Optional[Path] = DOCUMENT_INDEX_PATH,
+    symptom_routes_path: Optional[Path] = SYMPTOM_ROUTES_PATH,
+    snapshot_path: Optional[Path] = SNAPSHOT_DIR,
+    embedding_function=None,
+    workers: int = INGEST_WORKERS,
+    embed_batch: int = EMBED_BATCH_SIZE,
+    upsert_batch: int = UPSERT_BATCH_SIZE,
+    multilingual: bool = MULTILINGUAL_RETRIEVAL,
+    multilingual_embedding_function=None,
+    dedup: bool = RAG_DEDUP,
+    dedup_threshold: float = DEDUP_THRESHOLD,
+) -> dict:
+    """
+    Build or update the vector index from markdown files (recursively scans subdirectories)
     
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        if chunk:
-            chunks.append(chunk)
+    By default only new or changed chunks are embedded (see rag/incremental.py);
+    the collection stays queryable while the update runs. Files are parsed in a
+    process pool and chunks are embedded/upserted in bounded batches (rag/ingest.py).
     
-    return chunks
-
-
-def build_index():
-    """Build vector index from markdown files (recursively scans subdirectories)"""
+    Args:
+        full: Drop the collection and re-embed everything
+        data_dir: Knowledge-base root (default rag/data)
+        chroma_path: Chroma persistence directory (default rag/chroma_db)
+        bm25_path: Where to write the BM25 artifact (None to skip)
+        doc_store_path: Where to write the chunk doc store (None to skip)
+        document_index_path: Where to write the document index for two-stage retrieval (None to skip);
+            embeddings of unchanged documents are reused from the file already there
+        symptom_routes_path: Where to write the symptom -> chunk routes (None to skip)
+        snapshot_path: Directory for the memory-mapped index snapshot (None to skip)
+        embedding_function: Override Chroma's default embedding function
+        workers: Parser processes
+        embed_batch: Texts per embedding call
+        upsert_batch: Rows per upsert call
+        multilingual: Also sync the multilingual-embedding collection (rag/multilingual.py)
+        multilingual_embedding_function: Override the multilingual embedding function
+        dedup: Collapse near-duplicate chunks into one canonical chunk (rag/dedup.py);
+            when off, collapses made by an earlier build are undone
+        dedup_threshold: Jaccard similarity at which chunks count as duplicates
+        
+    Returns:
+        Summary of what changed, with throughput
+    """
     print("Building RAG index...")
     
     # Get the correct path
     script_dir = Path(__file__).parent
-    chroma_path = script_dir / "chroma_db"
-    data_dir = script_dir / "data"
+    chroma_path = Path(chroma_path or script_dir / "chroma_db")
+    data_dir = Path(data_dir or script_dir / "data")
+    manifest_path = chroma_path / MANIFEST_NAME
     
     print(f"Data directory: {data_dir}")
     print(f"Chroma path: {chroma_path}")
@@ -77,82 +93,146 @@ def build_index():
         settings=Settings(anonymized_telemetry=False),
     )
     
-    # Create or get collection
-    try:
-        collection = chroma_client.delete_collection("medical_knowledge")
-        print("Deleted existing collection")
-    except:
-        pass
+    if embedding_function is None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        embedding_function = DefaultEmbeddingFunction()
+    collection_kwargs = {
+        "name": "medical_knowledge",
+        "metadata": {"description": "Medical knowledge base"},
+        "embedding_function": embedding_function,
+    }
     
-    collection = chroma_client.create_collection(
-        name="medical_knowledge",
-        metadata={"description": "Medical knowledge base"}
-    )
+    if full:
+        try:
+            chroma_client.delete_collection("medical_knowledge")
+            print("Deleted existing collection")
+        except Exception:
+            pass
+        manifest = empty_manifest()
+    else:
+        manifest = load_manifest(manifest_path)
+    collection = chroma_client.get_or_create_collection(**collection_kwargs)
     
-    # Read all markdown files recursively
-    documents = []
-    metadatas = []
-    ids = []
+    manifest, summary = ingest(
+        collection,
+        embedding_function,
+        data_dir,
+        manifest,
+        workers=workers,
+        embed_batch=embed_batch,
+        upsert_batch=upsert_batch,
+    )
     
-    md_files = list(data_dir.rglob("*.md"))
-    print(f"Found {len(md_files)} markdown files")
+    # Only record hashes once Chroma has the data, so a failed run is retried next time
+    save_manifest(manifest, manifest_path)
     
-    for md_file in md_files:
-        # Get relative path for topic/category
-        relative_path = md_file.relative_to(data_dir)
-        category = relative_path.parent.name if relative_path.parent != Path(".") else "general"
+    # Near-duplicate chunks: keep one canonical chunk per cluster with merged references
+    if dedup or manifest.get("collapsed"):
+        def restore(rows):
+            writer = BatchWriter(collection, embedding_function, embed_batch, upsert_batch)
+            writer.add(rows)
+            writer.flush()
         
-        print(f"Processing {relative_path}...")
-        
-        with open(md_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # Extract frontmatter if present
-        frontmatter, body = extract_frontmatter(content)
-        
-        # Extract metadata
-        title = frontmatter.get("title", md_file.stem.replace("_", " ").replace("-", " "))
-        topic = frontmatter.get("id", md_file.stem)
-        sources = frontmatter.get("sources", [])
-        
-        # Convert sources to JSON-serializable format (convert dates to strings)
-        serializable_sources = make_json_serializable(sources) if sources else []
-        
-        # Chunk the content
-        chunks = chunk_text(body)
-        
-        for idx, chunk in enumerate(chunks):
-            documents.append(chunk)
-            # Prepare metadata - ChromaDB doesn't accept None values, so use empty JSON array string
-            metadata_dict = {
-                "source": str(relative_path),
-                "source_file": md_file.name,
-                "category": category,
-                "title": title,
-                "topic": topic,
-                "chunk_id": idx,
-            }
-            # Only add reference_sources if we have sources, otherwise use empty array string
-            if serializable_sources:
-                metadata_dict["reference_sources"] = json.dumps(serializable_sources)
-            else:
-                metadata_dict["reference_sources"] = "[]"  # Empty JSON array string instead of None
-            
-            metadatas.append(metadata_dict)
-            # Use POSIX relative path (without extension) to guarantee unique IDs across folders
-            relative_id = relative_path.with_suffix("").as_posix()
-            ids.append(f"{relative_id}#{idx}")
+        result = apply_dedup(
+            collection, load_corpus(data_dir), manifest.get("collapsed"), dedup_threshold if dedup else None, restore
+        )
+        manifest["collapsed"] = result["collapsed"]
+        save_manifest(manifest, manifest_path)
+        summary["dedup"] = {
+            "clusters": len(result["clusters"]),
+            "chunks_collapsed": len(result["collapsed"]),
+            "chunks_removed": result["chunks_removed"],
+            "chunks_restored": result["chunks_restored"],
+        }
+        print(f"Near-duplicates: {summary['dedup']}")
     
-    # Add to collection
-    print(f"Adding {len(documents)} chunks to index...")
-    collection.add(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids
-    )
+    # Artifacts derived from the indexed chunks, so they always match the collection
+    if any(path is not None for path in (bm25_path, doc_store_path, document_index_path, symptom_routes_path)):
+        data = collection.get(include=["documents", "metadatas"])
+    # Lexical index over the same chunks for hybrid retrieval
+    if bm25_path is not None:
+        BM25Index(data["ids"], data["documents"], data["metadatas"]).save(bm25_path)
+        print(f"BM25 index written to {bm25_path}")
+    # Pre-parsed metadata, citations and summaries looked up per request
+    if doc_store_path is not None:
+        DocStore.from_chunks(data["ids"], data["documents"], data["metadatas"]).save(doc_store_path)
+        print(f"Doc store written to {doc_store_path}")
+    # One row per document (title, id, headings, summary) for two-stage retrieval
+    if document_index_path is not None:
+        document_index_path = Path(document_index_path)
+        previous = None
+        if not full and document_index_path.exists():
+            try:
+                previous = DocumentIndex.load(document_index_path)
+            except (OSError, ValueError) as e:
+                print(f"Re-embedding every document, previous document index unreadable: {e}")
+        document_index = DocumentIndex.from_chunks(
+            data["ids"],
+            data["documents"],
+            data["metadatas"],
+            embedding_function,
+            previous,
+            space=(collection.metadata or {}).get("hnsw:space", "l2"),
+            batch_size=embed_batch,
+        )
+        document_index.save(document_index_path)
+        summary["documents_embedded"] = len(document_index) - document_index.reused
+        print(
+            f"Document index written to {document_index_path}: {len(document_index)} documents "
+            f"({summary['documents_embedded']} embedded)"
+        )
+    # Chunks answering common symptom messages, looked up without vector search
+    if symptom_routes_path is not None:
+        routes = SymptomRouteTable.from_chunks(data["ids"], data["documents"], data["metadatas"])
+        routes.save(symptom_routes_path)
+        print(f"Symptom routes written to {symptom_routes_path}: {len(routes)} routes")
+    # Versioned embeddings snapshot that RAG_ENGINE=snapshot workers memory-map
+    if snapshot_path is not None:
+        print(f"Index snapshot written to {export_collection_snapshot(collection, snapshot_path)}")
+    
+    # Same chunks embedded with a multilingual model, for untranslated queries
+    if multilingual:
+        summary["multilingual"] = sync_multilingual_collection(
+            collection, chroma_client, multilingual_embedding_function, batch_size=embed_batch
+        )
+        print(f"Multilingual collection synced: {summary['multilingual']}")
     
-    print(f"Index built successfully with {len(documents)} chunks from {len(md_files)} files")
+    summary = {"mode": "full" if full else "incremental", **summary, "chunks_total": collection.count()}
+    print(
+        f"Index ready: {summary['chunks_total']} chunks "
+        f"({summary['chunks_upserted']} upserted, {summary['chunks_deleted']} deleted; "
+        f"{summary['files_unchanged']} files unchanged, {summary['files_changed']} changed, "
+        f"{summary['files_added']} added, {summary['files_deleted']} deleted) in {summary['seconds']}s"
+    )
+    return summary
 
 
 if __name__ == "__main__":
-    build_index()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build or incrementally update the RAG index")
+    parser.add_argument("--full", action="store_true", help="Drop the collection and re-embed every chunk")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Parser processes")
+    parser.add_argument("--embed-batch", type=int, default=EMBED_BATCH_SIZE, help="Texts per embedding call")
+    parser.add_argument("--upsert-batch", type=int, default=UPSERT_BATCH_SIZE, help="Rows per upsert call")
+    parser.add_argument(
+        "--multilingual",
+        action="store_true",
+        default=MULTILINGUAL_RETRIEVAL,
+        help="Also embed chunks with the multilingual model (needs sentence-transformers)",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        default=RAG_DEDUP,
+        help="Collapse near-duplicate chunks into one canonical chunk with merged references",
+    )
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD, help="Jaccard similarity of duplicates")
+    args = parser.parse_args()
+    build_index(
+        full=args.full,
+        workers=args.workers,
+        embed_batch=args.embed_batch,
+        upsert_batch=args.upsert_batch,
+        multilingual=args.multilingual,
+        dedup=args.dedup,
+        dedup_threshold=args.dedup_threshold,
+    )
\ No newline at end of file
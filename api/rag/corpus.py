@@ -0,0 +1,281 @@
+"""
+Reading and chunking the markdown knowledge base under rag/data.
+
+Shared by build_index.py (Chroma) and the in-memory BM25 index so both index
+exactly the same chunks, ids and metadata.
+
+Files are chunked along their structure: split into sections at markdown
+headings, sections into paragraphs, list items and sentences, and those are
+packed into chunks of at most CHUNK_TOKEN_BUDGET tokens. Each chunk starts with
+the document title, followed by the heading line of each section it holds, and
+records the full ``heading_path`` of its first section, its ``token_count`` and
+the ``tokenizer`` that counted it in metadata, so the prompt packer can fit
+context without re-tokenizing.
+"""
+import json
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import yaml
+
+from .tokens import count_tokens, tokenizer_name
+
+DATA_DIR = Path(__file__).parent / "data"
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", "256"))
+HEADING_SEPARATOR = " > "
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_LIST_OR_TABLE_RE = re.compile(r"^\s*(?:[-*+]\s|\d+[.)]\s|\|)")
+# Sentence end followed by whitespace and something that starts a new sentence
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[*]?[A-Z0-9])")
+
+
+def make_json_serializable(obj):
+    """Convert date/datetime objects to strings for JSON serialization"""
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    elif isinstance(obj, dict):
+        return {key: make_json_serializable(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [make_json_serializable(item) for item in obj]
+    return obj
+
+
+def extract_frontmatter(content: str) -> tuple[dict, str]:
+    """Extract YAML frontmatter from markdown file"""
+    frontmatter = {}
+    body = content
+
+    # Check for YAML frontmatter (--- markers)
+    if content.startswith("---"):
+        parts = content.split("---", 2)
+        if len(parts) >= 3:
+            try:
+                frontmatter = yaml.safe_load(parts[1]) or {}
+                body = parts[2].strip()
+            except yaml.YAMLError:
+                # If YAML parsing fails, treat entire content as body
+                pass
+
+    return frontmatter, body
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
+    """Split text into overlapping word windows (the previous chunker; kept for comparison)"""
+    words = text.split()
+    chunks = []
+
+    for i in range(0, len(words), chunk_size - overlap):
+        chunk = " ".join(words[i:i + chunk_size])
+        if chunk:
+            chunks.append(chunk)
+
+    return chunks
+
+
+def split_sections(body: str) -> List[Tuple[List[str], str]]:
+    """
+    Split markdown into (heading path, section text) at headings
+
+    Fenced code blocks are never split on "#" lines inside them.
+    """
+    sections = []
+    stack: List[Tuple[int, str]] = []
+    lines: List[str] = []
+    in_fence = False
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text:
+            sections.append(([title for _, title in stack], text))
+        lines.clear()
+
+    for line in body.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, match.group(2).strip()))
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+def split_units(text: str) -> List[Tuple[str, str]]:
+    """
+    Split section text into packable units as (separator before, text)
+
+    List items and table rows are units on their own lines; paragraphs are
+    split into sentences joined by spaces.
+    """
+    units: List[Tuple[str, str]] = []
+    for block in re.split(r"\n\s*\n", text):
+        block_lines = [line.rstrip() for line in block.splitlines() if line.strip()]
+        if not block_lines:
+            continue
+        separator = "\n\n" if units else ""
+        if any(_LIST_OR_TABLE_RE.match(line) for line in block_lines):
+            items: List[str] = []
+            for line in block_lines:
+                if _LIST_OR_TABLE_RE.match(line) or not items:
+                    items.append(line.strip())
+                else:
+                    items[-1] += " " + line.strip()
+            for item in items:
+                units.append((separator, item))
+                separator = "\n"
+        else:
+            paragraph = " ".join(line.strip() for line in block_lines)
+            for sentence in _SENTENCE_END_RE.split(paragraph):
+                units.append((separator, sentence))
+                separator = " "
+    return units
+
+
+def _split_oversized(unit: str, budget: int) -> List[str]:
+    """Cut a single unit longer than the budget into word windows that fit"""
+    words = unit.split()
+    tokens = count_tokens(unit)
+    words_per_piece = max(1, int(len(words) * budget / max(tokens, 1)))
+    return [" ".join(words[i:i + words_per_piece]) for i in range(0, len(words), words_per_piece)]
+
+
+def _section_units(heading: str, section: str, budget: int) -> List[Tuple[str, str, int]]:
+    """Units of one section as (separator before, text, tokens), heading line first"""
+    units = [("", heading, count_tokens(heading))] if heading else []
+    for separator, unit in split_units(section):
+        if units and not separator:
+            separator = "\n"
+        pieces = [unit] if count_tokens(unit) <= budget else _split_oversized(unit, budget)
+        for piece in pieces:
+            units.append((separator, piece, count_tokens(piece)))
+            separator = " "
+    return units
+
+
+def chunk_markdown(body: str, title: str = "", max_tokens: int = CHUNK_TOKEN_BUDGET) -> List[Dict]:
+    """
+    Structure-aware chunking of a markdown body
+
+    Sections are packed whole while they fit the budget, so short sibling
+    sections share a chunk; a section larger than the budget is split at
+    paragraph, list-item and sentence boundaries and its heading is repeated
+    on each continuation chunk. Every chunk starts with the document title.
+
+    Args:
+        body: Markdown without frontmatter
+        title: Document title, used as the root of heading paths
+        max_tokens: Token budget per chunk, title and headings included
+
+    Returns:
+        List of {"text", "heading_path", "token_count"} in document order;
+        heading_path is the path of the chunk's first section
+    """
+    chunks: List[Dict] = []
+    title_line = title.strip()
+    budget = max(max_tokens - count_tokens(title_line), 16)
+
+    parts: List[str] = []
+    used = 0
+    first_path = ""
+
+    def emit():
+        text = "\n".join(filter(None, [title_line, "".join(parts).strip()]))
+        chunks.append({"text": text, "heading_path": first_path, "token_count": count_tokens(text)})
+
+    for path, section in split_sections(body):
+        if title_line and path and path[0].strip().lower() == title_line.lower():
+            path = path[1:]  # H1 repeats the title
+        full_path = HEADING_SEPARATOR.join(filter(None, [title_line, *path]))
+        heading = path[-1] if path else ""
+        units = _section_units(heading, section, budget)
+        section_tokens = sum(tokens + 1 for _, _, tokens in units)
+
+        # Whole section fits next to what is already in the chunk
+        if parts and used + section_tokens <= budget:
+            parts.append("\n\n" + "".join(sep + text for sep, text, _ in units))
+            used += section_tokens + 1
+            continue
+        if parts:
+            emit()
+        parts, used, first_path = [], 0, full_path
+
+        for separator, text, tokens in units:
+            if parts and used + tokens > budget:
+                emit()
+                # Continuation chunk: repeat the section heading for context
+                parts, used = ([heading + "\n"], count_tokens(heading) + 1) if heading else ([], 0)
+                separator = ""
+            parts.append(separator + text)
+            used += tokens + 1
+    if parts:
+        emit()
+    return chunks
+
+
+def chunk_markdown_file(md_file: Path, data_dir: Path = DATA_DIR) -> List[Dict]:
+    """
+    Chunk one markdown file into index rows
+
+    Returns:
+        List of {"id", "document", "metadata"} dicts in chunk order
+    """
+    # Get relative path for topic/category
+    relative_path = md_file.relative_to(data_dir)
+    category = relative_path.parent.name if relative_path.parent != Path(".") else "general"
+
+    with open(md_file, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    # Extract frontmatter if present
+    frontmatter, body = extract_frontmatter(content)
+
+    # Extract metadata
+    title = frontmatter.get("title", md_file.stem.replace("_", " ").replace("-", " "))
+    topic = frontmatter.get("id", md_file.stem)
+    sources = frontmatter.get("sources", [])
+
+    # Convert sources to JSON-serializable format (convert dates to strings)
+    serializable_sources = make_json_serializable(sources) if sources else []
+
+    # Use POSIX relative path (without extension) to guarantee unique IDs across folders
+    relative_id = relative_path.with_suffix("").as_posix()
+
+    rows = []
+    for idx, chunk in enumerate(chunk_markdown(body, str(title))):
+        # Prepare metadata - ChromaDB doesn't accept None values, so use empty JSON array string
+        metadata = {
+            "source": str(relative_path),
+            "source_file": md_file.name,
+            "category": category,
+            "title": title,
+            "topic": topic,
+            "chunk_id": idx,
+            "heading_path": chunk["heading_path"],
+            "token_count": chunk["token_count"],
+            "tokenizer": tokenizer_name(),
+            "reference_sources": json.dumps(serializable_sources) if serializable_sources else "[]",
+        }
+        rows.append({"id": f"{relative_id}#{idx}", "document": chunk["text"], "metadata": metadata})
+    return rows
+
+
+def list_markdown_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    """All markdown files under data_dir, recursively, in a stable order"""
+    return sorted(data_dir.rglob("*.md"))
+
+
+def load_corpus(data_dir: Path = DATA_DIR) -> List[Dict]:
+    """Chunk every markdown file under data_dir (same rows build_index.py indexes)"""
+    rows = []
+    for md_file in list_markdown_files(data_dir):
+        rows.extend(chunk_markdown_file(md_file, data_dir))
+    return rows
@@ -0,0 +1,300 @@
+"""
+Near-duplicate chunk detection (MinHash + LSH) for the indexing pipeline.
+
+Pages copied into a second folder, or shared boilerplate sections, produce
+chunks that compete for the same top-k slots, fill the prompt with the same
+text and repeat the same reference URLs in citations. build_index.py --dedup
+finds clusters of near-identical chunks and keeps one canonical chunk per
+cluster, whose ``reference_sources`` are merged from the whole cluster and
+whose ``duplicate_sources`` lists the files that were collapsed into it.
+
+Each chunk is reduced to a MinHash signature of its word shingles; locality-
+sensitive hashing over bands of the signature proposes candidate pairs, and
+a pair is kept when the exact Jaccard similarity of the shingle sets reaches
+the threshold. Clusters are the connected components of the kept pairs.
+
+The default threshold only merges chunks that say the same thing in nearly the
+same words. Pages that cover the same topic in their own words (burns, nosebleed,
+child fever and diarrhea, UTI in rag/data) stay below 0.35 and are left to
+retrieval-time diversity (rerank.py); around 0.5 distinct advice starts to
+merge (adult vs child choking), which a medical index must not do.
+
+Collapsing is driven by the full set of chunk rows, not by what happens to
+change in an incremental build: the collapsed ids are recorded in the
+manifest, so a duplicate that stops being one (its canonical chunk changed)
+is indexed again on the next build.
+
+Usage (from project root):
+    python -m api.rag.dedup [--threshold 0.8]   # report clusters in rag/data
+"""
+import argparse
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .bm25 import tokenize
+from .doc_store import parse_reference_sources
+
+# Collapse near-duplicate chunks at index time (build_index.py --dedup)
+RAG_DEDUP = os.getenv("RAG_DEDUP", "0").strip().lower() in ("1", "true", "yes")
+# Jaccard similarity of word shingles at which two chunks count as duplicates
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_SHINGLE_SIZE = 3
+DEDUP_NUM_PERM = 128
+
+# Universal hashing (a * x + b) mod p; a, b < 2**31 and x < 2**32 keep products within uint64
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_SIZE) -> Set[str]:
+    """Overlapping word n-grams of a chunk (stopwords dropped, so filler edits do not count)"""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _hash_shingles(items: Iterable[str]) -> np.ndarray:
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=4).digest(), "little") for item in items),
+        dtype=np.uint64,
+    )
+
+
+class MinHasher:
+    """MinHash signatures with ``num_perm`` seeded hash permutations"""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, items: Set[str]) -> np.ndarray:
+        if not items:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        hashes = _hash_shingles(items)
+        return ((hashes[:, None] * self.a + self.b) % _PRIME).min(axis=0)
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows per band) whose S-curve midpoint (1/b)^(1/r) is closest to, but not above, threshold"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int, rows: int) -> Set[Tuple[int, int]]:
+    """Row pairs that share at least one identical band of their signatures"""
+    pairs: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for row, key in enumerate(block):
+            buckets.setdefault(key.tobytes(), []).append(row)
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second))
+    return pairs
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def _components(n: int, edges: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    parent = list(range(n))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for first, second in edges:
+        parent[find(first)] = find(second)
+    groups: Dict[int, List[int]] = {}
+    for row in range(n):
+        groups.setdefault(find(row), []).append(row)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def find_duplicate_clusters(
+    rows: Sequence[Dict],
+    threshold: float = DEDUP_THRESHOLD,
+    num_perm: int = DEDUP_NUM_PERM,
+) -> List[Dict]:
+    """
+    Clusters of near-duplicate chunks
+
+    Args:
+        rows: Chunk rows (id, document, metadata) as produced by corpus.load_corpus()
+        threshold: Minimum Jaccard similarity of the chunks' word shingles
+        num_perm: MinHash permutations
+
+    Returns:
+        One dict per cluster: canonical id (the longest chunk; ties go to the
+        first id), duplicate ids, the source files involved and the lowest
+        pairwise similarity that linked them. Sorted by canonical id.
+    """
+    shingle_sets = [shingles(row["document"]) for row in rows]
+    hasher = MinHasher(num_perm)
+    signatures = np.stack([hasher.signature(items) for items in shingle_sets]) if rows else np.zeros((0, num_perm))
+    bands, band_rows = lsh_bands(num_perm, threshold)
+
+    edges = []
+    similarity: Dict[Tuple[int, int], float] = {}
+    for first, second in candidate_pairs(signatures, bands, band_rows):
+        score = jaccard(shingle_sets[first], shingle_sets[second])
+        if score >= threshold:
+            edges.append((first, second))
+            similarity[(first, second)] = score
+
+    clusters = []
+    for members in _components(len(rows), edges):
+        canonical = min(members, key=lambda row: (-len(rows[row]["document"]), rows[row]["id"]))
+        member_set = set(members)
+        clusters.append({
+            "canonical": rows[canonical]["id"],
+            "duplicates": sorted(rows[row]["id"] for row in members if row != canonical),
+            "sources": sorted({rows[row]["metadata"].get("source", "") for row in members}),
+            "min_similarity": round(min(
+                score for (first, second), score in similarity.items() if first in member_set
+            ), 3),
+        })
+    return sorted(clusters, key=lambda cluster: cluster["canonical"])
+
+
+def merge_metadata(canonical: Dict, duplicates: Sequence[Dict]) -> Dict:
+    """
+    Canonical chunk metadata with the cluster's reference_sources (deduplicated by URL)
+
+    Also records the collapsed chunks' source files in ``duplicate_sources`` (a JSON list).
+    """
+    merged = []
+    seen = set()
+    for metadata in (canonical, *duplicates):
+        for ref in parse_reference_sources(metadata.get("reference_sources")):
+            if not isinstance(ref, dict):
+                continue
+            key = ref.get("url") or json.dumps(ref, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                merged.append(ref)
+    duplicate_sources = sorted({m.get("source", "") for m in duplicates} - {canonical.get("source", "")})
+    return {
+        **canonical,
+        "reference_sources": json.dumps(merged) if merged else "[]",
+        "duplicate_sources": json.dumps(duplicate_sources),
+    }
+
+
+def collapse_plan(rows: Sequence[Dict], clusters: Sequence[Dict]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """
+    What the index should hold after collapsing
+
+    Returns:
+        (canonical id -> merged metadata, duplicate id -> canonical id)
+    """
+    by_id = {row["id"]: row for row in rows}
+    metadatas = {}
+    collapsed = {}
+    for cluster in clusters:
+        canonical = cluster["canonical"]
+        metadatas[canonical] = merge_metadata(
+            by_id[canonical]["metadata"], [by_id[chunk_id]["metadata"] for chunk_id in cluster["duplicates"]]
+        )
+        collapsed.update({chunk_id: canonical for chunk_id in cluster["duplicates"]})
+    return metadatas, collapsed
+
+
+def apply_dedup(
+    collection,
+    rows: Sequence[Dict],
+    previous_collapsed: Optional[Dict[str, str]] = None,
+    threshold: Optional[float] = DEDUP_THRESHOLD,
+    restore: Optional[Callable[[List[Dict]], None]] = None,
+) -> Dict:
+    """
+    Collapse near-duplicates in a collection after ingestion
+
+    Duplicates are deleted and canonical chunks get merged metadata (their
+    embeddings are kept). Chunks collapsed by the previous build that are no
+    longer duplicates get their own metadata back, or are handed to
+    ``restore`` to be embedded and indexed again.
+
+    Args:
+        collection: Chroma collection after ingestion
+        rows: Every chunk row of the knowledge base
+        previous_collapsed: Duplicate id -> canonical id from the last build's manifest
+        threshold: Jaccard threshold; None undoes every previous collapse
+        restore: Called with the rows that must be indexed again
+
+    Returns:
+        {"clusters", "collapsed" (duplicate id -> canonical id for the manifest),
+        "chunks_removed", "chunks_restored"}
+    """
+    previous_collapsed = previous_collapsed or {}
+    clusters = find_duplicate_clusters(rows, threshold) if threshold is not None else []
+    metadatas, collapsed = collapse_plan(rows, clusters)
+    by_id = {row["id"]: row for row in rows}
+    existing = set(collection.get(include=[])["ids"])
+
+    # Former canonicals that lost their cluster go back to their own metadata
+    reverted = {chunk_id for chunk_id in set(previous_collapsed.values()) - set(metadatas) if chunk_id in by_id}
+    updates = {**{chunk_id: by_id[chunk_id]["metadata"] for chunk_id in reverted}, **metadatas}
+    updates = {chunk_id: metadata for chunk_id, metadata in updates.items() if chunk_id in existing}
+    if updates:
+        ids = sorted(updates)
+        collection.update(ids=ids, metadatas=[updates[chunk_id] for chunk_id in ids])
+
+    removed = sorted(set(collapsed) & existing)
+    if removed:
+        collection.delete(ids=removed)
+    # Ingestion already re-added those whose file changed
+    restored = [
+        by_id[chunk_id] for chunk_id in sorted(set(previous_collapsed) - set(collapsed) - existing) if chunk_id in by_id
+    ]
+    if restored and restore is not None:
+        restore(restored)
+
+    return {
+        "clusters": clusters,
+        "collapsed": collapsed,
+        "chunks_removed": len(removed),
+        "chunks_restored": len(restored),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    args = parser.parse_args()
+
+    from .corpus import load_corpus
+
+    rows = load_corpus()
+    clusters = find_duplicate_clusters(rows, args.threshold)
+    duplicates = sum(len(cluster["duplicates"]) for cluster in clusters)
+    print(json.dumps({
+        "chunks": len(rows),
+        "clusters": len(clusters),
+        "duplicate_chunks": duplicates,
+        "chunks_after_collapse": len(rows) - duplicates,
+        "by_cluster": clusters,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
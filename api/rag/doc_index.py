@@ -0,0 +1,222 @@
+"""
+Document-level index for two-stage (document, then chunk) retrieval.
+
+Flat chunk search scores every chunk of every page, so its cost grows with the
+chunk count and its top k can be scattered over pages that each mention the
+query terms once. The document index holds one row per markdown file: its
+title, frontmatter ``id`` (the chunks' ``topic``), section headings and the
+summary of its first chunk, embedded with the chunk embedding model and also
+indexed with BM25. With RAG_TWO_STAGE=1, retrieve() first picks the
+TWO_STAGE_DOCUMENTS best documents for the query (honouring the planner's
+category filter) and then searches only their chunks, as a ``source`` filter
+on the chunk index.
+
+benchmarks/bench_two_stage.py measures both against synthetic corpora of 10x
+and 100x rag/data. At today's size two-stage costs a little recall for no
+speed-up, hence off by default; at 100x it cuts NumPy dense and hybrid search
+time several-fold while recall goes up, because whole off-topic documents are
+ruled out first. With RAG_ENGINE=chroma the chunk stage is a metadata filter in
+Chroma's SQLite store, which is slower than its unfiltered HNSW search, so
+two-stage is meant for the numpy and snapshot engines.
+
+build_index.py writes it next to the BM25 artifact. A document's embedding is
+reused from the previous artifact while its text is unchanged, so incremental
+builds only embed the documents that changed.
+"""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .corpus import HEADING_SEPARATOR
+from .doc_store import build_entry
+from .planner import category_rows, rows_for_where
+from .vector_index import NumpyVectorIndex
+
+logger = logging.getLogger("health_assistant")
+
+DOCUMENT_INDEX_PATH = Path(__file__).parent / "document_index.json"
+DOCUMENT_INDEX_VERSION = 1
+
+
+def document_rows(ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict]) -> List[Dict]:
+    """
+    One row per source file, built from its indexed chunks
+
+    Returns:
+        {"id": source, "document": title / id / headings / summary text,
+        "metadata": {"source", "category", "title", "topic", "chunks"}} in order of first appearance
+    """
+    by_source: Dict[str, List[tuple]] = {}
+    for chunk_id, document, metadata in zip(ids, documents, metadatas):
+        metadata = metadata or {}
+        source = metadata.get("source", metadata.get("source_file", "unknown"))
+        by_source.setdefault(source, []).append((metadata.get("chunk_id", 0), chunk_id, document or "", metadata))
+
+    rows = []
+    for source, chunks in by_source.items():
+        chunks.sort(key=lambda chunk: (chunk[0], chunk[1]))
+        _, _, first_document, metadata = chunks[0]
+        title = str(metadata.get("title", ""))
+        topic = str(metadata.get("topic", ""))
+        headings = []
+        for _, _, _, chunk_metadata in chunks:
+            for heading in (chunk_metadata.get("heading_path") or "").split(HEADING_SEPARATOR):
+                heading = heading.strip()
+                if heading and heading != title and heading not in headings:
+                    headings.append(heading)
+        text = "\n".join(filter(None, [
+            title,
+            topic.replace("-", " ").replace("_", " "),
+            "; ".join(headings),
+            build_entry(first_document, metadata)["summary"],
+        ]))
+        rows.append({
+            "id": source,
+            "document": text,
+            "metadata": {
+                "source": source,
+                "category": metadata.get("category", "general"),
+                "title": title,
+                "topic": topic,
+                "chunks": len(chunks),
+            },
+        })
+    return rows
+
+
+class DocumentIndex:
+    """
+    Dense and BM25 search over documents; ``ids`` are source paths
+
+    ``embeddings`` is parallel to ``rows`` (None for a lexical-only index).
+    """
+
+    def __init__(self, rows: Sequence[Dict], embeddings: Optional[Any] = None, space: str = "l2"):
+        rows = list(rows)
+        self.ids = [row["id"] for row in rows]
+        self.documents = [row["document"] for row in rows]
+        self.metadatas = [row["metadata"] for row in rows]
+        self.space = space
+        # Embeddings taken over from a previous index by from_chunks()
+        self.reused = 0
+        self.vectors = None
+        if embeddings is not None and rows:
+            self.vectors = NumpyVectorIndex(self.ids, embeddings, self.documents, self.metadatas, space)
+        self.bm25 = BM25Index.from_rows(rows)
+        # Documents of each category, for the planner's where filters
+        self._category_rows = category_rows(self.metadatas)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_chunks(
+        cls,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+        embedding_function: Optional[Callable[[List[str]], Any]] = None,
+        previous: Optional["DocumentIndex"] = None,
+        space: str = "l2",
+        batch_size: int = 64,
+    ) -> "DocumentIndex":
+        """
+        Build from the indexed chunks
+
+        Args:
+            ids, documents, metadatas: Every chunk of the collection
+            embedding_function: Chunk embedding model (None builds a lexical-only index)
+            previous: Earlier index whose embeddings are reused for unchanged documents
+            space: Distance space of the chunk collection
+            batch_size: Texts per embedding call
+
+        Returns:
+            The index; ``reused`` holds how many embeddings came from ``previous``
+        """
+        rows = document_rows(ids, documents, metadatas)
+        embeddings = None
+        reused = 0
+        if embedding_function is not None and rows:
+            known = {}
+            if previous is not None and previous.vectors is not None and previous.space == space:
+                known = {
+                    (source, text): previous.vectors.matrix[row]
+                    for row, (source, text) in enumerate(zip(previous.ids, previous.documents))
+                }
+            vectors: List[Optional[np.ndarray]] = [known.get((row["id"], row["document"])) for row in rows]
+            reused = sum(vector is not None for vector in vectors)
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                for i, vector in zip(batch, embedding_function([rows[i]["document"] for i in batch])):
+                    vectors[i] = np.asarray(vector, dtype=np.float32)
+            embeddings = np.stack(vectors)
+        index = cls(rows, embeddings, space)
+        index.reused = reused
+        return index
+
+    def search(
+        self,
+        query: str,
+        n: int,
+        mode: str = "dense",
+        query_embedding: Optional[Any] = None,
+        where: Optional[Dict] = None,
+    ) -> List[str]:
+        """
+        Sources of the ``n`` best documents for a query
+
+        Args:
+            query: Search query
+            n: Number of documents
+            mode: "dense", "sparse" or "hybrid" (dense and BM25 fused by RRF), as in retrieve();
+                dense falls back to BM25 when the index or the query has no embedding
+            query_embedding: Query vector for dense and hybrid modes
+            where: Planner category filter
+        """
+        rows = rows_for_where(self._category_rows, where)
+        rankings = []
+        if mode in ("dense", "hybrid") and self.vectors is not None and query_embedding is not None:
+            rankings.append([self.ids[row] for row, _ in self.vectors.search(query_embedding, n, rows)])
+        if mode in ("sparse", "hybrid") or not rankings:
+            rankings.append([self.ids[row] for row, _ in self.bm25.search(query, n, rows)])
+        if len(rankings) == 1:
+            return rankings[0]
+        return [source for source, _ in reciprocal_rank_fusion(rankings)[:n]]
+
+    def save(self, path: Path):
+        """Write the index as a JSON artifact"""
+        payload = {
+            "version": DOCUMENT_INDEX_VERSION,
+            "space": self.space,
+            "rows": [
+                {"id": source, "document": document, "metadata": metadata}
+                for source, document, metadata in zip(self.ids, self.documents, self.metadatas)
+            ],
+            "embeddings": self.vectors.matrix.tolist() if self.vectors is not None else None,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "DocumentIndex":
+        start = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != DOCUMENT_INDEX_VERSION:
+            raise ValueError(f"Unsupported document index version: {payload.get('version')}")
+        embeddings = payload.get("embeddings")
+        index = cls(
+            payload["rows"],
+            np.asarray(embeddings, dtype=np.float32) if embeddings else None,
+            payload.get("space", "l2"),
+        )
+        logger.info(f"Loaded document index: {len(index)} documents in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
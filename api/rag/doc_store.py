@@ -0,0 +1,127 @@
+"""
+Chunk-level document store built at index time.
+
+Maps each chunk id to its metadata with ``reference_sources`` already parsed,
+the citation list the chat endpoints show for that chunk and a two-sentence
+summary for the no-LLM fallback answer. build_index.py writes it next to the
+BM25 artifact and the API loads it once at startup, so per-request citation
+and summary work is a dictionary lookup instead of JSON parsing, URL
+filtering and regex sentence splitting.
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("health_assistant")
+
+DOC_STORE_PATH = Path(__file__).parent / "doc_store.json"
+DOC_STORE_VERSION = 1
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.?!])\s+")
+
+
+def parse_reference_sources(value: Any) -> List[Dict]:
+    """reference_sources metadata (a JSON string in Chroma) as a list"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    return value if isinstance(value, list) else []
+
+
+def chunk_citations(source: str, reference_sources: List[Dict]) -> List[Dict[str, str]]:
+    """
+    Citations shown for one chunk: its reference links, or the .md source itself
+
+    Same rules as the chat endpoints' citation filter: only {"source", "url"},
+    reference links deduplicated by URL, and a file:// entry for a markdown
+    source without reference links.
+    """
+    citations = []
+    seen_urls = set()
+    for ref in reference_sources:
+        if not isinstance(ref, dict):
+            continue
+        url = ref.get("url", "")
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            citations.append({"source": ref.get("name", "") or source or url, "url": url})
+    if not reference_sources and source and ".md" in source:
+        citations.append({"source": source, "url": f"file://{source}"})
+    return citations
+
+
+def summarize_chunk(chunk: str, sentence_limit: int = 2) -> str:
+    """First ``sentence_limit`` sentences of a chunk"""
+    if not chunk:
+        return ""
+    sentences = _SENTENCE_SPLIT_RE.split(chunk.strip())
+    return " ".join(sentences[:sentence_limit]).strip()
+
+
+def _strip_heading_lines(document: str, metadata: Dict) -> str:
+    """Drop the title/heading lines chunks start with, so summaries begin with prose"""
+    headings = {metadata.get("title", "")}
+    headings.update((metadata.get("heading_path") or "").split(" > "))
+    headings.discard("")
+    lines = document.split("\n")
+    while lines and lines[0].strip() in headings:
+        lines.pop(0)
+    return " ".join(" ".join(lines).split())
+
+
+def build_entry(document: str, metadata: Dict) -> Dict[str, Any]:
+    """Doc-store entry for one chunk"""
+    metadata = dict(metadata or {})
+    metadata["reference_sources"] = parse_reference_sources(metadata.get("reference_sources"))
+    source = metadata.get("source", metadata.get("source_file", "unknown"))
+    return {
+        "metadata": metadata,
+        "citations": chunk_citations(source, metadata["reference_sources"]),
+        "summary": summarize_chunk(_strip_heading_lines(document or "", metadata)),
+    }
+
+
+class DocStore:
+    """Chunk id -> {"metadata", "citations", "summary"}"""
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]]):
+        self.entries = entries
+
+    @classmethod
+    def from_chunks(cls, ids: Iterable[str], documents: Iterable[str], metadatas: Iterable[Dict]) -> "DocStore":
+        return cls({
+            chunk_id: build_entry(document, metadata)
+            for chunk_id, document, metadata in zip(ids, documents, metadatas)
+        })
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "DocStore":
+        """Build from corpus rows ({"id", "document", "metadata"})"""
+        return cls.from_chunks(
+            [row["id"] for row in rows], [row["document"] for row in rows], [row["metadata"] for row in rows]
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(chunk_id)
+
+    def save(self, path: Path):
+        """Write the store as a JSON artifact"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": DOC_STORE_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "DocStore":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != DOC_STORE_VERSION:
+            raise ValueError(f"Unsupported doc store version: {payload.get('version')}")
+        return cls(payload["entries"])
@@ -0,0 +1,165 @@
+"""
+Micro-batching of query embeddings.
+
+Each retrieve() call embeds one query, and every ONNX invocation has a fixed
+overhead, so under concurrency it is much cheaper to encode the waiting queries
+together. Callers submit their text to a queue; a dedicated worker thread
+collects texts for a short window (or until the batch is full), runs a single
+batched encode and hands each caller its vector. Inference therefore never runs
+on the event loop or the request threads.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("health_assistant")
+
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "1").lower() == "1"
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "16"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "3"))
+
+# Queue-delay samples kept for percentiles
+_DELAY_SAMPLES = 2048
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent embedding requests and encodes them in one call
+
+    Args:
+        embed_batch: Embeds a list of texts, returning one vector per text
+        max_batch: Encode as soon as this many texts are waiting
+        max_wait_ms: Longest time the first text of a batch waits for others
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], Sequence[Any]],
+        max_batch: int = EMBEDDING_BATCH_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.reset_statistics()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding; the future resolves to a float32 vector"""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Embed one text through the batcher, blocking until its batch is encoded"""
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect(self, first: tuple) -> List[tuple]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # let _run see the shutdown after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            started = time.perf_counter()
+
+            # Identical texts in one batch are encoded once
+            unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                vectors = self.embed_batch(unique_texts)
+                by_text = {
+                    text: np.asarray(vector, dtype=np.float32).reshape(-1)
+                    for text, vector in zip(unique_texts, vectors)
+                }
+                for text, future, _ in batch:
+                    future.set_result(by_text[text])
+            except Exception as e:
+                logger.error(f"Batched embedding failed for {len(batch)} queries: {e}", exc_info=True)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            encode_seconds = time.perf_counter() - started
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._encoded += len(unique_texts)
+                self._encode_seconds += encode_seconds
+                for _, _, enqueued in batch:
+                    self._delays.append(started - enqueued)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Batch-size distribution and the queue delay added before encoding"""
+        with self._stats_lock:
+            sizes = dict(sorted(self._batch_sizes.items()))
+            delays = sorted(self._delays)
+            encoded = self._encoded
+            encode_seconds = self._encode_seconds
+        batches = sum(sizes.values())
+        queries = sum(size * count for size, count in sizes.items())
+        return {
+            "batches": batches,
+            "queries": queries,
+            "encoded_texts": encoded,
+            "mean_batch_size": round(queries / batches, 2) if batches else 0,
+            "batch_size_distribution": sizes,
+            "queue_delay_ms": {
+                "mean": round(sum(delays) / len(delays) * 1000, 3) if delays else 0,
+                "p50": round(_percentile(delays, 0.5) * 1000, 3),
+                "p99": round(_percentile(delays, 0.99) * 1000, 3),
+            },
+            "mean_encode_ms_per_batch": round(encode_seconds / batches * 1000, 3) if batches else 0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def reset_statistics(self):
+        with self._stats_lock:
+            self._batch_sizes: Counter = Counter()
+            self._delays: deque = deque(maxlen=_DELAY_SAMPLES)
+            self._encoded = 0
+            self._encode_seconds = 0.0
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stop the worker after the queued texts are encoded"""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout)
@@ -0,0 +1,195 @@
+"""
+Query-embedding cache for retrieve().
+
+Embedding the query with the ONNX MiniLM model is the most expensive step of a
+retrieval, and the same strings recur: repeated questions, and enhanced queries
+that re-append the same history keywords. Embeddings are cached by normalized
+query text in two tiers:
+
+- L1: bounded in-process LRU of float32 vectors
+- L2 (optional): Redis, storing the vector as base64-encoded float16 bytes
+  (384 dims -> 768 bytes), shared across workers and restarts
+
+Both Redis clients used by the cache service (Upstash and redis-py) are
+synchronous, which matches retrieve().
+"""
+import base64
+import hashlib
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("health_assistant")
+
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", str(7 * 24 * 3600)))
+QUERY_EMBEDDING_CACHE_REDIS = os.getenv("QUERY_EMBEDDING_CACHE_REDIS", "1").lower() == "1"
+
+# Part of the Redis key so vectors from a different model are never reused
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key text: NFC, lower-cased, whitespace collapsed"""
+    text = unicodedata.normalize("NFC", query or "")
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def encode_float16(embedding: Any) -> str:
+    """Pack an embedding as base64 float16 bytes (Redis clients decode responses to str)"""
+    return base64.b64encode(np.asarray(embedding, dtype=np.float16).tobytes()).decode("ascii")
+
+
+def decode_float16(payload: Any) -> np.ndarray:
+    """Inverse of encode_float16, widened back to float32"""
+    if isinstance(payload, str):
+        payload = payload.encode("ascii")
+    return np.frombuffer(base64.b64decode(payload), dtype=np.float16).astype(np.float32)
+
+
+class QueryEmbeddingCache:
+    """Two-tier (LRU + optional Redis) cache of query embeddings"""
+
+    def __init__(self, max_size: int = QUERY_EMBEDDING_CACHE_SIZE, ttl: int = QUERY_EMBEDDING_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_client: Optional[Any] = None
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = Lock()
+        self.reset_statistics()
+
+    def attach_redis(self, client: Optional[Any]):
+        """Use a synchronous Redis client (get/setex) as the L2 tier; None disables it"""
+        self.redis_client = client
+
+    def _redis_key(self, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"query_embedding:{EMBEDDING_MODEL_NAME}:{digest}"
+
+    def _lru_get(self, normalized: str) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(normalized)
+            if embedding is not None:
+                self._entries.move_to_end(normalized)
+            return embedding
+
+    def _lru_put(self, normalized: str, embedding: np.ndarray):
+        with self._lock:
+            self._entries[normalized] = embedding
+            self._entries.move_to_end(normalized)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _redis_get(self, normalized: str) -> Optional[np.ndarray]:
+        if self.redis_client is None:
+            return None
+        try:
+            payload = self.redis_client.get(self._redis_key(normalized))
+            return decode_float16(payload) if payload else None
+        except Exception as e:
+            self._record("redis_errors")
+            logger.warning(f"Query embedding cache Redis read failed: {e}")
+            return None
+
+    def _redis_put(self, normalized: str, embedding: np.ndarray):
+        if self.redis_client is None:
+            return
+        try:
+            self.redis_client.setex(self._redis_key(normalized), self.ttl, encode_float16(embedding))
+        except Exception as e:
+            self._record("redis_errors")
+            logger.warning(f"Query embedding cache Redis write failed: {e}")
+
+    def _record(self, counter: str, amount: float = 1):
+        with self._lock:
+            self.stats[counter] += amount
+
+    def get_or_compute(self, query: str, compute: Callable[[str], Any]) -> np.ndarray:
+        """
+        Return the cached embedding for ``query`` or compute, cache and return it
+
+        Args:
+            query: Query text as passed to retrieve()
+            compute: Embeds a single query string
+
+        Returns:
+            float32 embedding vector
+        """
+        start = time.perf_counter()
+        normalized = normalize_query(query)
+
+        embedding = self._lru_get(normalized)
+        tier = "l1_hits"
+        if embedding is None:
+            embedding = self._redis_get(normalized)
+            tier = "l2_hits"
+            if embedding is not None:
+                self._lru_put(normalized, embedding)
+
+        if embedding is not None:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stats[tier] += 1
+                self.stats["hit_lookup_seconds"] += elapsed
+            return embedding
+
+        embedding = np.asarray(compute(query), dtype=np.float32).reshape(-1)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["miss_seconds"] += elapsed
+        self._lru_put(normalized, embedding)
+        self._redis_put(normalized, embedding)
+        return embedding
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit rate and estimated embedding time saved"""
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+        hits = stats["l1_hits"] + stats["l2_hits"]
+        total = hits + stats["misses"]
+        mean_miss = stats["miss_seconds"] / stats["misses"] if stats["misses"] else 0.0
+        # Each hit saves one embedding (estimated by the mean miss cost) minus its own lookup
+        time_saved = max(hits * mean_miss - stats["hit_lookup_seconds"], 0.0)
+        return {
+            "requests": total,
+            "l1_hits": stats["l1_hits"],
+            "l2_hits": stats["l2_hits"],
+            "misses": stats["misses"],
+            "redis_errors": stats["redis_errors"],
+            "hit_rate_percent": round(hits / total * 100, 2) if total else 0,
+            "mean_embed_ms": round(mean_miss * 1000, 3),
+            "time_saved_ms": round(time_saved * 1000, 2),
+            "size": size,
+            "max_size": self.max_size,
+            "redis_enabled": self.redis_client is not None,
+        }
+
+    def reset_statistics(self):
+        """Reset counters (cached entries are kept)"""
+        self.stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "redis_errors": 0,
+            "miss_seconds": 0.0,
+            "hit_lookup_seconds": 0.0,
+        }
+
+    def clear(self):
+        """Drop all L1 entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+query_embedding_cache = QueryEmbeddingCache()
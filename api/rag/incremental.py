@@ -0,0 +1,154 @@
+"""
+Incremental, content-hashed indexing of the knowledge base.
+
+A manifest stored next to the Chroma database records, for every markdown
+file, the hash of its raw bytes and the hash of each chunk it produced.
+On rebuild, unchanged files are skipped without parsing; changed files are
+re-chunked and only chunks whose content or metadata changed are re-embedded
+and upserted. Chunks that disappeared (shorter file, deleted file) are removed.
+The collection is never dropped, so it stays queryable during a rebuild.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .corpus import CHUNK_TOKEN_BUDGET, DATA_DIR, chunk_markdown_file
+from .tokens import tokenizer_name
+
+MANIFEST_NAME = "index_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def chunker_fingerprint() -> str:
+    """Changing how files are chunked or counted invalidates every manifest entry"""
+    return f"markdown-sections-{CHUNK_TOKEN_BUDGET}-{tokenizer_name()}"
+
+
+def file_hash(path: Path) -> str:
+    """sha256 of a file's raw bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_hash(row: Dict) -> str:
+    """sha256 of a chunk's text and metadata (metadata edits must reach the index too)"""
+    payload = json.dumps([row["document"], row["metadata"]], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def empty_manifest() -> Dict:
+    return {"version": MANIFEST_VERSION, "chunker": chunker_fingerprint(), "files": {}}
+
+
+def load_manifest(path: Path) -> Dict:
+    """Read the manifest; a missing, unreadable or outdated one counts as empty"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return empty_manifest()
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("chunker") != chunker_fingerprint():
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(manifest: Dict, path: Path):
+    """Write the manifest atomically (temp file + rename)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def process_file(md_file: Path, data_dir: Path, previous: Optional[Dict]) -> Dict:
+    """
+    Hash one file and, if it changed, chunk it and diff its chunks
+
+    Top-level and side-effect free so it can run in a process pool.
+
+    Args:
+        md_file: Markdown file to process
+        data_dir: Knowledge-base root
+        previous: This file's manifest entry from the last build, if any
+
+    Returns:
+        {"relative", "status" (unchanged/changed/added), "entry" (new manifest entry),
+        "rows" (chunks to upsert), "deleted" (chunk ids that no longer exist)}
+    """
+    relative = md_file.relative_to(data_dir).as_posix()
+    digest = file_hash(md_file)
+    if previous and previous.get("file_hash") == digest:
+        return {"relative": relative, "status": "unchanged", "entry": previous, "rows": [], "deleted": []}
+
+    old_chunks = previous.get("chunks", {}) if previous else {}
+    chunks = {}
+    rows = []
+    for row in chunk_markdown_file(md_file, data_dir):
+        chunks[row["id"]] = chunk_hash(row)
+        if old_chunks.get(row["id"]) != chunks[row["id"]]:
+            rows.append(row)
+    return {
+        "relative": relative,
+        "status": "changed" if previous else "added",
+        "entry": {"file_hash": digest, "chunks": chunks},
+        "rows": rows,
+        "deleted": sorted(set(old_chunks) - set(chunks)),
+    }
+
+
+def new_file_counts() -> Dict[str, int]:
+    return {"files_unchanged": 0, "files_changed": 0, "files_added": 0, "files_deleted": 0}
+
+
+def record_file_result(manifest: Dict, counts: Dict[str, int], result: Dict):
+    """Add a process_file() result to the manifest being built"""
+    manifest["files"][result["relative"]] = result["entry"]
+    counts[f"files_{result['status']}"] += 1
+
+
+def deleted_file_chunks(old_files: Dict, new_manifest: Dict, counts: Dict[str, int]) -> Set[str]:
+    """Chunk ids of files that were in the old manifest but no longer exist"""
+    deletes: Set[str] = set()
+    for relative in set(old_files) - set(new_manifest["files"]):
+        counts["files_deleted"] += 1
+        deletes.update(old_files[relative].get("chunks", {}))
+    return deletes
+
+
+def manifest_chunk_ids(manifest: Dict) -> Set[str]:
+    """Every chunk id the manifest expects in the collection (near-duplicates collapsed by dedup.py excluded)"""
+    ids = {chunk_id for entry in manifest.get("files", {}).values() for chunk_id in entry.get("chunks", {})}
+    return ids - set(manifest.get("collapsed", {}))
+
+
+def reconcile_with_collection(collection, manifest: Dict) -> Tuple[Set[str], Set[str]]:
+    """
+    Compare the manifest with the ids actually stored in the collection
+
+    Returns:
+        (stale ids the manifest does not account for, e.g. from a build before the
+        manifest existed; missing ids the manifest expects, e.g. after an interrupted build)
+    """
+    expected = manifest_chunk_ids(manifest)
+    existing = set(collection.get(include=[]).get("ids") or [])
+    return existing - expected, expected - existing
+
+
+def rows_for_ids(manifest: Dict, chunk_ids: Set[str], data_dir: Path = DATA_DIR) -> List[Dict]:
+    """Re-chunk the files that own ``chunk_ids`` and return those rows"""
+    wanted: Dict[str, Set[str]] = {}
+    for relative, entry in manifest.get("files", {}).items():
+        owned = chunk_ids & set(entry.get("chunks", {}))
+        if owned:
+            wanted[relative] = owned
+    rows = []
+    for relative, owned in wanted.items():
+        rows.extend(row for row in chunk_markdown_file(data_dir / relative, data_dir) if row["id"] in owned)
+    return rows
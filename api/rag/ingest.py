@@ -0,0 +1,235 @@
+"""
+Streaming ingestion pipeline for build_index.py.
+
+Files are hashed, parsed and chunked in a process pool with a bounded number
+of files in flight. Changed chunks stream into a writer that embeds them in
+fixed-size batches and upserts them in fixed-size chunks, so memory stays flat
+however large the corpus is. Progress and throughput are printed periodically.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .incremental import (
+    deleted_file_chunks,
+    empty_manifest,
+    new_file_counts,
+    process_file,
+    reconcile_with_collection,
+    record_file_result,
+    rows_for_ids,
+)
+from .corpus import list_markdown_files
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH", "64"))
+UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH", "256"))
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+
+class IngestProgress:
+    """Periodic progress/throughput line; one summary at the end"""
+
+    def __init__(self, files_total: int, interval: float = PROGRESS_INTERVAL_SECONDS, printer: Callable = print):
+        self.files_total = files_total
+        self.files_done = 0
+        self.chunks_upserted = 0
+        self.chunks_deleted = 0
+        self.interval = interval
+        self.printer = printer
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def line(self) -> str:
+        elapsed = self.elapsed()
+        return (
+            f"files {self.files_done}/{self.files_total} | chunks upserted {self.chunks_upserted} | "
+            f"{self.files_done / elapsed:.1f} files/s, {self.chunks_upserted / elapsed:.1f} chunks/s"
+        )
+
+    def update(self, files: int = 0, upserted: int = 0, deleted: int = 0):
+        self.files_done += files
+        self.chunks_upserted += upserted
+        self.chunks_deleted += deleted
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.printer(self.line())
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = self.elapsed()
+        return {
+            "seconds": round(elapsed, 2),
+            "files_per_second": round(self.files_done / elapsed, 1),
+            "chunks_per_second": round(self.chunks_upserted / elapsed, 1),
+        }
+
+
+class BatchWriter:
+    """
+    Buffers chunk rows, embeds them in bounded batches and upserts in chunks
+
+    Args:
+        collection: Chroma collection
+        embed: Embedding function (list of texts -> list of vectors)
+        embed_batch: Texts per embedding call
+        upsert_batch: Rows per collection.upsert call
+    """
+
+    def __init__(self, collection, embed: Callable, embed_batch: int = EMBED_BATCH_SIZE,
+                 upsert_batch: int = UPSERT_BATCH_SIZE, progress: Optional[IngestProgress] = None):
+        self.collection = collection
+        self.embed = embed
+        self.embed_batch = max(1, embed_batch)
+        self.upsert_batch = max(1, upsert_batch)
+        self.progress = progress
+        self.buffer: List[Dict] = []
+        self.upserted = 0
+        self.deleted = 0
+        self.embed_calls = 0
+
+    def add(self, rows: Sequence[Dict]):
+        self.buffer.extend(rows)
+        while len(self.buffer) >= self.upsert_batch:
+            batch, self.buffer = self.buffer[:self.upsert_batch], self.buffer[self.upsert_batch:]
+            self._upsert(batch)
+
+    def flush(self):
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self._upsert(batch)
+
+    def _upsert(self, rows: List[Dict]):
+        documents = [row["document"] for row in rows]
+        embeddings = []
+        for start in range(0, len(documents), self.embed_batch):
+            embeddings.extend(self.embed(documents[start:start + self.embed_batch]))
+            self.embed_calls += 1
+        self.collection.upsert(
+            ids=[row["id"] for row in rows],
+            documents=documents,
+            metadatas=[row["metadata"] for row in rows],
+            embeddings=[list(map(float, vector)) for vector in embeddings],
+        )
+        self.upserted += len(rows)
+        if self.progress:
+            self.progress.update(upserted=len(rows))
+
+    def delete(self, ids: Set[str]):
+        ordered = sorted(ids)
+        for start in range(0, len(ordered), self.upsert_batch):
+            self.collection.delete(ids=ordered[start:start + self.upsert_batch])
+        self.deleted += len(ordered)
+        if self.progress:
+            self.progress.update(deleted=len(ordered))
+
+
+def _process_args(args: Tuple[Path, Path, Optional[Dict]]) -> Dict:
+    return process_file(*args)
+
+
+def parse_files(
+    files: Sequence[Path],
+    data_dir: Path,
+    old_files: Dict[str, Dict],
+    workers: int = INGEST_WORKERS,
+    executor: Optional[Executor] = None,
+) -> Iterator[Dict]:
+    """
+    Yield process_file() results, parsing in a process pool when workers > 1
+
+    At most ``workers * 4`` files are in flight so results never pile up in memory.
+    Results are yielded in completion order.
+    """
+    tasks = ((path, data_dir, old_files.get(path.relative_to(data_dir).as_posix())) for path in files)
+    if workers <= 1 and executor is None:
+        for task in tasks:
+            yield _process_args(task)
+        return
+
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        window = max(1, workers) * 4
+        pending = set()
+        for task in tasks:
+            pending.add(executor.submit(_process_args, task))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def ingest(
+    collection,
+    embed: Callable,
+    data_dir: Path,
+    manifest: Optional[Dict] = None,
+    workers: int = INGEST_WORKERS,
+    embed_batch: int = EMBED_BATCH_SIZE,
+    upsert_batch: int = UPSERT_BATCH_SIZE,
+    printer: Callable = print,
+) -> Tuple[Dict, Dict]:
+    """
+    Bring the collection in line with data_dir, streaming only what changed
+
+    Args:
+        collection: Chroma collection to update in place
+        embed: Embedding function (list of texts -> list of vectors)
+        data_dir: Knowledge-base root
+        manifest: Manifest of the previous build (empty for a full build)
+        workers: Parser processes (1 parses inline)
+        embed_batch: Texts per embedding call
+        upsert_batch: Rows per upsert/delete call
+        printer: Where progress lines go
+
+    Returns:
+        (new manifest, summary of counts and throughput)
+    """
+    old_files = (manifest or empty_manifest()).get("files", {})
+    files = list_markdown_files(data_dir)
+    progress = IngestProgress(len(files), printer=printer)
+    writer = BatchWriter(collection, embed, embed_batch, upsert_batch, progress)
+    new_manifest = empty_manifest()
+    # Near-duplicates collapsed by the last build stay out of the collection (see dedup.py)
+    new_manifest["collapsed"] = dict((manifest or {}).get("collapsed", {}))
+    counts = new_file_counts()
+    deletes: Set[str] = set()
+    upserted_ids: Set[str] = set()
+
+    for result in parse_files(files, data_dir, old_files, workers):
+        record_file_result(new_manifest, counts, result)
+        deletes.update(result["deleted"])
+        upserted_ids.update(row["id"] for row in result["rows"])
+        writer.add(result["rows"])
+        progress.update(files=1)
+    writer.flush()
+    deletes.update(deleted_file_chunks(old_files, new_manifest, counts))
+
+    # Repair drift between manifest and collection (pre-manifest builds, interrupted runs)
+    stale, missing = reconcile_with_collection(collection, new_manifest)
+    writer.add(rows_for_ids(new_manifest, missing - upserted_ids, data_dir))
+    writer.flush()
+    deletes = (deletes | stale) - upserted_ids - missing
+    if deletes:
+        writer.delete(deletes)
+
+    printer(progress.line())
+    summary = {
+        **counts,
+        "chunks_upserted": writer.upserted,
+        "chunks_deleted": writer.deleted,
+        "embed_calls": writer.embed_calls,
+        **progress.summary(),
+    }
+    return new_manifest, summary
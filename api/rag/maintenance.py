@@ -0,0 +1,254 @@
+"""
+Chroma storage maintenance: orphaned segment GC and SQLite compaction.
+
+Collection delete/create cycles (notably with older Chroma releases, or when
+interrupted) leave old HNSW segment directories behind in chroma_db. This module lists the segments Chroma still
+references, removes directories that no segment owns, vacuums the SQLite
+metadata store and checks that queries return the same results afterwards.
+Orphans are first moved aside and only deleted once verification passes, so a
+failed check restores them.
+
+Usage (from project root):
+    python -m api.rag.maintenance [--path api/rag/chroma_db] [--dry-run] [--probes 20]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: garbage collection is not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger("health_assistant")
+
+CHROMA_PATH = Path(__file__).parent / "chroma_db"
+SQLITE_NAME = "chroma.sqlite3"
+# Held while a process collects garbage in a store (see _gc_lock)
+LOCK_NAME = ".gc.lock"
+COLLECTION_NAME = "medical_knowledge"
+# Startup check: "off", "report" (log orphans) or "clean" (remove them)
+CHROMA_GC_ON_STARTUP = os.getenv("CHROMA_GC_ON_STARTUP", "report").strip().lower()
+
+
+def _is_uuid(name: str) -> bool:
+    try:
+        uuid.UUID(name)
+        return True
+    except ValueError:
+        return False
+
+
+def directory_size(path: Path) -> int:
+    """Total bytes of the files under path"""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def list_live_segments(client) -> Set[str]:
+    """Ids of every segment Chroma's system database still references"""
+    # Chroma has no public segment API; the SysDB component is what the server itself uses
+    from chromadb.db.system import SysDB
+
+    sysdb = client._system.instance(SysDB)
+    return {str(segment["id"]) for segment in sysdb.get_segments()}
+
+
+def find_orphan_segments(persist_dir: Path, live_segments: Set[str]) -> List[Path]:
+    """Segment directories (named by segment UUID) that no live segment owns"""
+    return sorted(
+        entry for entry in Path(persist_dir).iterdir()
+        if entry.is_dir() and _is_uuid(entry.name) and entry.name not in live_segments
+    )
+
+
+def vacuum_sqlite(persist_dir: Path) -> int:
+    """VACUUM the Chroma metadata store; returns bytes reclaimed"""
+    db_path = Path(persist_dir) / SQLITE_NAME
+    before = directory_size(db_path)
+    connection = sqlite3.connect(str(db_path))
+    try:
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    return before - directory_size(db_path)
+
+
+def snapshot_results(collection, probes: int = 20, k: int = 4) -> List[List[str]]:
+    """
+    Top-k ids for ``probes`` stored embeddings used as queries
+
+    Uses embeddings already in the collection, so no embedding model is needed and
+    the check exercises the same collection.query path as retrieve().
+    """
+    if collection is None or collection.count() == 0:
+        return []
+    data = collection.get(limit=probes, include=["embeddings"])
+    embeddings = data.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return []
+    results = collection.query(query_embeddings=[list(map(float, e)) for e in embeddings], n_results=k)
+    return results["ids"]
+
+
+def collect_garbage(
+    persist_dir: Path = CHROMA_PATH,
+    dry_run: bool = False,
+    probes: int = 20,
+    client: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Remove orphaned segment directories and vacuum the SQLite store
+
+    Args:
+        persist_dir: Chroma persistence directory
+        dry_run: Only report what would be removed
+        probes: Stored embeddings replayed as queries to verify results are unchanged
+        client: Existing PersistentClient for persist_dir (one is created otherwise)
+
+    Returns:
+        Report with orphans, bytes reclaimed and verification outcome; only
+        "path" and "skipped" when another process is collecting garbage in the store
+    """
+    persist_dir = Path(persist_dir)
+    if not (persist_dir / SQLITE_NAME).exists():
+        # Without the metadata store nothing can say which segments are live; creating a
+        # client here would also create an empty store. Rebuild the index instead.
+        raise FileNotFoundError(
+            f"No {SQLITE_NAME} in {persist_dir}; cannot tell live segments from orphans. "
+            "Rebuild the index with 'python rag/build_index.py --full'."
+        )
+
+    if client is None:
+        import chromadb
+        from chromadb.config import Settings
+        client = chromadb.PersistentClient(path=str(persist_dir), settings=Settings(anonymized_telemetry=False))
+
+    if dry_run:
+        return _orphan_report(persist_dir, client, dry_run)
+
+    # Workers started together must not move the same orphans or vacuum the store twice
+    with _gc_lock(persist_dir) as acquired:
+        if not acquired:
+            return {"path": str(persist_dir), "skipped": "another process is collecting garbage in this store"}
+        size_before = directory_size(persist_dir)
+        report = _orphan_report(persist_dir, client, dry_run)
+        orphans = [persist_dir / name for name in report["orphan_segments"]]
+
+        try:
+            collection = client.get_collection(COLLECTION_NAME)
+        except Exception:
+            collection = None
+        before = snapshot_results(collection, probes)
+
+        # Move orphans aside first so a failed verification can put them back
+        trash = Path(tempfile.mkdtemp(prefix="chroma_gc_", dir=persist_dir.parent))
+        for path in orphans:
+            shutil.move(str(path), str(trash / path.name))
+        sqlite_reclaimed = vacuum_sqlite(persist_dir)
+        after = snapshot_results(collection, probes)
+
+        verified = before == after
+        if verified:
+            shutil.rmtree(trash)
+        else:
+            for moved in trash.iterdir():
+                shutil.move(str(moved), str(persist_dir / moved.name))
+            trash.rmdir()
+            logger.error("Chroma GC verification failed: query results changed; orphaned segments restored")
+
+        report.update({
+            "verified": verified,
+            "probes": len(before),
+            "sqlite_bytes_reclaimed": sqlite_reclaimed,
+            "bytes_reclaimed": size_before - directory_size(persist_dir),
+        })
+    return report
+
+
+def _orphan_report(persist_dir: Path, client, dry_run: bool) -> Dict[str, Any]:
+    live = list_live_segments(client)
+    orphans = find_orphan_segments(persist_dir, live)
+    return {
+        "path": str(persist_dir),
+        "live_segments": len(live),
+        "orphan_segments": [path.name for path in orphans],
+        "orphan_bytes": sum(directory_size(path) for path in orphans),
+        "dry_run": dry_run,
+    }
+
+
+@contextmanager
+def _gc_lock(persist_dir: Path):
+    """Non-blocking inter-process lock on a Chroma store; yields whether it was acquired"""
+    if fcntl is None:
+        yield True
+        return
+    with open(Path(persist_dir) / LOCK_NAME, "a") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def startup_segment_check(client, persist_dir: Path = CHROMA_PATH, mode: str = CHROMA_GC_ON_STARTUP) -> Optional[Dict]:
+    """
+    Startup hook: report (or, with mode="clean", remove) orphaned segments
+
+    Never raises; storage maintenance must not block the API from starting.
+    """
+    if mode == "off" or client is None:
+        return None
+    try:
+        if mode == "clean":
+            report = collect_garbage(persist_dir, client=client)
+            if "skipped" in report:
+                logger.info(f"Chroma GC skipped: {report['skipped']}")
+                return report
+            logger.info(
+                f"Chroma GC removed {len(report['orphan_segments'])} orphaned segments, "
+                f"reclaimed {report['bytes_reclaimed']} bytes (verified={report['verified']})"
+            )
+            return report
+        orphans = find_orphan_segments(persist_dir, list_live_segments(client))
+        if orphans:
+            orphan_bytes = sum(directory_size(path) for path in orphans)
+            logger.warning(
+                f"{len(orphans)} orphaned Chroma segment directories ({orphan_bytes} bytes) in {persist_dir}; "
+                "run 'python -m api.rag.maintenance' to remove them"
+            )
+        return {"orphan_segments": [path.name for path in orphans]}
+    except Exception as e:
+        logger.warning(f"Chroma segment check failed: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, default=CHROMA_PATH, help="Chroma persistence directory")
+    parser.add_argument("--dry-run", action="store_true", help="Only list orphaned segments")
+    parser.add_argument("--probes", type=int, default=20, help="Stored embeddings replayed to verify results")
+    args = parser.parse_args()
+    try:
+        report = collect_garbage(args.path, dry_run=args.dry_run, probes=args.probes)
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Multilingual retrieval index.
+
+The main collection is embedded with an English-only model, so a Hindi, Tamil,
+Telugu, Kannada or Malayalam question (native script or romanized) has to be
+translated before retrieve() can run. This module mirrors the same chunks into
+a second Chroma collection embedded with a multilingual sentence-transformers
+model, whose vectors for a question and its translation land close together.
+retriever.retrieve_multilingual() then searches it with the original text while
+translation runs in parallel.
+
+The mirror is kept in sync from the main collection (build_index.py
+--multilingual): only chunks whose text or metadata changed are re-embedded,
+and chunks that left the main collection are deleted. Changing the model
+rebuilds the mirror.
+
+Needs the optional ``sentence-transformers`` package; without it (or without
+the collection) retrieval simply stays translate-first.
+"""
+import logging
+import os
+from typing import Dict, List, Optional
+
+# Search the multilingual collection with untranslated queries (see main.py)
+MULTILINGUAL_RETRIEVAL = os.getenv("MULTILINGUAL_RETRIEVAL", "0").strip().lower() in ("1", "true", "yes")
+MULTILINGUAL_EMBEDDING_MODEL = os.getenv("MULTILINGUAL_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+MULTILINGUAL_COLLECTION = "medical_knowledge_multilingual"
+
+logger = logging.getLogger("health_assistant")
+
+
+def get_multilingual_embedding_function(model_name: str = MULTILINGUAL_EMBEDDING_MODEL):
+    """
+    Chroma embedding function for the multilingual model
+
+    Embeddings are normalised so squared L2 distances are on the same 0-4 scale
+    as the main collection (planner.PREFILTER_MAX_DISTANCE applies to both).
+    """
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+    return SentenceTransformerEmbeddingFunction(model_name=model_name, normalize_embeddings=True)
+
+
+def open_multilingual_collection(client, embedding_function=None, model_name: str = MULTILINGUAL_EMBEDDING_MODEL):
+    """Existing multilingual collection, or None if it is missing or was built with another model"""
+    try:
+        collection = client.get_collection(
+            MULTILINGUAL_COLLECTION,
+            embedding_function=embedding_function or get_multilingual_embedding_function(model_name),
+        )
+    except Exception as e:
+        logger.warning(f"Multilingual collection unavailable: {e}")
+        return None
+    built_with = (collection.metadata or {}).get("embedding_model")
+    if built_with != model_name:
+        logger.warning(f"Multilingual collection was built with {built_with}, not {model_name}; rebuild the index")
+        return None
+    return collection
+
+
+def sync_multilingual_collection(
+    source,
+    client,
+    embedding_function=None,
+    model_name: str = MULTILINGUAL_EMBEDDING_MODEL,
+    batch_size: int = 64,
+) -> Dict[str, int]:
+    """
+    Mirror the chunks of ``source`` into the multilingual collection
+
+    Args:
+        source: Main (English-embedded) Chroma collection
+        client: Chroma client that owns the multilingual collection
+        embedding_function: Override the multilingual embedding function
+        model_name: Model name recorded on the collection
+        batch_size: Texts per embedding call
+
+    Returns:
+        Counts of upserted, deleted and total chunks
+    """
+    embedding_function = embedding_function or get_multilingual_embedding_function(model_name)
+    metadata = {"description": "Medical knowledge base (multilingual embeddings)", "embedding_model": model_name}
+    try:
+        target = client.get_collection(MULTILINGUAL_COLLECTION, embedding_function=embedding_function)
+        if (target.metadata or {}).get("embedding_model") != model_name:
+            client.delete_collection(MULTILINGUAL_COLLECTION)
+            target = None
+    except Exception:
+        target = None
+    if target is None:
+        target = client.create_collection(MULTILINGUAL_COLLECTION, metadata=metadata, embedding_function=embedding_function)
+
+    wanted = source.get(include=["documents", "metadatas"])
+    existing = target.get(include=["documents", "metadatas"])
+    current = {
+        chunk_id: (document, chunk_metadata)
+        for chunk_id, document, chunk_metadata in zip(existing["ids"], existing["documents"], existing["metadatas"])
+    }
+
+    changed: List[int] = [
+        i for i, chunk_id in enumerate(wanted["ids"])
+        if current.get(chunk_id) != (wanted["documents"][i], wanted["metadatas"][i])
+    ]
+    stale = sorted(set(current) - set(wanted["ids"]))
+    if stale:
+        target.delete(ids=stale)
+
+    for start in range(0, len(changed), batch_size):
+        batch = changed[start:start + batch_size]
+        documents = [wanted["documents"][i] for i in batch]
+        target.upsert(
+            ids=[wanted["ids"][i] for i in batch],
+            embeddings=embedding_function(documents),
+            documents=documents,
+            metadatas=[wanted["metadatas"][i] for i in batch],
+        )
+
+    return {"upserted": len(changed), "deleted": len(stale), "total": target.count()}
+
+
+def format_query_results(results: Dict) -> List[Dict]:
+    """Rows of a single-query ``collection.query`` result as (id, document, metadata, distance) dicts"""
+    def first(key: str) -> list:
+        values = results.get(key) or []
+        return values[0] if values and isinstance(values[0], list) else []
+
+    ids, documents, metadatas, distances = first("ids"), first("documents"), first("metadatas"), first("distances")
+    return [
+        {
+            "id": chunk_id,
+            "document": documents[i] if i < len(documents) else "",
+            "metadata": metadatas[i] if i < len(metadatas) and isinstance(metadatas[i], dict) else {},
+            "distance": float(distances[i]) if i < len(distances) else None,
+        }
+        for i, chunk_id in enumerate(ids)
+    ]
+
+
+def query_multilingual(collection, query: str, k: int, where: Optional[Dict] = None) -> List[Dict]:
+    """Nearest chunks to an untranslated query"""
+    query_args = {"where": where} if where else {}
+    results = collection.query(
+        query_texts=[query],
+        n_results=k,
+        include=["documents", "metadatas", "distances"],
+        **query_args,
+    )
+    return format_query_results(results)
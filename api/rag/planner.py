@@ -0,0 +1,176 @@
+"""
+Retrieval planning: restrict a query to the knowledge-base categories that can apply.
+
+Chunks carry the folder they came from as ``category`` (peds, pregnancy,
+Sexual_Health_Women, mentalhealth, ...). plan_retrieval() turns the user's
+Profile and the safety signals of the current message into a Chroma ``where``
+filter on that field, e.g. no pregnancy or women's-health pages for a male
+user, no adult reproductive-health pages for a child, and a focus on mental
+health and triage pages during a crisis. retrieve() applies it as a Chroma
+``where`` clause, or as a precomputed per-category row subset for the NumPy and
+BM25 indexes, and falls back to a global search when the filtered results are
+weak.
+
+Filters only ever use the shape ``{"category": {"$in" | "$nin": [...]}}``;
+two-stage retrieval (doc_index.py) adds ``{"source": {"$in": [...]}}`` filters
+of the same shape for the chunk stage.
+"""
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Set to 0 to always search the whole knowledge base
+RAG_PREFILTER = os.getenv("RAG_PREFILTER", "1").strip().lower() in ("1", "true", "yes")
+# Filtered results weaker than this fall back to a global search
+PREFILTER_MAX_DISTANCE = float(os.getenv("PREFILTER_MAX_DISTANCE", "1.2"))  # dense (squared L2 of unit vectors)
+PREFILTER_MIN_BM25_SCORE = float(os.getenv("PREFILTER_MIN_BM25_SCORE", "4.0"))  # sparse
+
+PREGNANCY = "pregnancy"
+WOMENS_HEALTH = "Sexual_Health_Women"
+MENS_HEALTH = "Sexual_Health_Men"
+PEDIATRICS = "peds"
+# Categories searched during a mental-health crisis
+CRISIS_FOCUS = ("mentalhealth", "Triage", "general", "firstaid")
+
+# Words for a child, and ages under 18 ("my 5 year old", "a 3-yr-old", "8 month old")
+_CHILD_RE = re.compile(
+    r"\b(child|children|kid|kids|baby|babies|infant|toddler|newborn|son|daughter|"
+    r"bachch?a|bacche|baccha|beti)\b"
+    r"|\b(?:1[0-7]|[0-9])[\s-]*(?:years?|yrs?)[\s-]*old\b"
+    r"|\b\d{1,2}[\s-]*(?:months?|weeks?)[\s-]*old\b",
+    re.IGNORECASE,
+)
+
+
+def plan_retrieval(profile: Any = None, query: str = "", signals: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+    """
+    Category filter for one retrieval, or None to search everything
+
+    Args:
+        profile: models.Profile (age, sex, pregnancy) or None
+        query: English query text (checked for mentions of a child)
+        signals: Signals for the message: "mental_health" (detect_mental_health_crisis),
+            "pregnancy" (detect_pregnancy_emergency) and "route" (router.route_query)
+
+    Returns:
+        Chroma where filter on "category"
+    """
+    if not RAG_PREFILTER:
+        return None
+    signals = signals or {}
+    if (signals.get("mental_health") or {}).get("crisis"):
+        return {"category": {"$in": list(CRISIS_FOCUS)}}
+
+    age = getattr(profile, "age", None)
+    sex = getattr(profile, "sex", None)
+    pregnant = _is_pregnant(profile, signals)
+
+    exclude = set()
+    if sex == "male":
+        exclude.update((PREGNANCY, WOMENS_HEALTH))
+    elif sex == "female":
+        exclude.add(MENS_HEALTH)
+    if age is not None and age < 12:
+        exclude.update((PREGNANCY, WOMENS_HEALTH, MENS_HEALTH))
+    if age is not None and age >= 18 and not _CHILD_RE.search(query or ""):
+        # Adults asking about a child still get pediatric pages
+        exclude.add(PEDIATRICS)
+    if pregnant:
+        exclude.discard(PREGNANCY)
+
+    if not exclude:
+        return None
+    return {"category": {"$nin": sorted(exclude)}}
+
+
+def _is_pregnant(profile: Any, signals: Dict[str, Any]) -> bool:
+    route_terms = (signals.get("route") or {}).get("matched", {})
+    return (
+        bool(getattr(profile, "pregnancy", False))
+        or bool((signals.get("pregnancy") or {}).get("concern"))
+        # e.g. "my wife is pregnant" from a male profile
+        or bool(route_terms.get("pregnancy"))
+    )
+
+
+def profile_class(profile: Any = None, query: str = "", signals: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Who a question is about: "pregnancy", "child" or "adult"
+
+    Uses the same profile fields and signals as plan_retrieval(). None when both
+    pregnancy and a child apply (e.g. a pregnant user asking about their son), so
+    callers that pick pages per class can fall back to search.
+    """
+    signals = signals or {}
+    age = getattr(profile, "age", None)
+    pregnant = _is_pregnant(profile, signals)
+    child = (age is not None and age < 12) or bool(_CHILD_RE.search(query or ""))
+    if pregnant and child:
+        return None
+    if pregnant:
+        return "pregnancy"
+    return "child" if child else "adult"
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict]) -> bool:
+    """Whether one chunk's metadata passes a retrieval filter (always True without a filter)"""
+    if not where:
+        return True
+    field, condition = next(iter(where.items()))
+    value = (metadata or {}).get(field, "general")
+    if "$in" in condition:
+        return value in condition["$in"]
+    if "$nin" in condition:
+        return value not in condition["$nin"]
+    raise ValueError(f"Unsupported retrieval filter: {where}")
+
+
+def category_rows(metadatas: Sequence[Dict[str, Any]], field: str = "category") -> Dict[str, np.ndarray]:
+    """Row indexes of each category (the per-category sub-indexes), or of each value of another metadata field"""
+    rows: Dict[str, List[int]] = {}
+    for row, metadata in enumerate(metadatas):
+        rows.setdefault((metadata or {}).get(field, "general"), []).append(row)
+    return {category: np.asarray(indexes, dtype=np.int64) for category, indexes in rows.items()}
+
+
+def rows_for_where(rows_by_category: Dict[str, np.ndarray], where: Optional[Dict]) -> Optional[np.ndarray]:
+    """
+    Sorted rows matching a filter (None when there is no filter)
+
+    ``rows_by_category`` comes from category_rows() over the field the filter names.
+    """
+    if not where:
+        return None
+    if len(where) != 1:
+        raise ValueError(f"Unsupported retrieval filter: {where}")
+    condition = next(iter(where.values()))
+    if "$in" in condition:
+        categories: Iterable[str] = condition["$in"]
+    elif "$nin" in condition:
+        excluded = set(condition["$nin"])
+        categories = [category for category in rows_by_category if category not in excluded]
+    else:
+        raise ValueError(f"Unsupported retrieval filter: {where}")
+    selected = [rows_by_category[category] for category in categories if category in rows_by_category]
+    if not selected:
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.concatenate(selected))
+
+
+def is_weak(results: Sequence[Dict[str, Any]], k: int) -> bool:
+    """
+    Whether filtered results are too few or too dissimilar to trust
+
+    Uses whichever signal the results carry: dense "distance" or "bm25_score".
+    """
+    if len(results) < k:
+        return True
+    distances = [r["distance"] for r in results if r.get("distance") is not None]
+    scores = [r["bm25_score"] for r in results if r.get("bm25_score") is not None]
+    if distances and min(distances) <= PREFILTER_MAX_DISTANCE:
+        return False
+    if scores and max(scores) >= PREFILTER_MIN_BM25_SCORE:
+        return False
+    return bool(distances or scores)
@@ -0,0 +1,449 @@
+"""
+Knowledge-base hot reload with an atomic index swap.
+
+Changing api/rag/data used to mean re-running build_index.py and restarting the
+API, and a rebuild in place could leave retrieve() facing a missing or
+half-written collection. IndexReloader instead builds each new version of the
+index into a directory of its own:
+
+    index_versions/
+        CURRENT                      name of the version being served
+        <version>/chroma_db/         collection and incremental manifest
+        <version>/bm25_index.json
+        <version>/doc_store.json
+        <version>/document_index.json
+        <version>/symptom_routes.json
+        <version>/index_snapshot/    embeddings memory-mapped by RAG_ENGINE=snapshot (see snapshot.py)
+        <version>/version.json       knowledge-base fingerprint and build summary
+
+A build starts from a copy of the served version's chroma_db, so only changed
+chunks are embedded, and the served version keeps answering queries meanwhile.
+The new version is opened, smoke-tested (retriever.validate_index_generation)
+and only then swapped in (retriever.install_index_generation) and published
+through CURRENT. A failed build or validation leaves the served version
+untouched. The previous version stays open and on disk for rollback().
+
+With RAG_HOT_RELOAD=1 the API runs a watcher thread that, every
+RAG_RELOAD_POLL_SECONDS, adopts a version another worker published, rebuilds
+when the markdown changed, and re-ingests the graph CSVs into Neo4j when they
+changed (MERGE is additive, so the live graph stays queryable; triples removed
+from the CSVs still have to be deleted by hand). Builds take a file lock, so
+only one worker builds and the others adopt its version. POST /admin/reload
+and /admin/reload/rollback run the same steps on demand.
+
+Usage (from project root):
+    python -m api.rag.reload [--full] [--force] [--rollback]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from . import retriever
+from .corpus import DATA_DIR, list_markdown_files
+from .ingest import INGEST_WORKERS
+from .multilingual import MULTILINGUAL_RETRIEVAL
+from .snapshot import (
+    CURRENT_NAME,
+    current_version,
+    new_version_name,
+    prune_snapshots,
+    set_current_version,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger("health_assistant")
+
+INDEX_VERSIONS_DIR = retriever.INDEX_VERSIONS_DIR
+GRAPH_FILES = tuple(Path(__file__).parent.parent / "graph" / name for name in ("seed.csv", "symptom_relationships.csv"))
+VERSION_INFO_NAME = "version.json"
+# Fingerprint and problems of the last build that failed validation (not rebuilt until the data changes)
+REJECTED_NAME = "REJECTED"
+# Fingerprint of the graph CSVs last ingested into Neo4j
+GRAPH_NAME = "GRAPH"
+LOCK_NAME = ".build.lock"
+
+# Watch rag/data and the graph CSVs and reload on change (see main.py startup)
+RAG_HOT_RELOAD = os.getenv("RAG_HOT_RELOAD", "0").strip().lower() in ("1", "true", "yes")
+RAG_RELOAD_POLL_SECONDS = float(os.getenv("RAG_RELOAD_POLL_SECONDS", "30"))
+# Versions kept on disk, the served one and the rollback target included
+RAG_RELOAD_KEEP = int(os.getenv("RAG_RELOAD_KEEP", "3"))
+# Reject a version that lost more than this fraction of the served version's chunks
+RAG_RELOAD_MAX_SHRINK = float(os.getenv("RAG_RELOAD_MAX_SHRINK", "0.5"))
+# Reject a version where a smoke query has no dense hit this close. Defaults to the relevance
+# cutoff (RAG_MAX_DISTANCE), which such a version would answer nothing within once served
+RAG_RELOAD_MAX_DISTANCE = float(os.getenv("RAG_RELOAD_MAX_DISTANCE", str(retriever.RAG_MAX_DISTANCE)))
+
+
+def files_fingerprint(paths: Sequence[Path], root: Optional[Path] = None) -> str:
+    """sha256 over the path, size and mtime of each file (cheap enough to poll)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        name = path.relative_to(root).as_posix() if root is not None else path.name
+        digest.update(f"{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def data_fingerprint(data_dir: Path = DATA_DIR) -> str:
+    return files_fingerprint(list_markdown_files(Path(data_dir)), Path(data_dir))
+
+
+def read_version_info(directory: Path) -> Dict[str, Any]:
+    try:
+        with open(Path(directory) / VERSION_INFO_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, payload: Dict[str, Any]):
+    staging = path.with_name(f".{path.name}.tmp")
+    staging.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(staging, path)
+
+
+@contextmanager
+def _build_lock(root: Path):
+    """Non-blocking inter-process lock; yields whether it was acquired"""
+    if fcntl is None:
+        yield True
+        return
+    with open(Path(root) / LOCK_NAME, "a") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _chunk_count(generation: Dict[str, Any]) -> Optional[int]:
+    collection = generation.get("collection")
+    if collection is None:
+        return None
+    try:
+        return collection.count()
+    except Exception:
+        return None
+
+
+class IndexReloader:
+    """Builds, validates, swaps in and rolls back knowledge-base index versions"""
+
+    def __init__(
+        self,
+        root: Path = INDEX_VERSIONS_DIR,
+        data_dir: Path = DATA_DIR,
+        graph_files: Sequence[Path] = GRAPH_FILES,
+        embedding_function=None,
+        queries: Optional[List[str]] = None,
+        keep: int = RAG_RELOAD_KEEP,
+        workers: int = INGEST_WORKERS,
+        max_distance: float = RAG_RELOAD_MAX_DISTANCE,
+    ):
+        self.root = Path(root)
+        self.data_dir = Path(data_dir)
+        self.graph_files = tuple(graph_files)
+        self.embedding_function = embedding_function
+        self.queries = queries
+        self.keep = keep
+        self.workers = workers
+        self.max_distance = max_distance
+        # Called with the new generation after every swap (e.g. to drop cached answers)
+        self.on_swap: List[Callable[[Dict[str, Any]], Any]] = []
+        self.last_result: Dict[str, Any] = {}
+        self._lock = threading.Lock()  # one build/swap at a time in this process
+        self._previous: Optional[Dict[str, Any]] = None  # rollback target, still open
+        self._seen_fingerprint: Optional[str] = None
+        self._rejected_versions = set()  # published versions that failed validation here
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # -- building and swapping ------------------------------------------------
+
+    def reload(self, full: bool = False, force: bool = False) -> Dict[str, Any]:
+        """
+        Build a new version from rag/data, validate it and serve it
+
+        Args:
+            full: Re-embed every chunk instead of copying the served collection
+            force: Build even if the knowledge base has not changed
+
+        Returns:
+            Outcome with a status of "reloaded", "unchanged", "rejected", "busy" or "failed"
+        """
+        return self._exclusive(lambda: self._reload(full, force))
+
+    def adopt(self, version: str) -> Dict[str, Any]:
+        """Serve a version built elsewhere (another worker or the CLI) after validating it"""
+        return self._exclusive(lambda: self._activate(self.root / version, publish=False))
+
+    def rollback(self) -> Dict[str, Any]:
+        """Serve the previous version again (rolling back twice rolls forward)"""
+        return self._exclusive(self._rollback)
+
+    def _exclusive(self, action: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        if not self._lock.acquire(blocking=False):
+            return {"status": "busy"}
+        start = time.perf_counter()
+        try:
+            result = action()
+        except Exception as e:
+            logger.error(f"Index reload failed: {e}", exc_info=True)
+            result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self._lock.release()
+        result["seconds"] = round(time.perf_counter() - start, 2)
+        self.last_result = result
+        logger.info(f"Index reload: {result}")
+        return result
+
+    def _reload(self, full: bool, force: bool) -> Dict[str, Any]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fingerprint = data_fingerprint(self.data_dir)
+        served = retriever.get_index_version()
+        if not force and served is not None and read_version_info(self.root / served).get("fingerprint") == fingerprint:
+            return {"status": "unchanged", "version": served}
+        rejected = _read_json(self.root / REJECTED_NAME)
+        if not force and rejected.get("fingerprint") == fingerprint:
+            return {"status": "rejected", "version": rejected.get("version"), "problems": rejected.get("problems", [])}
+
+        with _build_lock(self.root) as acquired:
+            if not acquired:
+                return {"status": "busy"}  # another worker is building; the watcher adopts its version
+            directory, summary = self._build(fingerprint, full)
+            result = self._activate(directory)
+        if result["status"] == "rejected":
+            _write_json(self.root / REJECTED_NAME, {"fingerprint": fingerprint, **result})
+            shutil.rmtree(directory, ignore_errors=True)
+        return {**result, "build": summary}
+
+    def _build(self, fingerprint: str, full: bool):
+        # build_index.py is also a script (rag.* imports); only load it when a build runs
+        from .build_index import build_index
+
+        version = new_version_name()
+        staging = self.root / f".{version}.tmp"
+        staging.mkdir(parents=True)
+        try:
+            served = retriever.index_paths()
+            if not full and served["chroma"].exists():
+                shutil.copytree(served["chroma"], staging / "chroma_db")
+                if served["document_index"].exists():
+                    # Unchanged documents keep their embeddings
+                    shutil.copy2(served["document_index"], staging / "document_index.json")
+            summary = build_index(
+                full=full,
+                data_dir=self.data_dir,
+                chroma_path=staging / "chroma_db",
+                bm25_path=staging / "bm25_index.json",
+                doc_store_path=staging / "doc_store.json",
+                document_index_path=staging / "document_index.json",
+                symptom_routes_path=staging / "symptom_routes.json",
+                # Memory-mapped by RAG_ENGINE=snapshot workers serving this version
+                snapshot_path=staging / "index_snapshot" if retriever.RAG_ENGINE == "snapshot" else None,
+                embedding_function=self.embedding_function,
+                workers=self.workers,
+                multilingual=MULTILINGUAL_RETRIEVAL,
+            )
+            _write_json(staging / VERSION_INFO_NAME, {"version": version, "fingerprint": fingerprint, "build": summary})
+            os.replace(staging, self.root / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return self.root / version, summary
+
+    def _activate(self, directory: Path, publish: bool = True) -> Dict[str, Any]:
+        """Open, validate and swap in a built version"""
+        generation = retriever.open_index_generation(directory)
+        problems = retriever.validate_index_generation(generation, self.queries, max_distance=self.max_distance)
+        chunks = _chunk_count(generation)
+        served_chunks = _chunk_count(retriever.current_index_generation())
+        if served_chunks and chunks is not None and chunks < served_chunks * (1 - RAG_RELOAD_MAX_SHRINK):
+            problems.append(f"{chunks} chunks, down from {served_chunks}")
+        if problems:
+            retriever.close_index_generation(generation)
+            logger.error(f"Index version {generation['version']} rejected: {problems}")
+            return {"status": "rejected", "version": generation["version"], "problems": problems}
+
+        previous = self._swap(generation, publish)
+        return {
+            "status": "reloaded",
+            "version": generation["version"],
+            "previous_version": previous["version"],
+            "chunks": chunks,
+        }
+
+    def _rollback(self) -> Dict[str, Any]:
+        served = retriever.get_index_version()
+        generation = self._previous
+        if generation is None:
+            # Nothing open (e.g. after a restart): the newest version on disk older than the
+            # served one (names sort by build time), else the newest other one
+            versions = sorted(
+                (entry.name for entry in self.root.iterdir()
+                 if entry.is_dir() and not entry.name.startswith(".") and entry.name != served),
+                key=lambda name: (served is None or name < served, name),
+                reverse=True,
+            ) if self.root.exists() else []
+            if not versions:
+                return {"status": "unavailable", "version": served}
+            generation = retriever.open_index_generation(self.root / versions[0])
+            problems = retriever.validate_index_generation(generation, self.queries, max_distance=self.max_distance)
+            if problems:
+                retriever.close_index_generation(generation)
+                return {"status": "rejected", "version": generation["version"], "problems": problems}
+
+        previous = self._swap(generation, publish=True)
+        # The watcher would otherwise rebuild the data we just rolled away from
+        self._seen_fingerprint = data_fingerprint(self.data_dir)
+        return {"status": "rolled_back", "version": generation["version"], "previous_version": previous["version"]}
+
+    def _swap(self, generation: Dict[str, Any], publish: bool) -> Dict[str, Any]:
+        """Serve generation, publish it through CURRENT and keep what it replaced for rollback"""
+        previous = retriever.install_index_generation(generation)
+        if publish:
+            if generation["version"] is None:
+                (self.root / CURRENT_NAME).unlink(missing_ok=True)  # back to the unversioned build
+            else:
+                set_current_version(generation["version"], self.root)
+        if self._previous is not None and self._previous is not generation:
+            retriever.close_index_generation(self._previous)
+        self._previous = previous
+        if self.root.exists():
+            prune_snapshots(self.root, self.keep, protect=[v for v in (generation["version"], previous["version"]) if v])
+
+        for callback in self.on_swap:
+            try:
+                callback(generation)
+            except Exception as e:
+                logger.warning(f"Index swap callback failed: {e}")
+        return previous
+
+    # -- graph ----------------------------------------------------------------
+
+    def reload_graph(self, force: bool = False) -> Dict[str, Any]:
+        """Re-ingest the graph CSVs into Neo4j if they changed since the last ingest"""
+        from ..graph.client import neo4j_client
+
+        fingerprint = files_fingerprint(self.graph_files)
+        marker = self.root / GRAPH_NAME
+        if not force and _read_json(marker).get("fingerprint") == fingerprint:
+            return {"status": "unchanged"}
+        if not neo4j_client.is_connected():
+            return {"status": "skipped", "reason": "Neo4j not connected"}
+        from ..graph.ingest import ingest_triples
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _build_lock(self.root) as acquired:
+            if not acquired:
+                return {"status": "busy"}
+            ingest_triples()
+            _write_json(marker, {"fingerprint": fingerprint})
+        return {"status": "reloaded"}
+
+    # -- watcher --------------------------------------------------------------
+
+    def check(self) -> Optional[Dict[str, Any]]:
+        """
+        One watcher poll: adopt a version published elsewhere, or rebuild if rag/data changed
+
+        Returns:
+            The reload outcome, or None when there was nothing to do
+        """
+        published = current_version(self.root)
+        if published not in (None, retriever.get_index_version()) and published not in self._rejected_versions:
+            result = self.adopt(published)
+            if result["status"] == "rejected":
+                self._rejected_versions.add(published)
+            return result
+
+        fingerprint = data_fingerprint(self.data_dir)
+        if self._seen_fingerprint is None:
+            served = retriever.get_index_version()
+            self._seen_fingerprint = read_version_info(self.root / served).get("fingerprint") if served else fingerprint
+        if fingerprint == self._seen_fingerprint:
+            return None
+        result = self.reload()
+        if result["status"] != "busy":
+            self._seen_fingerprint = fingerprint
+        return result
+
+    def _watch(self, poll_seconds: float):
+        while not self._stop.wait(poll_seconds):
+            try:
+                self.check()
+                graph = self.reload_graph()
+                if graph["status"] == "reloaded":
+                    logger.info("Graph CSVs re-ingested into Neo4j")
+            except Exception as e:
+                logger.error(f"Knowledge-base watcher error: {e}", exc_info=True)
+
+    def start(self, poll_seconds: float = RAG_RELOAD_POLL_SECONDS) -> threading.Thread:
+        """Poll the knowledge base on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._watch, args=(poll_seconds,), name="knowledge-base-watcher", daemon=True
+            )
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "version": retriever.get_index_version(),
+            "published": current_version(self.root),
+            "rollback_version": self._previous["version"] if self._previous else None,
+            "watching": self._thread is not None and self._thread.is_alive(),
+            "reloading": self._lock.locked(),
+            "last_result": self.last_result,
+        }
+
+
+# Global reloader; main.py starts its watcher (RAG_HOT_RELOAD) and exposes /admin/reload
+index_reloader = IndexReloader()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="Re-embed every chunk")
+    parser.add_argument("--force", action="store_true", help="Build even if rag/data has not changed")
+    parser.add_argument("--rollback", action="store_true", help="Publish the previous version instead")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = index_reloader.rollback() if args.rollback else index_reloader.reload(full=args.full, force=args.force)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
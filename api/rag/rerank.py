@@ -0,0 +1,115 @@
+"""
+Diversity-aware reranking of retrieved chunks.
+
+retrieve() over-fetches candidates and this module picks the final chunks by
+maximal marginal relevance (MMR): each pick maximises
+
+    lambda * relevance - (1 - lambda) * max similarity to the chunks already picked
+
+with at most MAX_CHUNKS_PER_SOURCE chunks per file, and candidates that nearly
+duplicate an already picked chunk (adjacent overlapping chunks, or the same page
+filed under two folders such as firstaid/burns.md and
+Skin_Allergies/burns-first-aid.md) are dropped. Dropped chunks are not
+backfilled from the low-relevance tail of the candidates, so the result is
+fewer, more diverse chunks and fewer prompt tokens spent on repeated text.
+
+Similarity between candidates is the cosine of their term-frequency vectors
+(BM25 tokenization), so reranking works the same for dense, sparse and hybrid
+results and needs no extra embedding lookups.
+"""
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from .bm25 import tokenize
+
+# "mmr" (default) or "off"
+RAG_RERANK = os.getenv("RAG_RERANK", "mmr").strip().lower()
+# Candidates fetched before reranking, as a multiple of k
+RERANK_CANDIDATE_MULTIPLIER = int(os.getenv("RERANK_CANDIDATE_MULTIPLIER", "3"))
+# Weight of relevance against novelty (1.0 = plain relevance order)
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+MAX_CHUNKS_PER_SOURCE = int(os.getenv("MAX_CHUNKS_PER_SOURCE", "2"))
+# Candidates at least this similar to a picked chunk are treated as duplicates
+RERANK_DUPLICATE_SIMILARITY = float(os.getenv("RERANK_DUPLICATE_SIMILARITY", "0.5"))
+# Candidates below this relevance are never used to backfill dropped duplicates
+RERANK_MIN_RELEVANCE = float(os.getenv("RERANK_MIN_RELEVANCE", "0.2"))
+
+
+def term_vector(text: str) -> Counter:
+    return Counter(tokenize(text))
+
+
+def cosine_similarity(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def _relevances(results: Sequence[Dict]) -> List[float]:
+    """Relevance in [0, 1]: normalised "score" when results carry one, otherwise rank-based"""
+    scores = [result.get("score") for result in results]
+    if scores and all(isinstance(score, (int, float)) for score in scores):
+        low, high = min(scores), max(scores)
+        if high > low:
+            return [(score - low) / (high - low) for score in scores]
+    n = len(results)
+    return [1.0 - rank / n for rank in range(n)]
+
+
+def mmr_rerank(
+    results: Sequence[Dict],
+    k: int,
+    lambda_: float = MMR_LAMBDA,
+    max_per_source: int = MAX_CHUNKS_PER_SOURCE,
+    duplicate_similarity: Optional[float] = RERANK_DUPLICATE_SIMILARITY,
+    min_relevance: float = RERANK_MIN_RELEVANCE,
+) -> List[Dict]:
+    """
+    Pick up to k diverse chunks from ranked candidates
+
+    Args:
+        results: retrieve() results, best first
+        k: Maximum number of chunks to return
+        lambda_: Relevance/novelty trade-off
+        max_per_source: Cap on chunks from one source file (0 = no cap)
+        duplicate_similarity: Drop candidates at least this similar to a picked chunk (None = keep)
+        min_relevance: Ignore candidates whose relevance (0-1 within the candidates) is lower
+
+    Returns:
+        Picked results in pick order (the top candidate is always first)
+    """
+    if k <= 0 or not results:
+        return []
+
+    relevance = _relevances(results)
+    vectors = [term_vector(result.get("chunk", "")) for result in results]
+    # Highest similarity of each candidate to anything picked so far
+    redundancy = [0.0] * len(results)
+    per_source: Counter = Counter()
+    remaining = [i for i in range(len(results)) if i == 0 or relevance[i] >= min_relevance]
+    picked: List[int] = []
+
+    while remaining and len(picked) < k:
+        best = max(remaining, key=lambda i: lambda_ * relevance[i] - (1.0 - lambda_) * redundancy[i])
+        remaining.remove(best)
+        picked.append(best)
+        source = results[best].get("source")
+        per_source[source] += 1
+
+        survivors = []
+        for i in remaining:
+            if max_per_source and per_source[results[i].get("source")] >= max_per_source:
+                continue
+            redundancy[i] = max(redundancy[i], cosine_similarity(vectors[i], vectors[best]))
+            if duplicate_similarity is not None and redundancy[i] >= duplicate_similarity:
+                continue
+            survivors.append(i)
+        remaining = survivors
+
+    return [results[i] for i in picked]
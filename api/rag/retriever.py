@@ -1,12 +1,28 @@
 import logging
 import os
-import json
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 
 import chromadb
 from chromadb.config import Settings
 
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .corpus import load_corpus
+from .doc_index import DOCUMENT_INDEX_PATH, DocumentIndex
+from .doc_store import DOC_STORE_PATH, DocStore, chunk_citations, parse_reference_sources
+from .embedding_batcher import EMBEDDING_BATCHING, EmbeddingBatcher
+from .embedding_cache import query_embedding_cache
+from .multilingual import MULTILINGUAL_RETRIEVAL, open_multilingual_collection, query_multilingual
+from .planner import category_rows, is_weak, rows_for_where
+from .rerank import RAG_RERANK, RERANK_CANDIDATE_MULTIPLIER, mmr_rerank
+from .snapshot import SNAPSHOT_DIR, current_version, export_collection_snapshot, load_snapshot
+from .symptom_routes import RAG_SYMPTOM_ROUTES, SYMPTOM_ROUTES_PATH, SymptomRouteTable
+from .tokens import count_tokens, tokenizer_name
+from .vector_index import build_numpy_index
+
 os.environ.setdefault("CHROMADB_DISABLE_TELEMETRY", "1")
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
 
@@ -14,11 +30,113 @@ logging.getLogger("chromadb.telemetry").setLevel(logging.CRITICAL)
 logging.getLogger("chromadb.telemetry.telemetry").setLevel(logging.CRITICAL)
 logging.getLogger("chromadb.telemetry.product").setLevel(logging.CRITICAL)
 
+# Retrieval engine: "chroma" queries the collection directly, "numpy" loads all chunk
+# embeddings into an in-process matrix (see vector_index.py) and only uses Chroma to load them,
+# "snapshot" memory-maps the index snapshot written by build_index.py (see snapshot.py) and
+# never opens Chroma, so uvicorn workers share one copy of the embeddings
+RAG_ENGINE = os.getenv("RAG_ENGINE", "chroma").strip().lower()
+
+# Default retrieve() mode: "dense" (vectors), "sparse" (BM25) or "hybrid" (both, fused by RRF)
+RETRIEVAL_MODES = ("dense", "sparse", "hybrid")
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "dense").strip().lower()
+# Candidates taken from each ranker before fusion, as a multiple of k
+HYBRID_CANDIDATE_MULTIPLIER = int(os.getenv("HYBRID_CANDIDATE_MULTIPLIER", "4"))
+# Token budget for the retrieved context packed into the prompt
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "1500"))
+# Relevance cutoff: hits farther than RAG_MAX_DISTANCE (dense, squared L2 of unit vectors)
+# and scoring below RAG_MIN_BM25_SCORE (sparse) are dropped, so retrieve() returns up to k
+# chunks and [] for queries the knowledge base does not cover. Both defaults are loose on
+# purpose: recalibrate with the "cutoff" section of benchmarks/bench_retrieval.py when the
+# corpus or embedding model changes
+RAG_RELEVANCE_CUTOFF = os.getenv("RAG_RELEVANCE_CUTOFF", "1").strip().lower() in ("1", "true", "yes")
+# Cosine similarity 0.2 for unit vectors; weaker matches are off-topic for MiniLM
+RAG_MAX_DISTANCE = float(os.getenv("RAG_MAX_DISTANCE", "1.6"))
+# Keeps the top hit of 99% of the benchmark's labeled queries
+RAG_MIN_BM25_SCORE = float(os.getenv("RAG_MIN_BM25_SCORE", "4.0"))
+# Two-stage retrieval: pick the TWO_STAGE_DOCUMENTS best documents from the document index
+# (see doc_index.py), then search only their chunks; searches are flat while the index is missing.
+# Pays off on large corpora with the numpy and snapshot engines
+RAG_TWO_STAGE = os.getenv("RAG_TWO_STAGE", "0").strip().lower() in ("1", "true", "yes")
+TWO_STAGE_DOCUMENTS = int(os.getenv("TWO_STAGE_DOCUMENTS", "8"))
+# Prebuilt BM25 artifact written by build_index.py; rebuilt from rag/data when missing
+BM25_INDEX_PATH = Path(__file__).parent / "bm25_index.json"
+CHROMA_PATH = Path(__file__).parent / "chroma_db"
+# Index versions built by hot reload (see reload.py); once one exists, its CURRENT version
+# is served instead of chroma_db, bm25_index.json and doc_store.json
+INDEX_VERSIONS_DIR = Path(__file__).parent / "index_versions"
+
 # Cached ChromaDB client and collection for performance optimization
 _chroma_client = None
 _chroma_collection = None
 _chroma_initialized = False
 
+# Cached NumPy index and query embedding function
+_numpy_index = None
+_embedding_function = None
+_embedding_batcher = None
+
+# Cached BM25 index (sparse and hybrid modes)
+_bm25_index = None
+
+# Chunk id -> pre-parsed metadata, citations and summary (loaded at startup)
+_doc_store = None
+
+# Document-level index for two-stage retrieval; opened once
+_document_index = None
+_document_index_initialized = False
+
+# Symptom -> precomputed chunks (see symptom_routes.py); opened once
+_symptom_routes = None
+_symptom_routes_initialized = False
+
+# Multilingual mirror of the collection (untranslated queries); opened once
+_multilingual_collection = None
+_multilingual_initialized = False
+
+# Index -> {field: {value: row indexes}}, the per-category (and per-source) sub-indexes used by where filters
+_category_rows = weakref.WeakKeyDictionary()
+
+# Index version being served; read from index_versions/CURRENT on first use, then only
+# changed by install_index_generation() so every component comes from the same build
+_index_version = None
+_index_version_resolved = False
+_swap_lock = threading.Lock()
+
+
+def get_index_version() -> Optional[str]:
+    """Version of the index being served (None for the unversioned chroma_db build)"""
+    global _index_version, _index_version_resolved
+    
+    if not _index_version_resolved:
+        _index_version = current_version(INDEX_VERSIONS_DIR)
+        _index_version_resolved = True
+    return _index_version
+
+
+def index_paths(directory: Optional[Path] = None) -> Dict[str, Path]:
+    """Paths of the indexes and artifacts of an index version directory (default: the one served)"""
+    if directory is None:
+        version = get_index_version()
+        if version is None:
+            return {
+                "chroma": CHROMA_PATH,
+                "bm25": BM25_INDEX_PATH,
+                "doc_store": DOC_STORE_PATH,
+                "document_index": DOCUMENT_INDEX_PATH,
+                "symptom_routes": SYMPTOM_ROUTES_PATH,
+                "snapshot": SNAPSHOT_DIR,
+            }
+        directory = INDEX_VERSIONS_DIR / version
+    directory = Path(directory)
+    return {
+        "chroma": directory / "chroma_db",
+        "bm25": directory / "bm25_index.json",
+        "doc_store": directory / "doc_store.json",
+        "document_index": directory / "document_index.json",
+        "symptom_routes": directory / "symptom_routes.json",
+        "snapshot": directory / "index_snapshot",
+    }
+
 
 def _initialize_chroma():
     """Initialize ChromaDB client and collection (cached for performance)"""
@@ -28,9 +146,7 @@ def _initialize_chroma():
         return _chroma_client, _chroma_collection
     
     try:
-        # Get the correct path
-        script_dir = Path(__file__).parent
-        chroma_path = script_dir / "chroma_db"
+        chroma_path = index_paths()["chroma"]
         
         # Initialize Chroma client (only once)
         _chroma_client = chromadb.PersistentClient(
@@ -63,22 +179,679 @@ def _initialize_chroma():
     return _chroma_client, _chroma_collection
 
 
+def _initialize_numpy_index():
+    """Load the in-process NumPy index from the snapshot or the Chroma collection (cached)"""
+    global _numpy_index
+    
+    if _numpy_index is not None:
+        return _numpy_index
+    
+    if RAG_ENGINE == "snapshot":
+        try:
+            _numpy_index = load_snapshot(index_paths()["snapshot"])
+            return _numpy_index
+        except (FileNotFoundError, ValueError) as e:
+            logging.warning(f"Index snapshot unavailable ({e}); loading embeddings from Chroma instead")
+    
+    _, collection = _initialize_chroma()
+    if collection is None:
+        return None
+    
+    _numpy_index = build_numpy_index(collection)
+    return _numpy_index
+
+
+def _initialize_bm25_index() -> Optional[BM25Index]:
+    """Load the BM25 index from its artifact, or build it from rag/data (cached)"""
+    global _bm25_index
+    
+    if _bm25_index is not None:
+        return _bm25_index
+    
+    start = time.perf_counter()
+    path = index_paths()["bm25"]
+    try:
+        if path.exists():
+            _bm25_index = BM25Index.load(path)
+        else:
+            _bm25_index = BM25Index.from_rows(load_corpus())
+            logging.info(
+                f"Built BM25 index from rag/data: {len(_bm25_index)} chunks in "
+                f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+    except Exception as e:
+        logging.error(f"Failed to initialize BM25 index: {e}", exc_info=True)
+        _bm25_index = None
+    return _bm25_index
+
+
+def _initialize_doc_store() -> Optional[DocStore]:
+    """Load the doc store artifact, or derive it from the Chroma collection (cached)"""
+    global _doc_store
+    
+    if _doc_store is not None:
+        return _doc_store
+    
+    start = time.perf_counter()
+    path = index_paths()["doc_store"]
+    try:
+        if path.exists():
+            _doc_store = DocStore.load(path)
+        elif RAG_ENGINE == "snapshot" and _initialize_numpy_index() is not None:
+            # The snapshot carries the same chunks; no need to open Chroma
+            _doc_store = DocStore.from_chunks(_numpy_index.ids, _numpy_index.documents, _numpy_index.metadatas)
+        else:
+            # Derive from the collection rather than rag/data so entries match the indexed chunks
+            _, collection = _initialize_chroma()
+            if collection is None:
+                return None
+            data = collection.get(include=["documents", "metadatas"])
+            _doc_store = DocStore.from_chunks(data["ids"], data["documents"], data["metadatas"])
+        logging.info(f"Doc store ready: {len(_doc_store)} chunks in {(time.perf_counter() - start) * 1000:.0f}ms")
+    except Exception as e:
+        logging.error(f"Failed to initialize doc store: {e}", exc_info=True)
+        _doc_store = None
+    return _doc_store
+
+
+def _initialize_document_index() -> Optional[DocumentIndex]:
+    """Load the document index artifact (cached; None when build_index.py has not written one)"""
+    global _document_index, _document_index_initialized
+    
+    if _document_index_initialized:
+        return _document_index
+    _document_index_initialized = True
+    path = index_paths()["document_index"]
+    try:
+        if path.exists():
+            _document_index = DocumentIndex.load(path)
+        else:
+            logging.warning(f"Document index {path} not found; two-stage retrieval searches all chunks")
+    except Exception as e:
+        logging.error(f"Failed to load document index: {e}", exc_info=True)
+        _document_index = None
+    return _document_index
+
+
+def _initialize_symptom_routes() -> Optional[SymptomRouteTable]:
+    """Load the symptom routes artifact (cached; None when disabled or not built)"""
+    global _symptom_routes, _symptom_routes_initialized
+    
+    if _symptom_routes_initialized or not RAG_SYMPTOM_ROUTES:
+        return _symptom_routes
+    _symptom_routes_initialized = True
+    path = index_paths()["symptom_routes"]
+    try:
+        if path.exists():
+            _symptom_routes = SymptomRouteTable.load(path)
+        else:
+            logging.warning(f"Symptom routes {path} not found; symptom messages go through retrieval")
+    except Exception as e:
+        logging.error(f"Failed to load symptom routes: {e}", exc_info=True)
+        _symptom_routes = None
+    return _symptom_routes
+
+
+def _get_embedding_function():
+    """Embedding function used for queries; same default model the collection was built with"""
+    global _embedding_function
+    
+    if _embedding_function is None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        _embedding_function = DefaultEmbeddingFunction()
+    return _embedding_function
+
+
+def _embed_texts(texts: List[str]):
+    """Run the embedding model on a list of texts"""
+    return _get_embedding_function()(texts)
+
+
+def warm_embedding_model():
+    """Load the query embedding model(s) and run once (their runtime sessions are created on first use)"""
+    _embed_texts(["warmup"])
+    collection = _initialize_multilingual_collection()
+    if collection is not None:
+        query_multilingual(collection, "warmup", 1)
+
+
+def _get_embedding_batcher() -> EmbeddingBatcher:
+    """Micro-batcher that encodes concurrent queries together on a worker thread"""
+    global _embedding_batcher
+    
+    if _embedding_batcher is None:
+        _embedding_batcher = EmbeddingBatcher(_embed_texts)
+    return _embedding_batcher
+
+
+def _embed_uncached(query: str):
+    """Run the embedding model on a single query string (batched with concurrent queries)"""
+    if EMBEDDING_BATCHING:
+        return _get_embedding_batcher().embed(query)
+    return _embed_texts([query])[0]
+
+
+def embed_query(query: str):
+    """Embed a single query string, going through the query-embedding cache"""
+    return query_embedding_cache.get_or_compute(query, _embed_uncached)
+
+
+def get_embedding_cache_statistics() -> Dict:
+    """Hit rate and time saved by the query-embedding cache"""
+    return query_embedding_cache.get_statistics()
+
+
+def get_embedding_batcher_statistics() -> Dict:
+    """Batch-size distribution and queue delay of the embedding batcher"""
+    if _embedding_batcher is None:
+        return {"enabled": EMBEDDING_BATCHING, "batches": 0}
+    return {"enabled": EMBEDDING_BATCHING, **_embedding_batcher.get_statistics()}
+
+
+def get_chroma_client():
+    """Cached Chroma client (None if the collection could not be opened, or not opened by the snapshot engine)"""
+    if RAG_ENGINE == "snapshot":
+        return _chroma_client
+    client, _ = _initialize_chroma()
+    return client
+
+
+def _initialize_multilingual_collection():
+    """Open the multilingual collection once (None when disabled or unavailable)"""
+    global _multilingual_collection, _multilingual_initialized
+    
+    if _multilingual_initialized or not MULTILINGUAL_RETRIEVAL:
+        return _multilingual_collection
+    _multilingual_initialized = True
+    try:
+        client = _chroma_client or chromadb.PersistentClient(
+            path=str(index_paths()["chroma"]),
+            settings=Settings(anonymized_telemetry=False),
+        )
+        _multilingual_collection = open_multilingual_collection(client)
+    except Exception as e:
+        logging.warning(f"Multilingual retrieval disabled: {e}")
+        _multilingual_collection = None
+    return _multilingual_collection
+
+
+def multilingual_retrieval_available() -> bool:
+    """Whether untranslated queries can be searched (MULTILINGUAL_RETRIEVAL and the collection exists)"""
+    return _initialize_multilingual_collection() is not None
+
+
 def initialize_chroma_client():
-    """Public function to pre-initialize ChromaDB on startup"""
-    _initialize_chroma()
+    """Public function to pre-initialize ChromaDB (and the NumPy / BM25 indexes if used) on startup"""
+    if RAG_ENGINE != "snapshot":
+        _initialize_chroma()
+    if RAG_ENGINE in ("numpy", "snapshot"):
+        _initialize_numpy_index()
+    if RAG_RETRIEVAL_MODE in ("sparse", "hybrid"):
+        _initialize_bm25_index()
+    if RAG_TWO_STAGE:
+        _initialize_document_index()
+    _initialize_symptom_routes()
+    _initialize_doc_store()
+
+
+def open_index_generation(directory: Path) -> Dict[str, Any]:
+    """
+    Open every index of a built version without touching the ones being served
+
+    Args:
+        directory: Version directory written by reload.py (chroma_db, bm25_index.json, doc_store.json)
+
+    Returns:
+        The version's client, collection, NumPy index (built from the collection for
+        the numpy engine, memory-mapped from the version's snapshot for the snapshot engine),
+        BM25 index, doc store, document index and symptom routes (when built)
+        and multilingual collection, for validate/install_index_generation()
+    """
+    directory = Path(directory)
+    paths = index_paths(directory)
+    document_index = paths["document_index"]
+    symptom_routes = paths["symptom_routes"]
+    client = chromadb.PersistentClient(path=str(paths["chroma"]), settings=Settings(anonymized_telemetry=False))
+    collection = client.get_collection("medical_knowledge")
+    numpy_index = None
+    if RAG_ENGINE == "snapshot":
+        if current_version(paths["snapshot"]) is None:
+            # Built before the snapshot engine was enabled
+            export_collection_snapshot(collection, paths["snapshot"])
+        numpy_index = load_snapshot(paths["snapshot"])
+    elif RAG_ENGINE == "numpy":
+        numpy_index = build_numpy_index(collection)
+    return {
+        "version": directory.name,
+        "client": client,
+        "collection": collection,
+        "numpy_index": numpy_index,
+        "bm25_index": BM25Index.load(paths["bm25"]),
+        "doc_store": DocStore.load(paths["doc_store"]),
+        "document_index": DocumentIndex.load(document_index) if document_index.exists() else None,
+        "symptom_routes": SymptomRouteTable.load(symptom_routes) if symptom_routes.exists() else None,
+        "multilingual_collection": open_multilingual_collection(client) if MULTILINGUAL_RETRIEVAL else None,
+    }
+
+
+def validate_index_generation(
+    generation: Dict[str, Any],
+    queries: Optional[List[str]] = None,
+    k: int = 4,
+    max_distance: Optional[float] = None,
+) -> List[str]:
+    """
+    Smoke-test an opened index version before it is served
+
+    Every component must hold the same chunks, and every query must get k dense
+    hits, at least one within max_distance (default: RAG_MAX_DISTANCE), and a BM25 hit.
+
+    Returns:
+        Problems found; empty when the version is fit to serve
+    """
+    if max_distance is None:
+        max_distance = RAG_MAX_DISTANCE
+    problems = []
+    collection = generation["collection"]
+    count = collection.count()
+    if count == 0:
+        return ["collection is empty"]
+    for name in ("numpy_index", "bm25_index", "doc_store"):
+        component = generation.get(name)
+        if component is not None and len(component) != count:
+            problems.append(f"{name} has {len(component)} chunks, collection has {count}")
+    document_index = generation.get("document_index")
+    if document_index is not None and generation.get("bm25_index") is not None:
+        sources = {metadata.get("source") for metadata in generation["bm25_index"].metadatas}
+        if set(document_index.ids) != sources:
+            problems.append(f"document_index has {len(document_index)} documents, chunks come from {len(sources)}")
+    symptom_routes = generation.get("symptom_routes")
+    if symptom_routes is not None and generation.get("doc_store") is not None:
+        missing = [chunk_id for chunk_id in symptom_routes.chunks if generation["doc_store"].get(chunk_id) is None]
+        if missing:
+            problems.append(f"symptom routes point to {len(missing)} chunks missing from the index")
+    multilingual = generation.get("multilingual_collection")
+    if multilingual is not None and multilingual.count() != count:
+        problems.append(f"multilingual collection has {multilingual.count()} chunks, collection has {count}")
+
+    for query in queries if queries is not None else TEST_QUERIES:
+        try:
+            embedding = embed_query(query)
+            if generation.get("numpy_index") is not None:
+                distances = generation["numpy_index"].query(embedding, k)["distances"]
+            else:
+                results = collection.query(query_embeddings=[embedding.tolist()], n_results=k, include=["distances"])
+                distances = results["distances"][0]
+            sparse = generation["bm25_index"].search(query, k)
+        except Exception as e:
+            problems.append(f"{query!r}: {type(e).__name__}: {e}")
+            continue
+        if len(distances) < min(k, count):
+            problems.append(f"{query!r}: {len(distances)} dense hits")
+        elif min(distances) > max_distance:
+            problems.append(f"{query!r}: no dense hit within {max_distance} (closest {min(distances):.2f})")
+        if not sparse:
+            problems.append(f"{query!r}: no BM25 hits")
+    return problems
+
+
+def current_index_generation() -> Dict[str, Any]:
+    """The indexes being served, in the shape of open_index_generation()"""
+    return {
+        "version": get_index_version(),
+        "client": _chroma_client,
+        "collection": _chroma_collection,
+        "numpy_index": _numpy_index,
+        "bm25_index": _bm25_index,
+        "doc_store": _doc_store,
+        "document_index": _document_index,
+        "symptom_routes": _symptom_routes,
+        "multilingual_collection": _multilingual_collection,
+    }
+
+
+def install_index_generation(generation: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serve an opened (and validated) index version
+
+    Each engine's index is replaced by a single assignment, so a concurrent
+    retrieve() searches either the old or the new one, never a half-built one.
+    A search that reads the collection before the swap and the doc store after
+    it still succeeds: chunks the doc store does not know are formatted from
+    their metadata (see _format_result).
+
+    Returns:
+        The generation that was being served (for rollback)
+    """
+    global _chroma_client, _chroma_collection, _chroma_initialized, _numpy_index, _bm25_index
+    global _doc_store, _document_index, _document_index_initialized, _symptom_routes, _symptom_routes_initialized
+    global _multilingual_collection, _multilingual_initialized, _index_version, _index_version_resolved
+
+    with _swap_lock:
+        previous = current_index_generation()
+        _chroma_client = generation["client"]
+        _chroma_collection = generation["collection"]
+        _chroma_initialized = _chroma_collection is not None
+        _numpy_index = generation["numpy_index"]
+        _bm25_index = generation["bm25_index"]
+        _doc_store = generation["doc_store"]
+        _document_index = generation.get("document_index")
+        _document_index_initialized = True
+        _symptom_routes = generation.get("symptom_routes")
+        _symptom_routes_initialized = True
+        _multilingual_collection = generation["multilingual_collection"]
+        _multilingual_initialized = True
+        _index_version = generation["version"]
+        _index_version_resolved = True
+    logging.info(f"Serving index version {_index_version}")
+    return previous
+
+
+def close_index_generation(generation: Dict[str, Any]):
+    """Release a generation that is no longer served or kept for rollback"""
+    client = generation.get("client")
+    if client is None or client is _chroma_client:
+        return
+    try:
+        # Chroma caches one system per path for the life of the process; drop this one
+        from chromadb.api.client import SharedSystemClient
+
+        for identifier, system in list(SharedSystemClient._identifier_to_system.items()):
+            if system is client._system:
+                del SharedSystemClient._identifier_to_system[identifier]
+                system.stop()
+    except Exception as e:
+        logging.warning(f"Could not close Chroma client of index version {generation.get('version')}: {e}")
+
+
+def _format_result(chunk: str, chunk_id: str, metadata: Dict) -> Dict:
+    """Shape one retrieved chunk for callers of retrieve()"""
+    # Pre-parsed metadata, citations and summary from the doc store; computed here
+    # only for chunks it does not know (store not loaded, or built before this chunk)
+    entry = _doc_store.get(chunk_id) if _doc_store is not None else None
+    if entry is not None:
+        metadata = entry["metadata"]
+        reference_sources = metadata["reference_sources"]
+        citations = entry["citations"]
+        summary = entry["summary"]
+    else:
+        reference_sources = parse_reference_sources(metadata.get("reference_sources"))
+        citations = chunk_citations(metadata.get("source", metadata.get("source_file", "unknown")), reference_sources)
+        summary = None
+    
+    return {
+        "chunk": chunk,
+        "id": chunk_id,
+        "source": metadata.get("source", metadata.get("source_file", "unknown")),
+        "source_file": metadata.get("source_file", "unknown"),
+        "category": metadata.get("category", "general"),
+        "title": metadata.get("title", metadata.get("topic", "unknown")),
+        "topic": metadata.get("topic", metadata.get("title", "unknown")),
+        "reference_sources": reference_sources,  # Store the actual reference links
+        "citations": citations,
+        # Two-sentence summary for the fallback answer; None when not precomputed
+        "summary": summary,
+        "heading_path": metadata.get("heading_path", ""),
+        # Counted at index time; None for chunks indexed before token counts were stored
+        "token_count": metadata.get("token_count"),
+        "tokenizer": metadata.get("tokenizer"),
+    }
+
+
+def pack_context(results: List[Dict], max_tokens: int = RAG_CONTEXT_TOKENS, separator: str = "\n\n"):
+    """
+    Join retrieved chunks into prompt context within a token budget
+    
+    Chunks are taken in rank order using the token counts stored at index time
+    (recounted when another tokenizer measured them); one that does not fit is skipped so a smaller, lower-ranked one can still be
+    used. The top chunk is always kept.
+    
+    Args:
+        results: retrieve() results, best first
+        max_tokens: Context token budget
+        separator: Text placed between chunks
+        
+    Returns:
+        (context string, the results that were packed)
+    """
+    separator_tokens = count_tokens(separator)
+    tokenizer = tokenizer_name()
+    packed = []
+    used = 0
+    for result in results:
+        tokens = result.get("token_count")
+        if tokens is None or result.get("tokenizer") not in (None, tokenizer):
+            tokens = count_tokens(result["chunk"])
+        cost = tokens + (separator_tokens if packed else 0)
+        if packed and used + cost > max_tokens:
+            continue
+        packed.append(result)
+        used += cost
+    return separator.join(r["chunk"] for r in packed), packed
+
+
+def _rows_for_where(index, where: Optional[Dict]):
+    """Row subset of a NumPy or BM25 index matching a where filter (None = all rows)"""
+    if not where:
+        return None
+    field = next(iter(where))
+    by_field = _category_rows.get(index)
+    if by_field is None:
+        by_field = _category_rows[index] = {}
+    rows = by_field.get(field)
+    if rows is None:
+        rows = by_field[field] = category_rows(index.metadatas, field)
+    return rows_for_where(rows, where)
+
+
+def _retrieve_numpy(query: str, k: int, where: Optional[Dict] = None) -> List[Dict[str, str]]:
+    """retrieve() backed by the in-process NumPy index"""
+    try:
+        index = _initialize_numpy_index()
+        if index is None or len(index) == 0:
+            return []
+        
+        results = index.query(embed_query(query), k, _rows_for_where(index, where))
+        return [
+            {**_format_result(chunk, chunk_id, metadata if isinstance(metadata, dict) else {}), "distance": distance}
+            for chunk, chunk_id, metadata, distance in zip(
+                results["documents"], results["ids"], results["metadatas"], results["distances"]
+            )
+        ]
+    except Exception as e:
+        logging.error(f"NumPy index retrieval error: {e}", exc_info=True)
+        return []
+
+
+def _retrieve_sparse(query: str, k: int, where: Optional[Dict] = None) -> List[Dict[str, str]]:
+    """retrieve() backed by the BM25 index"""
+    index = _initialize_bm25_index()
+    if index is None:
+        return []
+    return [
+        {**_format_result(index.documents[row], index.ids[row], index.metadatas[row]), "bm25_score": score}
+        for row, score in index.search(query, k, _rows_for_where(index, where))
+    ]
+
+
+def _retrieve_hybrid(query: str, k: int, where: Optional[Dict] = None) -> List[Dict[str, str]]:
+    """Dense and BM25 candidates fused by reciprocal rank"""
+    candidates = max(k * HYBRID_CANDIDATE_MULTIPLIER, k)
+    args = (query, candidates, where) if where else (query, candidates)
+    dense = _retrieve_dense(*args)
+    sparse = _retrieve_sparse(*args)
+    
+    by_id = {result["id"]: result for result in sparse}
+    # Keep both signals on chunks found by both rankers
+    by_id.update({result["id"]: {**by_id.get(result["id"], {}), **result} for result in dense})
+    fused = reciprocal_rank_fusion([[r["id"] for r in dense], [r["id"] for r in sparse]])
+    return [by_id[chunk_id] for chunk_id, _ in fused[:k]]
+
 
+def _retrieve_dense(query: str, k: int, where: Optional[Dict] = None) -> List[Dict[str, str]]:
+    """Vector retrieval through the configured engine"""
+    if RAG_ENGINE in ("numpy", "snapshot"):
+        return _retrieve_numpy(query, k, where)
+    return _retrieve_chroma(query, k, where)
 
-def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
+
+def passes_relevance_cutoff(result: Dict) -> bool:
+    """Whether a hit is close enough to keep; hits without scores always pass"""
+    distance = result.get("distance")
+    score = result.get("bm25_score")
+    if distance is None and score is None:
+        return True
+    # Hybrid hits found by both rankers need to pass only one of the two
+    return (distance is not None and distance <= RAG_MAX_DISTANCE) or (score is not None and score >= RAG_MIN_BM25_SCORE)
+
+
+def retrieve(
+    query: str,
+    k: int = 4,
+    mode: Optional[str] = None,
+    rerank: Optional[str] = None,
+    where: Optional[Dict] = None,
+    cutoff: Optional[bool] = None,
+) -> List[Dict[str, str]]:
     """
-    Retrieve relevant chunks from the vector database
+    Retrieve relevant chunks from the knowledge base
+    
+    With RAG_TWO_STAGE, chunks are searched only within the TWO_STAGE_DOCUMENTS
+    documents the document index (doc_index.py) ranks best for the query.
     
     Args:
         query: Search query
-        k: Number of results to return
+        k: Maximum number of results to return
+        mode: "dense", "sparse" or "hybrid"; defaults to RAG_RETRIEVAL_MODE
+        rerank: "mmr" (over-fetch, then pick diverse chunks, see rerank.py) or "off";
+            defaults to RAG_RERANK. With "mmr" fewer than k results may come back.
+        where: Category filter from planner.plan_retrieval(); when the filtered
+            candidates are weak (see planner.is_weak) the whole knowledge base is searched
+        cutoff: Drop hits that fail passes_relevance_cutoff(); defaults to RAG_RELEVANCE_CUTOFF
+        
+    Returns:
+        List of dictionaries with 'chunk' and 'id' keys, plus 'distance' (dense)
+        and/or 'bm25_score' (sparse). Empty when nothing passes the cutoff.
+    """
+    mode = (mode or RAG_RETRIEVAL_MODE).lower()
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    rerank = (rerank or RAG_RERANK).lower()
+    
+    n_candidates = max(k * RERANK_CANDIDATE_MULTIPLIER, k) if rerank == "mmr" else k
+    candidates = _retrieve_mode(query, n_candidates, mode, where)
+    if where and is_weak(candidates, k):
+        logging.info(f"Filtered retrieval too weak for {where}; searching the whole knowledge base")
+        candidates = _retrieve_mode(query, n_candidates, mode)
+    if RAG_RELEVANCE_CUTOFF if cutoff is None else cutoff:
+        candidates = [r for r in candidates if passes_relevance_cutoff(r)]
+    
+    if rerank == "mmr":
+        return mmr_rerank(candidates, k)
+    return candidates
+
+
+def retrieve_by_symptoms(
+    text: str,
+    matched: Dict[str, List[str]],
+    patient_class: Optional[str],
+    k: int = 4,
+    where: Optional[Dict] = None,
+) -> Optional[List[Dict[str, str]]]:
+    """
+    Precomputed chunks for a message that clearly names known symptoms
+    
+    A dictionary lookup in the symptom routes (see symptom_routes.py): no query
+    embedding or vector search.
+    
+    Args:
+        text: English message
+        matched: safety.match_symptom_phrases(text)
+        patient_class: planner.profile_class() for the message
+        k: Maximum number of results
+        where: Planner category filter
         
     Returns:
-        List of dictionaries with 'chunk' and 'id' keys
+        Results shaped like retrieve()'s (without scores), or None when the message
+        is ambiguous or no routes are loaded, so callers fall back to retrieve()
+    """
+    routes = _initialize_symptom_routes()
+    if routes is None:
+        return None
+    rows = routes.lookup(text, matched, patient_class, k, where)
+    if rows is None:
+        return None
+    return [_format_result(row["document"], row["id"], row["metadata"]) for row in rows]
+
+
+def retrieve_multilingual(
+    query: str,
+    k: int = 4,
+    where: Optional[Dict] = None,
+    rerank: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """
+    Retrieve chunks for an untranslated (native-script or romanized) query
+    
+    Searches the multilingual collection (see multilingual.py) with the same
+    where fallback, relevance cutoff and reranking as retrieve(). Returns [] when the collection is
+    unavailable, so callers fall back to translate-then-retrieve().
     """
+    collection = _initialize_multilingual_collection()
+    if collection is None:
+        return []
+    rerank = (rerank or RAG_RERANK).lower()
+    n_candidates = max(k * RERANK_CANDIDATE_MULTIPLIER, k) if rerank == "mmr" else k
+    
+    def search(filter_: Optional[Dict]) -> List[Dict[str, str]]:
+        try:
+            rows = query_multilingual(collection, query, n_candidates, filter_)
+        except Exception as e:
+            logging.error(f"Multilingual retrieval error: {e}", exc_info=True)
+            return []
+        return [
+            {**_format_result(row["document"], row["id"], row["metadata"]), "distance": row["distance"]}
+            for row in rows
+        ]
+    
+    candidates = search(where)
+    if where and is_weak(candidates, k):
+        candidates = search(None)
+    if RAG_RELEVANCE_CUTOFF:
+        candidates = [r for r in candidates if passes_relevance_cutoff(r)]
+    if rerank == "mmr":
+        return mmr_rerank(candidates, k)
+    return candidates
+
+
+def _select_documents(query: str, mode: str, where: Optional[Dict] = None) -> Optional[List[str]]:
+    """First stage of two-stage retrieval: sources of the best documents (None = search all chunks)"""
+    index = _initialize_document_index()
+    if index is None or len(index) == 0:
+        return None
+    query_embedding = embed_query(query) if mode != "sparse" and index.vectors is not None else None
+    return index.search(query, TWO_STAGE_DOCUMENTS, mode, query_embedding, where)
+
+
+def _retrieve_mode(query: str, k: int, mode: str, where: Optional[Dict] = None) -> List[Dict[str, str]]:
+    if RAG_TWO_STAGE:
+        documents = _select_documents(query, mode, where)
+        if documents is not None:
+            if not documents:
+                return []
+            # The document stage applied the category filter; chunks only need the source filter
+            where = {"source": {"$in": documents}}
+    # Unfiltered calls keep the plain (query, k) signature
+    args = (query, k, where) if where else (query, k)
+    if mode == "hybrid":
+        return _retrieve_hybrid(*args)
+    if mode == "sparse":
+        return _retrieve_sparse(*args)
+    return _retrieve_dense(*args)
+
+
+def _retrieve_chroma(query: str, k: int, where: Optional[Dict] = None) -> List[Dict[str, str]]:
+    """retrieve() backed by the Chroma collection"""
     try:
         # Use cached client and collection (initialized on first call or startup)
         chroma_client, collection = _initialize_chroma()
@@ -87,11 +860,14 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
         if chroma_client is None or collection is None:
             return []
         
-        # Query the collection - handle internal ChromaDB errors
+        # Query the collection by (cached) embedding - handle internal ChromaDB errors
         try:
+            query_embedding = embed_query(query)
+            query_args = {"where": where} if where else {}
             results = collection.query(
-                query_texts=[query],
-                n_results=k
+                query_embeddings=[query_embedding.tolist()],
+                n_results=k,
+                **query_args
             )
         except TypeError as te:
             # Handle ChromaDB internal corruption errors
@@ -131,6 +907,10 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
             if not isinstance(metadatas, list):
                 metadatas = []
             
+            # Distances are optional (used to judge filtered results)
+            distances_raw = results.get("distances") or []
+            distances = distances_raw[0] if distances_raw and isinstance(distances_raw[0], list) else []
+            
             # Ensure all lists have the same length
             lengths = [len(documents), len(ids), len(metadatas)]
             min_length = min(lengths) if lengths else 0
@@ -140,26 +920,10 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
                 chunk_id = ids[i] if i < len(ids) else f"unknown_{i}"
                 metadata = metadatas[i] if i < len(metadatas) and isinstance(metadatas[i], dict) else {}
                 
-                # Parse reference_sources from JSON string if present
-                reference_sources = metadata.get("reference_sources")
-                if isinstance(reference_sources, str):
-                    try:
-                        reference_sources = json.loads(reference_sources)
-                    except (json.JSONDecodeError, TypeError):
-                        reference_sources = []
-                elif reference_sources is None:
-                    reference_sources = []
-                
-                retrieved.append({
-                    "chunk": chunk,
-                    "id": chunk_id,
-                    "source": metadata.get("source", metadata.get("source_file", "unknown")),
-                    "source_file": metadata.get("source_file", "unknown"),
-                    "category": metadata.get("category", "general"),
-                    "title": metadata.get("title", metadata.get("topic", "unknown")),
-                    "topic": metadata.get("topic", metadata.get("title", "unknown")),
-                    "reference_sources": reference_sources,  # Store the actual reference links
-                })
+                result = _format_result(chunk, chunk_id, metadata)
+                if i < len(distances) and distances[i] is not None:
+                    result["distance"] = float(distances[i])
+                retrieved.append(result)
         
         return retrieved
     
@@ -203,15 +967,17 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
         return []
 
 
+# Smoke-test queries (also part of the benchmarks/bench_retrieval.py query set)
+TEST_QUERIES = [
+    "I have fever and body ache",
+    "What should I do for sore throat?",
+    "Chest pain and shortness of breath"
+]
+
+
 def test_retrieval():
     """Test the retrieval function"""
-    test_queries = [
-        "I have fever and body ache",
-        "What should I do for sore throat?",
-        "Chest pain and shortness of breath"
-    ]
-    
-    for query in test_queries:
+    for query in TEST_QUERIES:
         print(f"\n🔍 Query: {query}")
         results = retrieve(query, k=2)
         for r in results:
@@ -0,0 +1,223 @@
+"""
+Versioned, memory-mapped snapshot of the vector index.
+
+build_index.py exports the collection as a snapshot directory:
+
+    index_snapshot/
+        CURRENT                  name of the active version
+        <version>/embeddings.npy float32 matrix, rows already in index form
+        <version>/chunks.json    ids, documents and metadatas parallel to the rows
+        <version>/snapshot.json  format version, shape, distance space, sha256 checksums
+
+API workers open embeddings.npy with ``numpy.memmap`` (``np.load(mmap_mode="r")``)
+instead of each opening a PersistentClient and copying every embedding out of
+Chroma, so all workers on a host share one set of page-cache pages and start
+with little more than an mmap call. A new export never touches a version that
+running workers have mapped: it is written to a fresh directory and CURRENT is
+switched with an atomic rename.
+
+Usage (from project root):
+    python -m api.rag.snapshot [--path api/rag/chroma_db] [--out api/rag/index_snapshot]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .vector_index import NumpyVectorIndex, normalize_rows
+
+logger = logging.getLogger("health_assistant")
+
+SNAPSHOT_DIR = Path(__file__).parent / "index_snapshot"
+SNAPSHOT_FORMAT = 1
+CURRENT_NAME = "CURRENT"
+EMBEDDINGS_NAME = "embeddings.npy"
+CHUNKS_NAME = "chunks.json"
+META_NAME = "snapshot.json"
+# Versions kept on disk (the active one included) so workers still mapping an older one keep working
+SNAPSHOT_KEEP = int(os.getenv("RAG_SNAPSHOT_KEEP", "2"))
+# Verify checksums on load; reads the files once, which also warms the page cache
+RAG_SNAPSHOT_VERIFY = os.getenv("RAG_SNAPSHOT_VERIFY", "1").strip().lower() in ("1", "true", "yes")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def current_version(root: Path = SNAPSHOT_DIR) -> Optional[str]:
+    """Name of the active snapshot version, or None if nothing was exported"""
+    try:
+        return (Path(root) / CURRENT_NAME).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def new_version_name() -> str:
+    """UTC timestamp to the nanosecond: unique per export and sorts oldest to newest"""
+    now_ns = time.time_ns()
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime(now_ns // 10**9)) + f".{now_ns % 10**9:09d}Z"
+
+
+def set_current_version(version: str, root: Path = SNAPSHOT_DIR):
+    """Point CURRENT at ``version`` with an atomic rename (readers see the old or the new name, never neither)"""
+    root = Path(root)
+    pointer = root / f".{CURRENT_NAME}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / CURRENT_NAME)
+
+
+def export_snapshot(
+    ids: Sequence[str],
+    embeddings: Any,
+    documents: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+    space: str = "l2",
+    root: Path = SNAPSHOT_DIR,
+    keep: int = SNAPSHOT_KEEP,
+) -> Path:
+    """
+    Write a new snapshot version and make it current
+
+    Args:
+        ids, embeddings, documents, metadatas: Parallel index rows
+        space: Collection distance space ("l2", "cosine" or "ip")
+        root: Snapshot directory
+        keep: Versions to keep, the new one included
+
+    Returns:
+        Directory of the new version
+    """
+    root = Path(root)
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if matrix.size == 0:
+        matrix = matrix.reshape(0, 0)
+    if matrix.ndim != 2 or not (len(ids) == len(documents) == len(metadatas) == matrix.shape[0]):
+        raise ValueError("ids, documents and metadatas must be parallel to the embedding rows")
+    # Store rows the way NumpyVectorIndex searches them so loading never copies
+    if space == "cosine":
+        matrix = normalize_rows(matrix)
+
+    version = new_version_name()
+    staging = root / f".{version}.tmp"
+    staging.mkdir(parents=True)
+    np.save(staging / EMBEDDINGS_NAME, matrix)
+    with open(staging / CHUNKS_NAME, "w", encoding="utf-8") as f:
+        json.dump({"ids": list(ids), "documents": list(documents), "metadatas": list(metadatas)}, f, ensure_ascii=False)
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "rows": int(matrix.shape[0]),
+        "dimension": int(matrix.shape[1]),
+        "dtype": "float32",
+        "space": space,
+        "normalized": space == "cosine",
+        "sha256": {
+            EMBEDDINGS_NAME: file_sha256(staging / EMBEDDINGS_NAME),
+            CHUNKS_NAME: file_sha256(staging / CHUNKS_NAME),
+        },
+    }
+    with open(staging / META_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    target = root / version
+    os.replace(staging, target)
+    set_current_version(version, root)
+
+    prune_snapshots(root, keep)
+    return target
+
+
+def export_collection_snapshot(collection, root: Path = SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP) -> Path:
+    """Export every row of a Chroma collection as a new snapshot version"""
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    embeddings = data.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+    return export_snapshot(
+        ids=data.get("ids") or [],
+        embeddings=embeddings,
+        documents=[doc or "" for doc in (data.get("documents") or [])],
+        metadatas=[meta or {} for meta in (data.get("metadatas") or [])],
+        space=(collection.metadata or {}).get("hnsw:space", "l2"),
+        root=root,
+        keep=keep,
+    )
+
+
+def prune_snapshots(root: Path = SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP, protect: Sequence[str] = ()):
+    """Delete all but the newest ``keep`` versions (never the current one or those in ``protect``)"""
+    root = Path(root)
+    current = current_version(root)
+    versions = sorted(
+        (entry for entry in root.iterdir() if entry.is_dir() and not entry.name.startswith(".")),
+        key=lambda entry: entry.name,
+        reverse=True,
+    )
+    for entry in versions[max(keep, 1):]:
+        if entry.name != current and entry.name not in protect:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def load_snapshot(root: Path = SNAPSHOT_DIR, verify: bool = RAG_SNAPSHOT_VERIFY) -> NumpyVectorIndex:
+    """
+    Open the current snapshot as a NumpyVectorIndex over a read-only memmap
+
+    Raises:
+        FileNotFoundError: No snapshot has been exported
+        ValueError: Unknown format, shape mismatch or checksum mismatch
+    """
+    root = Path(root)
+    version = current_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No index snapshot in {root}; run 'python rag/build_index.py'")
+    directory = root / version
+    with open(directory / META_NAME, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {meta.get('format')}")
+    if verify:
+        for name, expected in meta["sha256"].items():
+            if file_sha256(directory / name) != expected:
+                raise ValueError(f"Checksum mismatch for {directory / name}")
+
+    matrix = np.load(directory / EMBEDDINGS_NAME, mmap_mode="r")
+    if matrix.shape != (meta["rows"], meta["dimension"]) or matrix.dtype != np.float32:
+        raise ValueError(f"Snapshot {version} has shape {matrix.shape}, expected ({meta['rows']}, {meta['dimension']})")
+    with open(directory / CHUNKS_NAME, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+
+    index = NumpyVectorIndex(
+        chunks["ids"], matrix, chunks["documents"], chunks["metadatas"], meta["space"], normalized=meta["normalized"]
+    )
+    index.version = version
+    logger.info(f"Mapped index snapshot {version}: {len(index)} chunks, dim={index.dimension}, space={meta['space']}")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, default=Path(__file__).parent / "chroma_db", help="Chroma persistence directory")
+    parser.add_argument("--out", type=Path, default=SNAPSHOT_DIR, help="Snapshot directory")
+    args = parser.parse_args()
+
+    import chromadb
+    from chromadb.config import Settings
+    if not (args.path / "chroma.sqlite3").exists():
+        raise SystemExit(f"No Chroma index in {args.path}; run 'python rag/build_index.py' first")
+    client = chromadb.PersistentClient(path=str(args.path), settings=Settings(anonymized_telemetry=False))
+    print(f"Snapshot written to {export_collection_snapshot(client.get_collection('medical_knowledge'), args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Precomputed symptom -> knowledge-base chunk routes.
+
+For the common canonical symptoms of safety.extract_symptoms() ("high fever",
+"chest pain", "vomiting", ...) the page that answers the question is known in
+advance, per class of patient (planner.profile_class: adult, child or
+pregnancy). SYMPTOM_ROUTES lists those pages; build_index.py resolves them to
+the ROUTE_CHUNKS most relevant chunks of each route (BM25 on the symptom name
+within the routed pages) and writes them, text and metadata included, to
+symptom_routes.json.
+
+When a message clearly maps to known symptoms, retriever.retrieve_by_symptoms()
+returns those chunks with a dictionary lookup, with no query embedding or
+vector search. Anything less clear goes to retrieve() as before:
+
+- no symptom, or more than ROUTE_MAX_SYMPTOMS of them
+- a symptom without a route for the patient class (e.g. vomiting in a child)
+- pregnancy and a child both apply
+- more than ROUTE_MAX_EXTRA_TERMS words besides the symptom phrases and filler
+  ("chest pain after eating spicy food" may be reflux, not a cardiac page)
+- a routed page excluded by the planner's category filter
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .bm25 import BM25Index, tokenize
+from .planner import matches_where
+
+logger = logging.getLogger("health_assistant")
+
+SYMPTOM_ROUTES_PATH = Path(__file__).parent / "symptom_routes.json"
+SYMPTOM_ROUTES_VERSION = 1
+
+# Set to 0 to always search
+RAG_SYMPTOM_ROUTES = os.getenv("RAG_SYMPTOM_ROUTES", "1").strip().lower() in ("1", "true", "yes")
+# Chunks precomputed per route
+ROUTE_CHUNKS = 4
+# Routed messages name at most this many symptoms...
+ROUTE_MAX_SYMPTOMS = 2
+# ...and say little else
+ROUTE_MAX_EXTRA_TERMS = int(os.getenv("ROUTE_MAX_EXTRA_TERMS", "3"))
+
+# Canonical symptom -> patient class ("adult", "child", "pregnancy", or "any" for all) -> pages
+SYMPTOM_ROUTES: Dict[str, Dict[str, List[str]]] = {
+    "chest pain": {"any": ["general/chest-pain-red-flags.md", "Cardiometabolic/heart-attack-red-flags.md"]},
+    "shortness of breath": {
+        "adult": ["general/shortness-of-breath-mild.md"],
+        "child": ["peds/asthma-wheezing-child.md"],
+    },
+    "high fever": {
+        "adult": ["general/fever-adult.md"],
+        "child": ["peds/feverchild.md", "general/fever-child.md"],
+        "pregnancy": ["pregnancy/red-flags-any-trimester.md", "general/fever-adult.md"],
+    },
+    "stroke like symptoms": {"any": ["Neurology/stroke-warning-signs-act-fast.md"]},
+    "severe headache": {
+        "adult": ["general/headache-nonspecific.md"],
+        "pregnancy": ["pregnancy/red-flags-any-trimester.md"],
+    },
+    "seizure": {"any": ["Neurology/seizure-first-aid.md"]},
+    "heavy bleeding": {
+        "adult": ["firstaid/cuts-and-bleeding.md"],
+        "pregnancy": ["pregnancy/red-flags-any-trimester.md"],
+    },
+    "vomiting": {
+        "adult": ["Gastrointestinal/vomiting-nausea.md"],
+        "pregnancy": ["pregnancy/morning-sickness-self-care.md"],
+    },
+    "diarrhea": {
+        "adult": ["Gastrointestinal/diarrhea-acute-adult.md"],
+        "child": ["peds/diarrhea-child.md", "Gastrointestinal/diarrhea-child.md"],
+    },
+    "dehydration": {
+        "adult": ["firstaid/dehydration-rehydration.md"],
+        "child": ["peds/dehydration-signs-child.md"],
+    },
+    "pregnancy emergency": {"pregnancy": ["pregnancy/red-flags-any-trimester.md"]},
+    "mental health crisis": {"any": ["mentalhealth/suicide-warning-signs-crisis-help.md"]},
+    "allergic reaction": {"any": ["firstaid/allergic-reaction-when-to-escalate.md"]},
+}
+
+# Words that do not change which page answers a symptom message (stopwords are already dropped)
+FILLER_TERMS = frozenset(
+    "am feel feeling felt got getting having suffering since started start starting keep keeps kept also "
+    "very really quite bit little lot bad badly severe mild sudden suddenly day days week weeks hour hours "
+    "today yesterday night morning now still help please tell need know about done mine".split()
+)
+
+
+def build_routes(
+    ids: Sequence[str],
+    documents: Sequence[str],
+    metadatas: Sequence[Dict],
+    routes: Dict[str, Dict[str, List[str]]] = SYMPTOM_ROUTES,
+    chunks_per_route: int = ROUTE_CHUNKS,
+) -> Dict:
+    """
+    Resolve routes to chunk ids of the indexed chunks
+
+    Each route takes its pages' chunks in turns, best BM25 match for the symptom
+    name first, then in page order. Pages that are not indexed are skipped with a
+    warning; a route left without pages is dropped.
+
+    Returns:
+        {"routes": {symptom: {class: [chunk ids]}}, "chunks": {chunk id: {"document", "metadata"}}}
+    """
+    index = BM25Index(ids, documents, metadatas)
+    rows_by_source: Dict[str, List[int]] = {}
+    for row, metadata in enumerate(index.metadatas):
+        rows_by_source.setdefault((metadata or {}).get("source", ""), []).append(row)
+
+    table: Dict[str, Dict[str, List[str]]] = {}
+    chunks: Dict[str, Dict] = {}
+    for symptom, classes in routes.items():
+        scores = index.scores(symptom)
+        for patient_class, sources in classes.items():
+            per_source = []
+            for source in sources:
+                rows = rows_by_source.get(source)
+                if not rows:
+                    logger.warning(f"Symptom route {symptom!r} ({patient_class}): {source} is not indexed")
+                    continue
+                per_source.append(sorted(rows, key=lambda row: (-scores[row], index.metadatas[row].get("chunk_id", 0))))
+            selected: List[int] = []
+            for turn in range(max((len(rows) for rows in per_source), default=0)):
+                selected.extend(rows[turn] for rows in per_source if turn < len(rows))
+            selected = selected[:chunks_per_route]
+            if not selected:
+                continue
+            table.setdefault(symptom, {})[patient_class] = [index.ids[row] for row in selected]
+            for row in selected:
+                chunks[index.ids[row]] = {"document": index.documents[row], "metadata": index.metadatas[row]}
+    return {"routes": table, "chunks": chunks}
+
+
+class SymptomRouteTable:
+    """Symptom routes and their chunks, as written by build_index.py"""
+
+    def __init__(self, routes: Dict[str, Dict[str, List[str]]], chunks: Dict[str, Dict]):
+        self.routes = routes
+        self.chunks = chunks
+
+    @classmethod
+    def from_chunks(cls, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict], **kwargs):
+        built = build_routes(ids, documents, metadatas, **kwargs)
+        return cls(built["routes"], built["chunks"])
+
+    def __len__(self) -> int:
+        return sum(len(classes) for classes in self.routes.values())
+
+    def chunk_ids(self, symptom: str, patient_class: str) -> Optional[List[str]]:
+        """Chunks routed for one symptom and patient class ("any" routes serve every class)"""
+        classes = self.routes.get(symptom, {})
+        return classes.get(patient_class) or classes.get("any")
+
+    def lookup(
+        self,
+        text: str,
+        matched: Dict[str, Iterable[str]],
+        patient_class: Optional[str],
+        k: int = ROUTE_CHUNKS,
+        where: Optional[Dict] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Precomputed chunks for a message, or None when it does not clearly map to them
+
+        Args:
+            text: English message
+            matched: safety.match_symptom_phrases(text) (canonical symptom -> matched phrases)
+            patient_class: planner.profile_class() (None when ambiguous)
+            k: Maximum number of chunks
+            where: Planner category filter the chunks must pass
+
+        Returns:
+            Rows {"id", "document", "metadata"}, symptoms taking turns
+        """
+        if patient_class is None or not matched or len(matched) > ROUTE_MAX_SYMPTOMS:
+            return None
+        routed = [self.chunk_ids(symptom, patient_class) for symptom in matched]
+        if any(not chunk_ids for chunk_ids in routed):
+            return None
+
+        covered = set(FILLER_TERMS)
+        for phrases in matched.values():
+            for phrase in phrases:
+                covered.update(tokenize(phrase))
+        if len([token for token in tokenize(text) if token not in covered]) > ROUTE_MAX_EXTRA_TERMS:
+            return None
+
+        selected: List[str] = []
+        for turn in range(max(len(chunk_ids) for chunk_ids in routed)):
+            for chunk_ids in routed:
+                if turn < len(chunk_ids) and chunk_ids[turn] not in selected:
+                    selected.append(chunk_ids[turn])
+        rows = [{"id": chunk_id, **self.chunks[chunk_id]} for chunk_id in selected[:k]]
+        if not all(matches_where(row["metadata"], where) for row in rows):
+            return None
+        return rows
+
+    def save(self, path: Path):
+        """Write the table as a JSON artifact"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": SYMPTOM_ROUTES_VERSION, "routes": self.routes, "chunks": self.chunks}, f, ensure_ascii=False
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "SymptomRouteTable":
+        start = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != SYMPTOM_ROUTES_VERSION:
+            raise ValueError(f"Unsupported symptom routes version: {payload.get('version')}")
+        table = cls(payload["routes"], payload["chunks"])
+        logger.info(f"Loaded symptom routes: {len(table)} routes in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return table
@@ -0,0 +1,47 @@
+"""
+Token counting for chunking and prompt packing.
+
+Counts use the tiktoken encoding of the answer model (gpt-4o-mini ->
+o200k_base). tiktoken downloads encodings on first use; when that is not
+possible (offline builds) counts fall back to a word/punctuation estimate and
+the tokenizer name says so. Chunk metadata records the name next to each
+token_count, so pack_context() recounts chunks an offline build measured with
+"approx" when tiktoken is available at serving time (and vice versa).
+"""
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger("health_assistant")
+
+RAG_TOKENIZER = os.getenv("RAG_TOKENIZER", "o200k_base")
+APPROX_TOKENIZER = "approx"
+
+_APPROX_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Optional[object]:
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(RAG_TOKENIZER)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding {RAG_TOKENIZER} unavailable ({type(e).__name__}); estimating token counts")
+        return None
+
+
+def tokenizer_name() -> str:
+    """Encoding used by count_tokens ("approx" when tiktoken could not load it)"""
+    return RAG_TOKENIZER if _get_encoding() is not None else APPROX_TOKENIZER
+
+
+def count_tokens(text: str) -> int:
+    """Number of model tokens in text"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(_APPROX_TOKEN_RE.findall(text))
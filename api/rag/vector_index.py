@@ -0,0 +1,141 @@
+"""
+In-process NumPy vector index for the medical knowledge base.
+
+The knowledge base is a few hundred chunks, so exact search over one contiguous
+float32 matrix is faster than going through Chroma's HNSW segment, SQLite
+metadata store and result marshalling. Top-k is a single matrix-vector product
+followed by ``argpartition``.
+
+Distances follow the collection's ``hnsw:space`` (Chroma defaults to squared L2),
+so results and distances line up with ``collection.query``.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("health_assistant")
+
+SUPPORTED_SPACES = ("l2", "cosine", "ip")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (cosine space searches normalized rows)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+class NumpyVectorIndex:
+    """
+    Exact nearest-neighbour index over a float32 embedding matrix.
+
+    ``ids``, ``documents`` and ``metadatas`` are parallel to the matrix rows.
+    A C-contiguous float32 matrix (e.g. a read-only ``numpy.memmap``) is used
+    as-is, without copying; pass ``normalized=True`` when cosine rows are
+    already unit length.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        embeddings: Any,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        space: str = "l2",
+        normalized: bool = False,
+    ):
+        if space not in SUPPORTED_SPACES:
+            raise ValueError(f"Unsupported distance space: {space}")
+
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or not (len(ids) == len(documents) == len(metadatas) == matrix.shape[0]):
+            raise ValueError("ids, documents and metadatas must be parallel to the embedding rows")
+
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.space = space
+        # Snapshot version the rows were mapped from (see snapshot.py); None when built in memory
+        self.version: Optional[str] = None
+
+        if space == "cosine" and not normalized:
+            matrix = normalize_rows(matrix)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        # Squared row norms for L2: ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+        self._row_norms = np.einsum("ij,ij->i", self.matrix, self.matrix) if space == "l2" else None
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @classmethod
+    def from_collection(cls, collection) -> "NumpyVectorIndex":
+        """Load every embedding, document and metadata row from a Chroma collection."""
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        embeddings = data.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        index = cls(
+            ids=data.get("ids") or [],
+            embeddings=embeddings,
+            documents=[doc or "" for doc in (data.get("documents") or [])],
+            metadatas=[meta or {} for meta in (data.get("metadatas") or [])],
+            space=space,
+        )
+        logger.info(f"Loaded NumPy vector index: {len(index)} chunks, dim={index.dimension}, space={space}")
+        return index
+
+    def distances(self, query_embedding: Any, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Distance from the query to every row (or to ``rows`` only), in the collection's space."""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        products = matrix @ query
+        if self.space == "l2":
+            row_norms = self._row_norms if rows is None else self._row_norms[rows]
+            return row_norms - 2.0 * products + float(query @ query)
+        if self.space == "cosine":
+            query_norm = float(np.linalg.norm(query))
+            return 1.0 - products / max(query_norm, float(np.finfo(np.float32).tiny))
+        return 1.0 - products
+
+    def search(self, query_embedding: Any, k: int, rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Return the ``k`` nearest rows as (row index, distance), closest first.
+
+        ``rows`` restricts the search to a subset of row indexes (e.g. one category).
+        """
+        n_rows = len(self) if rows is None else len(rows)
+        if n_rows == 0 or k <= 0:
+            return []
+
+        distances = self.distances(query_embedding, rows)
+        if k < n_rows:
+            candidates = np.argpartition(distances, k - 1)[:k]
+        else:
+            candidates = np.arange(n_rows)
+        order = candidates[np.argsort(distances[candidates], kind="stable")]
+        row_ids = order if rows is None else rows[order]
+        return [(int(row), float(distance)) for row, distance in zip(row_ids, distances[order])]
+
+    def query(self, query_embedding: Any, k: int, rows: Optional[np.ndarray] = None) -> Dict[str, List[Any]]:
+        """Search and return rows in the shape of a single-query ``collection.query`` result."""
+        hits = self.search(query_embedding, k, rows)
+        return {
+            "ids": [self.ids[row] for row, _ in hits],
+            "documents": [self.documents[row] for row, _ in hits],
+            "metadatas": [self.metadatas[row] for row, _ in hits],
+            "distances": [distance for _, distance in hits],
+        }
+
+
+def build_numpy_index(collection) -> Optional[NumpyVectorIndex]:
+    """Build a NumPy index from a Chroma collection, or None if it cannot be loaded."""
+    try:
+        return NumpyVectorIndex.from_collection(collection)
+    except Exception as e:
+        logger.error(f"Failed to build NumPy vector index: {e}", exc_info=True)
+        return None
@@ -1,7 +1,18 @@
 """
 Intent router to determine if query should use Graph or Vector RAG
+
+All routing signals are compiled once at import time:
+- GRAPH_PATTERNS are joined into a single alternation with one named group per
+  pattern, so a single ``search`` tells us whether (and which) pattern fired.
+- The keyword lists are loaded into a token-level index, so terms only match on
+  whole words ("any" no longer matches inside "company", "list" inside "specialist").
+  Terms and queries are tokenized the same way, with plural and inflection
+  endings folded, so "hospitals", "chest pains" or "baby movements" still match
+  "hospital", "chest pain" and "movement".
 """
 import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 
 # Patterns that indicate graph-suitable queries
@@ -18,6 +29,20 @@ GRAPH_PATTERNS = [
     r'\b(list|what)\b.*\b(safe|unsafe|avoid)\b.*\b(for|during)\b.*\b(pregnancy|diabetes|hypertension|kidney disease)\b',
 ]
 
+# Feature names reported for each entry of GRAPH_PATTERNS (same order)
+GRAPH_PATTERN_NAMES = [
+    "contraindication_question",
+    "provider_question",
+    "red_flag_count",
+    "location",
+    "avoid_if",
+    "warning_signs",
+    "pregnancy_danger",
+    "mental_health_help",
+    "escalation_question",
+    "condition_safety_list",
+]
+
 # Known symptom terms that suggest graph query
 SYMPTOM_TERMS = {
     "chest pain", "shortness of breath", "headache", "fever", "diarrhea",
@@ -37,73 +62,206 @@ PREGNANCY_TERMS = {"pregnancy", "pregnant", "fetal", "baby", "kick count", "labo
 MENTAL_TERMS = {"suicide", "suicidal", "self harm", "hurt myself", "end my life", "mental health", "depression", "panic attack", "anxiety", "helpline"}
 RESOURCE_KEYWORDS = {"helpline", "emergency number", "hotline", "nearest hospital", "provider", "clinic", "doctor", "specialist"}
 
+# Words that turn a pregnancy mention into a graph question (red flags, movements, safe/avoid)
+PREGNANCY_TRIGGERS = {"red flag", "danger", "movement", "avoid", "safe", "warning", "kick"}
 
-def is_graph_intent(text: str) -> bool:
+# Words that turn a mental health mention into a request for help/resources
+MENTAL_SUPPORT_TERMS = {"support", "help", "what to do"}
+
+# Standalone keywords that route to the graph on their own
+GRAPH_KEYWORDS = {
+    "list", "count", "which", "any", "avoid", "contraindication",
+    "provider", "hospital", "doctors near", "how many red flags", "is it safe for",
+    "should i go to", "hotline", "helpline", "nearby clinic",
+}
+
+CITIES = ["Mumbai", "Delhi", "Bangalore", "Bengaluru", "Gurgaon", "Gurugram", "Chennai", "Kolkata", "Pune", "Hyderabad", "Ahmedabad"]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def _stem(token: str) -> str:
+    """Fold common plural and inflection endings ("helplines", "kicking", "fainted")"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 4 and token.endswith("ed") and not token.endswith("eed"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def _tokenize(text_lower: str) -> List[str]:
+    return [_stem(token) for token in _TOKEN_RE.findall(text_lower)]
+
+
+def _leading_letters(pattern: str) -> Optional[Set[str]]:
+    """First letters of the top-level alternatives in a pattern shaped like \\b(a|b(c|d)|e)."""
+    if not pattern.startswith("\\b("):
+        return None
+    letters: Set[str] = set()
+    depth = 0
+    at_alternative_start = True
+    for char in pattern[3:]:
+        if at_alternative_start:
+            if not char.isalpha():
+                return None
+            letters.add(char)
+            at_alternative_start = False
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            if depth == 0:
+                return letters
+            depth -= 1
+        elif char == "|" and depth == 0:
+            at_alternative_start = True
+    return None
+
+
+def _compile_graph_patterns(patterns: List[str], names: List[str]) -> "re.Pattern[str]":
+    alternatives = "|".join(f"(?P<{name}>{pattern})" for name, pattern in zip(names, patterns))
+
+    # Every pattern opens with \b(word|word|...): guard the alternation with one word
+    # boundary and a lookahead on the possible first letters so most positions fail
+    # after a single check instead of trying each alternative in turn.
+    first_letters: Optional[Set[str]] = set()
+    for pattern in patterns:
+        letters = _leading_letters(pattern)
+        if letters is None:
+            first_letters = None
+            break
+        first_letters.update(letters)
+
+    if first_letters:
+        return re.compile(rf"\b(?=[{''.join(sorted(first_letters))}])(?:{alternatives})")
+    return re.compile(alternatives)
+
+
+class KeywordIndex:
     """
-    Determine if query should use graph database
-    
+    Token-level keyword automaton.
+
+    Every term is split into tokens and indexed by its first token, so scanning a
+    query is a single walk over its tokens with a dict lookup per position.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], str, str]]] = defaultdict(list)
+        for group, terms in groups.items():
+            for term in terms:
+                term_tokens = tuple(_tokenize(term.lower()))
+                if term_tokens:
+                    self._index[term_tokens[0]].append((term_tokens, group, term))
+
+    def scan(self, tokens: List[str]) -> Dict[str, Set[str]]:
+        """Return {group: matched terms} for all whole-word matches in ``tokens``."""
+        found: Dict[str, Set[str]] = defaultdict(set)
+        for position, token in enumerate(tokens):
+            candidates = self._index.get(token)
+            if not candidates:
+                continue
+            for term_tokens, group, term in candidates:
+                end = position + len(term_tokens)
+                if end <= len(tokens) and tuple(tokens[position:end]) == term_tokens:
+                    found[group].add(term)
+        return found
+
+
+_GRAPH_REGEX = _compile_graph_patterns(GRAPH_PATTERNS, GRAPH_PATTERN_NAMES)
+
+_KEYWORD_INDEX = KeywordIndex({
+    "symptom": SYMPTOM_TERMS,
+    "condition": CONDITION_TERMS,
+    "pregnancy": PREGNANCY_TERMS,
+    "pregnancy_trigger": PREGNANCY_TRIGGERS,
+    "mental": MENTAL_TERMS,
+    "resource": RESOURCE_KEYWORDS,
+    "mental_support": MENTAL_SUPPORT_TERMS,
+    "graph_keyword": GRAPH_KEYWORDS,
+    "conjunction": {"and", "with"},
+})
+
+
+def route_query(text: str) -> Dict[str, object]:
+    """
+    Route a query in a single pass over the text.
+
     Args:
         text: User query
-        
+
     Returns:
-        True if graph query is appropriate
+        Dict with keys:
+            - route: "graph" or "vector"
+            - features: sorted list of the signals that fired (e.g. "pattern:location",
+              "symptoms:2", "keyword:hospital")
+            - matched: {keyword group: sorted matched terms}
     """
     text_lower = text.lower()
-    
-    # Check for graph-specific regex patterns
-    for pattern in GRAPH_PATTERNS:
-        if re.search(pattern, text_lower):
-            return True
-    
-    # Check for multiple symptoms (suggests counting/listing or red-flag matching)
-    symptom_count = sum(1 for term in SYMPTOM_TERMS if term in text_lower)
+    features: List[str] = []
+
+    # Single search over the combined pattern; lastgroup names the pattern that fired
+    pattern_match = _GRAPH_REGEX.search(text_lower)
+    if pattern_match:
+        features.append(f"pattern:{pattern_match.lastgroup}")
+
+    matched = _KEYWORD_INDEX.scan(_tokenize(text_lower))
+
+    # Multiple symptoms suggest counting/listing or red-flag matching
+    symptom_count = len(matched.get("symptom", ()))
     if symptom_count >= 2:
-        return True
-    
+        features.append(f"symptoms:{symptom_count}")
+
     # Pregnancy-specific combinations (red flags, movements, safe/avoid instructions)
-    if any(term in text_lower for term in PREGNANCY_TERMS):
-        if any(trigger in text_lower for trigger in ["red flag", "danger", "movement", "avoid", "safe", "warning", "kick"]):
-            return True
-        if any(keyword in text_lower for keyword in RESOURCE_KEYWORDS):
-            return True
+    if matched.get("pregnancy") and (matched.get("pregnancy_trigger") or matched.get("resource")):
+        features.append("pregnancy_combo")
 
     # Mental health crisis phrases asking for help/resources
-    if any(term in text_lower for term in MENTAL_TERMS):
-        if any(keyword in text_lower for keyword in RESOURCE_KEYWORDS | {"support", "help", "what to do"}):
-            return True
+    if matched.get("mental") and (matched.get("resource") or matched.get("mental_support")):
+        features.append("mental_health_combo")
 
     # Queries combining multiple conditions (e.g., diabetes and hypertension)
-    if " and " in text_lower or " with " in text_lower:
-        mentioned_conditions = {term for term in CONDITION_TERMS if term in text_lower}
-        if len(mentioned_conditions) >= 2:
-            return True
-    
-    # Check for specific keywords
-    graph_keywords = [
-        "list", "count", "which", "any", "avoid", "contraindication",
-        "provider", "hospital", "doctors near", "how many red flags", "is it safe for",
-        "should i go to", "hotline", "helpline", "nearby clinic",
-    ]
-    if any(keyword in text_lower for keyword in graph_keywords):
-        return True
-    
-    return False
-
-
-def extract_city(text: str) -> str:
+    if matched.get("conjunction") and len(matched.get("condition", ())) >= 2:
+        features.append("multi_condition")
+
+    for keyword in sorted(matched.get("graph_keyword", ())):
+        features.append(f"keyword:{keyword}")
+
+    return {
+        "route": "graph" if features else "vector",
+        "features": features,
+        "matched": {group: sorted(terms) for group, terms in matched.items()},
+    }
+
+
+def is_graph_intent(text: str) -> bool:
+    """
+    Determine if query should use graph database
+
+    Args:
+        text: User query
+
+    Returns:
+        True if graph query is appropriate
+    """
+    return route_query(text)["route"] == "graph"
+
+
+def extract_city(text: str) -> Optional[str]:
     """
     Extract city name from text
-    
+
     Args:
         text: User query
-        
+
     Returns:
         City name or None
     """
-    cities = ["Mumbai", "Delhi", "Bangalore", "Bengaluru", "Gurgaon", "Gurugram", "Chennai", "Kolkata", "Pune", "Hyderabad", "Ahmedabad"]
     text_lower = text.lower()
-    
-    for city in cities:
+
+    for city in CITIES:
         if city.lower() in text_lower:
             # Normalise spelling variants (Bangalore/Bengaluru etc.)
             if city.lower() in {"bengaluru"}:
@@ -111,5 +269,5 @@ def extract_city(text: str) -> str:
             if city.lower() in {"gurugram"}:
                 return "Gurgaon"
             return city
-    
-    return None
\ No newline at end of file
+
+    return None
@@ -1,7 +1,13 @@
 """
 Safety detection utilities for red flags, mental health crisis cues, and symptom extraction.
 """
-from typing import Dict, Iterable, List, Set
+import json
+import logging
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("health_assistant")
 
 # Red flag keywords in English and Hindi (transliterated)
 RED_FLAGS: Set[str] = {
@@ -183,6 +189,41 @@ SYMPTOM_SYNONYMS: Dict[str, Set[str]] = {
 }
 
 
+# Native-script and romanized lexicons per language, one JSON file per language code
+# with the same categories as the English sets above
+SAFETY_LEXICON_DIR = Path(__file__).resolve().parent / "safety_lexicons"
+SAFETY_LEXICON_CATEGORIES = ("red_flags", "mental_health_crisis", "pregnancy_crisis")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text).lower()
+
+
+def load_safety_lexicons(directory: Path = SAFETY_LEXICON_DIR) -> Dict[str, Dict[str, Set[str]]]:
+    """
+    Load native-script and romanized safety lexicons.
+
+    Returns:
+        {language code: {category: set of phrases}}
+    """
+    lexicons: Dict[str, Dict[str, Set[str]]] = {}
+    for path in sorted(directory.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load safety lexicon {path.name}: {e}")
+            continue
+        lang = data.get("language") or path.stem
+        lexicons[lang] = {
+            category: {_normalize(phrase) for phrase in data.get(category, []) if phrase}
+            for category in SAFETY_LEXICON_CATEGORIES
+        }
+    return lexicons
+
+
+NATIVE_SAFETY_LEXICONS: Dict[str, Dict[str, Set[str]]] = load_safety_lexicons()
+
+
 def _match_phrases(text_lower: str, phrases: Iterable[str]) -> List[str]:
     return sorted({phrase for phrase in phrases if phrase in text_lower})
 
@@ -232,17 +273,129 @@ def detect_pregnancy_emergency(text: str) -> dict:
     }
 
 
-def extract_symptoms(text: str) -> List[str]:
+def detect_native_safety_signals(text: str, lang: Optional[str] = None) -> dict:
     """
-    Extract canonical symptom names from free-text user messages.
+    Screen the original (untranslated) message with the native-script and romanized lexicons.
+
+    Runs before language detection and translation, so safety flags are available
+    at time zero. When ``lang`` is not given every loaded language is checked.
+
+    Returns dict with keys:
+        - red_flag: bool
+        - crisis: bool (mental health)
+        - pregnancy_concern: bool
+        - matched: {category: sorted list of matched phrases}
+        - languages: sorted list of languages with a match
+    """
+    text_norm = _normalize(text)
+    languages = [lang] if lang in NATIVE_SAFETY_LEXICONS else list(NATIVE_SAFETY_LEXICONS)
+
+    matched: Dict[str, Set[str]] = {category: set() for category in SAFETY_LEXICON_CATEGORIES}
+    matched_languages: Set[str] = set()
+    for code in languages:
+        for category, phrases in NATIVE_SAFETY_LEXICONS[code].items():
+            found = _match_phrases(text_norm, phrases)
+            if found:
+                matched[category].update(found)
+                matched_languages.add(code)
+
+    return {
+        "red_flag": bool(matched["red_flags"]),
+        "crisis": bool(matched["mental_health_crisis"]),
+        "pregnancy_concern": bool(matched["pregnancy_crisis"]),
+        "matched": {category: sorted(phrases) for category, phrases in matched.items()},
+        "languages": sorted(matched_languages),
+    }
+
+
+def merge_native_safety(
+    native: dict,
+    red_flags: dict,
+    mental_health: dict,
+    pregnancy: dict,
+) -> Tuple[dict, dict, dict]:
+    """
+    Combine the time-zero native screen with the checks on the translated text.
+
+    A native match stays flagged even if the English check does not confirm it
+    (the translation may have softened the wording); matched phrases from both
+    are reported.
+
+    Returns:
+        (red_flags, mental_health, pregnancy) dicts in the shape of
+        detect_red_flags / detect_mental_health_crisis / detect_pregnancy_emergency
+    """
+    native_matched = native.get("matched", {})
+    red_flags = {
+        **red_flags,
+        "red_flag": red_flags["red_flag"] or native.get("red_flag", False),
+        "matched": sorted(set(red_flags["matched"]) | set(native_matched.get("red_flags", []))),
+    }
+    mental_health = {
+        **mental_health,
+        "crisis": mental_health["crisis"] or native.get("crisis", False),
+        "matched": sorted(set(mental_health["matched"]) | set(native_matched.get("mental_health_crisis", []))),
+    }
+    pregnancy = {
+        **pregnancy,
+        "concern": pregnancy["concern"] or native.get("pregnancy_concern", False),
+        "matched": sorted(set(pregnancy["matched"]) | set(native_matched.get("pregnancy_crisis", []))),
+    }
+    return red_flags, mental_health, pregnancy
+
+
+def unconfirmed_native_categories(native: dict, red_flags: dict, mental_health: dict, pregnancy: dict) -> List[str]:
+    """
+    Categories flagged by the native screen that the check on the translated text did not confirm.
+    """
+    english_flags = {
+        "red_flags": red_flags["red_flag"],
+        "mental_health_crisis": mental_health["crisis"],
+        "pregnancy_crisis": pregnancy["concern"],
+    }
+    return [
+        category for category in SAFETY_LEXICON_CATEGORIES
+        if native.get("matched", {}).get(category) and not english_flags[category]
+    ]
+
+
+def native_safety_payload(native: dict) -> dict:
+    """
+    Shape a native screen result like the response ``safety`` payload, for early alerts.
+    """
+    matched = native.get("matched", {})
+    return {
+        "red_flag": native.get("red_flag", False),
+        "matched": matched.get("red_flags", []),
+        "mental_health": {
+            "crisis": native.get("crisis", False),
+            "matched": matched.get("mental_health_crisis", []),
+            "first_aid": MENTAL_HEALTH_FIRST_AID_HI if "hi" in native.get("languages", []) else MENTAL_HEALTH_FIRST_AID_EN,
+        },
+        "pregnancy": {
+            "concern": native.get("pregnancy_concern", False),
+            "matched": matched.get("pregnancy_crisis", []),
+        },
+    }
+
+
+def match_symptom_phrases(text: str) -> Dict[str, List[str]]:
+    """
+    Canonical symptom names found in a message, with the synonym phrases that matched.
     """
     text_lower = text.lower()
-    found: Set[str] = set()
+    matched: Dict[str, List[str]] = {}
 
     for canonical, synonyms in SYMPTOM_SYNONYMS.items():
-        for phrase in synonyms:
-            if phrase in text_lower:
-                found.add(canonical)
-                break
+        phrases = _match_phrases(text_lower, synonyms)
+        if phrases:
+            matched[canonical] = phrases
 
-    return sorted(found)
\ No newline at end of file
+    return dict(sorted(matched.items()))
+
+
+def extract_symptoms(text: str) -> List[str]:
+    """
+    Extract canonical symptom names from free-text user messages.
+    """
+    return list(match_symptom_phrases(text))
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Per-session symptom ledger
+
+Tracks the symptoms a user has reported in a session (canonical names and raw
+phrases, with the user-turn indexes they were mentioned in) so follow-up
+questions can be checked against earlier symptoms without rescanning history.
+Only user turns are recorded: assistant answers mention many symptoms the user
+never reported.
+
+The ledger is a plain JSON-serialisable dict cached next to the conversation
+history under ``symptom_ledger:{session_id}``:
+
+    {"turns": 2,
+     "symptoms": {"chest pain": [0]},
+     "phrases": {"chest pain": [0], "left arm pain": [1]}}
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..safety import extract_symptoms
+from .cache import cache_service
+
+logger = logging.getLogger("health_assistant")
+
+# Same TTL as conversation_history:{session_id}
+SYMPTOM_LEDGER_TTL = 120
+
+# Number of recent user turns treated as "history" for relationship checks
+# (the previous rescan looked at the last 4 messages, i.e. 2 user turns)
+SYMPTOM_LEDGER_WINDOW = 2
+
+# Common symptom phrases that might be mentioned (before canonical mapping)
+SYMPTOM_PHRASES = [
+    "chest pain", "chest pressure", "tightness in chest",
+    "left arm pain", "right arm pain", "arm pain", "left arm numb", "right arm numb",
+    "jaw pain", "shoulder pain", "back pain", "upper back pain",
+    "shortness of breath", "difficulty breathing",
+    "cold sweats", "sweating", "excessive sweating",
+    "nausea", "vomiting",
+    "lightheadedness", "dizziness",
+    "headache", "severe headache",
+    "abdominal pain", "stomach pain",
+    "fever", "high fever",
+    "rash", "skin rash",
+    "cough", "persistent cough"
+]
+
+
+def ledger_cache_key(session_id: str) -> str:
+    return f"symptom_ledger:{session_id}"
+
+
+def extract_raw_symptom_phrases(text: str) -> List[str]:
+    """
+    Extract raw symptom phrases from text (before canonical mapping)
+    This helps when "left arm pain" maps to "chest pain" but we want to detect the relationship
+
+    Args:
+        text: Text to extract symptoms from
+
+    Returns:
+        List of raw symptom phrases found in text
+    """
+    if not text:
+        return []
+
+    text_lower = text.lower()
+    return [phrase for phrase in SYMPTOM_PHRASES if phrase in text_lower]
+
+
+def new_ledger() -> Dict[str, Any]:
+    return {"turns": 0, "symptoms": {}, "phrases": {}}
+
+
+def record_user_turn(
+    ledger: Dict[str, Any],
+    symptoms: Iterable[str],
+    phrases: Iterable[str],
+) -> Dict[str, Any]:
+    """
+    Append one user turn to the ledger (in place) and return it.
+
+    Args:
+        ledger: Ledger to update
+        symptoms: Canonical symptoms extracted from the user message
+        phrases: Raw symptom phrases extracted from the user message
+    """
+    turn = ledger.get("turns", 0)
+    for field, names in (("symptoms", symptoms), ("phrases", phrases)):
+        entries = ledger.setdefault(field, {})
+        for name in dict.fromkeys(names):
+            entries.setdefault(name, []).append(turn)
+    ledger["turns"] = turn + 1
+    return ledger
+
+
+def build_ledger_from_history(conversation_history: Optional[List[Dict[str, str]]]) -> Dict[str, Any]:
+    """
+    Build a ledger from formatted conversation history, using user turns only.
+
+    Args:
+        conversation_history: Messages as returned by _get_conversation_history
+    """
+    ledger = new_ledger()
+    for msg in conversation_history or []:
+        if msg.get("role") != "user":
+            continue
+        content = msg.get("content", "")
+        record_user_turn(ledger, extract_symptoms(content) if content else [], extract_raw_symptom_phrases(content))
+    return ledger
+
+
+def recent_terms(ledger: Optional[Dict[str, Any]], window: int = SYMPTOM_LEDGER_WINDOW) -> Tuple[Set[str], Set[str]]:
+    """
+    Return (canonical symptoms, raw phrases) mentioned in the last ``window`` user turns.
+    """
+    if not ledger:
+        return set(), set()
+    first_turn = ledger.get("turns", 0) - window
+
+    def _recent(entries: Dict[str, List[int]]) -> Set[str]:
+        return {name for name, turns in entries.items() if turns and turns[-1] >= first_turn}
+
+    return _recent(ledger.get("symptoms", {})), _recent(ledger.get("phrases", {}))
+
+
+async def get_symptom_ledger(
+    session_id: Optional[str],
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Get the cached ledger for a session, rebuilding it from history on a cache miss.
+
+    Args:
+        session_id: Session ID
+        conversation_history: History used to rebuild the ledger if it is not cached
+    """
+    if session_id and cache_service.is_available():
+        try:
+            cached = await cache_service.get(ledger_cache_key(session_id))
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning(f"Failed to read symptom ledger from cache: {e}")
+
+    ledger = build_ledger_from_history(conversation_history)
+    if session_id and conversation_history and cache_service.is_available():
+        try:
+            await cache_service.set(ledger_cache_key(session_id), ledger, ttl=SYMPTOM_LEDGER_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache symptom ledger: {e}")
+    return ledger
+
+
+async def update_symptom_ledger(
+    session_id: str,
+    user_message: str,
+    extracted: Optional[Dict[str, List[str]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Record a new user turn in the cached ledger for a session.
+
+    Args:
+        session_id: Session ID
+        user_message: The user's message (used when ``extracted`` is not given)
+        extracted: {"symptoms": [...], "phrases": [...]} already extracted from the
+            English text of the message by the chat pipeline
+
+    Returns:
+        The updated ledger, or None if the cache is unavailable
+    """
+    if not session_id or not cache_service.is_available():
+        return None
+
+    cache_key = ledger_cache_key(session_id)
+    ledger = await cache_service.get(cache_key)
+    if ledger is None:
+        # Nothing cached: the next request rebuilds the ledger from conversation history,
+        # which already includes this turn
+        return None
+
+    if extracted is None:
+        extracted = {
+            "symptoms": extract_symptoms(user_message),
+            "phrases": extract_raw_symptom_phrases(user_message),
+        }
+    record_user_turn(ledger, extracted.get("symptoms", []), extracted.get("phrases", []))
+    await cache_service.set(cache_key, ledger, ttl=SYMPTOM_LEDGER_TTL)
+    return ledger
@@ -0,0 +1,96 @@
+"""
+Startup warmup and readiness
+
+Loading the embedding model, opening the vector index and compiling the
+safety and routing patterns takes seconds; done lazily, the first user after
+every deploy or scale-up pays for it. StartupWarmup runs those steps on a
+background thread at startup and records their progress, so the /ready
+endpoint can report "not ready" (503) until they finish and load balancers
+only route traffic to warm workers. /health stays a plain liveness check.
+
+A failing step is logged and reported but does not keep the worker out of
+rotation: everything it warms is also initialized lazily on first use.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("health_assistant")
+
+# "background" (serve immediately, /ready turns 200 when warm) or "blocking" (warm before serving)
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background").strip().lower()
+
+
+class StartupWarmup:
+    """Runs named warmup steps once, in order, and reports readiness"""
+
+    def __init__(self, steps: Optional[List[Tuple[str, Callable[[], Any]]]] = None):
+        self.steps: List[Tuple[str, Callable[[], Any]]] = list(steps or [])
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state = "pending"
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def add_step(self, name: str, func: Callable[[], Any]):
+        self.steps.append((name, func))
+
+    def run(self):
+        """Run every step on the calling thread (no-op if warmup already started)"""
+        with self._lock:
+            if self._state != "pending":
+                return
+            self._state = "running"
+            self._started_at = time.perf_counter()
+
+        for name, func in self.steps:
+            self._results[name] = {"status": "running"}
+            start = time.perf_counter()
+            try:
+                func()
+                self._results[name] = {"status": "ok"}
+            except Exception as e:
+                logger.warning(f"Warmup step '{name}' failed (will initialize on first use): {e}")
+                self._results[name] = {"status": "failed", "error": str(e)}
+            self._results[name]["ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        self._finished_at = time.perf_counter()
+        self._state = "ready"
+        self._done.set()
+        logger.info(f"Warmup finished in {self._finished_at - self._started_at:.2f}s: {self._results}")
+
+    def start(self) -> threading.Thread:
+        """Run the steps on a daemon thread"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="startup-warmup", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warmup finishes; returns whether it did"""
+        return self._done.wait(timeout)
+
+    def is_ready(self) -> bool:
+        return self._done.is_set()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Readiness, per-step status and elapsed time"""
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        return {
+            "ready": self.is_ready(),
+            "state": self._state,
+            "seconds": round(elapsed, 3),
+            "steps": {name: dict(self._results.get(name, {"status": "pending"})) for name, _ in self.steps},
+        }
+
+
+# Global warmup instance; main.py registers its steps
+startup_warmup = StartupWarmup()
@@ -0,0 +1,87 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.bm25 import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+from api.rag.corpus import load_corpus  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def corpus_index():
+    return BM25Index.from_rows(load_corpus())
+
+
+def _small_index():
+    documents = [
+        "Otitis externa is an infection of the outer ear canal, common after swimming.",
+        "PCOS can cause irregular periods, acne and weight gain.",
+        "For chest pain with sweating call 108 immediately.",
+        "Drink fluids and rest when you have a cold.",
+    ]
+    metadatas = [{"title": f"Doc {i}", "source": f"general/doc_{i}.md"} for i in range(len(documents))]
+    return BM25Index([f"general/doc_{i}#0" for i in range(len(documents))], documents, metadatas)
+
+
+def test_tokenize_keeps_numbers_and_drops_stopwords():
+    assert tokenize("Should I call 108 for the PCOS?") == ["call", "108", "pcos"]
+
+
+@pytest.mark.parametrize(
+    "query, expected_row",
+    [("otitis externa", 0), ("pcos", 1), ("when to call 108", 2)],
+)
+def test_exact_terms_rank_first(query, expected_row):
+    assert _small_index().search(query, 2)[0][0] == expected_row
+
+
+def test_unmatched_query_returns_nothing():
+    assert _small_index().search("zzzz qqqq", 3) == []
+
+
+def test_corpus_exact_terms(corpus_index):
+    top = [corpus_index.ids[row] for row, _ in corpus_index.search("otitis externa", 3)]
+    assert top[0].startswith("Eye_ENT_Oral/ear-pain-otitis-externa#")
+
+
+def test_artifact_round_trip(tmp_path):
+    index = _small_index()
+    path = tmp_path / "bm25_index.json"
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert loaded.ids == index.ids
+    for query in ["otitis externa", "call 108", "irregular periods acne"]:
+        assert loaded.search(query, 4) == pytest.approx(index.search(query, 4))
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+    assert [item for item, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_retrieve_hybrid_fuses_dense_and_sparse(monkeypatch):
+    index = _small_index()
+    dense = [
+        retriever._format_result(index.documents[row], index.ids[row], index.metadatas[row]) for row in (3, 2)
+    ]
+    monkeypatch.setattr(retriever, "_bm25_index", index)
+    monkeypatch.setattr(retriever, "_retrieve_dense", lambda query, k: dense[:k])
+    monkeypatch.setattr(retriever, "RAG_RELEVANCE_CUTOFF", False)  # synthetic scores; cutoff tested separately
+
+    sparse_only = retriever.retrieve("otitis externa", k=2, mode="sparse")
+    hybrid = retriever.retrieve("otitis externa swimming cold", k=3, mode="hybrid")
+
+    assert [r["id"] for r in sparse_only] == ["general/doc_0#0"]
+    assert {r["id"] for r in hybrid} == {"general/doc_0#0", "general/doc_2#0", "general/doc_3#0"}
+    assert hybrid[0]["id"] == "general/doc_3#0"  # ranked by both dense and BM25
+
+
+def test_retrieve_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        retriever.retrieve("fever", mode="fuzzy")
@@ -0,0 +1,96 @@
+import random
+import re
+import time
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.auth import validation  # noqa: E402
+
+LEGITIMATE = [
+    "I have a headache. What should I do?",
+    "I'm feeling sick today",
+    "The doctor said 'take this twice daily'",
+    "My blood pressure is 140/90",
+    "Should I take this with or without food?",
+    "I need to select a doctor from the list",
+    "Please update my appointment time",
+    "Can I take ibuprofen and paracetamol together?",
+    "मुझे सिरदर्द हो रहा है",
+]
+
+INJECTIONS = [
+    "' OR '1'='1",
+    "admin'--",
+    "' OR 1=1#",
+    "' UNION SELECT username, password FROM users--",
+    "'; DROP TABLE users; --",
+    "SELECT * FROM users WHERE id='1' OR '1'='1",
+    "UPDATE users SET password='hacked' WHERE id=1 OR 1=1",
+    "'; EXEC xp_cmdshell('rm -rf /')--",
+    "1' AND SLEEP(5)",
+    "test'/*comment*/",
+    "' or name like '%a%",
+    "ſelect * from users where 1=1 --",
+]
+
+FUZZ_TOKENS = [
+    "'", '"', " ", " ", "or", "AND", "1", "=", "--", "#", "/*", "*/", "*", ";", "select", "from", "into",
+    "where", "union", "all", "like", "drop", "table", "update", "set", "sleep", "(", "if", "then", "exec",
+    "order", "by", "having", "x", ",", "ſ", "İf", "\n",
+]
+
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip())
+
+
+@pytest.mark.parametrize("text", LEGITIMATE)
+def test_legitimate_messages_pass(text):
+    assert validation.validate_chat_input(text) == _collapse(text)
+
+
+@pytest.mark.parametrize("text", INJECTIONS)
+def test_injections_are_rejected(text):
+    with pytest.raises(ValueError, match="potentially dangerous content"):
+        validation.validate_chat_input(text)
+
+
+def test_rules_match_reference_patterns():
+    assert len(validation._CHAT_SQL_RULES) == len(validation.CHAT_SQL_PATTERNS)
+    compiled = [re.compile(pattern, re.IGNORECASE) for pattern in validation.CHAT_SQL_PATTERNS]
+    rng = random.Random(27)
+    samples = LEGITIMATE + INJECTIONS + [
+        "".join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 20))) for _ in range(3000)
+    ]
+    for sample in samples:
+        text = _collapse(sample)
+        folded = text.translate(validation._IGNORECASE_FOLDS).lower()
+        for pattern, rule in zip(compiled, validation._CHAT_SQL_RULES):
+            expected = pattern.search(text) is not None
+            assert rule.search(text) == expected, (pattern.pattern, text)
+            if expected:
+                assert any(literal in folded for literal in rule.literals), (pattern.pattern, text)
+
+
+def _best_time(text: str, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validation._find_chat_sql_injection(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.parametrize("prefix, unit", [("", "a"), ("", "if "), ("", "select a, "), ("exec", "x"), ("", "where x ")])
+def test_worst_case_input_scales_linearly(prefix, unit):
+    # Absolute timings are in benchmarks/bench_validation.py; here only the growth rate:
+    # 4x the input takes about 4x as long, where backtracking would take 16x
+    short = _collapse(prefix + unit * (5000 // len(unit)))
+    long = _collapse(prefix + unit * (20000 // len(unit)))
+    assert _best_time(long) < 8 * _best_time(short)
@@ -0,0 +1,79 @@
+from pathlib import Path
+import shutil
+import sys
+import uuid
+
+import chromadb
+import pytest
+from chromadb.config import Settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import maintenance  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path), settings=Settings(anonymized_telemetry=False))
+    collection = client.create_collection("medical_knowledge")
+    collection.add(
+        ids=[f"general/doc_{i}#0" for i in range(200)],
+        embeddings=[[float(i), float(i % 7), 1.0] for i in range(200)],
+    )
+    live_dir = next(p for p in tmp_path.iterdir() if p.is_dir())
+    orphan = tmp_path / str(uuid.uuid4())
+    shutil.copytree(live_dir, orphan)
+    return tmp_path, client, live_dir, orphan
+
+
+def test_dry_run_lists_orphans_without_removing(store):
+    path, client, live_dir, orphan = store
+    report = maintenance.collect_garbage(path, dry_run=True, client=client)
+    assert report["orphan_segments"] == [orphan.name]
+    assert report["orphan_bytes"] > 0
+    assert orphan.exists()
+
+
+def test_gc_removes_orphans_and_keeps_results(store):
+    path, client, live_dir, orphan = store
+    before = maintenance.snapshot_results(client.get_collection("medical_knowledge"))
+
+    report = maintenance.collect_garbage(path, client=client)
+
+    assert report["verified"] is True
+    assert report["bytes_reclaimed"] >= report["orphan_bytes"] > 0
+    assert not orphan.exists() and live_dir.exists()
+    assert maintenance.snapshot_results(client.get_collection("medical_knowledge")) == before
+
+
+def test_failed_verification_restores_orphans(store, monkeypatch):
+    path, client, _, orphan = store
+    snapshots = iter([[["a"]], [["b"]]])
+    monkeypatch.setattr(maintenance, "snapshot_results", lambda collection, probes: next(snapshots))
+
+    report = maintenance.collect_garbage(path, client=client)
+
+    assert report["verified"] is False
+    assert orphan.exists()
+    assert not any(p.name.startswith("chroma_gc_") for p in path.parent.iterdir())
+
+
+def test_concurrent_collection_is_skipped(store):
+    path, client, _, orphan = store
+    with maintenance._gc_lock(path) as acquired:
+        assert acquired
+        report = maintenance.collect_garbage(path, client=client)
+        assert "skipped" in report
+        assert maintenance.startup_segment_check(client, path, mode="clean") == report
+    assert orphan.exists()
+    assert maintenance.collect_garbage(path, client=client)["verified"] is True
+    assert not orphan.exists()
+
+
+def test_refuses_without_metadata_store(tmp_path):
+    (tmp_path / str(uuid.uuid4())).mkdir()
+    with pytest.raises(FileNotFoundError):
+        maintenance.collect_garbage(tmp_path)
+    assert not (tmp_path / maintenance.SQLITE_NAME).exists()
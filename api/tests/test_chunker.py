@@ -0,0 +1,94 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.corpus import DATA_DIR, chunk_markdown, chunk_markdown_file, split_sections  # noqa: E402
+from api.rag.tokens import count_tokens, tokenizer_name  # noqa: E402
+
+DOC = """# Fever in Adults
+
+## Overview
+Fever is a rise in body temperature. It is usually caused by infection.
+
+## Red flags
+- Fever above 40°C
+- Stiff neck or rash
+
+### In pregnancy
+Seek care early.
+
+```
+# not a heading
+```
+"""
+
+
+def test_sections_follow_heading_hierarchy():
+    paths = [path for path, _ in split_sections(DOC)]
+    assert paths == [
+        ["Fever in Adults", "Overview"],
+        ["Fever in Adults", "Red flags"],
+        ["Fever in Adults", "Red flags", "In pregnancy"],
+    ]
+
+
+def test_small_sections_share_a_chunk_with_title_and_headings():
+    chunks = chunk_markdown(DOC, title="Fever in Adults", max_tokens=256)
+    assert len(chunks) == 1
+    text = chunks[0]["text"]
+    assert text.startswith("Fever in Adults\nOverview\n")
+    assert "Red flags\n- Fever above 40°C\n- Stiff neck or rash" in text
+    assert "# not a heading" in text
+    assert chunks[0]["heading_path"] == "Fever in Adults > Overview"
+    assert chunks[0]["token_count"] == count_tokens(text)
+
+
+def test_large_section_splits_at_sentences_and_repeats_heading():
+    sentences = " ".join(f"Sentence number {i} explains one thing." for i in range(60))
+    chunks = chunk_markdown(f"## Self-care\n{sentences}\n\n## Prevention\nWash hands.", title="Cold", max_tokens=80)
+
+    self_care = [c for c in chunks if c["heading_path"] == "Cold > Self-care"]
+    assert len(self_care) > 2
+    for chunk in self_care:
+        assert chunk["text"].startswith("Cold\nSelf-care\n")
+        assert chunk["text"].endswith(".")  # never cut mid-sentence
+        assert chunk["token_count"] <= 80 + 8
+    assert chunks[-1]["text"].endswith("Wash hands.")
+
+
+def test_corpus_chunks_carry_token_metadata():
+    rows = chunk_markdown_file(DATA_DIR / "general" / "fever-adult.md")
+    assert len(rows) > 1
+    for row in rows:
+        assert row["metadata"]["token_count"] == count_tokens(row["document"])
+        assert row["metadata"]["tokenizer"] == tokenizer_name()
+        assert row["metadata"]["heading_path"].startswith("Fever in Adults > ")
+        assert row["document"].startswith("Fever in Adults\n")
+
+
+def test_pack_context_fits_budget_in_rank_order():
+    results = [
+        {"chunk": "a " * 50, "token_count": 50},
+        {"chunk": "b " * 80, "token_count": 80},  # does not fit, skipped
+        {"chunk": "c " * 20, "token_count": None},  # counted on the fly
+    ]
+    context, packed = retriever.pack_context(results, max_tokens=100)
+    assert [r["chunk"][0] for r in packed] == ["a", "c"]
+    assert context == results[0]["chunk"] + "\n\n" + results[2]["chunk"]
+
+    # Counts measured by another tokenizer are recounted
+    other = "approx" if tokenizer_name() != "approx" else "o200k_base"
+    mixed = [
+        {"chunk": "a " * 50, "token_count": 5, "tokenizer": other},
+        {"chunk": "c " * 20, "token_count": 50, "tokenizer": tokenizer_name()},  # trusted as stored
+    ]
+    _, packed = retriever.pack_context(mixed, max_tokens=60)
+    assert [r["chunk"][0] for r in packed] == ["a"]
+
+    # The top chunk is kept even when it alone exceeds the budget
+    _, packed = retriever.pack_context(results[1:2], max_tokens=10)
+    assert len(packed) == 1
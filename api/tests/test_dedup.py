@@ -0,0 +1,111 @@
+from pathlib import Path
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from chromadb import EmbeddingFunction  # noqa: E402
+
+from api.rag.build_index import build_index  # noqa: E402
+from api.rag.doc_store import DocStore  # noqa: E402
+from api.rag.dedup import find_duplicate_clusters, merge_metadata  # noqa: E402
+
+BURNS = (
+    "Cool the burn under cool running water for twenty minutes. Remove rings, watches and tight clothing "
+    "near the burned area before swelling starts. Cover the burn loosely with cling film or a clean "
+    "non-fluffy dressing. Do not apply ice, butter, toothpaste or creams to the burn. Seek urgent care for "
+    "burns larger than the palm, burns on the face, hands, feet or genitals, and any burn in a young child."
+)
+NOSEBLEED = (
+    "Sit upright and lean forward so blood does not run down the throat. Pinch the soft part of the nose "
+    "firmly for ten to fifteen minutes without letting go. Breathe through the mouth and spit out any blood."
+)
+
+
+class LengthEmbedding(EmbeddingFunction):
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in input]
+
+
+def _row(chunk_id: str, text: str, url: str) -> dict:
+    source = chunk_id.split("#")[0] + ".md"
+    return {
+        "id": chunk_id,
+        "document": text,
+        "metadata": {"source": source, "reference_sources": json.dumps([{"name": url, "url": url}])},
+    }
+
+
+def _page(path: Path, title: str, body: str, url: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        f"---\ntitle: {title}\nsources:\n  - name: {url}\n    url: {url}\n---\n## What to do\n{body}\n",
+        encoding="utf-8",
+    )
+
+
+def test_lightly_edited_copies_cluster_and_merge_references():
+    rows = [
+        _row("firstaid/burns#0", BURNS + " Keep the person warm.", "https://nhs.uk/burns"),
+        _row("Skin_Allergies/burns-first-aid#0", BURNS, "https://who.int/burns"),
+        _row("firstaid/nosebleed#0", NOSEBLEED, "https://nhs.uk/nosebleed"),
+    ]
+
+    clusters = find_duplicate_clusters(rows)
+    assert len(clusters) == 1
+    assert clusters[0]["canonical"] == "firstaid/burns#0"  # the longer chunk
+    assert clusters[0]["duplicates"] == ["Skin_Allergies/burns-first-aid#0"]
+    assert find_duplicate_clusters(rows, threshold=0.99) == []
+
+    merged = merge_metadata(rows[0]["metadata"], [rows[1]["metadata"], rows[0]["metadata"]])
+    urls = [ref["url"] for ref in json.loads(merged["reference_sources"])]
+    assert urls == ["https://nhs.uk/burns", "https://who.int/burns"]
+    assert json.loads(merged["duplicate_sources"]) == ["Skin_Allergies/burns-first-aid.md"]
+
+
+def test_build_collapses_duplicates_and_restores_them_when_they_diverge(tmp_path):
+    data_dir = tmp_path / "data"
+    _page(data_dir / "firstaid" / "burns.md", "Burns", BURNS, "https://nhs.uk/burns")
+    _page(data_dir / "Skin_Allergies" / "burns-first-aid.md", "Burns", BURNS, "https://who.int/burns")
+    _page(data_dir / "firstaid" / "nosebleed.md", "Nosebleed", NOSEBLEED, "https://nhs.uk/nosebleed")
+    embedding = LengthEmbedding()
+
+    def build(**kwargs):
+        embedding.embedded.clear()
+        return build_index(
+            data_dir=data_dir,
+            chroma_path=tmp_path / "chroma",
+            bm25_path=tmp_path / "bm25.json",
+            doc_store_path=tmp_path / "doc_store.json",
+            document_index_path=None,
+            symptom_routes_path=None,
+            snapshot_path=None,
+            embedding_function=embedding,
+            workers=1,
+            **kwargs,
+        )
+
+    first = build(dedup=True)
+    assert first["chunks_total"] == 2
+    assert first["dedup"]["chunks_removed"] == 1
+    store = DocStore.load(tmp_path / "doc_store.json")
+    canonical = store.get("Skin_Allergies/burns-first-aid#0")  # equal length: first id wins
+    assert {c["url"] for c in canonical["citations"]} == {"https://nhs.uk/burns", "https://who.int/burns"}
+
+    second = build(dedup=True)
+    assert (second["chunks_upserted"], second["chunks_total"]) == (0, 2)  # the duplicate is not re-embedded
+    assert embedding.embedded == []
+
+    # The canonical page changes; the collapsed chunk's file did not, so dedup re-indexes it
+    _page(data_dir / "Skin_Allergies" / "burns-first-aid.md", "Burns", NOSEBLEED.replace("nose", "arm"), "https://who.int/burns")
+    diverged = build(dedup=True)
+    assert diverged["chunks_total"] == 3
+    assert (diverged["dedup"]["clusters"], diverged["dedup"]["chunks_restored"]) == (0, 1)
+    store = DocStore.load(tmp_path / "doc_store.json")
+    assert [c["url"] for c in store.get("firstaid/burns#0")["citations"]] == ["https://nhs.uk/burns"]
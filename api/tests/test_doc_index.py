@@ -0,0 +1,97 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.bm25 import BM25Index  # noqa: E402
+from api.rag.doc_index import DocumentIndex, document_rows  # noqa: E402
+
+
+def _chunk(source: str, chunk_id: int, title: str, heading: str, text: str, category: str = "general") -> dict:
+    return {
+        "id": f"{source[:-3]}#{chunk_id}",
+        "document": f"{title}\n{heading}\n{text}",
+        "metadata": {
+            "source": source,
+            "category": category,
+            "title": title,
+            "topic": source.split("/")[-1][:-3],
+            "chunk_id": chunk_id,
+            "heading_path": f"{title} > {heading}",
+            "reference_sources": "[]",
+        },
+    }
+
+
+ROWS = [
+    _chunk("general/fever-adult.md", 0, "Fever in Adults", "Overview", "A temperature above 38C is a fever. Rest."),
+    _chunk("general/fever-adult.md", 1, "Fever in Adults", "When to seek care", "Get help if a fever and a stiff neck occur."),
+    _chunk("peds/fever-child.md", 0, "Fever in Children", "Overview", "Children often get a fever with infections.", "peds"),
+    _chunk("general/sprain.md", 0, "Sprains", "Home care", "Rest, ice and raise the joint. A fever is not expected."),
+]
+
+
+class CountingEmbedding:
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return [[float("fever" in text.lower()), float("sprain" in text.lower()), 1.0] for text in input]
+
+
+def _columns(rows):
+    return [row["id"] for row in rows], [row["document"] for row in rows], [row["metadata"] for row in rows]
+
+
+def test_one_row_per_document_with_title_id_headings_and_summary():
+    rows = document_rows(*_columns(ROWS))
+    assert [row["id"] for row in rows] == ["general/fever-adult.md", "peds/fever-child.md", "general/sprain.md"]
+    fever = rows[0]
+    assert fever["document"] == (
+        "Fever in Adults\nfever adult\nOverview; When to seek care\nA temperature above 38C is a fever. Rest."
+    )
+    assert fever["metadata"] == {
+        "source": "general/fever-adult.md", "category": "general", "title": "Fever in Adults",
+        "topic": "fever-adult", "chunks": 2,
+    }
+
+    # The planner's category filter applies to the document stage
+    index = DocumentIndex(rows)
+    assert index.search("fever", 1, "sparse") == ["peds/fever-child.md"]
+    assert index.search("fever", 1, "sparse", where={"category": {"$nin": ["peds"]}}) == ["general/fever-adult.md"]
+
+
+def test_embeddings_of_unchanged_documents_are_reused(tmp_path):
+    embedding = CountingEmbedding()
+    first = DocumentIndex.from_chunks(*_columns(ROWS), embedding)
+    first.save(tmp_path / "document_index.json")
+    assert len(embedding.embedded) == 3
+
+    embedding.embedded.clear()
+    edited = ROWS[:3] + [_chunk("general/sprain.md", 0, "Sprains and strains", "Home care", "Rest and ice.")]
+    second = DocumentIndex.from_chunks(*_columns(edited), embedding, DocumentIndex.load(tmp_path / "document_index.json"))
+    assert (second.reused, len(embedding.embedded)) == (2, 1)
+    assert embedding.embedded[0].startswith("Sprains and strains")
+
+
+def test_two_stage_retrieval_searches_chunks_of_the_best_documents(monkeypatch):
+    monkeypatch.setattr(retriever, "_bm25_index", BM25Index.from_rows(ROWS))
+    monkeypatch.setattr(retriever, "_doc_store", None)
+    monkeypatch.setattr(retriever, "_document_index", DocumentIndex.from_chunks(*_columns(ROWS)))
+    monkeypatch.setattr(retriever, "_document_index_initialized", True)
+    monkeypatch.setattr(retriever, "TWO_STAGE_DOCUMENTS", 1)
+
+    def sources():
+        results = retriever.retrieve("fever", k=4, mode="sparse", rerank="off", cutoff=False)
+        return sorted({result["source"] for result in results})
+
+    monkeypatch.setattr(retriever, "RAG_TWO_STAGE", False)
+    assert sources() == ["general/fever-adult.md", "general/sprain.md", "peds/fever-child.md"]
+
+    monkeypatch.setattr(retriever, "RAG_TWO_STAGE", True)
+    assert sources() == ["peds/fever-child.md"]
+    assert retriever.retrieve("unrelated words", k=4, mode="sparse", rerank="off", cutoff=False) == []
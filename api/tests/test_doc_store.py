@@ -0,0 +1,80 @@
+from pathlib import Path
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.doc_store import DocStore  # noqa: E402
+from api.main import _rag_citations, build_fallback_answer  # noqa: E402
+
+REFS = [
+    {"name": "NHS — Fever", "url": "https://nhs.uk/fever"},
+    {"name": "NHS duplicate", "url": "https://nhs.uk/fever"},
+    {"name": "", "url": "https://who.int/fever"},
+]
+
+ROWS = [
+    {
+        "id": "general/fever#0",
+        "document": "Fever\nOverview\nFever is a high temperature. It often means infection. Rest helps.",
+        "metadata": {
+            "source": "general/fever.md",
+            "title": "Fever",
+            "heading_path": "Fever > Overview",
+            "reference_sources": json.dumps(REFS),
+        },
+    },
+    {
+        "id": "general/rash#0",
+        "document": "Rash\nMost rashes are harmless. Some need care.",
+        "metadata": {"source": "general/rash.md", "title": "Rash", "heading_path": "Rash", "reference_sources": "[]"},
+    },
+]
+
+
+def test_entries_hold_parsed_metadata_citations_and_summary():
+    store = DocStore.from_rows(ROWS)
+
+    fever = store.get("general/fever#0")
+    assert fever["metadata"]["reference_sources"] == REFS
+    assert fever["citations"] == [
+        {"source": "NHS — Fever", "url": "https://nhs.uk/fever"},
+        {"source": "general/fever.md", "url": "https://who.int/fever"},
+    ]
+    assert fever["summary"] == "Fever is a high temperature. It often means infection."
+
+    rash = store.get("general/rash#0")
+    assert rash["citations"] == [{"source": "general/rash.md", "url": "file://general/rash.md"}]
+    assert store.get("missing#0") is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = DocStore.from_rows(ROWS)
+    store.save(tmp_path / "doc_store.json")
+    assert DocStore.load(tmp_path / "doc_store.json").entries == store.entries
+
+
+def test_retrieve_results_use_store_and_match_uncached_path(monkeypatch):
+    row = ROWS[0]
+    monkeypatch.setattr(retriever, "_doc_store", None)
+    uncached = retriever._format_result(row["document"], row["id"], row["metadata"])
+
+    monkeypatch.setattr(retriever, "_doc_store", DocStore.from_rows(ROWS))
+    cached = retriever._format_result(row["document"], row["id"], {})  # metadata comes from the store
+
+    assert cached["summary"] == "Fever is a high temperature. It often means infection."
+    assert uncached["summary"] is None
+    cached.pop("summary"), uncached.pop("summary")
+    assert cached == uncached
+    assert _rag_citations([cached, cached]) == cached["citations"]  # deduplicated across chunks
+
+
+def test_fallback_answer_uses_precomputed_summary():
+    result = {"chunk": "Fever\nOverview\nFever is a high temperature.", "summary": "Precomputed summary."}
+    answer = build_fallback_answer(
+        query_en="fever", rag_results=[result], facts=[], citations=[], target_lang="en", response_style="native"
+    )
+    assert "Key insight 1: Precomputed summary." in answer
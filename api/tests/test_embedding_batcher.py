@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag.embedding_batcher import EmbeddingBatcher  # noqa: E402
+
+
+def _vector(text):
+    return np.full(4, float(len(text)), dtype=np.float32)
+
+
+def test_concurrent_queries_share_one_encode():
+    calls = []
+    release = threading.Event()
+
+    def embed_batch(texts):
+        calls.append(list(texts))
+        release.wait(1)
+        return [_vector(t) for t in texts]
+
+    batcher = EmbeddingBatcher(embed_batch, max_batch=8, max_wait_ms=50)
+    texts = ["a", "bb", "ccc", "bb", "dddd"]
+    futures = [batcher.submit(t) for t in texts]
+    release.set()
+
+    results = [f.result(timeout=2) for f in futures]
+    assert calls == [["a", "bb", "ccc", "dddd"]]  # one batch, duplicate encoded once
+    assert [int(r[0]) for r in results] == [1, 2, 3, 2, 4]
+    stats = batcher.get_statistics()
+    assert stats["batch_size_distribution"] == {5: 1}
+    assert stats["encoded_texts"] == 4
+    batcher.shutdown(1)
+
+
+def test_batches_are_capped_at_max_batch():
+    batcher = EmbeddingBatcher(lambda texts: [_vector(t) for t in texts], max_batch=3, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=7) as pool:
+        results = list(pool.map(batcher.embed, [f"q{i}" for i in range(7)]))
+    assert len(results) == 7
+    stats = batcher.get_statistics()
+    assert max(stats["batch_size_distribution"]) <= 3
+    assert stats["queries"] == 7
+    assert stats["queue_delay_ms"]["p99"] >= stats["queue_delay_ms"]["p50"] >= 0
+    batcher.shutdown(1)
+
+
+def test_encode_errors_reach_every_caller():
+    def broken(texts):
+        raise RuntimeError("model failed")
+
+    batcher = EmbeddingBatcher(broken, max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.embed("fever", timeout=2)
+    # Worker survives and keeps serving
+    batcher.embed_batch = lambda texts: [_vector(t) for t in texts]
+    assert batcher.embed("fever", timeout=2)[0] == 5
+    batcher.shutdown(1)
@@ -0,0 +1,123 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.embedding_cache import (  # noqa: E402
+    QueryEmbeddingCache,
+    decode_float16,
+    encode_float16,
+    normalize_query,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+def _counting_embedder():
+    calls = []
+
+    def embed(query):
+        calls.append(query)
+        return np.arange(8, dtype=np.float32) + len(calls)
+
+    return embed, calls
+
+
+def test_normalized_queries_share_an_entry():
+    assert normalize_query("  I have   a FEVER ") == "i have a fever"
+    cache = QueryEmbeddingCache(max_size=4)
+    embed, calls = _counting_embedder()
+
+    first = cache.get_or_compute("I have a fever", embed)
+    second = cache.get_or_compute("  i have a   FEVER", embed)
+
+    assert len(calls) == 1
+    assert np.array_equal(first, second)
+    stats = cache.get_statistics()
+    assert (stats["l1_hits"], stats["misses"], stats["hit_rate_percent"]) == (1, 1, 50.0)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_size=2)
+    embed, calls = _counting_embedder()
+    cache.get_or_compute("a", embed)
+    cache.get_or_compute("b", embed)
+    cache.get_or_compute("a", embed)  # a is now most recent
+    cache.get_or_compute("c", embed)  # evicts b
+    cache.get_or_compute("a", embed)
+    cache.get_or_compute("b", embed)
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_redis_tier_round_trips_float16():
+    vector = np.linspace(-1, 1, 384).astype(np.float32)
+    payload = encode_float16(vector)
+    assert len(payload) == len(encode_float16(np.zeros(384))) < 1100
+    assert np.allclose(decode_float16(payload), vector, atol=1e-3)
+
+    redis = FakeRedis()
+    writer = QueryEmbeddingCache()
+    writer.attach_redis(redis)
+    writer.get_or_compute("sore throat", lambda q: vector)
+
+    reader = QueryEmbeddingCache()  # e.g. another worker with a cold L1
+    reader.attach_redis(redis)
+    result = reader.get_or_compute("Sore throat", lambda q: (_ for _ in ()).throw(AssertionError("embedded")))
+    assert np.allclose(result, vector, atol=1e-3)
+    assert reader.get_statistics()["l2_hits"] == 1
+
+
+def test_redis_failures_fall_back_to_embedding():
+    class BrokenRedis:
+        def get(self, key):
+            raise ConnectionError("down")
+
+        def setex(self, key, ttl, value):
+            raise ConnectionError("down")
+
+    cache = QueryEmbeddingCache()
+    cache.attach_redis(BrokenRedis())
+    embed, calls = _counting_embedder()
+    cache.get_or_compute("cough", embed)
+    assert calls == ["cough"]
+    assert cache.get_statistics()["redis_errors"] == 2
+
+
+def test_chroma_retrieve_queries_by_cached_embedding(monkeypatch):
+    class FakeCollection:
+        def __init__(self):
+            self.kwargs = None
+
+        def query(self, **kwargs):
+            self.kwargs = kwargs
+            return {"documents": [["chunk"]], "ids": [["general/doc#0"]], "metadatas": [[{"source": "general/doc.md"}]]}
+
+    collection = FakeCollection()
+    embed, calls = _counting_embedder()
+    monkeypatch.setattr(retriever, "RAG_ENGINE", "chroma")
+    monkeypatch.setattr(retriever, "_initialize_chroma", lambda: (object(), collection))
+    monkeypatch.setattr(retriever, "query_embedding_cache", QueryEmbeddingCache())
+    monkeypatch.setattr(retriever, "_embed_uncached", embed)
+
+    retriever.retrieve("fever and rash", k=1)
+    results = retriever.retrieve("Fever and rash", k=1)
+
+    assert calls == ["fever and rash"]
+    assert "query_texts" not in collection.kwargs
+    assert collection.kwargs["query_embeddings"] == [(np.arange(8, dtype=np.float32) + 1).tolist()]
+    assert results[0]["id"] == "general/doc#0"
+    assert retriever.get_embedding_cache_statistics()["l1_hits"] == 1
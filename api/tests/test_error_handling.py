@@ -58,7 +58,7 @@ def client(monkeypatch):
         audio = DummyAudio()
 
     monkeypatch.setattr(main_module, "translate_text", fake_translate)
-    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4: [])
+    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4, where=None: [])
     monkeypatch.setattr(main_module, "get_openai_client", lambda: DummyOpenAI())
     monkeypatch.setattr(main_module, "get_openrouter_client", lambda: None)
 
@@ -112,7 +112,7 @@ def test_chat_fallback_when_openai_unavailable(client, monkeypatch):
     monkeypatch.setattr(
         main_module,
         "retrieve",
-        lambda query, k=4: [
+        lambda query, k=4, where=None: [
             {
                 "chunk": "General fever guidance.",
                 "id": "guidance#0",
@@ -194,7 +194,7 @@ def test_chat_openai_unavailable_returns_fallback(client, monkeypatch):
     monkeypatch.setattr(
         main_module,
         "retrieve",
-        lambda query, k=4: [
+        lambda query, k=4, where=None: [
             {
                 "chunk": "General lifestyle guidance.",
                 "id": "guidance#1",
@@ -0,0 +1,153 @@
+from pathlib import Path
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.graph import fallback  # noqa: E402
+from api.graph.memory import MemoryGraph, read_triples, GRAPH_CSV_FILES  # noqa: E402
+from api.router import CITIES, extract_city  # noqa: E402
+
+
+def _triple(subject: str, predicate: str, obj: str, type_s: str = "Symptom", type_o: str = "Condition") -> dict:
+    return {"subject": subject, "predicate": predicate, "object": obj, "type_s": type_s, "type_o": type_o}
+
+
+TRIPLES = [
+    _triple("Chest pain", "IS_RED_FLAG_FOR", "Heart attack"),
+    _triple("Chest pain", "IS_RED_FLAG_FOR", "Heart attack"),  # merged, as by ingest.py
+    _triple("Chest pain", "IS_ASSOCIATED_WITH", "Angina"),
+    _triple("Left arm pain", "IS_ASSOCIATED_WITH", "Heart attack"),
+    _triple("Left arm pain", "IS_RED_FLAG_FOR", "Angina"),
+    _triple("Chest Pain", "IS_RED_FLAG_FOR", "Heart attack"),  # a distinct node, same name lowercased
+    _triple("Heart attack", "IS_RED_FLAG_FOR", "Cardiac arrest", "Condition", "Condition"),
+    _triple("Ibuprofen", "AVOID_IN", "Hypertension", "Action", "Condition"),
+    _triple("Ibuprofen", "AVOID_IN", "Kidney disease", "Action", "Condition"),
+    _triple("Sugary drinks", "AVOID_IN", "Diabetes", "Action", "Condition"),
+    _triple("Walking", "SAFE_FOR", "Diabetes", "Action", "Condition"),
+    _triple("Apollo Hospitals", "LOCATED_IN", "Mumbai", "Provider", "Location"),
+    _triple("Apollo Hospitals", "HAS_MODE", "Emergency", "Provider", "Service"),
+    _triple("Apollo Hospitals", "HAS_PHONE", "1860-500-1066", "Provider", "Contact"),
+    _triple("Lilavati Hospital", "LOCATED_IN", "Mumbai", "Provider", "Location"),
+    _triple("Broken row", "", "Nothing"),
+]
+
+
+def test_queries_follow_the_cypher_semantics():
+    graph = MemoryGraph(TRIPLES)
+    assert graph.edge_count == 14
+
+    # toLower(s.name) IN $symptoms, grouped by name; Condition -> Condition flags are not symptoms
+    assert graph.get_red_flags(["chest pain", "heart attack", "unknown"]) == [
+        {"symptom": "Chest pain", "conditions": ["Heart attack"]},
+        {"symptom": "Chest Pain", "conditions": ["Heart attack"]},
+    ]
+    assert graph.count_red_flags(["CHEST PAIN"]) == 2
+
+    # c.name IN $userConditions is case-sensitive
+    assert graph.get_contraindications(["Hypertension", "Kidney disease", "diabetes"]) == [
+        {"avoid": "Ibuprofen", "because": ["Hypertension", "Kidney disease"]}
+    ]
+    assert graph.get_safe_actions_for_metabolic_conditions() == [{"safeAction": "Walking"}]
+
+    assert graph.get_providers_in_city("Mumbai") == [
+        {"provider": "Apollo Hospitals", "mode": "Emergency", "phone": "1860-500-1066"},
+        {"provider": "Lilavati Hospital", "mode": None, "phone": None},
+    ]
+    assert graph.get_providers_in_city("mumbai") == []
+
+
+def test_related_symptoms_merge_every_relationship_combination():
+    graph = MemoryGraph(TRIPLES)
+    assert graph.get_related_symptoms(["chest pain"]) == [
+        {"original_symptom": "Chest pain", "related_symptom": "Left arm pain", "shared_conditions": ["Angina", "Heart attack"]},
+    ]
+    assert graph.get_related_symptoms(["left arm pain"]) == [
+        {"original_symptom": "Left arm pain", "related_symptom": "Chest pain", "shared_conditions": ["Angina", "Heart attack"]},
+    ]
+
+
+def test_fallback_answers_from_the_seed_triples():
+    triples = [triple for path in GRAPH_CSV_FILES for triple in read_triples(path)]
+    flags = {
+        (triple["subject"], triple["object"])
+        for triple in triples
+        if triple["predicate"] == "IS_RED_FLAG_FOR" and triple["type_s"] == "Symptom"
+    }
+    symptoms = sorted({symptom for symptom, _ in flags})
+    answered = {(row["symptom"], condition) for row in fallback.get_red_flags(symptoms) for condition in row["conditions"]}
+    assert answered == flags
+
+    related = fallback.get_related_symptoms(["chest pain"])
+    assert {"Left arm pain", "Jaw pain"} <= {row["related_symptom"] for row in related}
+    assert {row["provider"] for row in fallback.get_providers_in_city("Mumbai")} >= {"Apollo Hospitals", "Lilavati Hospital"}
+
+
+@pytest.mark.parametrize("city", sorted({extract_city(f"hospitals in {name}") for name in CITIES}))
+def test_providers_with_phones_for_every_city_the_router_extracts(city):
+    rows = fallback.get_providers_in_city(city)
+    assert any(row["phone"] and row["mode"] == "Emergency" for row in rows)
+
+
+def test_emergency_providers_of_the_former_fallback_table_keep_their_phones():
+    phones = {
+        (row["provider"], row["phone"])
+        for city in ("Mumbai", "Delhi", "Bangalore", "Gurgaon")
+        for row in fallback.get_providers_in_city(city)
+    }
+    assert {
+        ("Apollo Hospitals", "1860-500-1066"),
+        ("All India Institute of Medical Sciences (AIIMS)", "+91-11-2658-8500"),
+        ("Columbia Asia", "+91-80-6614-6614"),
+        ("Medanta (The Medicity)", "+91-124-414-1414"),
+        ("Emergency services (112)", "112"),
+    } <= phones
+
+
+def test_related_symptoms_fall_back_to_the_in_memory_graph(monkeypatch):
+    from api import main as main_module
+
+    monkeypatch.setattr(main_module, "ensure_neo4j", lambda: True)
+
+    def raise_error(symptoms):
+        raise RuntimeError("neo failure")
+
+    monkeypatch.setattr(main_module, "neo4j_get_related_symptoms", raise_error)
+    result = main_module.graph_get_related_symptoms(["chest pain"])
+    assert result == fallback.get_related_symptoms(["chest pain"])
+    assert result
+
+
+def _normalized(rows):
+    """Rows with list values sorted, in a stable order, for comparing query results"""
+    rows = [{key: sorted(value) if isinstance(value, list) else value for key, value in row.items()} for row in rows]
+    return sorted(rows, key=repr)
+
+
+@pytest.mark.skipif(
+    os.getenv("GRAPH_PARITY_NEO4J") != "1",
+    reason="needs a Neo4j loaded by graph/ingest.py (set GRAPH_PARITY_NEO4J=1)",
+)
+def test_parity_with_neo4j():
+    from api.graph import cypher
+    from api.graph.client import neo4j_client
+
+    assert neo4j_client.connect()
+    triples = [triple for path in GRAPH_CSV_FILES for triple in read_triples(path)]
+    names = lambda label: sorted({t["subject"] for t in triples if t["type_s"] == label} | {t["object"] for t in triples if t["type_o"] == label})  # noqa: E731
+    symptoms = [name.lower() for name in names("Symptom")]
+    conditions = names("Condition")
+
+    assert _normalized(fallback.get_red_flags(symptoms)) == _normalized(cypher.get_red_flags(symptoms))
+    assert _normalized(fallback.get_contraindications(conditions)) == _normalized(cypher.get_contraindications(conditions))
+    assert _normalized(fallback.get_safe_actions_for_metabolic_conditions()) == _normalized(
+        cypher.get_safe_actions_for_metabolic_conditions()
+    )
+    for city in names("Location") + ["Delhi", "Bangalore", "Gurgaon"]:
+        assert _normalized(fallback.get_providers_in_city(city)) == _normalized(cypher.get_providers_in_city(city))
+    for symptom in symptoms:
+        assert fallback.get_related_symptoms([symptom]) == cypher.get_related_symptoms([symptom])
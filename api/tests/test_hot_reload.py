@@ -0,0 +1,160 @@
+from pathlib import Path
+import math
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from chromadb import EmbeddingFunction  # noqa: E402
+
+from api.rag import retriever  # noqa: E402
+from api.rag.reload import REJECTED_NAME, IndexReloader  # noqa: E402
+from api.rag.snapshot import current_version  # noqa: E402
+
+CONCEPTS = ("fever", "cough", "rash", "sprain")
+QUERIES = ["reload fever care", "reload cough care"]
+
+
+class ConceptEmbedding(EmbeddingFunction):
+    """One unit axis per concept word, so distances are meaningful"""
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            vector = [float(word in text.lower()) for word in CONCEPTS] + [0.1]
+            norm = math.sqrt(sum(v * v for v in vector))
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+def _write(data_dir: Path, name: str, title: str):
+    path = data_dir / "general" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\ntitle: {title}\n---\n## Care\n{title} care at home: rest and fluids.\n", encoding="utf-8")
+
+
+@pytest.fixture
+def kb(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    _write(data_dir, "fever.md", "Fever")
+    _write(data_dir, "cough.md", "Cough")
+
+    # Serve from an empty versions directory with nothing loaded yet
+    monkeypatch.setattr(retriever, "INDEX_VERSIONS_DIR", tmp_path / "versions")
+    monkeypatch.setattr(retriever, "RAG_ENGINE", "chroma")
+    for name, value in (
+        ("_index_version", None), ("_index_version_resolved", False), ("_chroma_client", None),
+        ("_chroma_collection", None), ("_chroma_initialized", False), ("_numpy_index", None),
+        ("_bm25_index", None), ("_doc_store", None),
+    ):
+        monkeypatch.setattr(retriever, name, value)
+    embedding = ConceptEmbedding()
+    monkeypatch.setattr(retriever, "_embed_uncached", lambda query: embedding([query])[0])
+    monkeypatch.setattr(retriever, "EMBEDDING_BATCHING", False)
+
+    reloader = IndexReloader(
+        root=tmp_path / "versions", data_dir=data_dir, embedding_function=embedding, queries=QUERIES, workers=1
+    )
+    return data_dir, reloader
+
+
+def _top_source(query: str) -> str:
+    return retriever.retrieve(query, k=1, mode="dense", rerank="off", cutoff=False)[0]["source"]
+
+
+def test_reload_swaps_in_new_version_and_rolls_back(kb):
+    data_dir, reloader = kb
+
+    first = reloader.reload()
+    assert first["status"] == "reloaded"
+    assert current_version(reloader.root) == retriever.get_index_version() == first["version"]
+    assert reloader.reload()["status"] == "unchanged"
+
+    _write(data_dir, "sprain.md", "Sprain")
+    second = reloader.reload()
+    assert second["status"] == "reloaded"
+    assert second["previous_version"] == first["version"]
+    assert second["build"]["chunks_upserted"] == 1  # built incrementally from the served collection
+    assert _top_source("reload sprain care") == "general/sprain.md"
+
+    rolled_back = reloader.rollback()
+    assert rolled_back["status"] == "rolled_back"
+    assert current_version(reloader.root) == retriever.get_index_version() == first["version"]
+    assert _top_source("reload sprain care") != "general/sprain.md"
+    assert reloader.check() is None  # the watcher does not rebuild what was rolled back
+
+
+def test_snapshot_engine_maps_the_snapshot_of_each_version(kb, monkeypatch):
+    data_dir, reloader = kb
+    monkeypatch.setattr(retriever, "RAG_ENGINE", "snapshot")
+    monkeypatch.setattr(retriever, "build_numpy_index", lambda collection: pytest.fail("embeddings copied from Chroma"))
+
+    first = reloader.reload()
+    assert first["status"] == "reloaded"
+    matrix = retriever.current_index_generation()["numpy_index"].matrix
+    assert isinstance(matrix, np.memmap) or isinstance(matrix.base, np.memmap)
+    assert current_version(reloader.root / first["version"] / "index_snapshot") is not None
+    assert _top_source("reload fever care") == "general/fever.md"
+
+    _write(data_dir, "sprain.md", "Sprain")
+    assert reloader.reload()["status"] == "reloaded"
+    assert _top_source("reload sprain care") == "general/sprain.md"
+
+
+def test_invalid_version_is_rejected_and_old_one_kept(kb):
+    data_dir, reloader = kb
+    served = reloader.reload()["version"]
+
+    (data_dir / "general" / "cough.md").unlink()  # "reload cough care" no longer has a close match
+    rejected = reloader.reload()
+    assert rejected["status"] == "rejected"
+    assert any("cough" in problem for problem in rejected["problems"])
+    assert retriever.get_index_version() == current_version(reloader.root) == served
+    assert (reloader.root / REJECTED_NAME).exists()
+    assert not (reloader.root / rejected["version"]).exists()
+
+    again = reloader.reload()
+    assert again["status"] == "rejected" and "build" not in again  # not rebuilt until the data changes
+    assert _top_source("reload cough care") == "general/cough.md"
+
+
+def test_smoke_test_distance_is_configured_separately(kb, monkeypatch):
+    data_dir, reloader = kb
+    monkeypatch.setattr(retriever, "RAG_MAX_DISTANCE", 0.01)  # an over-tight cutoff does not block reloads
+    reloader.max_distance = 4.0  # any distance between unit vectors
+    assert reloader.reload()["status"] == "reloaded"
+
+    (data_dir / "general" / "cough.md").unlink()  # rejected at the default distance
+    assert reloader.reload()["status"] == "reloaded"
+
+
+def test_retrieval_never_fails_during_reload(kb):
+    data_dir, reloader = kb
+    reloader.reload()
+    _write(data_dir, "sprain.md", "Sprain")
+
+    failures = []
+    done = threading.Event()
+
+    def query_loop():
+        while not done.is_set():
+            results = retriever.retrieve("reload fever care", k=2, mode="hybrid", rerank="off")
+            if not results or results[0]["source"] != "general/fever.md":
+                failures.append(results)
+
+    readers = [threading.Thread(target=query_loop) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for _ in range(2):
+            assert reloader.reload(force=True)["status"] == "reloaded"
+    finally:
+        done.set()
+        for reader in readers:
+            reader.join()
+    assert failures == []
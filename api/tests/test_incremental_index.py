@@ -0,0 +1,133 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from chromadb import EmbeddingFunction  # noqa: E402
+
+from api.rag.build_index import build_index  # noqa: E402
+from api.rag.doc_store import DocStore  # noqa: E402
+from api.rag.incremental import MANIFEST_NAME, load_manifest  # noqa: E402
+
+
+class CountingEmbedding(EmbeddingFunction):
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in input]
+
+
+def _write(path: Path, title: str, sections: int, sentences: int = 20):
+    """Markdown with ``sections`` headed sections of ~150 tokens each (one chunk per section)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = "\n\n".join(
+        f"## Part {s}\n" + " ".join(f"{title} note {s}-{i} is here." for i in range(sentences))
+        for s in range(sections)
+    )
+    path.write_text(f"---\ntitle: {title}\n---\n{body}\n", encoding="utf-8")
+
+
+@pytest.fixture
+def kb(tmp_path):
+    data_dir = tmp_path / "data"
+    _write(data_dir / "general" / "fever.md", "Fever", 2)  # two chunks
+    _write(data_dir / "general" / "cough.md", "Cough", 1, sentences=5)
+    _write(data_dir / "peds" / "rash.md", "Rash", 1, sentences=5)
+    embedding = CountingEmbedding()
+
+    def build(**kwargs):
+        embedding.embedded.clear()
+        kwargs.setdefault("workers", 1)
+        return build_index(
+            data_dir=data_dir,
+            chroma_path=tmp_path / "chroma",
+            bm25_path=tmp_path / "bm25.json",
+            doc_store_path=tmp_path / "doc_store.json",
+            document_index_path=None,
+            symptom_routes_path=None,
+            snapshot_path=tmp_path / "snapshot",
+            embedding_function=embedding,
+            **kwargs,
+        )
+
+    return data_dir, embedding, build
+
+
+def test_unchanged_corpus_embeds_nothing(kb):
+    _, embedding, build = kb
+    first = build()
+    assert (first["files_added"], first["chunks_upserted"], first["chunks_total"]) == (3, 4, 4)
+    assert len(embedding.embedded) == 4
+
+    second = build()
+    assert (second["files_unchanged"], second["chunks_upserted"], second["chunks_deleted"]) == (3, 0, 0)
+    assert embedding.embedded == []
+
+
+def test_only_changed_chunks_are_embedded(kb):
+    data_dir, embedding, build = kb
+    build()
+
+    text = (data_dir / "general" / "fever.md").read_text(encoding="utf-8")
+    (data_dir / "general" / "fever.md").write_text(text.replace("note 1-19", "note edited"), encoding="utf-8")
+    summary = build()
+
+    assert summary["files_changed"] == 1
+    assert summary["chunks_upserted"] == 1  # only the second section's chunk changed
+    assert len(embedding.embedded) == 1 and "note edited" in embedding.embedded[0]
+
+
+def test_deleted_and_shrunk_files_remove_chunks(kb, tmp_path):
+    data_dir, _, build = kb
+    build()
+
+    (data_dir / "peds" / "rash.md").unlink()
+    _write(data_dir / "general" / "fever.md", "Fever", 1)  # shrinks to one chunk
+    summary = build()
+
+    assert summary["files_deleted"] == 1
+    assert summary["chunks_deleted"] == 2
+    assert summary["chunks_total"] == 2
+    manifest = load_manifest(tmp_path / "chroma" / MANIFEST_NAME)
+    assert sorted(manifest["files"]) == ["general/cough.md", "general/fever.md"]
+    assert sorted(DocStore.load(tmp_path / "doc_store.json").entries) == ["general/cough#0", "general/fever#0"]
+
+
+def test_missing_manifest_reconciles_with_collection(kb, tmp_path):
+    data_dir, _, build = kb
+    build()
+    (tmp_path / "chroma" / MANIFEST_NAME).unlink()
+    (data_dir / "general" / "cough.md").unlink()
+
+    summary = build()
+
+    assert summary["chunks_deleted"] == 1  # stale row found by diffing the collection
+    assert summary["chunks_total"] == 3
+
+
+def test_parallel_parsing_and_bounded_batches(kb, tmp_path):
+    data_dir, embedding, build = kb
+    for i in range(10):
+        _write(data_dir / "extra" / f"topic-{i}.md", f"Topic{i}", 1, sentences=5)
+
+    summary = build(workers=2, embed_batch=3, upsert_batch=5)
+
+    assert summary["chunks_upserted"] == summary["chunks_total"] == 14
+    assert summary["embed_calls"] == 6  # upserts of 5, 5, 4 rows -> 2 + 2 + 2 embed calls
+    assert len(embedding.embedded) == 14
+    assert summary["chunks_per_second"] > 0
+    assert build(workers=2)["chunks_upserted"] == 0
+
+
+def test_full_rebuild_reembeds_everything(kb):
+    _, embedding, build = kb
+    build()
+    summary = build(full=True)
+    assert summary["mode"] == "full"
+    assert summary["chunks_upserted"] == summary["chunks_total"] == 4
@@ -0,0 +1,81 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.snapshot import (  # noqa: E402
+    EMBEDDINGS_NAME,
+    current_version,
+    export_snapshot,
+    load_snapshot,
+)
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+
+def _rows(n=40, dim=8, seed=0):
+    matrix = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    ids = [f"general/doc_{i}#0" for i in range(n)]
+    documents = [f"chunk {i}" for i in range(n)]
+    metadatas = [{"source": f"general/doc_{i}.md", "title": f"Doc {i}", "reference_sources": "[]"} for i in range(n)]
+    return ids, matrix, documents, metadatas
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine"])
+def test_snapshot_is_memory_mapped_and_matches_in_memory_index(tmp_path, space):
+    ids, matrix, documents, metadatas = _rows()
+    export_snapshot(ids, matrix, documents, metadatas, space=space, root=tmp_path)
+
+    mapped = load_snapshot(tmp_path)
+    assert isinstance(mapped.matrix.base, np.memmap) or isinstance(mapped.matrix, np.memmap)
+    assert not mapped.matrix.flags.writeable
+
+    expected = NumpyVectorIndex(ids, matrix, documents, metadatas, space)
+    query = np.random.default_rng(1).standard_normal(8).astype(np.float32)
+    assert mapped.query(query, 5)["ids"] == expected.query(query, 5)["ids"]
+    assert np.allclose(mapped.query(query, 5)["distances"], expected.query(query, 5)["distances"], atol=1e-5)
+
+
+def test_new_export_switches_current_and_keeps_previous_version(tmp_path):
+    ids, matrix, documents, metadatas = _rows()
+    first = export_snapshot(ids, matrix, documents, metadatas, root=tmp_path, keep=2)
+    second = export_snapshot(ids[:10], matrix[:10], documents[:10], metadatas[:10], root=tmp_path, keep=2)
+    third = export_snapshot(ids[:5], matrix[:5], documents[:5], metadatas[:5], root=tmp_path, keep=2)
+
+    assert current_version(tmp_path) == third.name
+    assert len(load_snapshot(tmp_path)) == 5
+    assert second.exists() and not first.exists()
+
+
+def test_corrupted_snapshot_is_rejected(tmp_path):
+    ids, matrix, documents, metadatas = _rows()
+    version = export_snapshot(ids, matrix, documents, metadatas, root=tmp_path)
+    data = bytearray((version / EMBEDDINGS_NAME).read_bytes())
+    data[-1] ^= 0xFF
+    (version / EMBEDDINGS_NAME).write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="Checksum"):
+        load_snapshot(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        load_snapshot(tmp_path / "missing")
+
+
+def test_snapshot_engine_never_opens_chroma(tmp_path, monkeypatch):
+    ids, matrix, documents, metadatas = _rows()
+    export_snapshot(ids, matrix, documents, metadatas, root=tmp_path)
+    monkeypatch.setattr(retriever, "RAG_ENGINE", "snapshot")
+    monkeypatch.setattr(retriever, "SNAPSHOT_DIR", tmp_path)
+    monkeypatch.setattr(retriever, "_numpy_index", None)
+    monkeypatch.setattr(retriever, "_chroma_client", None)
+    monkeypatch.setattr(retriever, "embed_query", lambda query: matrix[7])
+    monkeypatch.setattr(retriever, "_initialize_chroma", lambda: pytest.fail("Chroma opened"))
+
+    results = retriever.retrieve("anything", k=3, mode="dense")
+
+    assert results[0]["id"] == "general/doc_7#0"
+    assert retriever.get_chroma_client() is None
@@ -0,0 +1,111 @@
+from concurrent.futures import Future
+from pathlib import Path
+import math
+import sys
+
+import chromadb
+from chromadb import EmbeddingFunction
+from chromadb.config import Settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main as main_module  # noqa: E402
+from api.rag import retriever  # noqa: E402
+from api.rag.multilingual import (  # noqa: E402
+    MULTILINGUAL_COLLECTION,
+    open_multilingual_collection,
+    sync_multilingual_collection,
+)
+
+# Concept -> words that mean it in English, Hindi (Devanagari) and Hinglish
+CONCEPTS = [("fever", "बुखार", "bukhar"), ("cough", "खांसी", "khansi"), ("rash", "चकत्ते", "daane")]
+
+
+class ConceptEmbedding(EmbeddingFunction):
+    """Stand-in multilingual model: one unit axis per concept, whatever the language"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        vectors = []
+        for text in input:
+            vector = [float(any(word in text.lower() for word in words)) for words in CONCEPTS] + [0.1]
+            norm = math.sqrt(sum(v * v for v in vector))
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+def _source(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"), settings=Settings(anonymized_telemetry=False))
+    source = client.create_collection("medical_knowledge", embedding_function=ConceptEmbedding())
+    source.add(
+        ids=["general/fever.md#0", "general/cough.md#0", "peds/rash.md#0"],
+        documents=["Fever care: rest and fluids.", "Cough care: warm water.", "Rash care in children."],
+        metadatas=[
+            {"source": "general/fever.md", "category": "general"},
+            {"source": "general/cough.md", "category": "general"},
+            {"source": "peds/rash.md", "category": "peds"},
+        ],
+    )
+    return client, source
+
+
+def test_sync_only_re_embeds_changed_chunks_and_rebuilds_on_model_change(tmp_path):
+    client, source = _source(tmp_path)
+    embedding = ConceptEmbedding()
+
+    assert sync_multilingual_collection(source, client, embedding, "model-a") == {"upserted": 3, "deleted": 0, "total": 3}
+    embedding.embedded.clear()
+    assert sync_multilingual_collection(source, client, embedding, "model-a")["upserted"] == 0
+    assert embedding.embedded == []
+
+    source.update(ids=["general/cough.md#0"], documents=["Cough care: honey and warm water."])
+    source.delete(ids=["peds/rash.md#0"])
+    assert sync_multilingual_collection(source, client, embedding, "model-a") == {"upserted": 1, "deleted": 1, "total": 2}
+    assert embedding.embedded == ["Cough care: honey and warm water."]
+
+    assert open_multilingual_collection(client, embedding, "model-b") is None  # built with another model
+    assert sync_multilingual_collection(source, client, embedding, "model-b")["upserted"] == 2
+    assert open_multilingual_collection(client, embedding, "model-b").name == MULTILINGUAL_COLLECTION
+
+
+def test_untranslated_queries_retrieve_from_multilingual_collection(tmp_path, monkeypatch):
+    client, source = _source(tmp_path)
+    embedding = ConceptEmbedding()
+    sync_multilingual_collection(source, client, embedding, "model-a")
+    monkeypatch.setattr(retriever, "_multilingual_collection", open_multilingual_collection(client, embedding, "model-a"))
+    monkeypatch.setattr(retriever, "_multilingual_initialized", True)
+
+    for query in ("मुझे बुखार है", "mujhe bukhar hai"):
+        results = retriever.retrieve_multilingual(query, k=1, rerank="off")
+        assert results[0]["source"] == "general/fever.md"
+        assert results[0]["distance"] < 0.1
+
+    # A filter that leaves only weak matches falls back to the whole collection
+    results = retriever.retrieve_multilingual("bachche ko daane", k=1, where={"category": {"$nin": ["peds"]}}, rerank="off")
+    assert results[0]["source"] == "peds/rash.md"
+
+    monkeypatch.setattr(retriever, "_multilingual_collection", None)
+    assert retriever.retrieve_multilingual("mujhe bukhar hai") == []
+
+
+def test_native_results_are_used_only_when_the_plan_matches(monkeypatch):
+    good = [{"id": "a", "chunk": "a", "source": "a.md", "distance": 0.3}] * 4
+    weak = [{"id": "b", "chunk": "b", "source": "b.md", "distance": 1.9}]
+    where = {"category": {"$nin": ["peds"]}}
+
+    assert main_module._native_results(good, where, where, 3) == good[:3]
+    assert main_module._native_results(good, None, where, 3) is None  # plan changed after translation
+    assert main_module._native_results(weak, None, None, 3) is None
+    assert main_module._native_results([], None, None, 3) is None
+
+    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4, where=None: [{"id": "english"}])
+    future = Future()
+    future.set_result(weak)
+    debug_info = {}
+    assert main_module._retrieve_for_request((future, None), "fever", 4, None, debug_info) == [{"id": "english"}]
+    assert debug_info["retrieval_source"] == "translated"
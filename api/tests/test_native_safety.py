@@ -0,0 +1,56 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import safety  # noqa: E402
+
+
+def test_lexicons_loaded_for_all_supported_languages():
+    assert set(safety.NATIVE_SAFETY_LEXICONS) == {"hi", "ta", "te", "kn", "ml"}
+    for categories in safety.NATIVE_SAFETY_LEXICONS.values():
+        assert set(categories) == set(safety.SAFETY_LEXICON_CATEGORIES)
+        assert all(categories.values())
+
+
+@pytest.mark.parametrize(
+    "text, lang, flag",
+    [
+        ("मुझे सीने में दर्द हो रहा है", "hi", "red_flag"),
+        ("எனக்கு நெஞ்சு வலி இருக்கிறது", "ta", "red_flag"),
+        ("నాకు ఆత్మహత్య ఆలోచనలు వస్తున్నాయి", "te", "crisis"),
+        ("ನನಗೆ ಎದೆ ನೋವು ಇದೆ", "kn", "red_flag"),
+        ("കുഞ്ഞ് അനങ്ങുന്നില്ല", "ml", "pregnancy_concern"),
+        ("Enakku nenju vali romba irukku", "ta", "red_flag"),
+        ("Naaku chanipovalani undi", "te", "crisis"),
+    ],
+)
+def test_native_and_romanized_phrases_are_flagged(text, lang, flag):
+    result = safety.detect_native_safety_signals(text)
+    assert result[flag] is True
+    assert lang in result["languages"]
+
+
+def test_ordinary_message_is_not_flagged():
+    result = safety.detect_native_safety_signals("எனக்கு லேசான தலைவலி இருக்கிறது, என்ன செய்யலாம்?")
+    assert result["languages"] == []
+    assert not (result["red_flag"] or result["crisis"] or result["pregnancy_concern"])
+
+
+def test_merge_keeps_native_flags_and_reports_unconfirmed():
+    native = safety.detect_native_safety_signals("எனக்கு நெஞ்சு வலி")
+    # Translation lost the meaning: English checks find nothing
+    translated = "I have some discomfort"
+    red_flags = safety.detect_red_flags(translated)
+    mental_health = safety.detect_mental_health_crisis(translated)
+    pregnancy = safety.detect_pregnancy_emergency(translated)
+
+    assert safety.unconfirmed_native_categories(native, red_flags, mental_health, pregnancy) == ["red_flags"]
+    red_flags, mental_health, pregnancy = safety.merge_native_safety(native, red_flags, mental_health, pregnancy)
+    assert red_flags["red_flag"] is True
+    assert "நெஞ்சு வலி" in red_flags["matched"]
+    assert mental_health["crisis"] is False
@@ -0,0 +1,96 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.models import Profile  # noqa: E402
+from api.rag import retriever  # noqa: E402
+from api.rag.bm25 import BM25Index  # noqa: E402
+from api.rag.planner import category_rows, is_weak, plan_retrieval, rows_for_where  # noqa: E402
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+from api.router import route_query  # noqa: E402
+
+CATEGORIES = ["general", "pregnancy", "peds", "Sexual_Health_Men", "mentalhealth", "pregnancy"]
+
+
+def test_profile_and_safety_signals_select_categories():
+    assert plan_retrieval(None, "fever") is None
+    assert plan_retrieval(Profile(sex="male", age=40), "chest pain") == {
+        "category": {"$nin": ["Sexual_Health_Women", "peds", "pregnancy"]}
+    }
+    # An adult asking about their child keeps pediatric pages; a pregnant user keeps pregnancy pages
+    assert plan_retrieval(Profile(sex="female", age=30, pregnancy=True), "my baby has a rash") == {
+        "category": {"$nin": ["Sexual_Health_Men"]}
+    }
+    assert plan_retrieval(Profile(age=8), "tummy ache") == {
+        "category": {"$nin": ["Sexual_Health_Men", "Sexual_Health_Women", "pregnancy"]}
+    }
+    partner = plan_retrieval(Profile(sex="male", age=35), "my wife is pregnant", {"route": route_query("my wife is pregnant")})
+    assert partner == {"category": {"$nin": ["Sexual_Health_Women", "peds"]}}
+    crisis = plan_retrieval(Profile(sex="male", age=40), "", {"mental_health": {"crisis": True}})
+    assert crisis["category"]["$in"][0] == "mentalhealth"
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["my 5 year old has a fever", "fever in my 5-year-old", "rash on a year-old son", "my 3 yr old is coughing",
+     "2-yrs-old with diarrhoea", "my 8 month old won't feed"],
+)
+def test_adults_asking_about_a_child_by_age_keep_pediatric_pages(query):
+    assert "peds" not in plan_retrieval(Profile(sex="female", age=34), query)["category"]["$nin"]
+
+
+@pytest.mark.parametrize("query", ["my 45 year old husband has a fever", "I am 30 years old with a rash"])
+def test_adult_ages_do_not_count_as_a_child(query):
+    assert "peds" in plan_retrieval(Profile(sex="female", age=34), query)["category"]["$nin"]
+
+
+def test_rows_for_where_uses_per_category_rows():
+    rows = category_rows([{"category": c} for c in CATEGORIES])
+    assert rows_for_where(rows, None) is None
+    assert rows_for_where(rows, {"category": {"$nin": ["pregnancy", "peds"]}}).tolist() == [0, 3, 4]
+    assert rows_for_where(rows, {"category": {"$in": ["pregnancy", "missing"]}}).tolist() == [1, 5]
+    assert rows_for_where(rows, {"category": {"$in": ["missing"]}}).tolist() == []
+
+
+def test_numpy_and_bm25_search_only_filtered_rows():
+    embeddings = np.eye(len(CATEGORIES), dtype=np.float32)
+    metadatas = [{"category": c, "source": f"{c}/{i}.md"} for i, c in enumerate(CATEGORIES)]
+    ids = [f"chunk{i}" for i in range(len(CATEGORIES))]
+    documents = [f"fever advice {c}" for c in CATEGORIES]
+
+    vectors = NumpyVectorIndex(ids, embeddings, documents, metadatas, space="l2")
+    rows = np.array([0, 3, 4])
+    assert [row for row, _ in vectors.search(embeddings[1], 2, rows)] == [0, 3]
+    assert vectors.query(embeddings[1], 1, rows)["ids"] == ["chunk0"]
+    assert vectors.search(embeddings[1], 1)[0][0] == 1
+
+    bm25 = BM25Index(ids, documents, metadatas)
+    assert {row for row, _ in bm25.search("fever pregnancy", 6, rows)} == {0, 3, 4}
+    assert bm25.search("fever pregnancy", 1)[0][0] in (1, 5)
+
+
+def test_weak_filtered_results_fall_back_to_global(monkeypatch):
+    calls = []
+
+    def fake_sparse(query, k, where=None):
+        calls.append(where)
+        if where:
+            return [{"id": "a", "chunk": "a", "source": "a.md", "bm25_score": 1.0}]
+        return [{"id": "b", "chunk": "b", "source": "b.md", "bm25_score": 12.0}]
+
+    monkeypatch.setattr(retriever, "_retrieve_sparse", fake_sparse)
+    where = {"category": {"$nin": ["peds"]}}
+
+    results = retriever.retrieve("fever", k=1, mode="sparse", rerank="off", where=where)
+    assert calls == [where, None]
+    assert results[0]["id"] == "b"
+
+    assert not is_weak([{"bm25_score": 12.0}], 1)
+    assert is_weak([{"distance": 1.9}], 1)
+    assert is_weak([], 1)
@@ -0,0 +1,105 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main as main_module  # noqa: E402
+from api.benchmarks.bench_retrieval import calibrate_cutoff  # noqa: E402
+from api.models import ChatRequest, Profile  # noqa: E402
+from api.rag import retriever  # noqa: E402
+
+
+def test_calibrated_threshold_keeps_the_labeled_top_hits():
+    relevant = [float(score) for score in range(5, 105)]
+    bm25 = calibrate_cutoff(relevant, [0.0, 2.0, 6.0], lower_is_better=False, loss=0.01)
+    assert bm25["threshold"] == pytest.approx(5.99)
+    assert (bm25["relevant_kept"], bm25["off_topic_kept"]) == (0.99, 0.333)
+
+    dense = calibrate_cutoff([0.5, 0.8, 1.0, 1.2], [1.5, 1.8], lower_is_better=True, loss=0.0)
+    assert (dense["threshold"], dense["relevant_kept"], dense["off_topic_kept"]) == (1.2, 1.0, 0.0)
+
+
+def test_hits_below_the_cutoff_are_dropped(monkeypatch):
+    hits = [
+        {"id": "close", "chunk": "a", "source": "a.md", "distance": 0.6},
+        {"id": "keyword", "chunk": "b", "source": "b.md", "distance": 1.6, "bm25_score": 9.0},  # hybrid: one signal passes
+        {"id": "far", "chunk": "c", "source": "c.md", "distance": 1.7},
+        {"id": "weak", "chunk": "d", "source": "d.md", "bm25_score": 1.5},
+        {"id": "unscored", "chunk": "e", "source": "e.md"},
+    ]
+    monkeypatch.setattr(retriever, "RAG_RELEVANCE_CUTOFF", True)
+    monkeypatch.setattr(retriever, "RAG_MAX_DISTANCE", 1.3)
+    monkeypatch.setattr(retriever, "RAG_MIN_BM25_SCORE", 4.0)
+    monkeypatch.setattr(retriever, "_retrieve_dense", lambda query, k: hits)
+
+    results = retriever.retrieve("anything", k=5, mode="dense", rerank="off")
+    assert [r["id"] for r in results] == ["close", "keyword", "unscored"]
+    assert len(retriever.retrieve("anything", k=5, mode="dense", rerank="off", cutoff=False)) == 5
+
+    monkeypatch.setattr(retriever, "_retrieve_dense", lambda query, k: hits[2:4])
+    assert retriever.retrieve("capital of france", k=4, mode="dense", rerank="off") == []
+
+
+@pytest.mark.parametrize("lang", ["en", "hi"])
+def test_no_match_skips_generation_and_answers_in_the_user_language(monkeypatch, lang):
+    def no_generation(**kwargs):
+        raise AssertionError("generation must not run")
+
+    # The reply follows the language the user typed in, not the requested one
+    monkeypatch.setattr(main_module, "get_openai_client", lambda: None)
+    monkeypatch.setattr(main_module, "detect_language", lambda text: lang)
+    monkeypatch.setattr(main_module, "translate_text", lambda text, target_lang="en", src_lang=None: text)
+    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4, where=None: [])
+    monkeypatch.setattr(main_module, "generate_answer", no_generation)
+
+    request = ChatRequest(text="What is the capital of France?", lang="hi" if lang == "en" else "en", profile=Profile())
+    response, _, _ = main_module.process_chat_request(request)
+
+    assert response.answer == main_module.INSUFFICIENT_INFORMATION_MESSAGES[lang]
+    assert response.citations == []
+
+
+def test_follow_ups_with_history_still_reach_generation(monkeypatch):
+    generated = []
+
+    def fake_generate(**kwargs):
+        generated.append(kwargs)
+        return "For children, use a weight-based paracetamol dose.", {"provider": "stub"}
+
+    monkeypatch.setattr(main_module, "get_openai_client", lambda: None)
+    monkeypatch.setattr(main_module, "detect_language", lambda text: "en")
+    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4, where=None: [])
+    monkeypatch.setattr(main_module, "generate_answer", fake_generate)
+
+    history = [
+        {"role": "user", "content": "How much paracetamol can I take for a fever?"},
+        {"role": "assistant", "content": "Adults can take 500mg to 1g every 4 to 6 hours."},
+    ]
+    request = ChatRequest(text="what about for kids?", lang="en", profile=Profile())
+    response, _, _ = main_module.process_chat_request(request, conversation_history=history)
+
+    assert generated
+    assert response.answer.startswith("For children")
+
+
+def test_safety_signals_still_reach_generation(monkeypatch):
+    generated = []
+
+    def fake_generate(**kwargs):
+        generated.append(kwargs["facts"])
+        return "Please call 108 now.", {"provider": "stub"}
+
+    monkeypatch.setattr(main_module, "get_openai_client", lambda: None)
+    monkeypatch.setattr(main_module, "detect_language", lambda text: "en")
+    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4, where=None: [])
+    monkeypatch.setattr(main_module, "generate_answer", fake_generate)
+
+    request = ChatRequest(text="I want to kill myself", lang="en", profile=Profile())
+    response, _, _ = main_module.process_chat_request(request)
+
+    assert generated and any(f["type"] == "mental_health_crisis" for f in generated[0])
+    assert response.answer.startswith("Please call 108 now.")
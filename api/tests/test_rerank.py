@@ -0,0 +1,61 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.rerank import mmr_rerank  # noqa: E402
+
+BURNS = "Burns\nCool the burn under running water for 20 minutes. Do not apply ice or butter."
+
+
+def _result(source, chunk, score=None):
+    result = {"source": source, "chunk": chunk}
+    if score is not None:
+        result["score"] = score
+    return result
+
+
+def test_near_duplicate_pages_from_other_folders_are_dropped():
+    candidates = [
+        _result("firstaid/burns.md", BURNS, 10.0),
+        _result("Skin_Allergies/burns-first-aid.md", BURNS + " Seek care for large burns.", 9.5),
+        _result("firstaid/scalds.md", "Scalds\nHot liquids cause scalds; remove wet clothing gently.", 8.0),
+    ]
+    picked = mmr_rerank(candidates, k=3, min_relevance=0.0)
+    assert [r["source"] for r in picked] == ["firstaid/burns.md", "firstaid/scalds.md"]
+
+
+def test_per_source_cap_and_low_relevance_tail_is_not_backfilled():
+    candidates = [
+        _result("a.md", "alpha beta gamma", 10.0),
+        _result("a.md", "delta epsilon zeta", 9.0),
+        _result("a.md", "eta theta iota", 8.5),
+        _result("b.md", "kappa lambda mu", 8.0),
+        _result("c.md", "nu xi omicron", 1.0),
+    ]
+    picked = mmr_rerank(candidates, k=4, max_per_source=2, min_relevance=0.2)
+    assert [r["source"] for r in picked] == ["a.md", "a.md", "b.md"]
+
+    # Without scores relevance follows rank, and the top candidate always comes first
+    picked = mmr_rerank([{k: v for k, v in r.items() if k != "score"} for r in candidates], k=2)
+    assert picked[0]["chunk"] == "alpha beta gamma"
+
+
+def test_retrieve_over_fetches_and_reranks(monkeypatch):
+    requested = []
+
+    def fake_sparse(query, k):
+        requested.append(k)
+        return [_result("firstaid/burns.md", BURNS), _result("firstaid/burns.md", BURNS), _result("b.md", "other text")]
+
+    monkeypatch.setattr(retriever, "_retrieve_sparse", fake_sparse)
+
+    results = retriever.retrieve("burn", k=2, mode="sparse", rerank="mmr")
+    assert requested == [2 * retriever.RERANK_CANDIDATE_MULTIPLIER]
+    assert [r["source"] for r in results] == ["firstaid/burns.md", "b.md"]
+
+    assert len(retriever.retrieve("burn", k=2, mode="sparse", rerank="off")) == 3  # fake ignores k
+    assert requested[-1] == 2
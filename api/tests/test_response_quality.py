@@ -22,7 +22,7 @@ def stub_external_dependencies(monkeypatch):
     def fake_detect_language(_: str) -> str:
         return "en"
 
-    def fake_retrieve(_: str, k: int = 4):
+    def fake_retrieve(_: str, k: int = 4, where=None):
         return [
             {
                 "chunk": "Sample clinical guidance chunk.",
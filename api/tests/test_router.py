@@ -0,0 +1,81 @@
+import json
+import re
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import router  # noqa: E402
+from api.benchmarks.bench_router import legacy_is_graph_intent  # noqa: E402
+
+LABELED_QUERIES = json.loads(
+    (PROJECT_ROOT / "api" / "benchmarks" / "router_queries.json").read_text(encoding="utf-8")
+)
+
+
+@pytest.mark.parametrize("item", LABELED_QUERIES, ids=lambda item: item["query"][:40])
+def test_labeled_queries_are_routed_correctly(item):
+    assert router.route_query(item["query"])["route"] == item["route"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "My company gives long shifts",
+        "Many people get colds in winter",
+        "I saw a specialist last week",
+        "Which",
+        "The baby is not moving and I see a red flag",
+    ],
+)
+def test_combined_pattern_matches_any_individual_pattern(text):
+    expected = any(re.search(pattern, text.lower()) for pattern in router.GRAPH_PATTERNS)
+    assert bool(router._GRAPH_REGEX.search(text.lower())) == expected
+
+
+def test_keywords_only_match_whole_words():
+    decision = router.route_query("My company has many employees with back pain")
+    assert decision["route"] == "vector"
+    assert "graph_keyword" not in decision["matched"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I am pregnant and baby movements are reduced",
+        "I have chest pains and fevers",
+        "what are the contraindications of ibuprofen",
+        "suicidal thoughts, need helplines",
+        "hospitals near me",
+        "my baby is kicking less, any danger?",
+        "my wife is pregnant, which doctors are nearby?",
+        "depression is getting worse and I need helplines",
+    ],
+)
+def test_plural_and_inflected_forms_route_like_the_legacy_router(text):
+    assert legacy_is_graph_intent(text)
+    assert router.route_query(text)["route"] == "graph"
+
+
+def test_plurals_match_the_singular_terms():
+    decision = router.route_query("Hospitals for chest pains and fevers")
+    assert decision["matched"]["symptom"] == ["chest pain", "fever"]
+    assert decision["matched"]["graph_keyword"] == ["hospital"]
+
+
+def test_route_reports_matched_features():
+    decision = router.route_query("Which hospital in Mumbai treats chest pain and fever?")
+    assert decision["route"] == "graph"
+    assert decision["features"][0] == "pattern:provider_question"
+    assert "symptoms:2" in decision["features"]
+    assert "keyword:hospital" in decision["features"]
+    assert decision["matched"]["symptom"] == ["chest pain", "fever"]
+
+
+def test_is_graph_intent_matches_route_query():
+    for item in LABELED_QUERIES:
+        assert router.is_graph_intent(item["query"]) == (router.route_query(item["query"])["route"] == "graph")
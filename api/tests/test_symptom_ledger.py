@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main  # noqa: E402
+from api.services import symptom_ledger  # noqa: E402
+
+HISTORY = [
+    {"role": "user", "content": "I have chest pain since morning"},
+    {"role": "assistant", "content": "Chest pain with fever, nausea or a headache can mean many things..."},
+]
+
+
+class FakeCache:
+    def __init__(self):
+        self.store = {}
+
+    def is_available(self):
+        return True
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+        return True
+
+
+def test_ledger_only_records_user_turns():
+    ledger = symptom_ledger.build_ledger_from_history(HISTORY)
+    assert ledger["turns"] == 1
+    assert ledger["symptoms"] == {"chest pain": [0]}
+    assert ledger["phrases"] == {"chest pain": [0]}
+
+
+def test_recent_terms_uses_last_user_turns():
+    ledger = symptom_ledger.new_ledger()
+    symptom_ledger.record_user_turn(ledger, ["fever"], ["fever"])
+    symptom_ledger.record_user_turn(ledger, [], [])
+    symptom_ledger.record_user_turn(ledger, ["chest pain"], ["left arm pain"])
+    assert symptom_ledger.recent_terms(ledger, window=2) == ({"chest pain"}, {"left arm pain"})
+    assert symptom_ledger.recent_terms(ledger, window=3) == ({"chest pain", "fever"}, {"fever", "left arm pain"})
+
+
+def test_update_appends_turn_to_cached_ledger(monkeypatch):
+    cache = FakeCache()
+    monkeypatch.setattr(symptom_ledger, "cache_service", cache)
+
+    ledger = asyncio.run(symptom_ledger.get_symptom_ledger("s1", HISTORY))
+    assert cache.store["symptom_ledger:s1"] == ledger
+
+    updated = asyncio.run(
+        symptom_ledger.update_symptom_ledger("s1", "meri baanh mein dard", {"symptoms": [], "phrases": ["left arm pain"]})
+    )
+    assert updated["turns"] == 2
+    assert updated["phrases"]["left arm pain"] == [1]
+
+
+def test_relationships_come_from_ledger_not_assistant_text(monkeypatch):
+    seen = {}
+
+    def fake_related(symptoms):
+        seen["query"] = symptoms
+        return [{"original_symptom": "Chest pain", "related_symptom": "Left arm pain"}]
+
+    monkeypatch.setattr(main, "graph_get_related_symptoms", fake_related)
+    ledger = symptom_ledger.build_ledger_from_history(HISTORY)
+
+    facts = main._check_symptom_relationships("What about left arm pain?", ["chest pain"], symptom_ledger=ledger)
+
+    assert facts and facts[0]["type"] == "symptom_relationships"
+    # Symptoms only mentioned in the assistant answer are not part of the query
+    assert "fever" not in seen["query"] and "nausea" not in seen["query"]
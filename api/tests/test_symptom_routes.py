@@ -0,0 +1,96 @@
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.planner import profile_class  # noqa: E402
+from api.rag.symptom_routes import SymptomRouteTable  # noqa: E402
+from api.safety import match_symptom_phrases  # noqa: E402
+
+
+def _chunk(source: str, chunk_id: int, text: str, category: str = "general") -> dict:
+    return {
+        "id": f"{source[:-3]}#{chunk_id}",
+        "document": text,
+        "metadata": {
+            "source": source,
+            "category": category,
+            "title": source.split("/")[-1][:-3],
+            "chunk_id": chunk_id,
+            "reference_sources": "[]",
+        },
+    }
+
+
+ROWS = [
+    _chunk("general/fever-adult.md", 0, "Overview of adult illness and rest."),
+    _chunk("general/fever-adult.md", 1, "A high fever above 39C needs fluids, rest and paracetamol."),
+    _chunk("general/fever-adult.md", 2, "Seek care if the fever lasts more than three days."),
+    _chunk("peds/fever-child.md", 0, "A fever in a child under three months needs a doctor.", "peds"),
+    _chunk("general/vomiting.md", 0, "Sip fluids after vomiting and rest the stomach."),
+]
+ROUTES = {
+    "high fever": {"adult": ["general/fever-adult.md"], "child": ["peds/fever-child.md"]},
+    "vomiting": {"adult": ["general/vomiting.md", "general/missing-page.md"]},
+}
+
+
+def _table(**kwargs) -> SymptomRouteTable:
+    return SymptomRouteTable.from_chunks(
+        [row["id"] for row in ROWS], [row["document"] for row in ROWS], [row["metadata"] for row in ROWS],
+        routes=ROUTES, **kwargs,
+    )
+
+
+def _lookup(table: SymptomRouteTable, text: str, patient_class="adult", k: int = 4, where=None):
+    rows = table.lookup(text, match_symptom_phrases(text), patient_class, k, where)
+    return rows if rows is None else [row["id"] for row in rows]
+
+
+def test_routes_rank_chunks_of_routed_pages_by_the_symptom(tmp_path):
+    table = _table(chunks_per_route=2)
+    assert table.routes == {
+        "high fever": {"adult": ["general/fever-adult#1", "general/fever-adult#2"], "child": ["peds/fever-child#0"]},
+        "vomiting": {"adult": ["general/vomiting#0"]},  # the page that is not indexed is skipped
+    }
+
+    table.save(tmp_path / "symptom_routes.json")
+    loaded = SymptomRouteTable.load(tmp_path / "symptom_routes.json")
+    assert _lookup(loaded, "I have high fever since 2 days") == ["general/fever-adult#1", "general/fever-adult#2"]
+    assert _lookup(loaded, "high fever", "child") == ["peds/fever-child#0"]
+    # Symptoms take turns
+    assert _lookup(loaded, "high fever and vomiting", k=2) == ["general/fever-adult#1", "general/vomiting#0"]
+
+
+def test_unclear_messages_are_left_to_search():
+    table = _table()
+    assert _lookup(table, "what vaccines does a traveller need") is None
+    assert _lookup(table, "vomiting", "child") is None  # no route for the class
+    assert _lookup(table, "high fever", None) is None  # pregnancy and a child both apply
+    assert _lookup(table, "vomiting after eating raw oysters at a seafood market") is None
+    assert _lookup(table, "high fever", "child", where={"category": {"$nin": ["peds"]}}) is None
+
+
+def test_patient_class_follows_profile_and_message():
+    assert profile_class(None, "I have a high fever") == "adult"
+    assert profile_class(SimpleNamespace(age=5), "high fever") == "child"
+    assert profile_class(None, "my daughter has a fever") == "child"
+    assert profile_class(SimpleNamespace(age=30, pregnancy=True), "high fever") == "pregnancy"
+    assert profile_class(SimpleNamespace(age=30, pregnancy=True), "my son has a fever") is None
+
+
+def test_retrieve_by_symptoms_formats_routed_chunks(monkeypatch):
+    monkeypatch.setattr(retriever, "_doc_store", None)
+    monkeypatch.setattr(retriever, "_symptom_routes_initialized", True)
+    monkeypatch.setattr(retriever, "_symptom_routes", None)
+    assert retriever.retrieve_by_symptoms("high fever", match_symptom_phrases("high fever"), "adult") is None
+
+    monkeypatch.setattr(retriever, "_symptom_routes", _table())
+    results = retriever.retrieve_by_symptoms("high fever", match_symptom_phrases("high fever"), "adult", k=1)
+    assert [(result["id"], result["source"], result["category"]) for result in results] == [
+        ("general/fever-adult#1", "general/fever-adult.md", "general")
+    ]
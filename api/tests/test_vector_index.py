@@ -0,0 +1,67 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.vector_index import NumpyVectorIndex  # noqa: E402
+
+
+def _index(space="l2", rows=50, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((rows, dim)).astype(np.float32)
+    metadatas = [
+        {"source": f"general/doc_{i}.md", "source_file": f"doc_{i}.md", "title": f"Doc {i}", "reference_sources": "[]"}
+        for i in range(rows)
+    ]
+    return NumpyVectorIndex([f"general/doc_{i}#0" for i in range(rows)], matrix, [f"chunk {i}" for i in range(rows)], metadatas, space)
+
+
+@pytest.mark.parametrize("space", ["l2", "cosine", "ip"])
+def test_search_matches_brute_force(space):
+    index = _index(space)
+    query = np.random.default_rng(1).standard_normal(16).astype(np.float32)
+
+    raw = _index("l2").matrix  # un-normalised rows
+    if space == "l2":
+        expected = ((raw - query) ** 2).sum(axis=1)
+    elif space == "cosine":
+        expected = 1 - (raw @ query) / (np.linalg.norm(raw, axis=1) * np.linalg.norm(query))
+    else:
+        expected = 1 - raw @ query
+
+    hits = index.search(query, 5)
+    assert [row for row, _ in hits] == list(np.argsort(expected)[:5])
+    assert np.allclose([distance for _, distance in hits], np.sort(expected)[:5], atol=1e-4)
+
+
+def test_search_handles_k_larger_than_index_and_empty_index():
+    index = _index(rows=3)
+    assert len(index.search(np.ones(16), 10)) == 3
+    empty = NumpyVectorIndex([], np.zeros((0, 16)), [], [])
+    assert empty.search(np.ones(16), 4) == []
+
+
+def test_rows_must_be_parallel():
+    with pytest.raises(ValueError):
+        NumpyVectorIndex(["a"], np.zeros((2, 4)), ["x"], [{}])
+
+
+def test_retrieve_uses_numpy_engine_when_configured(monkeypatch):
+    index = _index()
+    monkeypatch.setattr(retriever, "RAG_ENGINE", "numpy")
+    monkeypatch.setattr(retriever, "_numpy_index", index)
+    monkeypatch.setattr(retriever, "embed_query", lambda query: index.matrix[7])
+    monkeypatch.setattr(retriever, "RAG_RELEVANCE_CUTOFF", False)  # synthetic scores; cutoff tested separately
+
+    results = retriever.retrieve("any question", k=2)
+
+    assert [r["id"] for r in results][0] == "general/doc_7#0"
+    assert len(results) == 2
+    assert results[0]["source"] == "general/doc_7.md"
+    assert results[0]["reference_sources"] == []
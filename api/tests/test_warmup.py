@@ -0,0 +1,61 @@
+from pathlib import Path
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main as main_module  # noqa: E402
+from api.services.warmup import StartupWarmup  # noqa: E402
+
+
+def test_steps_run_in_order_and_failures_do_not_block_readiness():
+    calls = []
+
+    def broken():
+        calls.append("broken")
+        raise RuntimeError("model download failed")
+
+    warmup = StartupWarmup([("index", lambda: calls.append("index")), ("model", broken), ("graph", lambda: calls.append("graph"))])
+    assert warmup.get_status()["state"] == "pending"
+
+    warmup.start()
+    assert warmup.wait(5)
+
+    status = warmup.get_status()
+    assert calls == ["index", "broken", "graph"]
+    assert status["ready"] and status["state"] == "ready"
+    assert status["steps"]["model"]["status"] == "failed"
+    assert "model download failed" in status["steps"]["model"]["error"]
+    assert status["steps"]["graph"]["status"] == "ok"
+
+    warmup.run()  # runs only once
+    assert calls == ["index", "broken", "graph"]
+
+
+def test_ready_endpoint_reports_503_until_warm(monkeypatch):
+    release = threading.Event()
+    warmup = StartupWarmup([("retrieval", lambda: release.wait(5))])
+    monkeypatch.setattr(main_module, "startup_warmup", warmup)
+    client = TestClient(main_module.app)
+
+    warmup.start()
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["steps"]["retrieval"]["status"] == "running"
+
+    release.set()
+    assert warmup.wait(5)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert client.get("/health").status_code == 200  # liveness is independent of warmup
+
+
+def test_registered_steps_cover_index_model_retrieval_safety_and_graph():
+    names = [name for name, _ in main_module.startup_warmup.steps]
+    assert names == ["vector_index", "embedding_model", "retrieval", "safety", "graph"]
+    main_module._warm_safety()  # pure in-process; must not raise
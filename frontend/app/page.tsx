@@ -932,7 +932,16 @@ export default function Home({ initialSessionId }: HomeProps = {}) {
                 }
               }
               
-              if (data.type === 'translated_start') {
+              if (data.type === 'safety') {
+                // Early safety alert from the original (untranslated) text - show it before the answer arrives
+                setMessages((prev) =>
+                  prev.map((msg) =>
+                    msg.id === assistantMessageId
+                      ? { ...msg, safety: data.safety }
+                      : msg
+                  )
+                );
+              } else if (data.type === 'translated_start') {
                 // Clear the accumulated English content when translation starts
                 // This replaces the English loading indicator with translated content
                 translatedStarted = true;